@@ -18,6 +18,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("AeroTest API 启动中...")
 
     # 启动时的初始化逻辑
+    from aerotest.core.funnel.segmenter import warmup
+
+    warmup()  # 后台加载分词词典，首个请求无需等待
     # TODO: 初始化数据库连接池
     # TODO: 初始化 Redis 连接
 
@@ -14,8 +14,25 @@
 """
 
 from aerotest.browser.cdp.connection import CDPConnection, CDPConnectionConfig
+from aerotest.browser.cdp.context_pool import BrowserContextPool
+from aerotest.browser.cdp.dom_mirror import DOMMirror
+from aerotest.browser.cdp.readiness import PageReadinessTracker
 from aerotest.browser.cdp.session import CDPSession
-from aerotest.browser.cdp.types import PageInfo, TargetInfo
+from aerotest.browser.cdp.storage_state import OriginStorage, StorageState, StorageStateStore
+from aerotest.browser.cdp.types import (
+    ATTRIBUTES_ONLY_PROFILE,
+    CAPTURE_PROFILES,
+    FULL_PROFILE,
+    LAYOUT_PROFILE,
+    BrowserContextPoolConfig,
+    CaptureProfile,
+    DOMMirrorConfig,
+    PageInfo,
+    ReadinessConfig,
+    PooledBrowserContext,
+    ReadinessWaitMetrics,
+    TargetInfo,
+)
 
 __all__ = [
     # 连接
@@ -23,7 +40,28 @@ __all__ = [
     "CDPConnectionConfig",
     # 会话
     "CDPSession",
+    # 隔离浏览器上下文池
+    "BrowserContextPool",
+    # 页面就绪
+    "PageReadinessTracker",
+    # 增量 DOM 镜像
+    "DOMMirror",
+    # 登录态快照
+    "OriginStorage",
+    "StorageState",
+    "StorageStateStore",
+    # 抓取配置
+    "ATTRIBUTES_ONLY_PROFILE",
+    "CAPTURE_PROFILES",
+    "CaptureProfile",
+    "FULL_PROFILE",
+    "LAYOUT_PROFILE",
     # 类型
+    "BrowserContextPoolConfig",
+    "DOMMirrorConfig",
     "PageInfo",
+    "PooledBrowserContext",
+    "ReadinessConfig",
+    "ReadinessWaitMetrics",
     "TargetInfo",
 ]
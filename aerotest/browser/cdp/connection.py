@@ -6,17 +6,22 @@
 """
 
 import asyncio
+import inspect
 import json
-from typing import Optional
+import time
+from typing import Any, Callable, Optional
 
 import httpx
 from cdp_use import CDPClient
 
-from aerotest.browser.cdp.types import CDPConnectionConfig, TargetInfo
+from aerotest.browser.cdp.types import BrowserContextPoolConfig, CDPConnectionConfig, TargetInfo
 from aerotest.utils import get_logger
 
 logger = get_logger("aerotest.cdp.connection")
 
+# 目标列表发生变化的事件（收到后目标列表缓存失效）
+TARGET_EVENTS = ("Target.targetCreated", "Target.targetDestroyed", "Target.targetInfoChanged")
+
 
 class CDPConnection:
     """CDP WebSocket 连接管理器
@@ -25,6 +30,12 @@ class CDPConnection:
     - 连接到 Chrome DevTools Protocol
     - 管理 WebSocket 生命周期
     - 获取可用的浏览器目标（页面）
+    - 分发 CDP 事件（同一事件可有多个监听器，按会话过滤）
+    
+    发现接口（/json/version、/json/list 等）共用一个 keep-alive HTTP 连接池；
+    /json/version 和目标列表按 discovery_cache_ttl 短暂缓存，并发的相同请求
+    合并为一次，收到 Target.targetCreated / targetDestroyed 等事件时目标列表
+    缓存失效。
     
     Example:
         ```python
@@ -48,6 +59,32 @@ class CDPConnection:
         self.client: Optional[CDPClient] = None
         self._connected = False
         
+        # 事件方法 -> [(session_id, callback)]
+        # cdp_use 每个事件只保留一个处理器，这里统一分发
+        self._event_listeners: dict[str, list[tuple[Optional[str], Callable]]] = {}
+        
+        # 隔离浏览器上下文池（按需创建）
+        self.context_pool = None
+        
+        # 发现接口共用的 HTTP 连接池（按需创建，断开连接时关闭）
+        self.http_client: Optional[httpx.AsyncClient] = None
+        # 发现接口响应缓存: 路径 -> (获取时间, JSON)
+        self._discovery_cache: dict[str, tuple[float, Any]] = {}
+        self._discovery_inflight: dict[str, asyncio.Future] = {}
+        self._http_stats = {
+            "requests": 0,
+            "errors": 0,
+            "connections_opened": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+            "request_ms": 0.0,
+        }
+        
+        for method in TARGET_EVENTS:
+            self.add_event_listener(method, self._on_target_event)
+        
         logger.debug(f"初始化 CDP 连接: {config.http_url}")
     
     async def connect(self) -> CDPClient:
@@ -83,6 +120,14 @@ class CDPConnection:
             )
             
             self._connected = True
+            
+            # 重新挂接已注册的事件监听器
+            for method in self._event_listeners:
+                self._register_dispatcher(method)
+            
+            # 订阅目标创建/销毁事件（用于目标列表缓存失效）
+            await self._enable_target_discovery()
+            
             logger.info("✅ CDP 连接成功")
             
             return self.client
@@ -100,6 +145,12 @@ class CDPConnection:
             logger.debug("CDP 未连接，无需断开")
             return
         
+        if self.context_pool is not None:
+            await self.context_pool.close()
+            self.context_pool = None
+        
+        await self._close_http_client()
+        
         try:
             logger.info("正在断开 CDP 连接...")
             await self.client.disconnect()
@@ -123,12 +174,7 @@ class CDPConnection:
             目标信息列表
         """
         try:
-            url = f"{self.config.http_url}/json/list"
-            
-            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                targets_data = response.json()
+            targets_data = await self._get_discovery_json("/json/list")
             
             targets = []
             for target_data in targets_data:
@@ -184,12 +230,9 @@ class CDPConnection:
             新创建的页面目标信息
         """
         try:
-            create_url = f"{self.config.http_url}/json/new?{url}"
-            
-            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-                response = await client.get(create_url)
-                response.raise_for_status()
-                target_data = response.json()
+            response = await self._http_get(f"/json/new?{url}")
+            target_data = response.json()
+            self.invalidate_discovery_cache("/json/list")
             
             target = TargetInfo(
                 target_id=target_data["id"],
@@ -217,11 +260,8 @@ class CDPConnection:
             是否成功关闭
         """
         try:
-            close_url = f"{self.config.http_url}/json/close/{target_id}"
-            
-            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-                response = await client.get(close_url)
-                response.raise_for_status()
+            await self._http_get(f"/json/close/{target_id}")
+            self.invalidate_discovery_cache("/json/list")
             
             logger.info(f"✅ 关闭目标: {target_id}")
             return True
@@ -230,15 +270,79 @@ class CDPConnection:
             logger.error(f"关闭目标失败: {e}")
             return False
     
+    async def create_browser_context(self) -> str:
+        """
+        创建隔离的浏览器上下文（类似无痕窗口，Cookie 和存储互不共享）
+        
+        Returns:
+            浏览器上下文 ID
+        """
+        result = await self.client.send.Target.createBrowserContext(
+            params={"disposeOnDetach": False}
+        )
+        return result["browserContextId"]
+    
+    async def create_target(
+        self,
+        url: str = "about:blank",
+        browser_context_id: Optional[str] = None,
+    ) -> TargetInfo:
+        """
+        通过 CDP 创建页面目标
+        
+        Args:
+            url: 初始 URL
+            browser_context_id: 所属浏览器上下文（None 表示默认上下文）
+            
+        Returns:
+            新页面的目标信息
+        """
+        params: dict[str, Any] = {"url": url}
+        if browser_context_id is not None:
+            params["browserContextId"] = browser_context_id
+        
+        result = await self.client.send.Target.createTarget(params=params)
+        return TargetInfo(target_id=result["targetId"], target_type="page", url=url)
+    
+    async def dispose_browser_context(self, browser_context_id: str):
+        """
+        销毁浏览器上下文（同时关闭其中的所有页面）
+        
+        Args:
+            browser_context_id: 浏览器上下文 ID
+        """
+        await self.client.send.Target.disposeBrowserContext(
+            params={"browserContextId": browser_context_id}
+        )
+    
+    async def create_context_pool(
+        self,
+        config: Optional[BrowserContextPoolConfig] = None,
+    ):
+        """
+        创建并启动隔离浏览器上下文池（预热 config.prewarm 个上下文）
+        
+        连接断开时自动关闭该池。
+        
+        Args:
+            config: 上下文池配置
+            
+        Returns:
+            BrowserContextPool 实例
+        """
+        from aerotest.browser.cdp.context_pool import BrowserContextPool
+        
+        if self.context_pool is not None:
+            await self.context_pool.close()
+        
+        self.context_pool = BrowserContextPool(self, config)
+        await self.context_pool.start()
+        return self.context_pool
+    
     async def _check_cdp_availability(self):
         """检查 CDP 是否可用"""
         try:
-            url = f"{self.config.http_url}/json/version"
-            
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                version_info = response.json()
+            version_info = await self._get_discovery_json("/json/version", timeout=5.0)
             
             browser = version_info.get("Browser", "Unknown")
             protocol_version = version_info.get("Protocol-Version", "Unknown")
@@ -257,12 +361,8 @@ class CDPConnection:
     async def _get_browser_ws_url(self) -> str:
         """获取浏览器的 WebSocket URL"""
         try:
-            url = f"{self.config.http_url}/json/version"
-            
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                version_info = response.json()
+            # 通常直接命中 _check_cdp_availability 刚缓存的响应
+            version_info = await self._get_discovery_json("/json/version", timeout=5.0)
             
             ws_url = version_info.get("webSocketDebuggerUrl")
             
@@ -275,6 +375,233 @@ class CDPConnection:
         except Exception as e:
             raise ConnectionError(f"无法获取 WebSocket URL: {e}") from e
     
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """获取发现接口共用的 keep-alive HTTP 客户端（按需创建）"""
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(
+                timeout=self.config.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.config.http_max_connections,
+                    max_keepalive_connections=self.config.http_max_connections,
+                    keepalive_expiry=self.config.http_keepalive_expiry,
+                ),
+            )
+        return self.http_client
+    
+    async def _close_http_client(self):
+        """关闭 HTTP 连接池并清空发现接口缓存"""
+        self._discovery_cache.clear()
+        if self.http_client is not None:
+            client, self.http_client = self.http_client, None
+            await client.aclose()
+    
+    async def _http_get(self, path: str, timeout: Optional[float] = None) -> httpx.Response:
+        """
+        通过共用连接池请求发现接口
+        
+        Args:
+            path: 路径（如 "/json/list"）
+            timeout: 超时（秒，None 使用配置的 timeout）
+            
+        Returns:
+            响应
+            
+        Raises:
+            httpx.HTTPError: 请求失败或状态码错误
+        """
+        client = self._get_http_client()
+        self._http_stats["requests"] += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(
+                f"{self.config.http_url}{path}",
+                timeout=timeout or self.config.timeout,
+                extensions={"trace": self._trace_http},
+            )
+            response.raise_for_status()
+            return response
+        except Exception:
+            self._http_stats["errors"] += 1
+            raise
+        finally:
+            self._http_stats["request_ms"] += (time.perf_counter() - start) * 1000
+    
+    async def _trace_http(self, event_name: str, info: dict):
+        """httpcore 跟踪回调：统计新建的 TCP 连接（其余请求复用 keep-alive 连接）"""
+        if event_name == "connection.connect_tcp.complete":
+            self._http_stats["connections_opened"] += 1
+    
+    async def _get_discovery_json(self, path: str, timeout: Optional[float] = None) -> Any:
+        """
+        获取发现接口的 JSON（短 TTL 缓存，并发的相同请求合并）
+        
+        Args:
+            path: 路径（"/json/version" 或 "/json/list"）
+            timeout: 超时（秒）
+            
+        Returns:
+            解析后的 JSON
+        """
+        cached = self._discovery_cache.get(path)
+        if cached is not None and time.monotonic() - cached[0] < self.config.discovery_cache_ttl:
+            self._http_stats["cache_hits"] += 1
+            return cached[1]
+        
+        inflight = self._discovery_inflight.get(path)
+        if inflight is not None:
+            self._http_stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 发起请求的任务被取消（而不是当前任务）时重新请求
+                if not inflight.cancelled():
+                    raise
+                return await self._get_discovery_json(path, timeout)
+        
+        self._http_stats["cache_misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._discovery_inflight[path] = future
+        try:
+            fetched_at = time.monotonic()
+            data = (await self._http_get(path, timeout=timeout)).json()
+            # 请求期间缓存被置为失效时不写入（结果可能已过时）
+            if self._discovery_inflight.get(path) is future and self.config.discovery_cache_ttl > 0:
+                self._discovery_cache[path] = (fetched_at, data)
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "Future exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            if self._discovery_inflight.get(path) is future:
+                del self._discovery_inflight[path]
+    
+    def invalidate_discovery_cache(self, path: Optional[str] = None):
+        """
+        使发现接口缓存失效
+        
+        Args:
+            path: 路径（None 表示全部）
+        """
+        paths = [path] if path else list(self._discovery_cache)
+        for key in paths:
+            self._discovery_cache.pop(key, None)
+            # 正在进行的请求结果不再写入缓存
+            self._discovery_inflight.pop(key, None)
+        self._http_stats["invalidations"] += 1
+    
+    async def _on_target_event(self, event: dict, session_id: Optional[str] = None):
+        """目标创建、销毁或信息变化时目标列表缓存失效"""
+        self.invalidate_discovery_cache("/json/list")
+    
+    async def _enable_target_discovery(self):
+        """订阅浏览器级的目标事件"""
+        try:
+            await self.client.send.Target.setDiscoverTargets(params={"discover": True})
+        except Exception as e:
+            logger.warning(f"订阅目标事件失败，目标列表缓存仅按 TTL 失效: {e}")
+    
+    @property
+    def http_stats(self) -> dict[str, Any]:
+        """发现接口 HTTP 连接池和缓存指标"""
+        stats = dict(self._http_stats)
+        lookups = stats["cache_hits"] + stats["cache_misses"] + stats["coalesced"]
+        stats["cache_hit_rate"] = (stats["cache_hits"] + stats["coalesced"]) / lookups if lookups else 0.0
+        stats["connection_reuse_rate"] = (
+            1 - stats["connections_opened"] / stats["requests"] if stats["requests"] else 0.0
+        )
+        return stats
+    
+    def add_event_listener(
+        self,
+        method: str,
+        callback: Callable[[dict, Optional[str]], Any],
+        session_id: Optional[str] = None,
+    ):
+        """
+        注册 CDP 事件监听器
+        
+        Args:
+            method: 事件名（如 "Page.lifecycleEvent"）
+            callback: 回调函数，接收 (event, session_id)，可以是协程函数
+            session_id: 只接收该会话的事件（None 表示接收所有会话）
+        """
+        if method not in self._event_listeners:
+            self._event_listeners[method] = []
+            if self.client is not None:
+                self._register_dispatcher(method)
+        
+        self._event_listeners[method].append((session_id, callback))
+    
+    def remove_event_listener(
+        self,
+        method: str,
+        callback: Callable[[dict, Optional[str]], Any],
+    ):
+        """
+        移除 CDP 事件监听器
+        
+        Args:
+            method: 事件名
+            callback: 注册时的回调函数
+        """
+        listeners = self._event_listeners.get(method)
+        if not listeners:
+            return
+        
+        self._event_listeners[method] = [
+            (sid, cb) for sid, cb in listeners if cb != callback
+        ]
+    
+    def remove_session_listeners(self, session_id: str):
+        """
+        移除某个会话注册的所有事件监听器
+        
+        Args:
+            session_id: 会话 ID
+        """
+        for method, listeners in self._event_listeners.items():
+            self._event_listeners[method] = [
+                (sid, cb) for sid, cb in listeners if sid != session_id
+            ]
+    
+    async def dispatch_event(
+        self,
+        method: str,
+        event: dict,
+        session_id: Optional[str] = None,
+    ):
+        """
+        将事件分发给所有匹配的监听器
+        
+        Args:
+            method: 事件名
+            event: 事件参数
+            session_id: 事件来源会话
+        """
+        for listener_session_id, callback in list(self._event_listeners.get(method, [])):
+            if listener_session_id is not None and listener_session_id != session_id:
+                continue
+            try:
+                result = callback(event, session_id)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"处理 CDP 事件 {method} 失败: {e}")
+    
+    def _register_dispatcher(self, method: str):
+        """在 CDP 客户端上注册分发器"""
+        domain, event_name = method.split(".", 1)
+        
+        async def dispatcher(event: dict, session_id: Optional[str] = None):
+            await self.dispatch_event(method, event, session_id)
+        
+        getattr(getattr(self.client.register, domain), event_name)(dispatcher)
+    
     @property
     def is_connected(self) -> bool:
         """是否已连接"""
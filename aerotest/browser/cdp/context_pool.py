@@ -0,0 +1,289 @@
+"""隔离浏览器上下文池
+
+在同一个 Chrome 进程中用 Target.createBrowserContext 创建多个互相隔离的
+浏览器上下文（Cookie、localStorage、缓存均不共享），预热后借给并发执行的
+用例使用；归还时销毁并重建上下文，保证下一个用例拿到干净的环境。
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Optional
+
+from aerotest.browser.cdp.connection import CDPConnection
+from aerotest.browser.cdp.session import CDPSession
+from aerotest.browser.cdp.types import BrowserContextPoolConfig, PooledBrowserContext
+from aerotest.utils import get_logger
+
+logger = get_logger("aerotest.cdp.context_pool")
+
+
+class BrowserContextPool:
+    """隔离浏览器上下文池
+
+    Example:
+        ```python
+        connection = CDPConnection(CDPConnectionConfig())
+        await connection.connect()
+        pool = await connection.create_context_pool(
+            BrowserContextPoolConfig(max_size=4, prewarm=4)
+        )
+
+        # 直接作为 CaseExecutor 的 Session 工厂
+        results = await executor.batch_execute(
+            cases,
+            workers=4,
+            session_factory=lambda worker_id: pool.open_session(),
+            session_release=pool.release_session,
+        )
+        ```
+    """
+
+    def __init__(
+        self,
+        connection: CDPConnection,
+        config: Optional[BrowserContextPoolConfig] = None,
+    ):
+        """
+        初始化上下文池
+
+        Args:
+            connection: 已连接的 CDP 连接
+            config: 上下文池配置
+        """
+        self.connection = connection
+        self.config = config or BrowserContextPoolConfig()
+
+        self._idle: deque[PooledBrowserContext] = deque()
+        self._changed = asyncio.Condition()
+        self._in_use: dict[str, PooledBrowserContext] = {}
+        self._sessions: dict[int, PooledBrowserContext] = {}
+        self._size = 0
+        self._closed = False
+
+        self._stats = {
+            "created": 0,
+            "disposed": 0,
+            "resets": 0,
+            "acquires": 0,
+            "waits": 0,
+        }
+
+    async def start(self):
+        """预热 config.prewarm 个上下文"""
+        count = min(self.config.prewarm, self.config.max_size) - self._size
+        if count <= 0:
+            return
+
+        start_time = time.perf_counter()
+        self._size += count
+        results = await asyncio.gather(
+            *(self._create_context() for _ in range(count)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                self._size -= 1
+                logger.error(f"预热浏览器上下文失败: {result}")
+            else:
+                self._idle.append(result)
+
+        logger.info(
+            f"浏览器上下文池预热完成: {len(self._idle)}/{count} "
+            f"({(time.perf_counter() - start_time) * 1000:.1f}ms)"
+        )
+
+    async def acquire(self, timeout: Optional[float] = None) -> PooledBrowserContext:
+        """
+        借出一个空闲上下文（池未满时按需创建，已满时等待归还）
+
+        Args:
+            timeout: 等待超时（秒，None 使用配置值）
+
+        Returns:
+            浏览器上下文
+
+        Raises:
+            RuntimeError: 池已关闭
+            asyncio.TimeoutError: 等待超时
+        """
+        if timeout is None:
+            timeout = self.config.acquire_timeout
+
+        context = None
+        async with asyncio.timeout(timeout):
+            async with self._changed:
+                waited = False
+                while not self._idle and self._size >= self.config.max_size:
+                    if self._closed:
+                        break
+                    if not waited:
+                        self._stats["waits"] += 1
+                        waited = True
+                    await self._changed.wait()
+
+                if self._closed:
+                    raise RuntimeError("浏览器上下文池已关闭")
+
+                if self._idle:
+                    context = self._idle.popleft()
+                else:
+                    # 占位，避免并发创建超出上限
+                    self._size += 1
+
+        if context is None:
+            try:
+                context = await self._create_context()
+            except Exception:
+                await self._shrink()
+                raise
+
+        context.uses += 1
+        self._in_use[context.browser_context_id] = context
+        self._stats["acquires"] += 1
+        return context
+
+    async def release(self, context: PooledBrowserContext, reset: Optional[bool] = None):
+        """
+        归还上下文
+
+        Args:
+            context: 借出的上下文
+            reset: 是否销毁并重建（None 使用配置值）
+        """
+        if self._closed:
+            # close() 已销毁所有上下文
+            return
+
+        if self._in_use.pop(context.browser_context_id, None) is None:
+            logger.warning(f"归还了未借出的浏览器上下文: {context.browser_context_id}")
+            return
+
+        if reset is None:
+            reset = self.config.reset_on_release
+
+        if reset:
+            try:
+                context = await self.reset(context)
+            except Exception as e:
+                logger.error(f"重建浏览器上下文失败: {e}")
+                await self._shrink()
+                return
+
+        async with self._changed:
+            self._idle.append(context)
+            self._changed.notify()
+
+    async def reset(self, context: PooledBrowserContext) -> PooledBrowserContext:
+        """
+        销毁并重建上下文，清除其中的 Cookie、存储和页面
+
+        Args:
+            context: 要重置的上下文
+
+        Returns:
+            新的上下文
+        """
+        await self._dispose_context(context)
+        self._stats["resets"] += 1
+        return await self._create_context()
+
+    async def open_session(self, **session_kwargs: Any) -> CDPSession:
+        """
+        借出一个上下文并附加到其中的页面
+
+        Args:
+            **session_kwargs: 传给 CDPSession 的参数
+
+        Returns:
+            附加到隔离页面的 CDP 会话（共享本池的连接）
+        """
+        context = await self.acquire()
+        try:
+            session = CDPSession(self.connection, context.target_info, **session_kwargs)
+            await session._attach_to_target()
+        except Exception:
+            await self.release(context)
+            raise
+
+        self._sessions[id(session)] = context
+        return session
+
+    async def release_session(self, session: CDPSession, reset: Optional[bool] = None):
+        """
+        分离会话并归还其上下文（不断开共享连接）
+
+        Args:
+            session: open_session 返回的会话
+            reset: 是否销毁并重建上下文（None 使用配置值）
+        """
+        context = self._sessions.pop(id(session), None)
+        await session.detach()
+        if context is not None:
+            await self.release(context, reset=reset)
+
+    async def close(self):
+        """销毁所有上下文"""
+        if self._closed:
+            return
+        self._closed = True
+
+        contexts = list(self._in_use.values()) + list(self._idle)
+        self._idle.clear()
+        self._in_use.clear()
+        self._sessions.clear()
+
+        # 唤醒等待者，使其收到池已关闭的错误
+        async with self._changed:
+            self._changed.notify_all()
+
+        await asyncio.gather(
+            *(self._dispose_context(context) for context in contexts),
+            return_exceptions=True,
+        )
+        self._size = 0
+        logger.info(f"浏览器上下文池已关闭: 销毁 {len(contexts)} 个上下文")
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """池统计信息"""
+        return {
+            **self._stats,
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": len(self._in_use),
+        }
+
+    async def _shrink(self):
+        """释放一个容量名额并唤醒等待者"""
+        async with self._changed:
+            self._size -= 1
+            self._changed.notify()
+
+    async def _create_context(self) -> PooledBrowserContext:
+        """创建浏览器上下文及其首个页面"""
+        browser_context_id = await self.connection.create_browser_context()
+        try:
+            target_info = await self.connection.create_target(
+                self.config.initial_url,
+                browser_context_id=browser_context_id,
+            )
+        except Exception:
+            await self.connection.dispose_browser_context(browser_context_id)
+            raise
+
+        self._stats["created"] += 1
+        logger.debug(f"创建浏览器上下文: {browser_context_id} (target={target_info.target_id})")
+        return PooledBrowserContext(
+            browser_context_id=browser_context_id,
+            target_info=target_info,
+            created_at=time.monotonic(),
+        )
+
+    async def _dispose_context(self, context: PooledBrowserContext):
+        """销毁浏览器上下文（失败只记录日志）"""
+        try:
+            await self.connection.dispose_browser_context(context.browser_context_id)
+            self._stats["disposed"] += 1
+        except Exception as e:
+            logger.warning(f"销毁浏览器上下文失败: {context.browser_context_id} - {e}")
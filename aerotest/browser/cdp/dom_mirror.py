@@ -0,0 +1,514 @@
+"""增量 DOM 镜像
+
+订阅 CDP DOM 变更事件，原地修补已构建的 EnhancedDOMTreeNode 图，
+只为脏子树重新获取布局，避免每次观察都完整抓取 DOM/Snapshot/AX 三棵树。
+
+处理的事件：
+- DOM.childNodeInserted / DOM.childNodeRemoved / DOM.setChildNodes
+- DOM.attributeModified / DOM.attributeRemoved / DOM.characterDataModified
+- DOM.shadowRootPushed / DOM.shadowRootPopped
+- DOM.documentUpdated（整体失效，下次完整抓取）
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+from aerotest.browser.cdp.types import FULL_PROFILE, CaptureProfile, DOMMirrorConfig
+from aerotest.browser.dom.enhanced_snapshot import REQUIRED_COMPUTED_STYLES, build_snapshot_lookup
+from aerotest.browser.dom.tree_builder import (
+    EnhancedDOMTreeBuilder,
+    apply_snapshot_lookup,
+    build_ax_node,
+    is_node_visible,
+)
+from aerotest.browser.dom.views import (
+    DOMRect,
+    EnhancedDOMTreeNode,
+    EnhancedSnapshotNode,
+    NodeType,
+    TargetAllTrees,
+)
+from aerotest.utils import get_logger
+
+if TYPE_CHECKING:
+    from aerotest.browser.cdp.session import CDPSession
+
+logger = get_logger("aerotest.cdp.dom_mirror")
+
+# 镜像订阅的 DOM 事件 -> 处理方法名
+DOM_MUTATION_EVENTS = {
+    "DOM.childNodeInserted": "on_child_node_inserted",
+    "DOM.childNodeRemoved": "on_child_node_removed",
+    "DOM.setChildNodes": "on_set_child_nodes",
+    "DOM.attributeModified": "on_attribute_modified",
+    "DOM.attributeRemoved": "on_attribute_removed",
+    "DOM.characterDataModified": "on_character_data_modified",
+    "DOM.shadowRootPushed": "on_shadow_root_pushed",
+    "DOM.shadowRootPopped": "on_shadow_root_popped",
+    "DOM.documentUpdated": "on_document_updated",
+}
+
+
+class DOMMirror:
+    """增量 DOM 镜像
+
+    由 CDPSession 在完整抓取后创建，之后将 DOM 事件喂给 on_* 方法，
+    get_dom_tree 时调用 refresh 只为脏子树刷新布局。
+
+    Example:
+        ```python
+        mirror = DOMMirror(session, root, builder.node_lookup)
+        mirror.on_attribute_modified({"nodeId": 42, "name": "class", "value": "open"})
+        root = await mirror.refresh()
+        ```
+    """
+
+    def __init__(
+        self,
+        session: "CDPSession",
+        root: EnhancedDOMTreeNode,
+        node_lookup: dict[int, EnhancedDOMTreeNode],
+        config: Optional[DOMMirrorConfig] = None,
+        profile: CaptureProfile = FULL_PROFILE,
+    ):
+        """
+        初始化镜像
+
+        Args:
+            session: 所属 CDP 会话（用于刷新布局）
+            root: 完整抓取得到的树根节点
+            node_lookup: nodeId -> 节点（EnhancedDOMTreeBuilder.node_lookup）
+            config: 镜像配置
+            profile: 完整抓取时使用的抓取配置（刷新时保持一致）
+        """
+        self.session = session
+        self.root = root
+        self.node_lookup = node_lookup
+        self.config = config or DOMMirrorConfig()
+        self.profile = profile
+
+        # 每应用一次变更递增，可用作缓存键
+        self.version = 0
+        self.valid = True
+
+        self._dirty: set[int] = set()
+        # 进行中的 DOM.requestChildNodes 请求（保留引用，stop() 时取消）
+        self._pending: set[asyncio.Future] = set()
+        self.stats: dict[str, float] = {
+            "mutations_applied": 0,
+            "mutations_ignored": 0,
+            "partial_refreshes": 0,
+            "full_layout_refreshes": 0,
+            "nodes_refreshed": 0,
+            "last_refresh_ms": 0.0,
+        }
+
+    @property
+    def is_dirty(self) -> bool:
+        """是否有待刷新布局的节点"""
+        return bool(self._dirty)
+
+    def invalidate(self, reason: str = ""):
+        """
+        使镜像整体失效，下次 get_dom_tree 完整抓取
+
+        Args:
+            reason: 失效原因（用于日志）
+        """
+        if self.valid:
+            logger.debug(f"DOM 镜像失效: {reason}")
+        self.valid = False
+
+    def stop(self):
+        """停止镜像：取消进行中的子节点请求并使镜像失效（镜像被替换或会话分离时调用）"""
+        for task in list(self._pending):
+            task.cancel()
+        self._pending.clear()
+        self.invalidate("已停止")
+
+    # ===== 事件处理 =====
+
+    def on_child_node_inserted(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """DOM.childNodeInserted"""
+        parent = self.node_lookup.get(event.get("parentNodeId"))
+        if parent is None:
+            self._ignore()
+            return
+
+        node = self._build_subtree(event["node"], parent)
+        if parent.children_nodes is None:
+            parent.children_nodes = []
+
+        previous_id = event.get("previousNodeId")
+        index = 0
+        if previous_id:
+            for i, child in enumerate(parent.children_nodes):
+                if child.node_id == previous_id:
+                    index = i + 1
+                    break
+            else:
+                index = len(parent.children_nodes)
+        parent.children_nodes.insert(index, node)
+        # 兄弟位置变化，后代 XPath 需要重新计算
+        parent.invalidate_identity_cache(subtree=True)
+
+        self._mark_dirty(node)
+        self._mark_dirty(parent)
+        self._request_missing_children(event["node"])
+        self._applied()
+
+    def on_child_node_removed(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """DOM.childNodeRemoved"""
+        parent = self.node_lookup.get(event.get("parentNodeId"))
+        node = self.node_lookup.get(event.get("nodeId"))
+        if parent is None or node is None:
+            self._ignore()
+            return
+
+        if parent.children_nodes:
+            parent.children_nodes = [c for c in parent.children_nodes if c is not node]
+        parent.invalidate_identity_cache(subtree=True)
+        self._forget_subtree(node)
+        self._mark_dirty(parent)
+        self._applied()
+
+    def on_set_child_nodes(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """DOM.setChildNodes（requestChildNodes 的响应）"""
+        parent = self.node_lookup.get(event.get("parentId"))
+        if parent is None:
+            self._ignore()
+            return
+
+        for child in parent.children_nodes or []:
+            self._forget_subtree(child)
+        parent.children_nodes = [self._build_subtree(child, parent) for child in event.get("nodes", [])]
+        parent.invalidate_identity_cache(subtree=True)
+        self._mark_dirty(parent)
+        self._applied()
+
+    def on_attribute_modified(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """DOM.attributeModified"""
+        node = self.node_lookup.get(event.get("nodeId"))
+        if node is None:
+            self._ignore()
+            return
+
+        node.attributes[event["name"]] = event.get("value", "")
+        node.invalidate_identity_cache()
+        self._mark_dirty(node)
+        self._applied()
+
+    def on_attribute_removed(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """DOM.attributeRemoved"""
+        node = self.node_lookup.get(event.get("nodeId"))
+        if node is None:
+            self._ignore()
+            return
+
+        node.attributes.pop(event["name"], None)
+        node.invalidate_identity_cache()
+        self._mark_dirty(node)
+        self._applied()
+
+    def on_character_data_modified(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """DOM.characterDataModified"""
+        node = self.node_lookup.get(event.get("nodeId"))
+        if node is None:
+            self._ignore()
+            return
+
+        node.node_value = event.get("characterData", "")
+        self._mark_dirty(node.parent_node or node)
+        self._applied()
+
+    def on_shadow_root_pushed(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """DOM.shadowRootPushed"""
+        host = self.node_lookup.get(event.get("hostId"))
+        if host is None:
+            self._ignore()
+            return
+
+        shadow_root = self._build_subtree(event["root"], host)
+        if host.shadow_roots is None:
+            host.shadow_roots = []
+        host.shadow_roots.append(shadow_root)
+        self._mark_dirty(host)
+        self._applied()
+
+    def on_shadow_root_popped(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """DOM.shadowRootPopped"""
+        host = self.node_lookup.get(event.get("hostId"))
+        shadow_root = self.node_lookup.get(event.get("rootId"))
+        if host is None or shadow_root is None:
+            self._ignore()
+            return
+
+        if host.shadow_roots:
+            host.shadow_roots = [r for r in host.shadow_roots if r is not shadow_root] or None
+        self._forget_subtree(shadow_root)
+        self._mark_dirty(host)
+        self._applied()
+
+    def on_document_updated(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """DOM.documentUpdated（文档替换，所有 nodeId 失效）"""
+        self.invalidate("documentUpdated")
+
+    # ===== 刷新 =====
+
+    async def refresh(self) -> EnhancedDOMTreeNode:
+        """
+        刷新脏子树的布局、样式和辅助功能信息
+
+        脏节点不超过 max_dirty_nodes 时逐节点刷新，否则（或脏节点位于
+        iframe 文档内时）只重新抓取一次布局快照并应用到现有节点图。
+
+        Returns:
+            树根节点
+        """
+        if not self._dirty:
+            return self.root
+
+        start_time = time.time()
+        version = self.version
+
+        nodes = self._collect_dirty_nodes()
+        if nodes is None:
+            await self._refresh_full_layout()
+            self.stats["full_layout_refreshes"] += 1
+        else:
+            await self._refresh_nodes(nodes)
+            self.stats["partial_refreshes"] += 1
+            self.stats["nodes_refreshed"] += len(nodes)
+
+        # 刷新期间到达的新变更保留到下次
+        if self.version == version:
+            self._dirty.clear()
+
+        self.stats["last_refresh_ms"] = (time.time() - start_time) * 1000
+        logger.debug(
+            f"DOM 镜像刷新完成: {'整页布局' if nodes is None else f'{len(nodes)} 个节点'}, "
+            f"耗时 {self.stats['last_refresh_ms']:.1f}ms"
+        )
+        return self.root
+
+    def _collect_dirty_nodes(self) -> Optional[list[EnhancedDOMTreeNode]]:
+        """
+        收集脏子树中的所有节点（先序）
+
+        Returns:
+            节点列表；需要整页刷新布局时返回 None
+        """
+        dirty_nodes = [self.node_lookup[i] for i in self._dirty if i in self.node_lookup]
+
+        # 只保留最上层的脏根
+        dirty_ids = {node.node_id for node in dirty_nodes}
+        dirty_roots = []
+        for node in dirty_nodes:
+            ancestor = node.parent_node
+            covered = False
+            while ancestor is not None:
+                if ancestor.node_id in dirty_ids:
+                    covered = True
+                    break
+                # iframe 文档内的坐标需要帧偏移，交给整页刷新处理
+                if ancestor.parent_node is not None and ancestor.parent_node.content_document is ancestor:
+                    return None
+                ancestor = ancestor.parent_node
+            if not covered:
+                dirty_roots.append(node)
+
+        nodes: list[EnhancedDOMTreeNode] = []
+        stack = list(reversed(dirty_roots))
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            if len(nodes) > self.config.max_dirty_nodes:
+                return None
+            if node.content_document:
+                return None
+            stack.extend(reversed(node.children_and_shadow_roots))
+
+        return nodes
+
+    async def _refresh_full_layout(self):
+        """重新抓取布局快照并应用到现有节点图（不重新获取 DOM/AX 树）"""
+        client = self.session.connection.client
+        device_pixel_ratio = await self.session._get_viewport_ratio()
+        snapshot = await client.send.DOMSnapshot.captureSnapshot(
+            params=self.profile.snapshot_params(),
+            session_id=self.session.session_id,
+        )
+        apply_snapshot_lookup(
+            self.root,
+            build_snapshot_lookup(snapshot, device_pixel_ratio, list(self.profile.computed_styles)),
+        )
+
+    async def _refresh_nodes(self, nodes: list[EnhancedDOMTreeNode]):
+        """逐节点刷新布局、样式和辅助功能信息"""
+        client = self.session.connection.client
+        session_id = self.session.session_id
+
+        # getBoxModel 返回视口坐标，加上滚动量换算为文档坐标
+        metrics = await client.send.Page.getLayoutMetrics(session_id=session_id)
+        viewport = metrics.get("cssVisualViewport", {})
+        scroll_x = viewport.get("pageX", 0.0)
+        scroll_y = viewport.get("pageY", 0.0)
+
+        elements = [node for node in nodes if node.node_type == NodeType.ELEMENT_NODE]
+        await asyncio.gather(
+            *(self._refresh_element(client, session_id, node, scroll_x, scroll_y) for node in elements)
+        )
+
+        # 非元素节点继承父元素的可见性
+        for node in nodes:
+            if node.node_type != NodeType.ELEMENT_NODE:
+                parent = node.parent_node
+                node.is_visible = parent.is_visible if parent is not None else True
+
+    async def _refresh_element(
+        self,
+        client: Any,
+        session_id: Optional[str],
+        node: EnhancedDOMTreeNode,
+        scroll_x: float,
+        scroll_y: float,
+    ):
+        """刷新单个元素节点"""
+        box_task = client.send.DOM.getBoxModel(
+            params={"backendNodeId": node.backend_node_id}, session_id=session_id
+        )
+        style_task = client.send.CSS.getComputedStyleForNode(
+            params={"nodeId": node.node_id}, session_id=session_id
+        )
+        tasks = [box_task, style_task]
+        if self.config.refresh_ax and self.profile.include_ax:
+            tasks.append(
+                client.send.Accessibility.getPartialAXTree(
+                    params={"backendNodeId": node.backend_node_id, "fetchRelatives": False},
+                    session_id=session_id,
+                )
+            )
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        box_result, style_result = results[0], results[1]
+
+        previous = node.snapshot_node
+
+        bounds = None
+        client_rects = None
+        if not isinstance(box_result, Exception) and box_result.get("model"):
+            quad = box_result["model"]["border"]
+            xs, ys = quad[0::2], quad[1::2]
+            client_rects = DOMRect(x=min(xs), y=min(ys), width=max(xs) - min(xs), height=max(ys) - min(ys))
+            bounds = DOMRect(
+                x=client_rects.x + scroll_x,
+                y=client_rects.y + scroll_y,
+                width=client_rects.width,
+                height=client_rects.height,
+            )
+
+        computed_styles = None
+        if not isinstance(style_result, Exception):
+            wanted = set(REQUIRED_COMPUTED_STYLES)
+            computed_styles = {
+                style["name"]: style["value"]
+                for style in style_result.get("computedStyle", [])
+                if style["name"] in wanted
+            } or None
+        elif previous is not None:
+            computed_styles = previous.computed_styles
+
+        node.snapshot_node = EnhancedSnapshotNode(
+            is_clickable=previous.is_clickable if previous else None,
+            cursor_style=computed_styles.get("cursor") if computed_styles else None,
+            bounds=bounds,
+            clientRects=client_rects,
+            scrollRects=previous.scrollRects if previous else None,
+            computed_styles=computed_styles,
+            paint_order=previous.paint_order if previous else None,
+            stacking_contexts=previous.stacking_contexts if previous else None,
+        )
+        node.absolute_position = (
+            DOMRect(x=bounds.x, y=bounds.y, width=bounds.width, height=bounds.height)
+            if bounds else None
+        )
+        node.is_visible = is_node_visible(node)
+
+        if len(results) > 2 and not isinstance(results[2], Exception):
+            ax_nodes = results[2].get("nodes") or []
+            if ax_nodes:
+                node.ax_node = build_ax_node(ax_nodes[0])
+                # AX 名称参与哈希
+                node.invalidate_identity_cache()
+
+    # ===== 内部方法 =====
+
+    def _build_subtree(self, cdp_node: dict[str, Any], parent: EnhancedDOMTreeNode) -> EnhancedDOMTreeNode:
+        """为插入的 CDP 节点构建增强子树（布局稍后刷新）"""
+        builder = EnhancedDOMTreeBuilder(
+            TargetAllTrees(
+                snapshot={},
+                dom_tree={"root": cdp_node},
+                ax_tree={},
+                device_pixel_ratio=1.0,
+                cdp_timing={},
+            ),
+            target_id=parent.target_id,
+            session_id=parent.session_id,
+            snapshot_lookup={},
+        )
+        node = builder.build()
+        node.parent_node = parent
+        self.node_lookup.update(builder.node_lookup)
+        return node
+
+    def _forget_subtree(self, node: EnhancedDOMTreeNode):
+        """从查找表中移除子树"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self.node_lookup.pop(current.node_id, None)
+            self._dirty.discard(current.node_id)
+            if current.content_document:
+                stack.append(current.content_document)
+            stack.extend(current.children_and_shadow_roots)
+
+    def _request_missing_children(self, cdp_node: dict[str, Any]):
+        """插入事件只携带部分后代时，请求完整子树（结果通过 setChildNodes 到达）"""
+        stack = [cdp_node]
+        missing = []
+        while stack:
+            current = stack.pop()
+            children = current.get("children") or []
+            if current.get("childNodeCount", 0) > len(children):
+                missing.append(current["nodeId"])
+            stack.extend(children)
+
+        for node_id in missing:
+            task = asyncio.ensure_future(self._request_child_nodes(node_id))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _request_child_nodes(self, node_id: int):
+        """DOM.requestChildNodes"""
+        try:
+            await self.session.connection.client.send.DOM.requestChildNodes(
+                params={"nodeId": node_id, "depth": -1, "pierce": True},
+                session_id=self.session.session_id,
+            )
+        except Exception as e:
+            logger.debug(f"请求子节点失败: {e}")
+            self.invalidate("requestChildNodes 失败")
+
+    def _mark_dirty(self, node: EnhancedDOMTreeNode):
+        """标记节点为脏"""
+        self._dirty.add(node.node_id)
+
+    def _applied(self):
+        """记录一次已应用的变更"""
+        self.version += 1
+        self.stats["mutations_applied"] += 1
+
+    def _ignore(self):
+        """记录一次无法应用的变更（节点未被跟踪）"""
+        self.stats["mutations_ignored"] += 1
@@ -0,0 +1,302 @@
+"""页面就绪检测
+
+基于 CDP 事件跟踪页面加载状态，替代固定时长的 sleep：
+- Page.lifecycleEvent / Page.domContentEventFired / Page.loadEventFired
+- Network.requestWillBeSent / loadingFinished / loadingFailed 在途请求计数
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Optional
+
+from aerotest.browser.cdp.types import ReadinessConfig, ReadinessWaitMetrics
+from aerotest.utils import get_logger
+
+logger = get_logger("aerotest.cdp.readiness")
+
+# 支持的等待条件
+WAIT_CONDITIONS = ("domcontentloaded", "load", "networkidle")
+
+
+class PageReadinessTracker:
+    """页面就绪状态跟踪器
+
+    由 CDPSession 将事件喂给 on_* 方法，navigate 时调用 wait_until
+    在条件满足后立即返回。
+
+    Example:
+        ```python
+        tracker = PageReadinessTracker(ReadinessConfig(idle_time=0.5))
+        tracker.start_navigation()
+        result = await client.send.Page.navigate(params={"url": url}, session_id=sid)
+        tracker.commit_navigation(result.get("frameId"), result.get("loaderId"))
+        metrics = await tracker.wait_until("networkidle")
+        ```
+    """
+
+    def __init__(self, config: Optional[ReadinessConfig] = None):
+        """
+        初始化跟踪器
+
+        Args:
+            config: 就绪检测配置
+        """
+        self.config = config or ReadinessConfig()
+        self.history: deque[ReadinessWaitMetrics] = deque(maxlen=self.config.metrics_history)
+
+        self._changed = asyncio.Event()
+        self._frame_id: Optional[str] = None
+        self._loader_id: Optional[str] = None
+        self._same_document = False
+
+        # (frameId, loaderId) -> 已触发的生命周期事件名
+        self._lifecycle: dict[tuple[str, str], set[str]] = {}
+        self._dom_content_fired = False
+        self._load_fired = False
+
+        self._inflight: set[str] = set()
+        self._total_requests = 0
+        self._idle_since: Optional[float] = time.monotonic()
+
+    # ===== 导航 =====
+
+    def start_navigation(self):
+        """开始新的导航，清空上一页的状态"""
+        self._frame_id = None
+        self._loader_id = None
+        self._same_document = False
+        self._lifecycle.clear()
+        self._dom_content_fired = False
+        self._load_fired = False
+        self._inflight.clear()
+        self._total_requests = 0
+        self._idle_since = time.monotonic()
+        self._notify()
+
+    def commit_navigation(self, frame_id: Optional[str], loader_id: Optional[str]):
+        """
+        记录 Page.navigate 返回的主帧和加载器
+
+        Args:
+            frame_id: 主帧 ID
+            loader_id: 加载器 ID（文档内导航时为空）
+        """
+        self._frame_id = frame_id
+        self._loader_id = loader_id
+        # 文档内导航（如 #hash）不会产生新的加载周期
+        self._same_document = frame_id is not None and not loader_id
+        self._notify()
+
+    # ===== 事件处理 =====
+
+    def on_lifecycle_event(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """Page.lifecycleEvent"""
+        key = (event.get("frameId"), event.get("loaderId"))
+        name = event.get("name")
+        if name == "init":
+            self._lifecycle[key] = set()
+        self._lifecycle.setdefault(key, set()).add(name)
+        self._notify()
+
+    def on_dom_content_event_fired(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """Page.domContentEventFired"""
+        self._dom_content_fired = True
+        self._notify()
+
+    def on_load_event_fired(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """Page.loadEventFired"""
+        self._dom_content_fired = True
+        self._load_fired = True
+        self._notify()
+
+    def on_request_will_be_sent(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """Network.requestWillBeSent"""
+        request_id = event.get("requestId")
+        if request_id is None:
+            return
+        # 重定向复用同一个 requestId，不重复计数
+        if request_id not in self._inflight:
+            self._inflight.add(request_id)
+            self._total_requests += 1
+            self._update_idle()
+
+    def on_loading_finished(self, event: dict[str, Any], session_id: Optional[str] = None):
+        """Network.loadingFinished / Network.loadingFailed"""
+        request_id = event.get("requestId")
+        if request_id in self._inflight:
+            self._inflight.discard(request_id)
+            self._update_idle()
+
+    on_loading_failed = on_loading_finished
+
+    # ===== 状态 =====
+
+    @property
+    def inflight_requests(self) -> int:
+        """当前在途请求数"""
+        return len(self._inflight)
+
+    @property
+    def dom_content_loaded(self) -> bool:
+        """DOMContentLoaded 是否已触发"""
+        if self._same_document or self._dom_content_fired:
+            return True
+        return "DOMContentLoaded" in self._main_frame_events()
+
+    @property
+    def loaded(self) -> bool:
+        """load 是否已触发"""
+        if self._same_document or self._load_fired:
+            return True
+        return "load" in self._main_frame_events()
+
+    def is_network_idle(self, idle_time: Optional[float] = None) -> bool:
+        """
+        网络是否已空闲
+
+        Args:
+            idle_time: 空闲窗口（秒），None 表示使用配置
+        """
+        if idle_time is None:
+            idle_time = self.config.idle_time
+        if self._idle_since is None:
+            return False
+        return time.monotonic() - self._idle_since >= idle_time
+
+    def is_satisfied(self, condition: str, idle_time: Optional[float] = None) -> bool:
+        """
+        检查等待条件是否满足
+
+        Args:
+            condition: 等待条件（domcontentloaded, load, networkidle）
+            idle_time: networkidle 的空闲窗口（秒）
+
+        Returns:
+            是否满足
+        """
+        if condition == "domcontentloaded":
+            return self.dom_content_loaded
+        if condition == "load":
+            return self.loaded
+        if condition == "networkidle":
+            return self.loaded and self.is_network_idle(idle_time)
+        raise ValueError(f"不支持的等待条件: {condition}")
+
+    async def wait_until(
+        self,
+        condition: str = "load",
+        timeout: Optional[float] = None,
+        idle_time: Optional[float] = None,
+    ) -> ReadinessWaitMetrics:
+        """
+        等待条件满足，满足后立即返回
+
+        Args:
+            condition: 等待条件（domcontentloaded, load, networkidle）
+            timeout: 超时（秒），None 表示使用配置
+            idle_time: networkidle 的空闲窗口（秒），None 表示使用配置
+
+        Returns:
+            本次等待的指标
+
+        Raises:
+            ValueError: 不支持的等待条件
+        """
+        if condition not in WAIT_CONDITIONS:
+            raise ValueError(f"不支持的等待条件: {condition}")
+
+        if timeout is None:
+            timeout = self.config.timeout
+        if idle_time is None:
+            idle_time = self.config.idle_time
+
+        start = time.monotonic()
+        deadline = start + timeout
+        satisfied = False
+
+        while True:
+            self._changed.clear()
+            if self.is_satisfied(condition, idle_time):
+                satisfied = True
+                break
+
+            now = time.monotonic()
+            remaining = deadline - now
+            if remaining <= 0:
+                break
+
+            # 网络已低于阈值时，只需等到空闲窗口结束（除非期间有新事件）
+            wait_time = remaining
+            if condition == "networkidle" and self._idle_since is not None:
+                wait_time = min(wait_time, max(self._idle_since + idle_time - now, 0.0))
+
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=wait_time)
+            except asyncio.TimeoutError:
+                pass
+
+        metrics = ReadinessWaitMetrics(
+            condition=condition,
+            elapsed_ms=(time.monotonic() - start) * 1000,
+            satisfied=satisfied,
+            timed_out=not satisfied,
+            inflight_requests=self.inflight_requests,
+            total_requests=self._total_requests,
+        )
+        self.history.append(metrics)
+
+        if satisfied:
+            logger.debug(f"页面就绪 ({condition}): {metrics.elapsed_ms:.1f}ms")
+        else:
+            logger.warning(
+                f"等待页面就绪超时 ({condition}): {timeout}秒, "
+                f"在途请求 {metrics.inflight_requests} 个"
+            )
+
+        return metrics
+
+    def get_metrics(self) -> dict[str, dict[str, float]]:
+        """
+        按条件汇总等待延迟
+
+        Returns:
+            condition -> {count, avg_ms, max_ms, timeouts}
+        """
+        summary: dict[str, dict[str, float]] = {}
+        for metrics in self.history:
+            stats = summary.setdefault(
+                metrics.condition,
+                {"count": 0, "avg_ms": 0.0, "max_ms": 0.0, "timeouts": 0},
+            )
+            stats["count"] += 1
+            stats["avg_ms"] += metrics.elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], metrics.elapsed_ms)
+            if metrics.timed_out:
+                stats["timeouts"] += 1
+
+        for stats in summary.values():
+            stats["avg_ms"] /= stats["count"]
+
+        return summary
+
+    # ===== 内部方法 =====
+
+    def _main_frame_events(self) -> set[str]:
+        """当前导航主帧的生命周期事件"""
+        if self._frame_id is None or self._loader_id is None:
+            return set()
+        return self._lifecycle.get((self._frame_id, self._loader_id), set())
+
+    def _update_idle(self):
+        """在途请求数变化时更新空闲起点"""
+        if len(self._inflight) <= self.config.max_inflight_requests:
+            if self._idle_since is None:
+                self._idle_since = time.monotonic()
+        else:
+            self._idle_since = None
+        self._notify()
+
+    def _notify(self):
+        """唤醒等待者重新检查条件"""
+        self._changed.set()
@@ -8,17 +8,27 @@
 
 import asyncio
 import time
+import uuid
 from typing import Optional
 
 from cdp_use.cdp.target import SessionID, TargetID
 
 from aerotest.browser.cdp.connection import CDPConnection
-from aerotest.browser.cdp.types import CDPConnectionConfig, PageInfo, TargetInfo
-from aerotest.browser.dom.views import EnhancedDOMTreeNode, TargetAllTrees
-from aerotest.browser.dom.enhanced_snapshot import (
-    REQUIRED_COMPUTED_STYLES,
-    build_snapshot_lookup,
+from aerotest.browser.cdp.dom_mirror import DOM_MUTATION_EVENTS, DOMMirror
+from aerotest.browser.cdp.readiness import PageReadinessTracker
+from aerotest.browser.cdp.storage_state import STORAGE_SEED_MARKER, OriginStorage, StorageState
+from aerotest.browser.cdp.types import (
+    CAPTURE_PROFILES,
+    CaptureProfile,
+    CDPConnectionConfig,
+    DOMMirrorConfig,
+    PageInfo,
+    ReadinessConfig,
+    ReadinessWaitMetrics,
+    TargetInfo,
 )
+from aerotest.browser.dom.views import DOMRect, EnhancedAXNode, EnhancedDOMTreeNode, TargetAllTrees
+from aerotest.browser.dom.tree_builder import EnhancedDOMTreeBuilder, build_ax_node, is_node_visible
 from aerotest.utils import get_logger
 
 logger = get_logger("aerotest.cdp.session")
@@ -51,6 +61,13 @@ class CDPSession:
         self,
         connection: CDPConnection,
         target_info: Optional[TargetInfo] = None,
+        build_dom_in_thread: bool = False,
+        readiness_config: Optional[ReadinessConfig] = None,
+        enable_dom_mirror: bool = False,
+        dom_mirror_config: Optional[DOMMirrorConfig] = None,
+        capture_profile: str = "full",
+        lazy_ax: bool = False,
+        ax_batch_size: int = 50,
     ):
         """
         初始化 CDP 会话
@@ -58,11 +75,43 @@ class CDPSession:
         Args:
             connection: CDP 连接
             target_info: 目标信息（如果为 None，会自动选择第一个页面）
+            build_dom_in_thread: 是否在工作线程中构建增强 DOM 树
+            readiness_config: 页面就绪检测配置
+            enable_dom_mirror: 是否启用增量 DOM 镜像
+            dom_mirror_config: 增量 DOM 镜像配置
+            capture_profile: 默认抓取配置（attributes-only / layout / full）
+            lazy_ax: 延迟 AX 模式（抓取时不获取完整 AX 树，由 fetch_ax_nodes 按需获取）
+            ax_batch_size: 按需获取 AX 时每批并发请求的节点数
         """
         self.connection = connection
         self.target_info = target_info
+        self.build_dom_in_thread = build_dom_in_thread
+        self.readiness = PageReadinessTracker(readiness_config)
+        self.last_wait_metrics: Optional[ReadinessWaitMetrics] = None
+        
+        # 增量 DOM 镜像
+        self.enable_dom_mirror = enable_dom_mirror
+        self.dom_mirror_config = dom_mirror_config or DOMMirrorConfig()
+        self.dom_mirror: Optional[DOMMirror] = None
+        self._node_lookup: dict[int, EnhancedDOMTreeNode] = {}
+        self._dom_mutation_count = 0
+        
+        # 抓取配置
+        self.capture_profile = CAPTURE_PROFILES[capture_profile]
+        self._captured_profile: Optional[CaptureProfile] = None
+        self.last_cdp_timing: dict[str, float] = {}
+        self.capture_stats: dict[str, dict[str, float]] = {}
+        self._capture_count = 0
+        
+        # 延迟 AX 模式：backendDOMNodeId -> AX 节点，按 DOM 版本失效
+        self.lazy_ax = lazy_ax
+        self.ax_batch_size = ax_batch_size
+        self._ax_cache: dict[int, Optional[EnhancedAXNode]] = {}
+        self._ax_cache_version: Optional[tuple[int, int]] = None
+        self.ax_stats: dict[str, int] = {"requested": 0, "cache_hits": 0, "batches": 0, "errors": 0}
         self.session_id: Optional[SessionID] = None
         self._page_info: Optional[PageInfo] = None
+        self._storage_seed_script: Optional[str] = None
         
         logger.debug("初始化 CDP 会话")
     
@@ -71,6 +120,11 @@ class CDPSession:
         cls,
         config: Optional[CDPConnectionConfig] = None,
         target_info: Optional[TargetInfo] = None,
+        build_dom_in_thread: bool = False,
+        readiness_config: Optional[ReadinessConfig] = None,
+        enable_dom_mirror: bool = False,
+        capture_profile: str = "full",
+        lazy_ax: bool = False,
     ) -> "CDPSession":
         """
         创建并连接 CDP 会话
@@ -78,6 +132,11 @@ class CDPSession:
         Args:
             config: CDP 连接配置（如果为 None，使用默认配置）
             target_info: 目标信息（如果为 None，会自动选择第一个页面）
+            build_dom_in_thread: 是否在工作线程中构建增强 DOM 树
+            readiness_config: 页面就绪检测配置
+            enable_dom_mirror: 是否启用增量 DOM 镜像
+            capture_profile: 默认抓取配置（attributes-only / layout / full）
+            lazy_ax: 延迟 AX 模式（只为需要的节点获取 AX 信息）
             
         Returns:
             CDP 会话实例
@@ -102,14 +161,22 @@ class CDPSession:
                     raise RuntimeError("无法创建新页面")
         
         # 创建会话
-        session = cls(connection, target_info)
+        session = cls(
+            connection,
+            target_info,
+            build_dom_in_thread=build_dom_in_thread,
+            readiness_config=readiness_config,
+            enable_dom_mirror=enable_dom_mirror,
+            capture_profile=capture_profile,
+            lazy_ax=lazy_ax,
+        )
         await session._attach_to_target()
         
         logger.info(f"✅ CDP 会话已创建: {target_info.title or target_info.url}")
         return session
     
-    async def disconnect(self):
-        """断开会话"""
+    async def detach(self):
+        """分离目标并移除本会话的事件监听器（保留连接，供共享连接的会话使用）"""
         if self.session_id and self.connection.client:
             try:
                 # 分离目标
@@ -120,17 +187,35 @@ class CDPSession:
             except Exception as e:
                 logger.debug(f"分离目标时出错: {e}")
         
+        if self.session_id:
+            self.connection.remove_session_listeners(self.session_id)
+        self.session_id = None
+        if self.dom_mirror is not None:
+            self.dom_mirror.stop()
+    
+    async def disconnect(self):
+        """断开会话"""
+        await self.detach()
+        
         # 断开连接
         await self.connection.disconnect()
         logger.info("✅ CDP 会话已断开")
     
-    async def navigate(self, url: str, wait_until: str = "load") -> bool:
+    async def navigate(
+        self,
+        url: str,
+        wait_until: str = "load",
+        timeout: Optional[float] = None,
+        idle_time: Optional[float] = None,
+    ) -> bool:
         """
         导航到 URL
         
         Args:
             url: 目标 URL
             wait_until: 等待条件（load, domcontentloaded, networkidle）
+            timeout: 等待超时（秒），None 表示使用就绪配置
+            idle_time: networkidle 的空闲窗口（秒），None 表示使用就绪配置
             
         Returns:
             是否导航成功
@@ -139,34 +224,59 @@ class CDPSession:
             logger.info(f"导航到: {url}")
             
             # 发送导航命令
+            self.last_wait_metrics = None
+            self.readiness.start_navigation()
+            if self.dom_mirror is not None:
+                self.dom_mirror.invalidate("导航")
             result = await self.connection.client.send.Page.navigate(
                 params={"url": url},
                 session_id=self.session_id
             )
             
-            # 等待页面加载
+            if result.get("errorText"):
+                raise RuntimeError(result["errorText"])
+            
+            self.readiness.commit_navigation(result.get("frameId"), result.get("loaderId"))
+            
+            # 等待页面加载（事件驱动，条件满足即返回）
             if wait_until == "load":
-                await self._wait_for_load()
+                await self._wait_for_load(timeout)
             elif wait_until == "domcontentloaded":
-                await self._wait_for_dom_content_loaded()
+                await self._wait_for_dom_content_loaded(timeout)
             elif wait_until == "networkidle":
-                await self._wait_for_network_idle()
+                await self._wait_for_network_idle(timeout, idle_time)
             
             # 更新页面信息
             await self._update_page_info()
             
-            logger.info(f"✅ 导航完成: {url}")
+            if self.last_wait_metrics:
+                logger.info(
+                    f"✅ 导航完成: {url} "
+                    f"({wait_until} 等待 {self.last_wait_metrics.elapsed_ms:.0f}ms)"
+                )
+            else:
+                logger.info(f"✅ 导航完成: {url}")
             return True
             
         except Exception as e:
             logger.error(f"导航失败: {e}")
             return False
     
-    async def get_dom_tree(self) -> EnhancedDOMTreeNode:
+    async def get_dom_tree(
+        self,
+        force_full: bool = False,
+        profile: Optional[str] = None,
+    ) -> EnhancedDOMTreeNode:
         """
         获取增强的 DOM 树
         
-        完整实现：复用 browser-use 的 DOM 获取算法
+        完整实现：复用 browser-use 的 DOM 获取算法。
+        启用 DOM 镜像时，若镜像有效且其抓取配置满足本次需要，
+        则只应用增量变更并刷新脏子树布局。
+        
+        Args:
+            force_full: 是否强制完整抓取
+            profile: 抓取配置名称（None 表示使用会话默认配置）
         
         Returns:
             增强的 DOM 树根节点
@@ -175,10 +285,24 @@ class CDPSession:
             RuntimeError: DOM 获取失败
         """
         try:
-            logger.debug("开始获取完整 DOM 树...")
+            capture_profile = CAPTURE_PROFILES[profile] if profile else self.capture_profile
+            
+            if (
+                not force_full
+                and self.dom_mirror is not None
+                and self.dom_mirror.valid
+                and self.dom_mirror.profile.covers(capture_profile)
+            ):
+                root_node = await self.dom_mirror.refresh()
+                self.last_cdp_timing = {"dom_mirror_refresh": self.dom_mirror.stats["last_refresh_ms"] / 1000}
+                logger.debug(f"DOM 镜像命中 (version={self.dom_mirror.version})")
+                return root_node
+            
+            logger.debug(f"开始获取完整 DOM 树 (profile={capture_profile.name})...")
+            mutation_count = self._dom_mutation_count
             
             # 获取所有树（Snapshot, DOM Tree, AX Tree）
-            all_trees = await self._get_all_trees()
+            all_trees = await self._get_all_trees(capture_profile)
             
             # 构建增强 DOM 树（完整版本）
             root_node = await self._build_enhanced_dom_tree(
@@ -187,6 +311,20 @@ class CDPSession:
                 total_frame_offset=None,
             )
             
+            self.last_cdp_timing = all_trees.cdp_timing
+            self._capture_count += 1
+            self._captured_profile = capture_profile
+            
+            if self.enable_dom_mirror:
+                if self.dom_mirror is not None:
+                    self.dom_mirror.stop()
+                self.dom_mirror = DOMMirror(
+                    self, root_node, self._node_lookup, self.dom_mirror_config, capture_profile
+                )
+                # 抓取期间到达的变更无法确定是否已包含在结果中
+                if self._dom_mutation_count != mutation_count:
+                    self.dom_mirror.invalidate("抓取期间 DOM 发生变更")
+            
             logger.info(f"✅ 完整 DOM 树获取成功")
             return root_node
             
@@ -194,6 +332,83 @@ class CDPSession:
             logger.error(f"获取 DOM 树失败: {e}")
             raise RuntimeError(f"获取 DOM 树失败: {e}") from e
     
+    @property
+    def dom_version(self) -> tuple[int, int]:
+        """当前 DOM 版本（完整抓取次数, 镜像变更版本），用作按需数据的缓存键"""
+        mirror_version = self.dom_mirror.version if self.dom_mirror is not None else 0
+        return self._capture_count, mirror_version
+    
+    async def fetch_ax_nodes(self, nodes: list[EnhancedDOMTreeNode]) -> int:
+        """
+        按需获取节点的辅助功能信息
+        
+        最近一次抓取未包含 AX 树（延迟 AX 模式或抓取配置不含 AX）时，
+        只为给定节点（通常是 L2 筛选后的候选）分批并发请求
+        Accessibility.getPartialAXTree。结果以 backendDOMNodeId 为键缓存，
+        DOM 版本变化时失效。
+        
+        Args:
+            nodes: 需要 AX 信息的节点
+            
+        Returns:
+            本次向 CDP 请求的节点数
+        """
+        profile = self._captured_profile
+        if profile is not None and profile.include_ax and not self.lazy_ax:
+            return 0
+        
+        version = self.dom_version
+        if version != self._ax_cache_version:
+            self._ax_cache = {}
+            self._ax_cache_version = version
+        
+        pending: dict[int, list[EnhancedDOMTreeNode]] = {}
+        for node in nodes:
+            backend_node_id = node.backend_node_id
+            if backend_node_id in self._ax_cache:
+                self.ax_stats["cache_hits"] += 1
+                self._apply_ax_node(node, self._ax_cache[backend_node_id])
+            else:
+                pending.setdefault(backend_node_id, []).append(node)
+        
+        if not pending:
+            return 0
+        
+        start_time = time.time()
+        backend_node_ids = list(pending)
+        for i in range(0, len(backend_node_ids), self.ax_batch_size):
+            batch = backend_node_ids[i:i + self.ax_batch_size]
+            results = await asyncio.gather(
+                *(
+                    self.connection.client.send.Accessibility.getPartialAXTree(
+                        params={"backendNodeId": backend_node_id, "fetchRelatives": False},
+                        session_id=self.session_id,
+                    )
+                    for backend_node_id in batch
+                ),
+                return_exceptions=True,
+            )
+            self.ax_stats["batches"] += 1
+            
+            for backend_node_id, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    # 不缓存失败结果，下次重试
+                    self.ax_stats["errors"] += 1
+                    logger.debug(f"获取节点 {backend_node_id} 的 AX 信息失败: {result}")
+                    continue
+                ax_node = self._pick_ax_node(result, backend_node_id)
+                self._ax_cache[backend_node_id] = ax_node
+                for node in pending[backend_node_id]:
+                    self._apply_ax_node(node, ax_node)
+        
+        self.ax_stats["requested"] += len(backend_node_ids)
+        self.last_cdp_timing["partial_ax"] = time.time() - start_time
+        logger.debug(
+            f"按需获取 AX 完成: {len(backend_node_ids)} 个节点，"
+            f"耗时 {self.last_cdp_timing['partial_ax']*1000:.1f}ms"
+        )
+        return len(backend_node_ids)
+    
     async def evaluate(self, expression: str) -> dict:
         """
         执行 JavaScript 代码
@@ -261,6 +476,86 @@ class CDPSession:
             logger.error(f"截图失败: {e}")
             raise
     
+    async def capture_storage_state(self, origins: Optional[list[str]] = None) -> StorageState:
+        """
+        捕获当前的登录/存储状态
+        
+        Cookie 通过 Network.getAllCookies 读取（浏览器上下文内全部 Cookie），
+        Web Storage 通过 DOMStorage 按源读取。
+        
+        Args:
+            origins: 要读取 Web Storage 的源（None 表示当前页面的源）
+            
+        Returns:
+            存储状态快照
+        """
+        send = self.connection.client.send
+        try:
+            result = await send.Network.getAllCookies(session_id=self.session_id)
+            cookies = result.get("cookies", [])
+            
+            if origins is None:
+                result = await self.evaluate("window.location.origin")
+                origin = result.get("result", {}).get("value")
+                origins = [origin] if origin and origin != "null" else []
+            
+            await send.DOMStorage.enable(session_id=self.session_id)
+            storages = []
+            for origin in origins:
+                storages.append(OriginStorage(
+                    origin=origin,
+                    local_storage=await self._get_dom_storage_items(origin, is_local_storage=True),
+                    session_storage=await self._get_dom_storage_items(origin, is_local_storage=False),
+                ))
+            
+            state = StorageState(cookies=cookies, origins=storages)
+            logger.info(f"✅ 捕获存储状态: {len(cookies)} 个 Cookie, {len(storages)} 个源")
+            return state
+            
+        except Exception as e:
+            logger.error(f"捕获存储状态失败: {e}")
+            raise
+    
+    async def restore_storage_state(self, state: StorageState):
+        """
+        将存储状态注入当前目标（应在导航到业务页面之前调用）
+        
+        Cookie 立即写入；没有加载对应源的帧时 DOMStorage 无法写入，
+        Web Storage 通过新文档脚本在之后加载该源的页面时写入。
+        再次调用会替换之前注册的脚本。
+        
+        Args:
+            state: 存储状态快照
+        """
+        send = self.connection.client.send
+        try:
+            cookies = state.cookie_params()
+            if cookies:
+                await send.Network.setCookies(
+                    params={"cookies": cookies},
+                    session_id=self.session_id
+                )
+            
+            if self._storage_seed_script is not None:
+                await send.Page.removeScriptToEvaluateOnNewDocument(
+                    params={"identifier": self._storage_seed_script},
+                    session_id=self.session_id
+                )
+                self._storage_seed_script = None
+            
+            if any(storage.local_storage or storage.session_storage for storage in state.origins):
+                result = await send.Page.addScriptToEvaluateOnNewDocument(
+                    params={"source": state.seed_script(token=uuid.uuid4().hex)},
+                    session_id=self.session_id
+                )
+                self._storage_seed_script = result.get("identifier")
+            
+            logger.info(f"✅ 恢复存储状态: {len(cookies)} 个 Cookie, {len(state.origins)} 个源")
+            
+        except Exception as e:
+            logger.error(f"恢复存储状态失败: {e}")
+            raise
+    
     # ========== 内部方法 ==========
     
     async def _attach_to_target(self):
@@ -277,6 +572,11 @@ class CDPSession:
             self.session_id = result["sessionId"]
             logger.debug(f"已附加到目标: {self.target_info.target_id}")
             
+            # 订阅就绪事件（先于启用域，避免丢失早期事件）
+            self._register_readiness_listeners()
+            if self.enable_dom_mirror:
+                self._register_dom_mirror_listeners()
+            
             # 启用必要的 CDP 域
             await self._enable_cdp_domains()
             
@@ -286,7 +586,10 @@ class CDPSession:
     async def _enable_cdp_domains(self):
         """启用必要的 CDP 域"""
         try:
-            domains = ["Page", "DOM", "Runtime", "Accessibility", "DOMSnapshot"]
+            domains = ["Page", "DOM", "Runtime", "Accessibility", "DOMSnapshot", "Network"]
+            if self.enable_dom_mirror:
+                # 逐节点刷新计算样式需要 CSS 域
+                domains.append("CSS")
             
             for domain in domains:
                 await self.connection.client.send(
@@ -295,20 +598,30 @@ class CDPSession:
                     session_id=self.session_id
                 )
             
+            # 生命周期事件需要单独开启
+            await self.connection.client.send.Page.setLifecycleEventsEnabled(
+                params={"enabled": True},
+                session_id=self.session_id
+            )
+            
             logger.debug(f"已启用 CDP 域: {', '.join(domains)}")
             
         except Exception as e:
             logger.warning(f"启用 CDP 域时出错: {e}")
     
-    async def _get_all_trees(self) -> TargetAllTrees:
+    async def _get_all_trees(self, profile: Optional[CaptureProfile] = None) -> TargetAllTrees:
         """
         获取所有树（Snapshot, DOM Tree, AX Tree）
         
-        复用 browser-use 的核心算法
+        复用 browser-use 的核心算法；只请求抓取配置需要的样式、布局数据和 AX 树
+        
+        Args:
+            profile: 抓取配置（None 表示使用会话默认配置）
         
         Returns:
             TargetAllTrees 包含所有树数据
         """
+        profile = profile or self.capture_profile
         start_time = time.time()
         timing = {}
         
@@ -319,13 +632,7 @@ class CDPSession:
             # 2. 并行获取 Snapshot, DOM Tree, AX Tree
             snapshot_task = asyncio.create_task(
                 self.connection.client.send.DOMSnapshot.captureSnapshot(
-                    params={
-                        "computedStyles": REQUIRED_COMPUTED_STYLES,
-                        "includePaintOrder": True,
-                        "includeDOMRects": True,
-                        "includeBlendedBackgroundColors": False,
-                        "includeTextColorOpacities": False,
-                    },
+                    params=profile.snapshot_params(),
                     session_id=self.session_id
                 )
             )
@@ -337,19 +644,17 @@ class CDPSession:
                 )
             )
             
-            ax_tree_task = asyncio.create_task(
-                self._get_ax_tree_for_all_frames()
-            )
+            # 延迟 AX 模式下不获取完整 AX 树
+            include_ax = profile.include_ax and not self.lazy_ax
+            tasks = [snapshot_task, dom_tree_task]
+            if include_ax:
+                tasks.append(asyncio.create_task(self._get_ax_tree_for_all_frames()))
             
             # 等待所有任务完成
-            results = await asyncio.gather(
-                snapshot_task,
-                dom_tree_task,
-                ax_tree_task,
-                return_exceptions=True
-            )
+            results = await asyncio.gather(*tasks, return_exceptions=True)
             
-            snapshot, dom_tree, ax_tree = results
+            snapshot, dom_tree = results[0], results[1]
+            ax_tree = results[2] if include_ax else {"nodes": []}
             
             # 检查错误
             if isinstance(snapshot, Exception):
@@ -362,8 +667,15 @@ class CDPSession:
             # 记录时间
             timing["get_all_trees"] = time.time() - start_time
             timing["cdp_calls"] = timing["get_all_trees"]
+            timing[f"capture.{profile.name}"] = timing["get_all_trees"]
             
-            logger.debug(f"获取所有树完成，耗时: {timing['get_all_trees']*1000:.1f}ms")
+            stats = self.capture_stats.setdefault(profile.name, {"count": 0, "total_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += timing["get_all_trees"] * 1000
+            
+            logger.debug(
+                f"获取所有树完成 (profile={profile.name})，耗时: {timing['get_all_trees']*1000:.1f}ms"
+            )
             
             # 构建 TargetAllTrees
             return TargetAllTrees(
@@ -372,6 +684,7 @@ class CDPSession:
                 ax_tree=ax_tree,
                 device_pixel_ratio=device_pixel_ratio,
                 cdp_timing=timing,
+                computed_styles=list(profile.computed_styles),
             )
             
         except Exception as e:
@@ -424,6 +737,21 @@ class CDPSession:
             logger.warning(f"获取 AX 树失败: {e}")
             return {"nodes": []}
     
+    @staticmethod
+    def _pick_ax_node(result: dict, backend_node_id: int) -> Optional[EnhancedAXNode]:
+        """从 getPartialAXTree 结果中取出对应 DOM 节点的 AX 节点"""
+        for ax_node in result.get("nodes", []):
+            if ax_node.get("backendDOMNodeId") == backend_node_id:
+                return build_ax_node(ax_node)
+        return None
+    
+    @staticmethod
+    def _apply_ax_node(node: EnhancedDOMTreeNode, ax_node: Optional[EnhancedAXNode]):
+        """把按需获取的 AX 节点挂到 DOM 节点上"""
+        if ax_node is None or node.ax_node is ax_node:
+            return
+        node.ax_node = ax_node
+    
     async def _get_viewport_ratio(self) -> float:
         """获取设备像素比"""
         try:
@@ -452,310 +780,103 @@ class CDPSession:
         self,
         all_trees: TargetAllTrees,
         html_frames: Optional[list] = None,
-        total_frame_offset: Optional["DOMRect"] = None,
+        total_frame_offset: Optional[DOMRect] = None,
+        use_thread: Optional[bool] = None,
     ) -> EnhancedDOMTreeNode:
         """
         构建增强 DOM 树
-        
-        完整实现：复用 browser-use 的核心算法
-        
+
+        复用 browser-use 的核心算法，由 EnhancedDOMTreeBuilder 以显式栈同步完成
+
         Args:
             all_trees: 所有树数据
-            html_frames: HTML 帧节点列表
+            html_frames: HTML 帧节点列表（保留参数，兼容旧调用）
             total_frame_offset: 累积的帧偏移
-            
+            use_thread: 是否在工作线程中构建（None 表示使用会话配置）
+
         Returns:
             增强的 DOM 树根节点
         """
-        import time
-        from aerotest.browser.dom.cdp_types import DOMRect, EnhancedAXNode, EnhancedAXProperty
-        from aerotest.browser.dom.views import EnhancedDOMTreeNode, NodeType
-        
-        start_time = time.time()
-        
-        # 构建 snapshot 查找表
-        snapshot_lookup = build_snapshot_lookup(
-            all_trees.snapshot,
-            all_trees.device_pixel_ratio
+        builder = EnhancedDOMTreeBuilder(
+            all_trees,
+            target_id=str(self.target_info.target_id),
+            session_id=str(self.session_id),
         )
-        logger.debug(f"Snapshot 查找表构建完成: {len(snapshot_lookup)} 个节点")
-        
-        # 构建 AX 树查找表
-        ax_tree_lookup: dict[int, dict] = {}
-        if all_trees.ax_tree and "nodes" in all_trees.ax_tree:
-            for ax_node in all_trees.ax_tree["nodes"]:
-                if "backendNodeId" in ax_node:
-                    ax_tree_lookup[ax_node["backendNodeId"]] = ax_node
-        logger.debug(f"AX 树查找表构建完成: {len(ax_tree_lookup)} 个节点")
-        
-        # 记忆化查找表 (nodeId -> EnhancedDOMTreeNode)
-        enhanced_dom_tree_node_lookup: dict[int, EnhancedDOMTreeNode] = {}
-        
-        # 从 DOM 树根节点开始构建
-        dom_root = all_trees.dom_tree.get("root")
-        if not dom_root:
-            raise RuntimeError("DOM 树根节点为空")
-        
-        # 递归构建增强节点
-        async def _construct_enhanced_node(
-            node: dict,
-            html_frames: Optional[list[EnhancedDOMTreeNode]],
-            total_frame_offset: Optional[DOMRect],
-        ) -> EnhancedDOMTreeNode:
-            """递归构建增强 DOM 节点（复用 browser-use 核心算法）"""
-            
-            # 初始化
-            if html_frames is None:
-                html_frames = []
-            
-            if total_frame_offset is None:
-                total_frame_offset = DOMRect(x=0.0, y=0.0, width=0.0, height=0.0)
-            else:
-                # 复制以避免指针引用
-                total_frame_offset = DOMRect(
-                    x=total_frame_offset.x,
-                    y=total_frame_offset.y,
-                    width=total_frame_offset.width,
-                    height=total_frame_offset.height,
-                )
-            
-            # 记忆化：避免重复构建
-            node_id = node.get("nodeId")
-            if node_id in enhanced_dom_tree_node_lookup:
-                return enhanced_dom_tree_node_lookup[node_id]
-            
-            # 获取 backend_node_id
-            backend_node_id = node.get("backendNodeId", 0)
-            
-            # 从 AX 树获取辅助功能信息
-            enhanced_ax_node = None
-            ax_node = ax_tree_lookup.get(backend_node_id)
-            if ax_node:
-                # 构建 EnhancedAXNode
-                properties = []
-                if "properties" in ax_node and ax_node["properties"]:
-                    for prop in ax_node["properties"]:
-                        try:
-                            properties.append(
-                                EnhancedAXProperty(
-                                    name=prop.get("name", ""),
-                                    value=prop.get("value", {}).get("value"),
-                                )
-                            )
-                        except (ValueError, KeyError):
-                            pass
-                
-                enhanced_ax_node = EnhancedAXNode(
-                    ax_node_id=ax_node.get("nodeId", ""),
-                    ignored=ax_node.get("ignored", False),
-                    role=ax_node.get("role", {}).get("value"),
-                    name=ax_node.get("name", {}).get("value"),
-                    description=ax_node.get("description", {}).get("value"),
-                    properties=properties if properties else None,
-                    child_ids=ax_node.get("childIds"),
-                )
-            
-            # 解析属性
-            attributes = {}
-            if "attributes" in node and node["attributes"]:
-                attrs_list = node["attributes"]
-                for i in range(0, len(attrs_list), 2):
-                    if i + 1 < len(attrs_list):
-                        attributes[attrs_list[i]] = attrs_list[i + 1]
-            
-            # Shadow Root 类型
-            shadow_root_type = None
-            if "shadowRootType" in node and node["shadowRootType"]:
-                shadow_root_type = node["shadowRootType"]
-            
-            # 从 Snapshot 获取数据
-            snapshot_data = snapshot_lookup.get(backend_node_id)
-            
-            # 计算绝对位置（考虑 iframe 偏移量）
-            absolute_position = None
-            if snapshot_data and snapshot_data.bounds:
-                absolute_position = DOMRect(
-                    x=snapshot_data.bounds.x + total_frame_offset.x,
-                    y=snapshot_data.bounds.y + total_frame_offset.y,
-                    width=snapshot_data.bounds.width,
-                    height=snapshot_data.bounds.height,
-                )
-            
-            # 创建增强节点
-            dom_tree_node = EnhancedDOMTreeNode(
-                node_id=node_id,
-                backend_node_id=backend_node_id,
-                node_type=NodeType(node.get("nodeType", 1)),
-                node_name=node.get("nodeName", ""),
-                node_value=node.get("nodeValue", ""),
-                attributes=attributes,
-                is_scrollable=node.get("isScrollable", False),
-                is_visible=None,  # 稍后计算
-                absolute_position=absolute_position,
-                target_id=str(self.target_info.target_id),
-                frame_id=node.get("frameId"),
-                session_id=str(self.session_id),
-                content_document=None,
-                shadow_root_type=shadow_root_type,
-                shadow_roots=None,
-                parent_node=None,
-                children_nodes=None,
-                ax_node=enhanced_ax_node,
-                snapshot_node=snapshot_data,
-            )
-            
-            # 保存到查找表
-            enhanced_dom_tree_node_lookup[node_id] = dom_tree_node
-            
-            # 设置父节点
-            if "parentId" in node and node["parentId"]:
-                parent_id = node["parentId"]
-                if parent_id in enhanced_dom_tree_node_lookup:
-                    dom_tree_node.parent_node = enhanced_dom_tree_node_lookup[parent_id]
-            
-            # 更新 HTML frames 列表
-            updated_html_frames = html_frames.copy()
-            if (
-                node.get("nodeType") == NodeType.ELEMENT_NODE.value
-                and node.get("nodeName") == "HTML"
-                and node.get("frameId") is not None
-            ):
-                updated_html_frames.append(dom_tree_node)
-                
-                # 调整帧偏移（考虑滚动量）
-                if snapshot_data and snapshot_data.scrollRects:
-                    total_frame_offset.x -= snapshot_data.scrollRects.x
-                    total_frame_offset.y -= snapshot_data.scrollRects.y
-            
-            # 处理 iframe 偏移
-            if (
-                node.get("nodeName", "").upper() in ("IFRAME", "FRAME")
-                and snapshot_data
-                and snapshot_data.bounds
-            ):
-                updated_html_frames.append(dom_tree_node)
-                total_frame_offset.x += snapshot_data.bounds.x
-                total_frame_offset.y += snapshot_data.bounds.y
-            
-            # 递归处理 content_document
-            if "contentDocument" in node and node["contentDocument"]:
-                dom_tree_node.content_document = await _construct_enhanced_node(
-                    node["contentDocument"],
-                    updated_html_frames,
-                    total_frame_offset,
-                )
-                dom_tree_node.content_document.parent_node = dom_tree_node
-            
-            # 递归处理 shadow_roots
-            if "shadowRoots" in node and node["shadowRoots"]:
-                dom_tree_node.shadow_roots = []
-                for shadow_root in node["shadowRoots"]:
-                    shadow_root_node = await _construct_enhanced_node(
-                        shadow_root,
-                        updated_html_frames,
-                        total_frame_offset,
-                    )
-                    shadow_root_node.parent_node = dom_tree_node
-                    dom_tree_node.shadow_roots.append(shadow_root_node)
-            
-            # 递归处理 children
-            if "children" in node and node["children"]:
-                dom_tree_node.children_nodes = []
-                
-                # 构建 shadow root node IDs 集合（避免重复）
-                shadow_root_node_ids = set()
-                if "shadowRoots" in node and node["shadowRoots"]:
-                    for shadow_root in node["shadowRoots"]:
-                        shadow_root_node_ids.add(shadow_root.get("nodeId"))
-                
-                for child in node["children"]:
-                    # 跳过 shadow roots（已在 shadow_roots 列表中）
-                    if child.get("nodeId") in shadow_root_node_ids:
-                        continue
-                    
-                    child_node = await _construct_enhanced_node(
-                        child,
-                        updated_html_frames,
-                        total_frame_offset,
-                    )
-                    dom_tree_node.children_nodes.append(child_node)
-            
-            # 计算可见性（简化版本：检查基本样式）
-            dom_tree_node.is_visible = self._is_node_visible(dom_tree_node)
-            
-            return dom_tree_node
-        
-        # 开始递归构建
-        root_node = await _construct_enhanced_node(
-            dom_root,
-            html_frames,
-            total_frame_offset,
+
+        if use_thread is None:
+            use_thread = self.build_dom_in_thread
+
+        if use_thread:
+            # 大页面构建是纯 CPU 工作，放入线程避免阻塞事件循环
+            root_node = await asyncio.to_thread(builder.build, total_frame_offset)
+        else:
+            root_node = builder.build(total_frame_offset)
+
+        self._node_lookup = builder.node_lookup
+        all_trees.cdp_timing.update(builder.timing)
+        logger.info(
+            f"✅ 完整 DOM 树构建完成: {builder.node_count} 个节点, "
+            f"耗时 {builder.timing['build_enhanced_dom_tree']*1000:.1f}ms"
         )
-        
-        elapsed = time.time() - start_time
-        logger.info(f"✅ 完整 DOM 树构建完成: {len(enhanced_dom_tree_node_lookup)} 个节点, 耗时 {elapsed*1000:.1f}ms")
-        
+
         return root_node
-    
+
     def _is_node_visible(self, node: EnhancedDOMTreeNode) -> bool:
         """
         检查节点是否可见（简化版本）
-        
+
         Args:
             node: DOM 节点
-            
+
         Returns:
             是否可见
         """
-        if not node.snapshot_node:
-            return True  # 无 snapshot 数据，假设可见
-        
-        # 检查计算样式
-        if node.snapshot_node.computed_styles:
-            styles = node.snapshot_node.computed_styles
-            
-            display = styles.get("display", "").lower()
-            visibility = styles.get("visibility", "").lower()
-            opacity = styles.get("opacity", "1")
+        return is_node_visible(node)
+
+    def _register_readiness_listeners(self):
+        """将本会话的页面/网络事件转发给就绪跟踪器"""
+        listeners = {
+            "Page.lifecycleEvent": self.readiness.on_lifecycle_event,
+            "Page.domContentEventFired": self.readiness.on_dom_content_event_fired,
+            "Page.loadEventFired": self.readiness.on_load_event_fired,
+            "Network.requestWillBeSent": self.readiness.on_request_will_be_sent,
+            "Network.loadingFinished": self.readiness.on_loading_finished,
+            "Network.loadingFailed": self.readiness.on_loading_failed,
+        }
+        for method, callback in listeners.items():
+            self.connection.add_event_listener(method, callback, session_id=self.session_id)
+    
+    def _register_dom_mirror_listeners(self):
+        """将本会话的 DOM 变更事件转发给 DOM 镜像"""
+        for method, handler_name in DOM_MUTATION_EVENTS.items():
             
-            if display == "none" or visibility == "hidden":
-                return False
+            def forward(event: dict, session_id: Optional[str] = None, _handler=handler_name):
+                self._dom_mutation_count += 1
+                if self.dom_mirror is not None and self.dom_mirror.valid:
+                    getattr(self.dom_mirror, _handler)(event, session_id)
             
-            try:
-                if float(opacity) <= 0:
-                    return False
-            except (ValueError, TypeError):
-                pass
-        
-        # 检查边界框
-        if node.snapshot_node.bounds:
-            bounds = node.snapshot_node.bounds
-            if bounds.width <= 0 or bounds.height <= 0:
-                return False
-        
-        return True
-    
+            self.connection.add_event_listener(method, forward, session_id=self.session_id)
     
-    async def _wait_for_load(self, timeout: float = 30.0):
-        """等待页面加载完成"""
-        try:
-            result = await asyncio.wait_for(
-                self.evaluate("document.readyState"),
-                timeout=timeout
-            )
-            # 简化实现：只检查一次
-            await asyncio.sleep(0.5)  # 给一点时间让页面稳定
-        except asyncio.TimeoutError:
-            logger.warning("等待页面加载超时")
+    async def _wait_for_load(self, timeout: Optional[float] = None) -> ReadinessWaitMetrics:
+        """等待页面加载完成（load 事件）"""
+        self.last_wait_metrics = await self.readiness.wait_until("load", timeout=timeout)
+        return self.last_wait_metrics
     
-    async def _wait_for_dom_content_loaded(self, timeout: float = 30.0):
-        """等待 DOM 内容加载"""
-        await self._wait_for_load(timeout)
+    async def _wait_for_dom_content_loaded(self, timeout: Optional[float] = None) -> ReadinessWaitMetrics:
+        """等待 DOM 内容加载（DOMContentLoaded 事件）"""
+        self.last_wait_metrics = await self.readiness.wait_until("domcontentloaded", timeout=timeout)
+        return self.last_wait_metrics
     
-    async def _wait_for_network_idle(self, timeout: float = 30.0):
-        """等待网络空闲"""
-        # 简化实现：等待一段时间
-        await asyncio.sleep(1.0)
+    async def _wait_for_network_idle(
+        self,
+        timeout: Optional[float] = None,
+        idle_time: Optional[float] = None,
+    ) -> ReadinessWaitMetrics:
+        """等待网络空闲（load 之后在途请求数持续不超过阈值）"""
+        self.last_wait_metrics = await self.readiness.wait_until(
+            "networkidle", timeout=timeout, idle_time=idle_time
+        )
+        return self.last_wait_metrics
     
     async def _update_page_info(self):
         """更新页面信息"""
@@ -769,6 +890,17 @@ class CDPSession:
         except Exception as e:
             logger.debug(f"更新页面信息失败: {e}")
     
+    async def _get_dom_storage_items(self, origin: str, is_local_storage: bool) -> dict[str, str]:
+        """读取某个源的 localStorage / sessionStorage"""
+        result = await self.connection.client.send.DOMStorage.getDOMStorageItems(
+            params={"storageId": {"securityOrigin": origin, "isLocalStorage": is_local_storage}},
+            session_id=self.session_id
+        )
+        return {
+            key: value for key, value in result.get("entries", [])
+            if key != STORAGE_SEED_MARKER
+        }
+    
     @property
     def page_info(self) -> PageInfo:
         """获取页面信息"""
@@ -0,0 +1,244 @@
+"""登录态快照
+
+保存和恢复页面的认证/存储状态（Cookie、localStorage、sessionStorage），
+使后续用例可以直接注入登录态，而不必重放登录步骤。
+"""
+
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional, Union
+
+from aerotest.utils import get_logger, user_cache_dir
+
+logger = get_logger("aerotest.cdp.storage_state")
+
+# Network.setCookies 接受的 Cookie 字段（CookieParam）
+COOKIE_PARAM_FIELDS = (
+    "name", "value", "url", "domain", "path", "secure", "httpOnly", "sameSite",
+    "expires", "priority", "sameParty", "sourceScheme", "sourcePort", "partitionKey",
+)
+
+# 已注入标记（写在 sessionStorage 中，同一标签页内每份快照只注入一次）
+STORAGE_SEED_MARKER = "__aerotest_storage_seed__"
+
+# 新文档创建时按源写入 Web Storage 的脚本（%s 为 JSON 数据）
+_STORAGE_SEED_SCRIPT = """(() => {
+  const seed = %s;
+  const storage = seed.origins[location.origin];
+  if (!storage) return;
+  try {
+    if (sessionStorage.getItem(seed.marker) === seed.token) return;
+    for (const [key, value] of Object.entries(storage.local)) localStorage.setItem(key, value);
+    for (const [key, value] of Object.entries(storage.session)) sessionStorage.setItem(key, value);
+    sessionStorage.setItem(seed.marker, seed.token);
+  } catch (e) {}
+})();"""
+
+
+@dataclass
+class OriginStorage:
+    """单个源的 Web Storage
+
+    Attributes:
+        origin: 源（如 https://example.com）
+        local_storage: localStorage 键值
+        session_storage: sessionStorage 键值
+    """
+
+    origin: str
+    local_storage: dict[str, str] = field(default_factory=dict)
+    session_storage: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class StorageState:
+    """页面存储状态快照
+
+    Attributes:
+        cookies: Network.getAllCookies 返回的 Cookie
+        origins: 各源的 Web Storage
+        created_at: 创建时间（Unix 时间戳）
+    """
+
+    cookies: list[dict] = field(default_factory=list)
+    origins: list[OriginStorage] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+
+    def cookie_params(self) -> list[dict]:
+        """
+        转换为 Network.setCookies 的参数
+
+        会话 Cookie 不带过期时间，已过期的 Cookie 被丢弃。
+
+        Returns:
+            CookieParam 列表
+        """
+        now = time.time()
+        params = []
+        for cookie in self.cookies:
+            param = {key: cookie[key] for key in COOKIE_PARAM_FIELDS if key in cookie}
+            expires = param.get("expires")
+            if cookie.get("session") or expires is None or expires < 0:
+                param.pop("expires", None)
+            elif expires < now:
+                continue
+            params.append(param)
+        return params
+
+    def seed_script(self, token: str) -> str:
+        """
+        生成注入 Web Storage 的新文档脚本（Page.addScriptToEvaluateOnNewDocument）
+
+        DOMStorage.setDOMStorageItem 要求已加载该源的帧，导航前无法写入；
+        脚本在每个新文档执行，只写入与 location.origin 相同的源，并用
+        sessionStorage 中的标记保证同一标签页内只写入一次（不覆盖页面之后的修改）。
+
+        Args:
+            token: 本次注入的标识
+
+        Returns:
+            JavaScript 源码
+        """
+        seed = {
+            "marker": STORAGE_SEED_MARKER,
+            "token": token,
+            "origins": {
+                storage.origin: {"local": storage.local_storage, "session": storage.session_storage}
+                for storage in self.origins
+                if storage.local_storage or storage.session_storage
+            },
+        }
+        return _STORAGE_SEED_SCRIPT % json.dumps(seed, ensure_ascii=False)
+
+    def to_dict(self) -> dict:
+        """转换为可序列化的字典"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StorageState":
+        """从字典创建"""
+        return cls(
+            cookies=list(data.get("cookies", [])),
+            origins=[OriginStorage(**origin) for origin in data.get("origins", [])],
+            created_at=data.get("created_at", time.time()),
+        )
+
+    def save(self, path: Union[str, Path]):
+        """
+        保存到 JSON 文件
+
+        Args:
+            path: 文件路径
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(path.suffix + ".tmp")
+        temp_path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        temp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "StorageState":
+        """
+        从 JSON 文件加载
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            存储状态
+        """
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+class StorageStateStore:
+    """按名称持久化存储状态的目录
+
+    每个状态保存为 <directory>/<name>.json，内存中缓存已加载的状态。
+
+    Example:
+        ```python
+        store = StorageStateStore(max_age=3600)
+
+        store.save("logged_in", await session.capture_storage_state())
+
+        state = store.get("logged_in")
+        if state:
+            await session.restore_storage_state(state)
+        ```
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path, None] = None,
+        max_age: Optional[float] = None,
+    ):
+        """
+        初始化状态目录
+
+        Args:
+            directory: 保存目录（默认为用户缓存目录下的 storage_state）
+            max_age: 状态有效期（秒，None 表示不过期）
+        """
+        self.directory = Path(directory) if directory else user_cache_dir("storage_state")
+        self.max_age = max_age
+        self._cache: dict[str, StorageState] = {}
+
+    def path_for(self, name: str) -> Path:
+        """状态文件路径"""
+        return self.directory / f"{name}.json"
+
+    def save(self, name: str, state: StorageState):
+        """
+        保存状态
+
+        Args:
+            name: 状态名称
+            state: 存储状态
+        """
+        state.save(self.path_for(name))
+        self._cache[name] = state
+        logger.info(
+            f"已保存存储状态: {name} "
+            f"({len(state.cookies)} 个 Cookie, {len(state.origins)} 个源)"
+        )
+
+    def get(self, name: str) -> Optional[StorageState]:
+        """
+        读取状态（不存在、损坏或已过期返回 None）
+
+        Args:
+            name: 状态名称
+
+        Returns:
+            存储状态
+        """
+        state = self._cache.get(name)
+        if state is None:
+            path = self.path_for(name)
+            if not path.exists():
+                return None
+            try:
+                state = StorageState.load(path)
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"读取存储状态失败: {name} - {e}")
+                return None
+            self._cache[name] = state
+
+        if self.max_age is not None and time.time() - state.created_at > self.max_age:
+            logger.info(f"存储状态已过期: {name}")
+            self.invalidate(name)
+            return None
+
+        return state
+
+    def invalidate(self, name: str):
+        """
+        删除状态
+
+        Args:
+            name: 状态名称
+        """
+        self._cache.pop(name, None)
+        self.path_for(name).unlink(missing_ok=True)
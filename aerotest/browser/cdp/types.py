@@ -6,6 +6,11 @@
 from dataclasses import dataclass, field
 from typing import Optional
 
+from aerotest.browser.dom.enhanced_snapshot import (
+    REQUIRED_COMPUTED_STYLES,
+    VISIBILITY_COMPUTED_STYLES,
+)
+
 
 @dataclass
 class CDPConnectionConfig:
@@ -18,12 +23,18 @@ class CDPConnectionConfig:
         port: CDP 端口（Chrome 默认 9222）
         timeout: 连接超时时间（秒）
         max_retries: 最大重试次数
+        http_max_connections: 发现接口（/json/*）HTTP 连接池的最大连接数
+        http_keepalive_expiry: 空闲 keep-alive 连接的保留时间（秒）
+        discovery_cache_ttl: /json/version 和目标列表的缓存有效期（秒，0 表示不缓存）
     """
     
     host: str = "localhost"
     port: int = 9222
     timeout: float = 30.0
     max_retries: int = 3
+    http_max_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    discovery_cache_ttl: float = 1.0
     
     @property
     def ws_url(self) -> str:
@@ -166,3 +177,159 @@ class ScreenshotOptions:
     format: str = "png"
     quality: int = 90
     full_page: bool = False
+
+
+@dataclass
+class ReadinessConfig:
+    """页面就绪检测配置
+    
+    Attributes:
+        timeout: 默认等待超时（秒）
+        idle_time: 网络空闲窗口（秒），在途请求数持续不超过阈值的时长
+        max_inflight_requests: 视为空闲的最大在途请求数
+        metrics_history: 保留的等待指标条数
+    """
+    
+    timeout: float = 30.0
+    idle_time: float = 0.5
+    max_inflight_requests: int = 0
+    metrics_history: int = 100
+
+
+@dataclass
+class ReadinessWaitMetrics:
+    """一次就绪等待的指标
+    
+    Attributes:
+        condition: 等待条件（load, domcontentloaded, networkidle）
+        elapsed_ms: 等待耗时（毫秒）
+        satisfied: 条件是否满足
+        timed_out: 是否超时
+        inflight_requests: 结束时的在途请求数
+        total_requests: 本次导航发出的请求数
+    """
+    
+    condition: str
+    elapsed_ms: float
+    satisfied: bool
+    timed_out: bool = False
+    inflight_requests: int = 0
+    total_requests: int = 0
+
+
+@dataclass
+class DOMMirrorConfig:
+    """增量 DOM 镜像配置
+    
+    Attributes:
+        max_dirty_nodes: 逐节点刷新布局的最大脏节点数，超过则整页重新快照布局
+        refresh_ax: 是否刷新脏节点的辅助功能信息
+    """
+    
+    max_dirty_nodes: int = 150
+    refresh_ax: bool = True
+
+
+@dataclass(frozen=True)
+class CaptureProfile:
+    """DOM 抓取配置（observe 阶段按需选择）
+    
+    级别高的配置抓取的数据包含级别低的配置所需的全部数据
+    
+    Attributes:
+        name: 配置名称
+        level: 覆盖级别
+        computed_styles: captureSnapshot 请求的计算样式
+        include_paint_order: 是否请求绘制顺序（遮挡过滤）
+        include_dom_rects: 是否请求 clientRects/scrollRects（可滚动性、视口坐标）
+        include_ax: 是否获取所有帧的辅助功能树
+    """
+    
+    name: str
+    level: int
+    computed_styles: tuple[str, ...]
+    include_paint_order: bool = False
+    include_dom_rects: bool = False
+    include_ax: bool = False
+    
+    def covers(self, other: "CaptureProfile") -> bool:
+        """此配置抓取的数据是否满足 other 的需要"""
+        return self.level >= other.level
+    
+    def snapshot_params(self) -> dict:
+        """DOMSnapshot.captureSnapshot 的请求参数"""
+        return {
+            "computedStyles": list(self.computed_styles),
+            "includePaintOrder": self.include_paint_order,
+            "includeDOMRects": self.include_dom_rects,
+            "includeBlendedBackgroundColors": False,
+            "includeTextColorOpacities": False,
+        }
+
+
+# 只需属性和可见性：L1 槽位不含空间/视觉描述且不会用到 AI 层
+ATTRIBUTES_ONLY_PROFILE = CaptureProfile(
+    name="attributes-only",
+    level=0,
+    computed_styles=tuple(VISIBILITY_COMPUTED_STYLES),
+)
+
+# 需要布局：空间关系（上方、左侧...）依赖绘制顺序和视口坐标
+LAYOUT_PROFILE = CaptureProfile(
+    name="layout",
+    level=1,
+    computed_styles=tuple(REQUIRED_COMPUTED_STYLES),
+    include_paint_order=True,
+    include_dom_rects=True,
+)
+
+# 完整抓取：AI/视觉层需要辅助功能树
+FULL_PROFILE = CaptureProfile(
+    name="full",
+    level=2,
+    computed_styles=tuple(REQUIRED_COMPUTED_STYLES),
+    include_paint_order=True,
+    include_dom_rects=True,
+    include_ax=True,
+)
+
+CAPTURE_PROFILES: dict[str, CaptureProfile] = {
+    profile.name: profile
+    for profile in (ATTRIBUTES_ONLY_PROFILE, LAYOUT_PROFILE, FULL_PROFILE)
+}
+
+
+@dataclass
+class BrowserContextPoolConfig:
+    """浏览器上下文池配置
+    
+    Attributes:
+        max_size: 池中最多同时存在的上下文数
+        prewarm: 启动时预先创建的上下文数
+        initial_url: 新上下文中首个页面的 URL
+        reset_on_release: 归还时是否销毁并重建上下文（清除 Cookie 和存储）
+        acquire_timeout: 等待空闲上下文的超时（秒，None 表示一直等待）
+    """
+    
+    max_size: int = 4
+    prewarm: int = 0
+    initial_url: str = "about:blank"
+    reset_on_release: bool = True
+    acquire_timeout: Optional[float] = None
+
+
+@dataclass
+class PooledBrowserContext:
+    """池中的隔离浏览器上下文
+    
+    Attributes:
+        browser_context_id: Target.createBrowserContext 返回的上下文 ID
+        target_info: 上下文中的页面目标
+        created_at: 创建时间（time.monotonic）
+        uses: 被借出的次数
+    """
+    
+    browser_context_id: str
+    target_info: TargetInfo
+    created_at: float = 0.0
+    uses: int = 0
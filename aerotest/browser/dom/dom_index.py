@@ -0,0 +1,201 @@
+"""DOM 倒排索引
+
+为序列化后的 DOM 状态构建一次倒排索引，供 DomService 和漏斗 L2/L3 查询：
+- 字符 n-gram 倒排表：子串查询只验证候选元素
+- 单词倒排表：支持 AttributeMatcher 的单词部分匹配
+- 标签 / role 分桶
+- XPath 映射
+"""
+
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from aerotest.browser.dom.views import EnhancedDOMTreeNode
+
+# 参与关键词匹配的属性（与 AttributeMatcher.ATTRIBUTE_WEIGHTS 一致，
+# innerText 同时读取 textContent）
+INDEXED_ATTRIBUTES = (
+    "placeholder", "id", "name", "aria-label", "title", "value",
+    "innerText", "textContent", "class", "type", "role", "alt",
+)
+
+# n-gram 长度（同时索引单字符，支持单字查询）
+NGRAM_SIZE = 2
+
+
+def _grams(text: str) -> set[str]:
+    """文本的单字符和 n-gram 集合"""
+    grams = set(text)
+    grams.update(text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1))
+    return grams
+
+
+def _query_grams(query: str) -> set[str]:
+    """子串查询需要全部命中的 gram"""
+    if len(query) < NGRAM_SIZE:
+        return {query}
+    return {query[i:i + NGRAM_SIZE] for i in range(len(query) - NGRAM_SIZE + 1)}
+
+
+class DOMIndex:
+    """DOM 元素倒排索引
+
+    构建时对每个元素计算一次可见文本，并为属性值和文本建立倒排表。
+    查询先取倒排表的候选位置，再用原始条件验证，结果与全量线性扫描
+    相同且保持元素原有顺序。
+
+    Example:
+        ```python
+        index = DOMIndex(state.selector_map.values())
+
+        index.find_by_text("登录")
+        index.find_by_xpath("html/body/form/button")
+        index.keyword_candidates(["用户名", "username"])
+        index.by_tags(["input", "textarea"])
+        ```
+    """
+
+    def __init__(self, nodes: Iterable[EnhancedDOMTreeNode]):
+        """
+        构建索引
+
+        Args:
+            nodes: 要索引的元素（顺序即查询结果的顺序）
+        """
+        self.nodes: list[EnhancedDOMTreeNode] = list(nodes)
+
+        self._texts: list[str] = []
+        self._texts_lower: list[str] = []
+        self._text_grams: defaultdict[str, set[int]] = defaultdict(set)
+        self._exact_text: defaultdict[str, list[int]] = defaultdict(list)
+
+        self._attr_grams: defaultdict[str, set[int]] = defaultdict(set)
+        self._attr_words: defaultdict[str, set[int]] = defaultdict(set)
+
+        self._tags: defaultdict[str, list[int]] = defaultdict(list)
+        self._roles: defaultdict[str, list[int]] = defaultdict(list)
+        self._xpaths: defaultdict[str, list[int]] = defaultdict(list)
+
+        for position, node in enumerate(self.nodes):
+            self._add(position, node)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def _add(self, position: int, node: EnhancedDOMTreeNode):
+        """索引单个元素"""
+        text = node.get_all_children_text()
+        text_lower = text.lower()
+        self._texts.append(text)
+        self._texts_lower.append(text_lower)
+        self._exact_text[text].append(position)
+        for gram in _grams(text_lower):
+            self._text_grams[gram].add(position)
+
+        attributes = node.attributes or {}
+        for attribute in INDEXED_ATTRIBUTES:
+            value = attributes.get(attribute)
+            if not value:
+                continue
+            value_lower = value.lower()
+            for gram in _grams(value_lower):
+                self._attr_grams[gram].add(position)
+            for word in value_lower.split():
+                self._attr_words[word].add(position)
+
+        if node.tag_name:
+            self._tags[node.tag_name.lower()].append(position)
+        role = attributes.get("role")
+        if role:
+            self._roles[role.lower()].append(position)
+        self._xpaths[node.xpath].append(position)
+
+    # ===== 查询 =====
+
+    def find_by_text(self, text: str, exact_match: bool = False) -> list[EnhancedDOMTreeNode]:
+        """
+        按可见文本查找（与 DomService.find_elements_by_text 语义相同）
+
+        Args:
+            text: 要搜索的文本
+            exact_match: 是否精确匹配（区分大小写）
+
+        Returns:
+            匹配的元素列表
+        """
+        if exact_match:
+            return [self.nodes[p] for p in self._exact_text.get(text, [])]
+
+        query = text.lower()
+        candidates = self._substring_candidates(query, self._text_grams)
+        return [self.nodes[p] for p in candidates if query in self._texts_lower[p]]
+
+    def find_by_xpath(self, xpath: str) -> list[EnhancedDOMTreeNode]:
+        """按 XPath 精确查找"""
+        return [self.nodes[p] for p in self._xpaths.get(xpath, [])]
+
+    def by_tags(self, tags: Iterable[str]) -> list[EnhancedDOMTreeNode]:
+        """按标签名分桶取元素（保持原有顺序）"""
+        positions: set[int] = set()
+        for tag in tags:
+            positions.update(self._tags.get(tag.lower(), []))
+        return [self.nodes[p] for p in sorted(positions)]
+
+    def by_role(self, role: str) -> list[EnhancedDOMTreeNode]:
+        """按 ARIA role 分桶取元素"""
+        return [self.nodes[p] for p in self._roles.get(role.lower(), [])]
+
+    def keyword_candidates(
+        self,
+        keywords: Iterable[str],
+        elements: Optional[list[EnhancedDOMTreeNode]] = None,
+    ) -> list[EnhancedDOMTreeNode]:
+        """
+        可能被 AttributeMatcher 匹配到的元素
+
+        属性值包含关键词（含精确匹配）时必然命中关键词的全部 n-gram；
+        单词部分匹配时属性值中某个单词是关键词的子串或反之。两类候选
+        的并集是非零得分元素的超集，其余元素得分必为 0。
+
+        Args:
+            keywords: 关键词列表
+            elements: 只在这些元素中筛选（None 表示全部）
+
+        Returns:
+            候选元素（保持原有顺序）
+        """
+        positions: set[int] = set()
+        for keyword in keywords:
+            keyword_lower = keyword.lower().strip()
+            if not keyword_lower:
+                continue
+            positions.update(self._substring_candidates(keyword_lower, self._attr_grams))
+            # 单词是关键词的子串
+            for start in range(len(keyword_lower)):
+                for end in range(start + 1, len(keyword_lower) + 1):
+                    postings = self._attr_words.get(keyword_lower[start:end])
+                    if postings:
+                        positions.update(postings)
+
+        if elements is None:
+            return [self.nodes[p] for p in sorted(positions)]
+
+        allowed = {id(self.nodes[p]) for p in positions}
+        return [element for element in elements if id(element) in allowed]
+
+    # ===== 内部方法 =====
+
+    def _substring_candidates(self, query: str, postings: dict[str, set[int]]) -> list[int]:
+        """包含 query 所有 gram 的位置（升序）"""
+        if not query:
+            return list(range(len(self.nodes)))
+
+        lists = sorted((postings.get(gram, set()) for gram in _query_grams(query)), key=len)
+        if not lists or not lists[0]:
+            return []
+        result = set(lists[0])
+        for other in lists[1:]:
+            result &= other
+            if not result:
+                return []
+        return sorted(result)
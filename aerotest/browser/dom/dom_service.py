@@ -37,6 +37,7 @@ class DomService:
         bbox_filtering: bool = True,
         containment_threshold: float = 0.99,
         logger: Optional[logging.Logger] = None,
+        occlusion_backend: str = "grid",
     ):
         """
         初始化 DOM 服务
@@ -46,10 +47,12 @@ class DomService:
             bbox_filtering: 是否启用边界框过滤
             containment_threshold: 包含阈值（0.0-1.0）
             logger: 可选的日志记录器
+            occlusion_backend: 绘制顺序遮挡计算后端（"grid" 或 "pure"）
         """
         self.paint_order_filtering = paint_order_filtering
         self.bbox_filtering = bbox_filtering
         self.containment_threshold = containment_threshold
+        self.occlusion_backend = occlusion_backend
         self.logger = logger or get_logger("aerotest.dom.service")
 
     def serialize_dom_tree(
@@ -58,6 +61,7 @@ class DomService:
         previous_state: Optional[SerializedDOMState] = None,
         include_attributes: Optional[list[str]] = None,
         session_id: Optional[str] = None,
+        keep_fingerprints: bool = True,
     ) -> tuple[SerializedDOMState, dict[str, float]]:
         """
         序列化 DOM 树为可访问元素
@@ -67,6 +71,9 @@ class DomService:
             previous_state: 可选的之前的状态（用于检测新元素）
             include_attributes: 要包含的属性列表
             session_id: 可选的会话 ID
+            keep_fingerprints: 是否为全部可交互元素计算内容指纹（默认保留，
+                结果作为下一次的 previous_state 时 diff.changed 才能检测内容变化；
+                确定不会用于 diff 时可传 False 省去计算）
         
         Returns:
             (SerializedDOMState, timing_info) 元组
@@ -82,6 +89,8 @@ class DomService:
                 containment_threshold=self.containment_threshold,
                 paint_order_filtering=self.paint_order_filtering,
                 session_id=session_id,
+                occlusion_backend=self.occlusion_backend,
+                keep_fingerprints=keep_fingerprints,
             )
             
             # 执行序列化
@@ -261,19 +270,7 @@ class DomService:
         Returns:
             匹配的元素列表
         """
-        matching_elements = []
-        
-        for element in state.selector_map.values():
-            element_text = element.get_all_children_text()
-            
-            if exact_match:
-                if element_text == text:
-                    matching_elements.append(element)
-            else:
-                if text.lower() in element_text.lower():
-                    matching_elements.append(element)
-        
-        return matching_elements
+        return state.index.find_by_text(text, exact_match=exact_match)
 
     @staticmethod
     def find_elements_by_xpath(
@@ -290,13 +287,7 @@ class DomService:
         Returns:
             匹配的元素列表
         """
-        matching_elements = []
-        
-        for element in state.selector_map.values():
-            if element.xpath == xpath:
-                matching_elements.append(element)
-        
-        return matching_elements
+        return state.index.find_by_xpath(xpath)
 
     @staticmethod
     def get_element_hierarchy(
@@ -371,6 +362,7 @@ class DomService:
 def create_dom_service(
     paint_order_filtering: bool = True,
     bbox_filtering: bool = True,
+    occlusion_backend: str = "grid",
 ) -> DomService:
     """
     创建 DOM 服务实例的便捷函数
@@ -378,6 +370,7 @@ def create_dom_service(
     Args:
         paint_order_filtering: 是否启用绘制顺序过滤
         bbox_filtering: 是否启用边界框过滤
+        occlusion_backend: 绘制顺序遮挡计算后端（"grid" 或 "pure"）
     
     Returns:
         DomService 实例
@@ -385,6 +378,7 @@ def create_dom_service(
     return DomService(
         paint_order_filtering=paint_order_filtering,
         bbox_filtering=bbox_filtering,
+        occlusion_backend=occlusion_backend,
     )
 
 
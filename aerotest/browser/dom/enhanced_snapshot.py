@@ -5,8 +5,11 @@
 
 来源: browser-use v0.11.2
 许可的 MIT
+改动: 快照数据保存为列式存储（SnapshotStore），节点视图按需物化
 """
 
+from array import array
+from collections.abc import Mapping
 from typing import Any, Optional
 
 from aerotest.browser.dom.views import DOMRect, EnhancedSnapshotNode
@@ -26,168 +29,386 @@ REQUIRED_COMPUTED_STYLES = [
     'background-color',  # 用于可见性逻辑
 ]
 
+# 只判断可见性和可点击性时需要的样式（不含滚动、定位和遮挡相关样式）
+VISIBILITY_COMPUTED_STYLES = [
+    'display',
+    'visibility',
+    'opacity',
+    'cursor',
+    'pointer-events',
+]
 
-def _parse_rare_boolean_data(rare_data: dict, index: int) -> Optional[bool]:
-    """
-    解析罕见布尔数据
-    
-    Args:
-        rare_data: 罕见数据字典（包的'index' 键）
-        index: 要检查的索引
-    
-    Returns:
-        如果索引在罕见数据中，返的True，否则返的None
+
+# 行标志位
+_HAS_BOUNDS = 1
+_HAS_CLIENT_RECTS = 2
+_HAS_SCROLL_RECTS = 4
+_HAS_PAINT_ORDER = 8
+_HAS_STACKING_CONTEXTS = 16
+_HAS_CLICKABLE_DATA = 32
+_IS_CLICKABLE = 64
+
+_STYLE_COUNT = len(REQUIRED_COMPUTED_STYLES)
+_STYLE_SLOT = {name: i for i, name in enumerate(REQUIRED_COMPUTED_STYLES)}
+
+
+class SnapshotStore(Mapping):
+    """列式快照存储（struct-of-arrays）
+
+    每个布局属性保存在一列紧凑数组中，按行号访问；backend_node_id 通过
+    稠密索引映射到行号。计算样式只保存字符串表中的索引（驻留字符串），
+    不为每个节点构建字典。
+
+    行为与 dict[int, EnhancedSnapshotNode] 一致：get/[] 返回 SnapshotNodeView，
+    各字段在首次访问时才物化为 DOMRect / dict。
     """
-    if not rare_data or 'index' not in rare_data:
+
+    __slots__ = (
+        "strings", "_index", "_flags", "_bounds", "_client_rects", "_scroll_rects",
+        "_paint_order", "_stacking_contexts", "_style_ids",
+    )
+
+    def __init__(self, strings: list[str]):
+        """
+        初始化空存储
+
+        Args:
+            strings: 快照字符串表
+        """
+        self.strings = strings
+        self._index: dict[int, int] = {}
+        self._flags = bytearray()
+        self._bounds = array("d")
+        self._client_rects = array("d")
+        self._scroll_rects = array("d")
+        self._paint_order = array("q")
+        self._stacking_contexts = array("q")
+        self._style_ids = array("l")
+
+    # ===== Mapping 接口 =====
+
+    def __getitem__(self, backend_node_id: int) -> "SnapshotNodeView":
+        return SnapshotNodeView(self, self._index[backend_node_id])
+
+    def __contains__(self, backend_node_id: object) -> bool:
+        return backend_node_id in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # ===== 列访问 =====
+
+    def row_of(self, backend_node_id: int) -> Optional[int]:
+        """backend_node_id 对应的行号"""
+        return self._index.get(backend_node_id)
+
+    def bounds_at(self, row: int) -> Optional[tuple[float, float, float, float]]:
+        """行的边界框 (x, y, width, height)，不创建 DOMRect"""
+        if not self._flags[row] & _HAS_BOUNDS:
+            return None
+        i = row * 4
+        b = self._bounds
+        return b[i], b[i + 1], b[i + 2], b[i + 3]
+
+    def style_at(self, row: int, name: str) -> Optional[str]:
+        """行的单个计算样式，不创建样式字典"""
+        style_id = self._style_ids[row * _STYLE_COUNT + _STYLE_SLOT[name]]
+        if 0 <= style_id < len(self.strings):
+            return self.strings[style_id]
         return None
-    return index in rare_data['index']
+
+    def is_visible_at(self, row: int) -> bool:
+        """按列数据检查可见性（与 is_node_visible 规则一致）"""
+        strings = self.strings
+        base = row * _STYLE_COUNT
+        styles = self._style_ids
+        n = len(strings)
+
+        display_id = styles[base + _STYLE_SLOT["display"]]
+        if 0 <= display_id < n and strings[display_id].lower() == "none":
+            return False
+        visibility_id = styles[base + _STYLE_SLOT["visibility"]]
+        if 0 <= visibility_id < n and strings[visibility_id].lower() == "hidden":
+            return False
+        opacity_id = styles[base + _STYLE_SLOT["opacity"]]
+        if 0 <= opacity_id < n:
+            try:
+                if float(strings[opacity_id]) <= 0:
+                    return False
+            except (ValueError, TypeError):
+                pass
+
+        if self._flags[row] & _HAS_BOUNDS:
+            i = row * 4
+            if self._bounds[i + 2] <= 0 or self._bounds[i + 3] <= 0:
+                return False
+
+        return True
+
+    # ===== 构建 =====
+
+    def _append_row(self, backend_node_id: int) -> int:
+        """追加一行（重复的 backend_node_id 指向新行）"""
+        row = len(self._flags)
+        self._index[backend_node_id] = row
+        self._flags.append(0)
+        self._bounds.extend(_EMPTY_RECT)
+        self._client_rects.extend(_EMPTY_RECT)
+        self._scroll_rects.extend(_EMPTY_RECT)
+        self._paint_order.append(0)
+        self._stacking_contexts.append(0)
+        self._style_ids.extend(_EMPTY_STYLES)
+        return row
 
 
-def _parse_computed_styles(strings: list[str], style_indices: list[int]) -> dict[str, str]:
+_EMPTY_RECT = (0.0, 0.0, 0.0, 0.0)
+_EMPTY_STYLES = (-1,) * _STYLE_COUNT
+
+
+class SnapshotNodeView:
+    """SnapshotStore 中一行的惰性视图
+
+    字段与 EnhancedSnapshotNode 相同，首次访问时物化并缓存
     """
-    从布局树解析计算样的
-    
+
+    __slots__ = ("store", "row", "_bounds", "_client_rects", "_scroll_rects", "_computed_styles")
+
+    _UNSET: Any = object()
+
+    def __init__(self, store: SnapshotStore, row: int):
+        self.store = store
+        self.row = row
+        self._bounds = self._UNSET
+        self._client_rects = self._UNSET
+        self._scroll_rects = self._UNSET
+        self._computed_styles = self._UNSET
+
+    @property
+    def is_clickable(self) -> Optional[bool]:
+        """是否可点击（无数据时为 None）"""
+        flags = self.store._flags[self.row]
+        if not flags & _HAS_CLICKABLE_DATA:
+            return None
+        return bool(flags & _IS_CLICKABLE)
+
+    @property
+    def cursor_style(self) -> Optional[str]:
+        """光标样式"""
+        return self.store.style_at(self.row, "cursor")
+
+    @property
+    def bounds(self) -> Optional[DOMRect]:
+        """文档坐标（原点 = 页面左上角，忽略当前滚动）"""
+        if self._bounds is self._UNSET:
+            self._bounds = self._rect(self.store._bounds, _HAS_BOUNDS)
+        return self._bounds
+
+    @property
+    def clientRects(self) -> Optional[DOMRect]:
+        """视口坐标（原点 = 可见滚动端口左上角）"""
+        if self._client_rects is self._UNSET:
+            self._client_rects = self._rect(self.store._client_rects, _HAS_CLIENT_RECTS)
+        return self._client_rects
+
+    @property
+    def scrollRects(self) -> Optional[DOMRect]:
+        """元素的可滚动区域"""
+        if self._scroll_rects is self._UNSET:
+            self._scroll_rects = self._rect(self.store._scroll_rects, _HAS_SCROLL_RECTS)
+        return self._scroll_rects
+
+    @property
+    def computed_styles(self) -> Optional[dict[str, str]]:
+        """从布局树计算的样式"""
+        if self._computed_styles is self._UNSET:
+            store = self.store
+            strings = store.strings
+            base = self.row * _STYLE_COUNT
+            styles = {}
+            for i, name in enumerate(REQUIRED_COMPUTED_STYLES):
+                style_id = store._style_ids[base + i]
+                if 0 <= style_id < len(strings):
+                    styles[name] = strings[style_id]
+            self._computed_styles = styles or None
+        return self._computed_styles
+
+    @property
+    def paint_order(self) -> Optional[int]:
+        """绘制顺序"""
+        if not self.store._flags[self.row] & _HAS_PAINT_ORDER:
+            return None
+        return self.store._paint_order[self.row]
+
+    @property
+    def stacking_contexts(self) -> Optional[int]:
+        """堆叠上下文"""
+        if not self.store._flags[self.row] & _HAS_STACKING_CONTEXTS:
+            return None
+        return self.store._stacking_contexts[self.row]
+
+    def to_snapshot_node(self) -> EnhancedSnapshotNode:
+        """物化为 EnhancedSnapshotNode"""
+        return EnhancedSnapshotNode(
+            is_clickable=self.is_clickable,
+            cursor_style=self.cursor_style,
+            bounds=self.bounds,
+            clientRects=self.clientRects,
+            scrollRects=self.scrollRects,
+            computed_styles=self.computed_styles,
+            paint_order=self.paint_order,
+            stacking_contexts=self.stacking_contexts,
+        )
+
+    def _rect(self, column: array, flag: int) -> Optional[DOMRect]:
+        """从矩形列物化 DOMRect"""
+        if not self.store._flags[self.row] & flag:
+            return None
+        i = self.row * 4
+        return DOMRect(x=column[i], y=column[i + 1], width=column[i + 2], height=column[i + 3])
+
+    def __repr__(self) -> str:
+        return f"SnapshotNodeView(row={self.row}, bounds={self.bounds})"
+
+
+# 快照查找表：build_snapshot_lookup 返回 SnapshotStore，也接受普通字典
+SnapshotLookup = Mapping[int, Any]
+
+
+def snapshot_bounds(snapshot_data: Any) -> Optional[tuple[float, float, float, float]]:
+    """
+    读取快照数据的边界框，视图直接读列，不物化 DOMRect
+
     Args:
-        strings: 字符串表（来自快照）
-        style_indices: 样式索引列表
-    
+        snapshot_data: SnapshotNodeView 或 EnhancedSnapshotNode
+
     Returns:
-        样式名称到值的映射
+        (x, y, width, height)，无边界框时为 None
     """
-    styles = {}
-    for i, style_index in enumerate(style_indices):
-        if i < len(REQUIRED_COMPUTED_STYLES) and 0 <= style_index < len(strings):
-            styles[REQUIRED_COMPUTED_STYLES[i]] = strings[style_index]
-    return styles
+    if isinstance(snapshot_data, SnapshotNodeView):
+        return snapshot_data.store.bounds_at(snapshot_data.row)
+    bounds = snapshot_data.bounds
+    if bounds is None:
+        return None
+    return bounds.x, bounds.y, bounds.width, bounds.height
 
 
 def build_snapshot_lookup(
     snapshot: dict[str, Any],
     device_pixel_ratio: float = 1.0,
-) -> dict[int, EnhancedSnapshotNode]:
+    computed_styles: Optional[list[str]] = None,
+) -> SnapshotStore:
     """
-    构建后端节点 ID 到增强快照数据的查找的
-    
-    这个函数预先计算所有内容，避免在后续处理中重复计算的
-    
+    构建后端节点 ID 到增强快照数据的列式存储
+
+    只把 CDP 的布局数组拷贝进紧凑列，不为每个节点创建对象；
+    节点视图在访问时才物化
+
     Args:
-        snapshot: CDP DOMSnapshot.captureSnapshot 的返回的
-        device_pixel_ratio: 设备像素比（用于坐标转换的
-    
+        snapshot: CDP DOMSnapshot.captureSnapshot 的返回值
+        device_pixel_ratio: 设备像素比（用于坐标转换）
+        computed_styles: 抓取时请求的样式列表（None 表示 REQUIRED_COMPUTED_STYLES），
+            按名称对齐到存储的样式槽位
+
     Returns:
-        backend_node_id -> EnhancedSnapshotNode 的映的
+        SnapshotStore（backend_node_id -> SnapshotNodeView）
     """
-    snapshot_lookup: dict[int, EnhancedSnapshotNode] = {}
-    
+    store = SnapshotStore(snapshot.get('strings', []))
+
     if not snapshot.get('documents'):
-        return snapshot_lookup
-    
-    strings = snapshot.get('strings', [])
-    
+        return store
+
+    flags = store._flags
+    bounds_column = store._bounds
+    client_column = store._client_rects
+    scroll_column = store._scroll_rects
+    style_column = store._style_ids
+    if computed_styles is None:
+        style_slots = list(range(_STYLE_COUNT))
+    else:
+        style_slots = [_STYLE_SLOT[name] for name in computed_styles if name in _STYLE_SLOT]
+
     for document in snapshot['documents']:
         nodes = document.get('nodes', {})
         layout = document.get('layout', {})
-        
-        # 构建后端节点 ID 到快照索引的查找的
+
+        # 后端节点 ID -> 快照索引（重复项取最后一次）
         backend_node_to_snapshot_index = {}
         if 'backendNodeId' in nodes:
             for i, backend_node_id in enumerate(nodes['backendNodeId']):
                 backend_node_to_snapshot_index[backend_node_id] = i
-        
-        # 性能优化：预先构建布局索引映射，消的O(n²) 双重查找
-        # 保留原始行为：对于重复项使用第一次出的
+
+        # 快照索引 -> 布局索引（重复项取第一次）
         layout_index_map = {}
         if layout and 'nodeIndex' in layout:
             for layout_idx, node_index in enumerate(layout['nodeIndex']):
-                if node_index not in layout_index_map:  # 只存储第一次出的
+                if node_index not in layout_index_map:
                     layout_index_map[node_index] = layout_idx
-        
-        # 为每个后端节的ID 构建快照查找
+
+        clickable_data = nodes.get('isClickable')
+        clickable_indices = None
+        if clickable_data and 'index' in clickable_data:
+            clickable_indices = set(clickable_data['index'])
+
+        bounds_data = layout.get('bounds', [])
+        styles_data = layout.get('styles', [])
+        paint_orders = layout.get('paintOrders', [])
+        client_rects_data = layout.get('clientRects', [])
+        scroll_rects_data = layout.get('scrollRects', [])
+        stacking_data = layout.get('stackingContexts', {})
+        stacking_index = stacking_data.get('index') if stacking_data else None
+
         for backend_node_id, snapshot_index in backend_node_to_snapshot_index.items():
-            is_clickable = None
-            if 'isClickable' in nodes:
-                is_clickable = _parse_rare_boolean_data(nodes['isClickable'], snapshot_index)
-            
-            # 查找对应的布局节点
-            cursor_style = None
-            bounding_box = None
-            computed_styles = {}
-            paint_order = None
-            client_rects = None
-            scroll_rects = None
-            stacking_contexts = None
-            
-            # 查找与此快照节点对应的布局树节的
-            if snapshot_index in layout_index_map:
-                layout_idx = layout_index_map[snapshot_index]
-                
-                # 解析边界的
-                if layout_idx < len(layout.get('bounds', [])):
-                    bounds = layout['bounds'][layout_idx]
+            row = store._append_row(backend_node_id)
+            row_flags = 0
+
+            if clickable_indices is not None:
+                row_flags |= _HAS_CLICKABLE_DATA
+                if snapshot_index in clickable_indices:
+                    row_flags |= _IS_CLICKABLE
+
+            layout_idx = layout_index_map.get(snapshot_index)
+            if layout_idx is not None:
+                rect_offset = row * 4
+
+                if layout_idx < len(bounds_data):
+                    bounds = bounds_data[layout_idx]
                     if len(bounds) >= 4:
-                        # 重要：CDP 坐标是设备像素，需要转换为 CSS 像素
-                        # 通过除以设备像素比来转换
-                        raw_x, raw_y, raw_width, raw_height = bounds[0], bounds[1], bounds[2], bounds[3]
-                        
-                        # 应用设备像素比缩放，将设备像素转换为 CSS 像素
-                        bounding_box = DOMRect(
-                            x=raw_x / device_pixel_ratio,
-                            y=raw_y / device_pixel_ratio,
-                            width=raw_width / device_pixel_ratio,
-                            height=raw_height / device_pixel_ratio,
-                        )
-                
-                # 解析此布局节点的计算样的
-                if layout_idx < len(layout.get('styles', [])):
-                    style_indices = layout['styles'][layout_idx]
-                    computed_styles = _parse_computed_styles(strings, style_indices)
-                    cursor_style = computed_styles.get('cursor')
-                
-                # 提取绘制顺序（如果可用）
-                if layout_idx < len(layout.get('paintOrders', [])):
-                    paint_order = layout.get('paintOrders', [])[layout_idx]
-                
-                # 提取客户端矩形（如果可用的
-                client_rects_data = layout.get('clientRects', [])
+                        # CDP 坐标是设备像素，除以设备像素比转换为 CSS 像素
+                        bounds_column[rect_offset] = bounds[0] / device_pixel_ratio
+                        bounds_column[rect_offset + 1] = bounds[1] / device_pixel_ratio
+                        bounds_column[rect_offset + 2] = bounds[2] / device_pixel_ratio
+                        bounds_column[rect_offset + 3] = bounds[3] / device_pixel_ratio
+                        row_flags |= _HAS_BOUNDS
+
+                if layout_idx < len(styles_data):
+                    style_indices = styles_data[layout_idx]
+                    style_offset = row * _STYLE_COUNT
+                    for slot, style_index in zip(style_slots, style_indices):
+                        style_column[style_offset + slot] = style_index
+
+                if layout_idx < len(paint_orders):
+                    store._paint_order[row] = paint_orders[layout_idx]
+                    row_flags |= _HAS_PAINT_ORDER
+
                 if layout_idx < len(client_rects_data):
-                    client_rect_data = client_rects_data[layout_idx]
-                    if client_rect_data and len(client_rect_data) >= 4:
-                        client_rects = DOMRect(
-                            x=client_rect_data[0],
-                            y=client_rect_data[1],
-                            width=client_rect_data[2],
-                            height=client_rect_data[3],
-                        )
-                
-                # 提取滚动矩形（如果可用）
-                scroll_rects_data = layout.get('scrollRects', [])
+                    rect = client_rects_data[layout_idx]
+                    if rect and len(rect) >= 4:
+                        client_column[rect_offset:rect_offset + 4] = array('d', rect[:4])
+                        row_flags |= _HAS_CLIENT_RECTS
+
                 if layout_idx < len(scroll_rects_data):
-                    scroll_rect_data = scroll_rects_data[layout_idx]
-                    if scroll_rect_data and len(scroll_rect_data) >= 4:
-                        scroll_rects = DOMRect(
-                            x=scroll_rect_data[0],
-                            y=scroll_rect_data[1],
-                            width=scroll_rect_data[2],
-                            height=scroll_rect_data[3],
-                        )
-                
-                # 提取堆叠上下文（如果可用的
-                stacking_contexts_data = layout.get('stackingContexts', {})
-                if stacking_contexts_data and 'index' in stacking_contexts_data:
-                    if layout_idx < len(stacking_contexts_data['index']):
-                        stacking_contexts = stacking_contexts_data['index'][layout_idx]
-            
-            # 创建增强快照节点
-            snapshot_lookup[backend_node_id] = EnhancedSnapshotNode(
-                is_clickable=is_clickable,
-                cursor_style=cursor_style,
-                bounds=bounding_box,
-                clientRects=client_rects,
-                scrollRects=scroll_rects,
-                computed_styles=computed_styles if computed_styles else None,
-                paint_order=paint_order,
-                stacking_contexts=stacking_contexts,
-            )
-    
-    return snapshot_lookup
+                    rect = scroll_rects_data[layout_idx]
+                    if rect and len(rect) >= 4:
+                        scroll_column[rect_offset:rect_offset + 4] = array('d', rect[:4])
+                        row_flags |= _HAS_SCROLL_RECTS
+
+                if stacking_index and layout_idx < len(stacking_index):
+                    store._stacking_contexts[row] = stacking_index[layout_idx]
+                    row_flags |= _HAS_STACKING_CONTEXTS
+
+            flags[row] = row_flags
 
+    return store
@@ -5,6 +5,7 @@
 来源: browser-use v0.11.2
 """
 
+import math
 from collections import defaultdict
 from dataclasses import dataclass
 
@@ -142,13 +143,129 @@ class RectUnionPure:
         return True
 
 
+class RectUnionGrid(RectUnionPure):
+    """
+    带均匀网格索引的矩形并集
+
+    与 RectUnionPure 使用相同的切分算法，但每个片段只与网格中和它
+    接触的已有片段比较。纯版本中每个片段的去留只取决于按插入顺序
+    之后遇到的矩形，不接触片段的矩形不会改变它；因此按片段深度优先
+    处理、只遍历接触的候选，得到的结果与片段顺序都与纯版本完全相同。
+    """
+
+    __slots__ = ('_cell_size', '_grid')
+
+    def __init__(self, cell_size: float = 128.0) -> None:
+        super().__init__()
+        self._cell_size = cell_size
+        # (列, 行) -> 片段在 _rects 中的下标（递增）
+        self._grid: defaultdict[tuple[int, int], list[int]] = defaultdict(list)
+
+    def _cells(self, r: Rect) -> tuple[range, range]:
+        """矩形（闭区间）覆盖的网格列和行"""
+        size = self._cell_size
+        return (
+            range(math.floor(r.x1 / size), math.floor(r.x2 / size) + 1),
+            range(math.floor(r.y1 / size), math.floor(r.y2 / size) + 1),
+        )
+
+    def _candidates(self, r: Rect, after: int) -> list[int]:
+        """下标大于 after 且与 r（闭区间）接触的片段下标，升序"""
+        columns, rows = self._cells(r)
+        grid = self._grid
+        rects = self._rects
+        ids: set[int] = set()
+        for cx in columns:
+            for cy in rows:
+                cell = grid.get((cx, cy))
+                if cell:
+                    ids.update(cell)
+        return sorted(
+            i for i in ids
+            if i > after
+            and rects[i].x1 <= r.x2 and r.x1 <= rects[i].x2
+            and rects[i].y1 <= r.y2 and r.y1 <= rects[i].y2
+        )
+
+    def _remaining(self, r: Rect, covered_check: bool) -> list[Rect]:
+        """
+        r 减去并集后剩余的片段（顺序与纯版本一致）
+
+        Args:
+            r: 查询矩形
+            covered_check: True 时按 contains 语义（被单个片段包含即消除），
+                并在出现第一个剩余片段时立即返回
+
+        Returns:
+            剩余片段
+        """
+        rects = self._rects
+        remaining: list[Rect] = []
+        # (片段, 已处理到的 _rects 下标)
+        stack: list[tuple[Rect, int]] = [(r, -1)]
+        while stack:
+            piece, after = stack.pop()
+            for i in self._candidates(piece, after):
+                s = rects[i]
+                if covered_check and s.contains(piece):
+                    break
+                if piece.intersects(s):
+                    stack.extend((part, i) for part in reversed(self._split_diff(piece, s)))
+                    break
+            else:
+                remaining.append(piece)
+                if covered_check:
+                    return remaining
+        return remaining
+
+    def contains(self, r: Rect) -> bool:
+        """
+        如果 r 完全被当前并集覆盖则返回 True
+        """
+        if not self._rects:
+            return False
+        return not self._remaining(r, covered_check=True)
+
+    def add(self, r: Rect) -> bool:
+        """
+        插入 r，除非它已经被覆盖
+        如果并集增长则返回 True
+        """
+        if self.contains(r):
+            return False
+
+        for piece in self._remaining(r, covered_check=False):
+            index = len(self._rects)
+            self._rects.append(piece)
+            columns, rows = self._cells(piece)
+            for cx in columns:
+                for cy in rows:
+                    self._grid[(cx, cy)].append(index)
+        return True
+
+
+# 可选的遮挡计算后端
+OCCLUSION_BACKENDS: dict[str, type[RectUnionPure]] = {
+    'pure': RectUnionPure,
+    'grid': RectUnionGrid,
+}
+
+
 class PaintOrderRemover:
     """
     根据绘制顺序参数计算应该移除的元素
     """
 
-    def __init__(self, root: SimplifiedNode):
+    def __init__(self, root: SimplifiedNode, occlusion_backend: str = 'grid'):
+        """
+        Args:
+            root: 简化树根节点
+            occlusion_backend: 遮挡计算后端（'grid' 或 'pure'，结果相同）
+        """
+        if occlusion_backend not in OCCLUSION_BACKENDS:
+            raise ValueError(f"不支持的遮挡计算后端: {occlusion_backend}")
         self.root = root
+        self.occlusion_backend = occlusion_backend
 
     def calculate_paint_order(self) -> None:
         """计算绘制顺序并标记应该被忽略的元素"""
@@ -178,7 +295,7 @@ class PaintOrderRemover:
             ):
                 grouped_by_paint_order[node.original_node.snapshot_node.paint_order].append(node)
 
-        rect_union = RectUnionPure()
+        rect_union = OCCLUSION_BACKENDS[self.occlusion_backend]()
 
         # 从高到低处理绘制顺序
         for paint_order, nodes in sorted(grouped_by_paint_order.items(), key=lambda x: -x[0]):
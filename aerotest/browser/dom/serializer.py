@@ -14,6 +14,7 @@ from aerotest.browser.dom.paint_order import PaintOrderRemover
 from aerotest.browser.dom.utils import cap_text_length
 from aerotest.browser.dom.views import (
     DEFAULT_INCLUDE_ATTRIBUTES,
+    DOMDiff,
     DOMRect,
     DOMSelectorMap,
     EnhancedDOMTreeNode,
@@ -57,6 +58,8 @@ class DOMTreeSerializer:
         containment_threshold: float | None = None,
         paint_order_filtering: bool = True,
         session_id: str | None = None,
+        occlusion_backend: str = 'grid',
+        keep_fingerprints: bool = False,
     ):
         self.root_node = root_node
         self._interactive_counter = 1
@@ -64,11 +67,25 @@ class DOMTreeSerializer:
         self._previous_cached_selector_map = (
             previous_cached_state.selector_map if previous_cached_state else None
         )
+        self._previous_cached_state = previous_cached_state
+        # 上一次的可交互元素 ID 集合只构建一次
+        self._previous_ids: set[int] = (
+            {n.backend_node_id for n in self._previous_cached_selector_map.values()}
+            if self._previous_cached_selector_map
+            else set()
+        )
+        self._interactive_descendants_cache: dict[int, bool] = {}
+        self._fingerprints: dict[int, int] = {}
+        # 结果会作为下一次的 previous_cached_state 时才为全部可交互元素计算指纹，
+        # 否则只在计算 diff 时为前后都存在的元素计算
+        self.keep_fingerprints = keep_fingerprints
+        self._visible_nodes: list[EnhancedDOMTreeNode] = []
         self.timing_info: dict[str, float] = {}
         self._clickable_cache: dict[int, bool] = {}
         self.enable_bbox_filtering = enable_bbox_filtering
         self.containment_threshold = containment_threshold or self.DEFAULT_CONTAINMENT_THRESHOLD
         self.paint_order_filtering = paint_order_filtering
+        self.occlusion_backend = occlusion_backend
         self.session_id = session_id
 
     def serialize_accessible_elements(self) -> tuple[SerializedDOMState, dict[str, float]]:
@@ -79,6 +96,9 @@ class DOMTreeSerializer:
         self._interactive_counter = 1
         self._selector_map = {}
         self._clickable_cache = {}
+        self._interactive_descendants_cache = {}
+        self._fingerprints = {}
+        self._visible_nodes = []
 
         # 步骤 1: 创建简化树
         start_step1 = time.time()
@@ -88,7 +108,7 @@ class DOMTreeSerializer:
         # 步骤 2: 移除基于绘制顺序的元素
         start_step2 = time.time()
         if self.paint_order_filtering and simplified_tree:
-            PaintOrderRemover(simplified_tree).calculate_paint_order()
+            PaintOrderRemover(simplified_tree, self.occlusion_backend).calculate_paint_order()
         self.timing_info['calculate_paint_order'] = time.time() - start_step2
 
         # 步骤 3: 优化树
@@ -109,9 +129,21 @@ class DOMTreeSerializer:
         self._assign_interactive_indices(filtered_tree)
         self.timing_info['assign_interactive_indices'] = time.time() - start_step5
 
+        diff = None
+        if self._previous_cached_state is not None:
+            diff = self._compute_diff(self._previous_cached_state)
+
         self.timing_info['serialize_accessible_elements_total'] = time.time() - start_total
 
-        return SerializedDOMState(_root=filtered_tree, selector_map=self._selector_map), self.timing_info
+        state = SerializedDOMState(
+            _root=filtered_tree,
+            selector_map=self._selector_map,
+            element_fingerprints=self._fingerprints,
+            diff=diff,
+            interactive_nodes=list(self._selector_map.values()),
+            visible_nodes=self._visible_nodes,
+        )
+        return state, self.timing_info
 
     def _is_interactive_cached(self, node: EnhancedDOMTreeNode) -> bool:
         """缓存版本的可点击元素检测"""
@@ -348,21 +380,37 @@ class DOMTreeSerializer:
                 return True
         return False
 
-    def _assign_interactive_indices(self, node: SimplifiedNode | None) -> None:
-        """分配交互索引"""
-        if not node:
+    def _assign_interactive_indices(self, root: SimplifiedNode | None) -> None:
+        """分配交互索引并收集可见元素（先序遍历，与递归版本顺序一致）"""
+        if not root:
             return
 
-        if not node.excluded_by_parent and not node.ignored_by_paint_order:
-            is_interactive = self._is_interactive_cached(node.original_node)
-            is_visible = node.original_node.snapshot_node and node.original_node.is_visible
-            is_scrollable = node.original_node.is_actually_scrollable
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            # 逆序压栈以保持先序遍历顺序
+            stack.extend(reversed(node.children))
+
+            if node.ignored_by_paint_order:
+                continue
+
+            original = node.original_node
+            is_visible = original.snapshot_node and original.is_visible
+            # 被传播边界包含的子元素不单独交互，但仍然可见
+            if is_visible and original.node_type == NodeType.ELEMENT_NODE:
+                self._visible_nodes.append(original)
+
+            if node.excluded_by_parent:
+                continue
+
+            is_interactive = self._is_interactive_cached(original)
+            is_scrollable = original.is_actually_scrollable
 
             is_file_input = (
-                node.original_node.tag_name
-                and node.original_node.tag_name.lower() == 'input'
-                and node.original_node.attributes
-                and node.original_node.attributes.get('type') == 'file'
+                original.tag_name
+                and original.tag_name.lower() == 'input'
+                and original.attributes
+                and original.attributes.get('type') == 'file'
             )
 
             should_make_interactive = False
@@ -375,26 +423,86 @@ class DOMTreeSerializer:
 
             if should_make_interactive:
                 node.is_interactive = True
-                self._selector_map[node.original_node.backend_node_id] = node.original_node
+                backend_node_id = original.backend_node_id
+                self._selector_map[backend_node_id] = original
+                if self.keep_fingerprints:
+                    self._fingerprints[backend_node_id] = self._element_fingerprint(original)
                 self._interactive_counter += 1
 
-                if self._previous_cached_selector_map:
-                    previous_ids = {n.backend_node_id for n in self._previous_cached_selector_map.values()}
-                    if node.original_node.backend_node_id not in previous_ids:
-                        node.is_new = True
-
-        # 处理子节点
-        for child in node.children:
-            self._assign_interactive_indices(child)
+                if self._previous_cached_selector_map and backend_node_id not in self._previous_ids:
+                    node.is_new = True
 
     def _has_interactive_descendants(self, node: SimplifiedNode) -> bool:
-        """检查节点是否有交互后代"""
-        for child in node.children:
-            if self._is_interactive_cached(child.original_node):
-                return True
-            if self._has_interactive_descendants(child):
-                return True
-        return False
+        """
+        检查节点是否有交互后代
+
+        后序遍历一次子树并缓存每个节点的结果，嵌套的可滚动容器不会重复遍历。
+        """
+        cache = self._interactive_descendants_cache
+        if id(node) in cache:
+            return cache[id(node)]
+
+        stack: list[tuple[SimplifiedNode, bool]] = [(node, False)]
+        while stack:
+            current, children_done = stack.pop()
+            if children_done:
+                cache[id(current)] = any(
+                    self._is_interactive_cached(child.original_node) or cache[id(child)]
+                    for child in current.children
+                )
+                continue
+            stack.append((current, True))
+            for child in current.children:
+                if id(child) not in cache:
+                    stack.append((child, False))
+
+        return cache[id(node)]
+
+    @staticmethod
+    def _element_fingerprint(node: EnhancedDOMTreeNode) -> int:
+        """可交互元素内容指纹，用于检测两次序列化之间的变化"""
+        ax_name = node.ax_node.name if node.ax_node and node.ax_node.name else ''
+        return hash((
+            node.tag_name,
+            tuple(sorted((node.attributes or {}).items())),
+            ax_name,
+            node.get_all_children_text(max_depth=2),
+            bool(node.is_visible),
+        ))
+
+    def _compute_diff(self, previous_state: SerializedDOMState) -> DOMDiff:
+        """
+        计算与上一次序列化结果之间可交互元素的差异
+
+        Args:
+            previous_state: 上一次的序列化状态
+
+        Returns:
+            按 backend_node_id 的新增/删除/变化列表
+        """
+        previous_map = previous_state.selector_map
+        previous_fingerprints = previous_state.element_fingerprints
+
+        diff = DOMDiff()
+        for backend_node_id, node in self._selector_map.items():
+            if backend_node_id not in previous_map:
+                diff.added.append(backend_node_id)
+                continue
+            previous_fingerprint = previous_fingerprints.get(backend_node_id)
+            if previous_fingerprint is None:
+                # 上一次未保留指纹，无法判断内容变化
+                continue
+            fingerprint = self._fingerprints.get(backend_node_id)
+            if fingerprint is None:
+                fingerprint = self._element_fingerprint(node)
+            if fingerprint != previous_fingerprint:
+                diff.changed.append(backend_node_id)
+
+        for backend_node_id in previous_map:
+            if backend_node_id not in self._selector_map:
+                diff.removed.append(backend_node_id)
+
+        return diff
 
     @staticmethod
     def serialize_tree(node: SimplifiedNode | None, include_attributes: list[str], depth: int = 0) -> str:
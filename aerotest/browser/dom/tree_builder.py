@@ -0,0 +1,421 @@
+"""增强 DOM 树构建器
+
+将 DOM.getDocument、DOMSnapshot 和 AX 树的原始数据合并为 EnhancedDOMTreeNode 图
+
+来源: 改写自 browser-use v0.11.2 的递归构建算法
+改动: 使用显式栈的同步实现，避免每个节点创建协程，也不受递归深度限制
+"""
+
+import time
+from typing import Any, Optional
+
+from aerotest.browser.dom.enhanced_snapshot import (
+    SnapshotLookup,
+    SnapshotNodeView,
+    build_snapshot_lookup,
+    snapshot_bounds,
+)
+from aerotest.browser.dom.views import (
+    DOMRect,
+    EnhancedAXNode,
+    EnhancedAXProperty,
+    EnhancedDOMTreeNode,
+    NodeType,
+    TargetAllTrees,
+)
+from aerotest.utils import get_logger
+
+logger = get_logger("aerotest.dom.tree_builder")
+
+# 栈帧中节点与父节点的关系
+_RELATION_ROOT = 0
+_RELATION_CONTENT_DOCUMENT = 1
+_RELATION_SHADOW_ROOT = 2
+_RELATION_CHILD = 3
+
+# nodeType 值 -> NodeType（避免每个节点调用 Enum 构造）
+_NODE_TYPES = {node_type.value: node_type for node_type in NodeType}
+
+
+def is_node_visible(node: EnhancedDOMTreeNode) -> bool:
+    """
+    检查节点是否可见（简化版本）
+
+    Args:
+        node: DOM 节点
+
+    Returns:
+        是否可见
+    """
+    if not node.snapshot_node:
+        return True  # 无 snapshot 数据，假设可见
+
+    # 列式视图直接读驻留的样式索引，不物化样式字典
+    if isinstance(node.snapshot_node, SnapshotNodeView):
+        return node.snapshot_node.store.is_visible_at(node.snapshot_node.row)
+
+    # 检查计算样式
+    if node.snapshot_node.computed_styles:
+        styles = node.snapshot_node.computed_styles
+
+        display = styles.get("display", "").lower()
+        visibility = styles.get("visibility", "").lower()
+        opacity = styles.get("opacity", "1")
+
+        if display == "none" or visibility == "hidden":
+            return False
+
+        try:
+            if float(opacity) <= 0:
+                return False
+        except (ValueError, TypeError):
+            pass
+
+    # 检查边界框
+    if node.snapshot_node.bounds:
+        bounds = node.snapshot_node.bounds
+        if bounds.width <= 0 or bounds.height <= 0:
+            return False
+
+    return True
+
+
+def build_ax_node(ax_node: dict[str, Any]) -> EnhancedAXNode:
+    """
+    将 CDP AX 节点转换为 EnhancedAXNode
+
+    Args:
+        ax_node: Accessibility 域返回的原始节点
+
+    Returns:
+        增强的 AX 节点
+    """
+    properties = []
+    if ax_node.get("properties"):
+        for prop in ax_node["properties"]:
+            try:
+                properties.append(
+                    EnhancedAXProperty(
+                        name=prop.get("name", ""),
+                        value=prop.get("value", {}).get("value"),
+                    )
+                )
+            except (ValueError, KeyError):
+                pass
+
+    return EnhancedAXNode(
+        ax_node_id=ax_node.get("nodeId", ""),
+        ignored=ax_node.get("ignored", False),
+        role=ax_node.get("role", {}).get("value"),
+        name=ax_node.get("name", {}).get("value"),
+        description=ax_node.get("description", {}).get("value"),
+        properties=properties if properties else None,
+        child_ids=ax_node.get("childIds"),
+    )
+
+
+class EnhancedDOMTreeBuilder:
+    """增强 DOM 树构建器
+
+    与原递归实现产生相同的节点图（遍历顺序、记忆化、iframe 偏移、
+    shadow roots 和 content document 均保持一致），但：
+    - 纯同步执行，可直接放入工作线程（asyncio.to_thread）
+    - 使用显式栈，深层嵌套页面不会触发 RecursionError
+
+    Example:
+        ```python
+        builder = EnhancedDOMTreeBuilder(all_trees, target_id, session_id)
+        root = builder.build()
+        print(builder.node_count, builder.timing)
+        ```
+    """
+
+    def __init__(
+        self,
+        all_trees: TargetAllTrees,
+        target_id: str,
+        session_id: Optional[str] = None,
+        snapshot_lookup: Optional[SnapshotLookup] = None,
+    ):
+        """
+        初始化构建器
+
+        Args:
+            all_trees: 所有树数据
+            target_id: 目标 ID（写入每个节点）
+            session_id: 会话 ID（写入每个节点）
+            snapshot_lookup: 预先构建的快照查找表（为 None 时从 all_trees 构建）
+        """
+        self.all_trees = all_trees
+        self.target_id = str(target_id)
+        self.session_id = str(session_id)
+        self._snapshot_lookup = snapshot_lookup
+
+        # nodeId -> EnhancedDOMTreeNode（记忆化查找表）
+        self.node_lookup: dict[int, EnhancedDOMTreeNode] = {}
+        self.timing: dict[str, float] = {}
+
+    @property
+    def node_count(self) -> int:
+        """已构建的节点数量"""
+        return len(self.node_lookup)
+
+    def build(
+        self,
+        total_frame_offset: Optional[DOMRect] = None,
+    ) -> EnhancedDOMTreeNode:
+        """
+        构建增强 DOM 树
+
+        Args:
+            total_frame_offset: 根节点的累积帧偏移
+
+        Returns:
+            增强的 DOM 树根节点
+
+        Raises:
+            RuntimeError: DOM 树根节点为空
+        """
+        start_time = time.time()
+
+        dom_root = self.all_trees.dom_tree.get("root")
+        if not dom_root:
+            raise RuntimeError("DOM 树根节点为空")
+
+        # 构建 snapshot 查找表
+        snapshot_lookup = self._snapshot_lookup
+        if snapshot_lookup is None:
+            snapshot_lookup = build_snapshot_lookup(
+                self.all_trees.snapshot,
+                self.all_trees.device_pixel_ratio,
+                self.all_trees.computed_styles,
+            )
+        self.timing["snapshot_lookup"] = time.time() - start_time
+
+        # 构建 AX 树查找表
+        ax_tree_lookup: dict[int, dict] = {}
+        if self.all_trees.ax_tree and "nodes" in self.all_trees.ax_tree:
+            for ax_node in self.all_trees.ax_tree["nodes"]:
+                if "backendNodeId" in ax_node:
+                    ax_tree_lookup[ax_node["backendNodeId"]] = ax_node
+
+        if total_frame_offset is None:
+            total_frame_offset = DOMRect(x=0.0, y=0.0, width=0.0, height=0.0)
+
+        start_construct = time.time()
+        root_node = self._construct(dom_root, total_frame_offset, snapshot_lookup, ax_tree_lookup)
+        self.timing["construct_nodes"] = time.time() - start_construct
+        self.timing["build_enhanced_dom_tree"] = time.time() - start_time
+
+        logger.debug(
+            f"增强 DOM 树构建完成: {self.node_count} 个节点, "
+            f"耗时 {self.timing['build_enhanced_dom_tree']*1000:.1f}ms"
+        )
+        return root_node
+
+    def _construct(
+        self,
+        dom_root: dict[str, Any],
+        root_offset: DOMRect,
+        snapshot_lookup: SnapshotLookup,
+        ax_tree_lookup: dict[int, dict],
+    ) -> EnhancedDOMTreeNode:
+        """
+        显式栈深度优先构建
+
+        栈帧为 (原始节点, 父增强节点, 关系, 继承的帧偏移 (x, y))。
+        子项逆序入栈，保证出栈顺序与递归实现的先序遍历一致：
+        content document -> shadow roots -> children。
+        """
+        lookup = self.node_lookup
+        target_id = self.target_id
+        session_id = self.session_id
+        element_node = NodeType.ELEMENT_NODE.value
+        node_types = _NODE_TYPES
+
+        root_node: Optional[EnhancedDOMTreeNode] = None
+        stack: list[tuple[dict, Optional[EnhancedDOMTreeNode], int, float, float]] = [
+            (dom_root, None, _RELATION_ROOT, root_offset.x, root_offset.y)
+        ]
+
+        while stack:
+            node, parent, relation, offset_x, offset_y = stack.pop()
+
+            node_id = node.get("nodeId")
+            dom_tree_node = lookup.get(node_id)
+
+            if dom_tree_node is None:
+                backend_node_id = node.get("backendNodeId", 0)
+
+                # 从 AX 树获取辅助功能信息
+                ax_node = ax_tree_lookup.get(backend_node_id)
+                enhanced_ax_node = build_ax_node(ax_node) if ax_node else None
+
+                # 解析属性
+                attributes = {}
+                attrs_list = node.get("attributes")
+                if attrs_list:
+                    for i in range(0, len(attrs_list) - 1, 2):
+                        attributes[attrs_list[i]] = attrs_list[i + 1]
+
+                # 从 Snapshot 获取数据
+                snapshot_data = snapshot_lookup.get(backend_node_id)
+
+                # 计算绝对位置（考虑 iframe 偏移量）
+                absolute_position = None
+                bounds = snapshot_bounds(snapshot_data) if snapshot_data else None
+                if bounds:
+                    absolute_position = DOMRect(
+                        x=bounds[0] + offset_x,
+                        y=bounds[1] + offset_y,
+                        width=bounds[2],
+                        height=bounds[3],
+                    )
+
+                dom_tree_node = EnhancedDOMTreeNode(
+                    node_id=node_id,
+                    backend_node_id=backend_node_id,
+                    node_type=node_types.get(node.get("nodeType", 1)) or NodeType(node.get("nodeType", 1)),
+                    node_name=node.get("nodeName", ""),
+                    node_value=node.get("nodeValue", ""),
+                    attributes=attributes,
+                    is_scrollable=node.get("isScrollable", False),
+                    is_visible=None,
+                    absolute_position=absolute_position,
+                    target_id=target_id,
+                    frame_id=node.get("frameId"),
+                    session_id=session_id,
+                    content_document=None,
+                    shadow_root_type=node.get("shadowRootType") or None,
+                    shadow_roots=None,
+                    parent_node=None,
+                    children_nodes=None,
+                    ax_node=enhanced_ax_node,
+                    snapshot_node=snapshot_data,
+                )
+                dom_tree_node.is_visible = is_node_visible(dom_tree_node)
+                lookup[node_id] = dom_tree_node
+
+                # 设置父节点
+                parent_id = node.get("parentId")
+                if parent_id and parent_id in lookup:
+                    dom_tree_node.parent_node = lookup[parent_id]
+
+                # 计算传给后代的帧偏移
+                child_offset_x, child_offset_y = offset_x, offset_y
+                if (
+                    node.get("nodeType") == element_node
+                    and node.get("nodeName") == "HTML"
+                    and node.get("frameId") is not None
+                ):
+                    # 调整帧偏移（考虑滚动量）
+                    if snapshot_data and snapshot_data.scrollRects:
+                        child_offset_x -= snapshot_data.scrollRects.x
+                        child_offset_y -= snapshot_data.scrollRects.y
+
+                if node.get("nodeName", "").upper() in ("IFRAME", "FRAME") and bounds:
+                    child_offset_x += bounds[0]
+                    child_offset_y += bounds[1]
+
+                # 子项逆序入栈：children -> shadow roots -> content document
+                children = node.get("children")
+                shadow_roots = node.get("shadowRoots")
+                if children:
+                    dom_tree_node.children_nodes = []
+                    shadow_root_node_ids = (
+                        {shadow_root.get("nodeId") for shadow_root in shadow_roots}
+                        if shadow_roots else set()
+                    )
+                    for child in reversed(children):
+                        # 跳过 shadow roots（已在 shadow_roots 列表中）
+                        if child.get("nodeId") in shadow_root_node_ids:
+                            continue
+                        stack.append(
+                            (child, dom_tree_node, _RELATION_CHILD, child_offset_x, child_offset_y)
+                        )
+                if shadow_roots:
+                    dom_tree_node.shadow_roots = []
+                    for shadow_root in reversed(shadow_roots):
+                        stack.append(
+                            (shadow_root, dom_tree_node, _RELATION_SHADOW_ROOT, child_offset_x, child_offset_y)
+                        )
+                content_document = node.get("contentDocument")
+                if content_document:
+                    stack.append(
+                        (content_document, dom_tree_node, _RELATION_CONTENT_DOCUMENT, child_offset_x, child_offset_y)
+                    )
+
+            # 挂接到父节点
+            if relation == _RELATION_CHILD:
+                parent.children_nodes.append(dom_tree_node)
+            elif relation == _RELATION_SHADOW_ROOT:
+                dom_tree_node.parent_node = parent
+                parent.shadow_roots.append(dom_tree_node)
+            elif relation == _RELATION_CONTENT_DOCUMENT:
+                dom_tree_node.parent_node = parent
+                parent.content_document = dom_tree_node
+            else:
+                root_node = dom_tree_node
+
+        return root_node
+
+
+def apply_snapshot_lookup(
+    root: EnhancedDOMTreeNode,
+    snapshot_lookup: SnapshotLookup,
+    total_frame_offset: Optional[DOMRect] = None,
+) -> int:
+    """
+    将新的快照数据应用到已有节点图（不重建节点）
+
+    帧偏移规则与 EnhancedDOMTreeBuilder 相同，用于只刷新布局的场景
+
+    Args:
+        root: 已构建的树根节点
+        snapshot_lookup: 新的快照查找表
+        total_frame_offset: 根节点的累积帧偏移
+
+    Returns:
+        更新的节点数量
+    """
+    offset_x = total_frame_offset.x if total_frame_offset else 0.0
+    offset_y = total_frame_offset.y if total_frame_offset else 0.0
+
+    count = 0
+    stack: list[tuple[EnhancedDOMTreeNode, float, float]] = [(root, offset_x, offset_y)]
+    while stack:
+        node, offset_x, offset_y = stack.pop()
+        count += 1
+
+        snapshot_data = snapshot_lookup.get(node.backend_node_id)
+        node.snapshot_node = snapshot_data
+        node.absolute_position = None
+        if snapshot_data and snapshot_data.bounds:
+            node.absolute_position = DOMRect(
+                x=snapshot_data.bounds.x + offset_x,
+                y=snapshot_data.bounds.y + offset_y,
+                width=snapshot_data.bounds.width,
+                height=snapshot_data.bounds.height,
+            )
+        node.is_visible = is_node_visible(node)
+
+        if (
+            node.node_type == NodeType.ELEMENT_NODE
+            and node.node_name == "HTML"
+            and node.frame_id is not None
+            and snapshot_data
+            and snapshot_data.scrollRects
+        ):
+            offset_x -= snapshot_data.scrollRects.x
+            offset_y -= snapshot_data.scrollRects.y
+
+        if node.node_name.upper() in ("IFRAME", "FRAME") and snapshot_data and snapshot_data.bounds:
+            offset_x += snapshot_data.bounds.x
+            offset_y += snapshot_data.bounds.y
+
+        if node.content_document:
+            stack.append((node.content_document, offset_x, offset_y))
+        for child in node.children_and_shadow_roots:
+            stack.append((child, offset_x, offset_y))
+
+    return count
@@ -7,14 +7,17 @@
 """
 
 import hashlib
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, is_dataclass
 from enum import Enum
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 from uuid import uuid4
 
 from aerotest.browser.dom.cdp_types import AXPropertyName, ShadowRootType, SessionID, TargetID
 from aerotest.browser.dom.utils import cap_text_length
 
+if TYPE_CHECKING:
+    from aerotest.browser.dom.dom_index import DOMIndex
+
 # 序列化器默认包含的属性
 DEFAULT_INCLUDE_ATTRIBUTES = [
     'title', 'type', 'checked', 'id', 'name', 'role', 'value', 'placeholder',
@@ -198,12 +201,20 @@ class EnhancedDOMTreeNode:
     
     # ===== Snapshot 节点数据 =====
     snapshot_node: EnhancedSnapshotNode | None
+    """快照数据（也可以是列式存储的 SnapshotNodeView，字段相同）"""
     
     # 复合控件子组件信息
     _compound_children: list[dict[str, Any]] = field(default_factory=list)
     
     uuid: str = field(default_factory=lambda: str(uuid4()))
 
+    # 身份缓存：首次访问时基于父节点的缓存计算，DOMMirror 在变更时失效
+    _branch_path: tuple[str, ...] | None = field(default=None, repr=False, compare=False)
+    _xpath: str | None = field(default=None, repr=False, compare=False)
+    _xpath_position: int | None = field(default=None, repr=False, compare=False)
+    _hash: int | None = field(default=None, repr=False, compare=False)
+    _stable_hash: int | None = field(default=None, repr=False, compare=False)
+
     @property
     def parent(self) -> 'EnhancedDOMTreeNode | None':
         """父节点"""
@@ -230,48 +241,58 @@ class EnhancedDOMTreeNode:
     @property
     def xpath(self) -> str:
         """生成从 DOM 节点的 XPath，在 shadow 边界或 iframe 处停止"""
-        segments = []
-        current_element = self
+        if self._xpath is not None:
+            return self._xpath
 
-        while current_element and (
-            current_element.node_type == NodeType.ELEMENT_NODE
-            or current_element.node_type == NodeType.DOCUMENT_FRAGMENT_NODE
+        # 向上找到第一个已缓存的祖先，再自上而下补全
+        chain: list[EnhancedDOMTreeNode] = []
+        current_element: EnhancedDOMTreeNode | None = self
+        while (
+            current_element is not None
+            and current_element._xpath is None
+            and current_element.node_type in (NodeType.ELEMENT_NODE, NodeType.DOCUMENT_FRAGMENT_NODE)
         ):
-            # 只是通过 shadow roots
-            if current_element.node_type == NodeType.DOCUMENT_FRAGMENT_NODE:
-                current_element = current_element.parent_node
-                continue
-
-            # 只在遇到 iframe 时停止
-            if current_element.parent_node and current_element.parent_node.node_name.lower() == 'iframe':
-                break
-
-            position = self._get_element_position(current_element)
-            tag_name = current_element.node_name.lower()
-            xpath_index = f'[{position}]' if position > 0 else ''
-            segments.insert(0, f'{tag_name}{xpath_index}')
-
+            chain.append(current_element)
             current_element = current_element.parent_node
 
-        return '/'.join(segments)
+        prefix = current_element._xpath if current_element is not None and current_element._xpath else ''
+        for element in reversed(chain):
+            # 只是通过 shadow roots
+            if element.node_type == NodeType.ELEMENT_NODE:
+                # 只在遇到 iframe 时停止
+                if element.parent_node and element.parent_node.node_name.lower() == 'iframe':
+                    prefix = ''
+                else:
+                    position = self._get_element_position(element)
+                    xpath_index = f'[{position}]' if position > 0 else ''
+                    segment = f'{element.node_name.lower()}{xpath_index}'
+                    prefix = f'{prefix}/{segment}' if prefix else segment
+            element._xpath = prefix
+
+        return prefix if chain else ''
 
     def _get_element_position(self, element: 'EnhancedDOMTreeNode') -> int:
-        """获取元素在具有相同标签名的兄弟元素中的位置"""
-        if not element.parent_node or not element.parent_node.children_nodes:
+        """获取元素在具有相同标签名的兄弟元素中的位置（按父节点批量计算并缓存）"""
+        if element._xpath_position is not None:
+            return element._xpath_position
+
+        parent = element.parent_node
+        if not parent or not parent.children_nodes:
             return 0
 
-        same_tag_siblings = [
-            child for child in element.parent_node.children_nodes
-            if child.node_type == NodeType.ELEMENT_NODE and child.node_name.lower() == element.node_name.lower()
-        ]
+        same_tag_siblings: dict[str, list[EnhancedDOMTreeNode]] = {}
+        for child in parent.children_nodes:
+            if child.node_type == NodeType.ELEMENT_NODE:
+                same_tag_siblings.setdefault(child.node_name.lower(), []).append(child)
 
-        if len(same_tag_siblings) <= 1:
-            return 0
+        for siblings in same_tag_siblings.values():
+            if len(siblings) <= 1:
+                siblings[0]._xpath_position = 0
+                continue
+            for position, sibling in enumerate(siblings, start=1):  # XPath 从 1 索引
+                sibling._xpath_position = position
 
-        try:
-            return same_tag_siblings.index(element) + 1  # XPath 从 1 索引
-        except ValueError:
-            return 0
+        return element._xpath_position or 0
 
     def get_all_children_text(self, max_depth: int = -1) -> str:
         """获取所有子节点的文本内容"""
@@ -472,7 +493,15 @@ class EnhancedDOMTreeNode:
         return hash(self)
 
     def compute_stable_hash(self) -> int:
-        """计算过滤动态类后的稳定哈希"""
+        """
+        计算过滤动态类后的稳定哈希
+
+        只基于父分支路径和静态属性，不含可访问性名称：
+        不同抓取档位（是否获取 AX 树）下同一元素的稳定哈希保持一致。
+        """
+        if self._stable_hash is not None:
+            return self._stable_hash
+
         parent_branch_path = self._get_parent_branch_path()
         parent_branch_path_string = '/'.join(parent_branch_path)
 
@@ -488,16 +517,16 @@ class EnhancedDOMTreeNode:
 
         attributes_string = ''.join(f'{k}={v}' for k, v in sorted(filtered_attrs.items()))
 
-        ax_name = ''
-        if self.ax_node and self.ax_node.name:
-            ax_name = f'|ax_name={self.ax_node.name}'
-
-        combined_string = f'{parent_branch_path_string}|{attributes_string}{ax_name}'
+        combined_string = f'{parent_branch_path_string}|{attributes_string}'
         hash_hex = hashlib.sha256(combined_string.encode()).hexdigest()
-        return int(hash_hex[:16], 16)
+        self._stable_hash = int(hash_hex[:16], 16)
+        return self._stable_hash
 
     def __hash__(self) -> int:
         """基于父分支路径、属性和可访问性名称对元素进行哈希"""
+        if self._hash is not None:
+            return self._hash
+
         parent_branch_path = self._get_parent_branch_path()
         parent_branch_path_string = '/'.join(parent_branch_path)
 
@@ -512,20 +541,72 @@ class EnhancedDOMTreeNode:
         combined_string = f'{parent_branch_path_string}|{attributes_string}{ax_name}'
         element_hash = hashlib.sha256(combined_string.encode()).hexdigest()
 
-        return int(element_hash[:16], 16)
+        self._hash = int(element_hash[:16], 16)
+        return self._hash
 
     def _get_parent_branch_path(self) -> list[str]:
-        """获取从根到当前元素的父分支路径"""
-        parents: list[EnhancedDOMTreeNode] = []
-        current_element: EnhancedDOMTreeNode | None = self
+        """获取从根到当前元素的父分支路径（由父节点的缓存前缀得到）"""
+        if self._branch_path is None:
+            chain: list[EnhancedDOMTreeNode] = []
+            current_element: EnhancedDOMTreeNode | None = self
+            while current_element is not None and current_element._branch_path is None:
+                chain.append(current_element)
+                current_element = current_element.parent_node
 
-        while current_element is not None:
-            if current_element.node_type == NodeType.ELEMENT_NODE:
-                parents.append(current_element)
-            current_element = current_element.parent_node
+            prefix: tuple[str, ...] = current_element._branch_path if current_element is not None else ()
+            for element in reversed(chain):
+                if element.node_type == NodeType.ELEMENT_NODE:
+                    prefix = prefix + (element.tag_name,)
+                element._branch_path = prefix
+
+        return list(self._branch_path)
+
+    def precompute_identity_cache(self) -> int:
+        """
+        自上而下一次性计算子树中每个节点的分支路径、XPath 和哈希
+
+        之后 __hash__、compute_stable_hash、xpath 都是 O(1)。
+
+        Returns:
+            处理的节点数
+        """
+        count = 0
+        stack: list[EnhancedDOMTreeNode] = [self]
+        while stack:
+            node = stack.pop()
+            node._get_parent_branch_path()
+            if node.node_type == NodeType.ELEMENT_NODE:
+                node.xpath
+                hash(node)
+                node.compute_stable_hash()
+            count += 1
+            stack.extend(node.children_and_shadow_roots)
+            if node.content_document:
+                stack.append(node.content_document)
+        return count
+
+    def invalidate_identity_cache(self, subtree: bool = False) -> None:
+        """
+        清除身份缓存
+
+        属性或 AX 名称变化只影响本节点的哈希；结构变化（插入/删除子节点）
+        会改变兄弟位置和后代 XPath，需要清除整个子树。
 
-        parents.reverse()
-        return [parent.tag_name for parent in parents]
+        Args:
+            subtree: 是否同时清除所有后代的缓存
+        """
+        stack: list[EnhancedDOMTreeNode] = [self]
+        while stack:
+            node = stack.pop()
+            node._branch_path = None
+            node._xpath = None
+            node._xpath_position = None
+            node._hash = None
+            node._stable_hash = None
+            if subtree:
+                stack.extend(node.children_and_shadow_roots)
+                if node.content_document:
+                    stack.append(node.content_document)
 
     def __repr__(self) -> str:
         """字符串表示"""
@@ -558,7 +639,10 @@ class EnhancedDOMTreeNode:
             'content_document': self.content_document.__json__() if self.content_document else None,
             'shadow_root_type': self.shadow_root_type,
             'ax_node': asdict(self.ax_node) if self.ax_node else None,
-            'snapshot_node': asdict(self.snapshot_node) if self.snapshot_node else None,
+            'snapshot_node': (
+                asdict(self.snapshot_node) if is_dataclass(self.snapshot_node)
+                else asdict(self.snapshot_node.to_snapshot_node())
+            ) if self.snapshot_node else None,
             'shadow_roots': [r.__json__() for r in self.shadow_roots] if self.shadow_roots else [],
             'children_nodes': [c.__json__() for c in self.children_nodes] if self.children_nodes else [],
         }
@@ -600,11 +684,69 @@ class SimplifiedNode:
 DOMSelectorMap = dict[int, EnhancedDOMTreeNode]
 
 
+@dataclass
+class TargetAllTrees:
+    """一个目标页面的所有原始树数据（CDP 返回）"""
+    snapshot: dict[str, Any]
+    """DOMSnapshot.captureSnapshot 结果"""
+
+    dom_tree: dict[str, Any]
+    """DOM.getDocument 结果"""
+
+    ax_tree: dict[str, Any]
+    """合并后的 AX 树（{'nodes': [...]}）"""
+
+    device_pixel_ratio: float
+    """设备像素比"""
+
+    cdp_timing: dict[str, float]
+    """CDP 调用耗时"""
+
+    computed_styles: Optional[list[str]] = None
+    """快照请求的计算样式（None 表示 REQUIRED_COMPUTED_STYLES）"""
+
+
+@dataclass
+class DOMDiff:
+    """两次序列化之间可交互元素的差异（按 backend_node_id）"""
+    added: list[int] = field(default_factory=list)
+    removed: list[int] = field(default_factory=list)
+    # 内容变化只能对保留了指纹（keep_fingerprints=True）的上一次状态检测，否则为空
+    changed: list[int] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        """是否有任何变化"""
+        return bool(self.added or self.removed or self.changed)
+
+    def to_dict(self) -> dict[str, list[int]]:
+        """转换为字典"""
+        return {'added': self.added, 'removed': self.removed, 'changed': self.changed}
+
+
 @dataclass
 class SerializedDOMState:
     """序列化的 DOM 状态"""
     _root: SimplifiedNode | None
     selector_map: DOMSelectorMap
+    # backend_node_id -> 可交互元素内容指纹（序列化时指定 keep_fingerprints 才计算）
+    element_fingerprints: dict[int, int] = field(default_factory=dict)
+    # 与 previous_cached_state 相比的差异，无上一次状态时为 None
+    diff: DOMDiff | None = None
+    # 可交互元素（与 selector_map 顺序一致）和可见元素（先序），序列化时一次构建
+    interactive_nodes: list[EnhancedDOMTreeNode] = field(default_factory=list)
+    visible_nodes: list[EnhancedDOMTreeNode] = field(default_factory=list)
+    _index: Any = field(default=None, repr=False, compare=False)
+
+    @property
+    def index(self) -> 'DOMIndex':
+        """可交互元素的倒排索引（首次访问时构建，每个状态只构建一次）"""
+        if self._index is None:
+            # 延迟导入避免循环依赖
+            from aerotest.browser.dom.dom_index import DOMIndex
+
+            self._index = DOMIndex(self.selector_map.values())
+        return self._index
 
     def llm_representation(self, include_attributes: list[str] | None = None) -> str:
         """LLM 友好的表示形式"""
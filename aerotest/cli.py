@@ -42,6 +42,11 @@ def run(test_case_file: str) -> None:
     """运行测试用例"""
     logger.info(f"运行测试用例: {test_case_file}")
 
+    # 在后台加载分词词典，与浏览器连接等启动步骤并行
+    from aerotest.core.funnel.segmenter import warmup
+
+    warmup()
+
     async def execute() -> None:
         from aerotest.core.client import AeroTestClient
 
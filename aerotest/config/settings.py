@@ -33,6 +33,23 @@ class Settings(BaseSettings):
     qwen_max_model: str = "qwen-max"
     qwen_plus_model: str = "qwen-plus"
     qwen_vl_model: str = "qwen-vl-max"
+    qwen_base_url: str = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+    qwen_max_tokens: int = 2000
+    qwen_temperature: float = 0.1
+
+    # LLM 响应缓存
+    llm_cache_enabled: bool = True
+    llm_cache_path: Optional[str] = None  # 为空时使用用户缓存目录
+    llm_cache_ttl: Optional[float] = Field(default=7 * 24 * 3600, description="缓存有效期（秒）")
+    llm_cache_max_entries: int = 10_000
+
+    # L1 槽位缓存（路径为空时仅内存）
+    l1_slot_cache_max_entries: int = 4096
+    l1_slot_cache_path: Optional[str] = None
+
+    # 执行历史（只保留最近 N 个步骤的完整观察，路径不为空时压缩前写入磁盘）
+    ooda_history_keep_full: Optional[int] = 20
+    ooda_history_spill_path: Optional[str] = None
 
     # CDP éç½®
     cdp_host: str = "localhost"
@@ -0,0 +1,348 @@
+"""关键词多模式匹配
+
+L1 意图识别、实体提取和 L3 锚点识别原先对每条指令逐个关键词做子串检查、
+逐条尝试正则。这里把所有词表编译为一个 Aho–Corasick 自动机，把同一用途的
+正则合并为一个带命名分组的正则：
+- 一次线性扫描得到指令中出现的全部意图、元素类型、常见元素名、方位词、
+  距离词和上下文提示
+- 扫描结果按文本缓存，意图识别、实体提取和置信度计算共用同一次扫描
+- 结果与原先的逐个检查一致（命中多个时仍按词表定义顺序取第一个）
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Generic, Iterable, Iterator, Optional, TypeVar
+
+from aerotest.core.funnel.types import ActionType, ElementType
+
+T = TypeVar("T")
+
+# 扫描结果缓存大小
+SCAN_CACHE_SIZE = 1024
+
+# 常见动作词（实体提取时从目标描述开头移除）
+COMMON_ACTION_WORDS = (
+    "点击", "按", "选择", "单击", "双击",
+    "输入", "填写", "录入", "键入",
+    "打开", "访问", "跳转",
+    "等待", "暂停",
+    "click", "input", "select", "open", "wait",
+)
+
+
+class AhoCorasick(Generic[T]):
+    """Aho–Corasick 自动机
+
+    一次扫描找出文本中出现的所有关键词，耗时与文本长度和命中数成正比，
+    与关键词数量无关。同一个关键词可以携带多个标签。
+
+    Example:
+        ```python
+        automaton = AhoCorasick([("按钮", "type"), ("点击", "action")])
+        list(automaton.iter("点击按钮"))
+        # [(0, "点击", "action"), (2, "按钮", "type")]
+        ```
+    """
+
+    def __init__(self, patterns: Iterable[tuple[str, T]]):
+        """
+        构建自动机
+
+        Args:
+            patterns: (关键词, 标签) 列表，空关键词被忽略
+        """
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[tuple[str, T]]] = [[]]
+
+        for keyword, tag in patterns:
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((keyword, tag))
+
+        self._build_fail_links()
+
+    def _build_fail_links(self):
+        """按广度优先计算失败指针，并把后缀状态的输出合并进来"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        """状态数"""
+        return len(self._goto)
+
+    def iter(self, text: str) -> Iterator[tuple[int, str, T]]:
+        """
+        扫描文本
+
+        Args:
+            text: 文本
+
+        Yields:
+            (起始位置, 关键词, 标签)，按结束位置排列
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword, tag in output[state]:
+                yield end - len(keyword), keyword, tag
+
+
+@dataclass
+class KeywordScan:
+    """一条文本的扫描结果
+
+    列表均按词表定义顺序排列（与原先逐个检查时的命中顺序一致）。
+
+    Attributes:
+        actions: 包含关键词的动作
+        action_keyword_counts: 每个动作命中的不同关键词数
+        context_hints: 命中的上下文关联词对应的动作（CONTEXT_HINTS 顺序）
+        element_types: 包含关键词的元素类型
+        element_name: 第一个命中的常见元素名对应的类型
+        element_names: 命中常见元素名的所有类型
+        context_type: 第一个命中的上下文提示对应的类型
+        directions: 包含方位词的方向
+        distance: 第一个命中的距离词 (距离, 单位)
+        prefixes: 出现在文本开头的关键词
+    """
+
+    actions: list[ActionType] = field(default_factory=list)
+    action_keyword_counts: dict[ActionType, int] = field(default_factory=dict)
+    context_hints: list[ActionType] = field(default_factory=list)
+    element_types: list[ElementType] = field(default_factory=list)
+    element_name: Optional[ElementType] = None
+    element_names: set[ElementType] = field(default_factory=set)
+    context_type: Optional[ElementType] = None
+    directions: list[Any] = field(default_factory=list)
+    distance: Optional[tuple[float, Any]] = None
+    prefixes: tuple[str, ...] = ()
+
+
+class KeywordMatcher:
+    """L1/L3 词表的编译结果
+
+    所有关键词统一转为小写，扫描时对小写文本匹配。中文词表不受大小写影响，
+    因此原先区分大小写的检查（常见元素名、上下文提示、距离词）结果不变。
+
+    Example:
+        ```python
+        matcher = get_keyword_matcher()
+
+        scan = matcher.scan("点击用户名右边的按钮")
+        scan.actions         # [ActionType.CLICK]
+        scan.element_types   # [ElementType.BUTTON]
+        scan.directions      # [Direction.RIGHT]
+
+        matcher.search_spatial("点击用户名右边的按钮")
+        # ("点击用户名", "右边", "按钮")
+        ```
+    """
+
+    def __init__(self):
+        """编译词表和正则"""
+        # 延迟导入避免循环依赖（AnchorLocator 依赖本模块）
+        from aerotest.core.funnel.l1.action_patterns import ACTION_KEYWORDS, CONTEXT_HINTS
+        from aerotest.core.funnel.l1.element_types import (
+            COMMON_ELEMENT_NAMES,
+            CONTEXT_PATTERNS,
+            ELEMENT_TYPE_KEYWORDS,
+        )
+        from aerotest.core.funnel.l3.anchor_locator import AnchorLocator
+
+        self._actions = list(ACTION_KEYWORDS)
+        self._element_types = list(ELEMENT_TYPE_KEYWORDS)
+        self._directions = list(AnchorLocator.DIRECTION_KEYWORDS)
+
+        # 标签: (类别, 值, 定义顺序)
+        patterns: list[tuple[str, tuple[str, Any, int]]] = []
+        for rank, (action, data) in enumerate(ACTION_KEYWORDS.items()):
+            patterns.extend((kw.lower(), ("action", action, rank)) for kw in data["keywords"])
+        for rank, (hint, action) in enumerate(CONTEXT_HINTS.items()):
+            patterns.append((hint.lower(), ("hint", action, rank)))
+        for rank, (element_type, data) in enumerate(ELEMENT_TYPE_KEYWORDS.items()):
+            patterns.extend((kw.lower(), ("element", element_type, rank)) for kw in data["keywords"])
+        for rank, (name, element_type) in enumerate(COMMON_ELEMENT_NAMES.items()):
+            patterns.append((name.lower(), ("name", element_type, rank)))
+        for rank, (hint, element_type) in enumerate(CONTEXT_PATTERNS.items()):
+            patterns.append((hint.lower(), ("context", element_type, rank)))
+        for rank, (direction, keywords) in enumerate(AnchorLocator.DIRECTION_KEYWORDS.items()):
+            patterns.extend((kw.lower(), ("direction", direction, rank)) for kw in keywords)
+        for rank, (word, distance) in enumerate(AnchorLocator.DISTANCE_KEYWORDS.items()):
+            patterns.append((word.lower(), ("distance", distance, rank)))
+        for word in COMMON_ACTION_WORDS:
+            patterns.append((word.lower(), ("action_word", word, 0)))
+
+        self.automaton: AhoCorasick[tuple[str, Any, int]] = AhoCorasick(patterns)
+
+        # 动作模式（re.match），元素类型模式（re.search），空间关系模式（re.search）
+        self._action_pattern, self._action_groups = _combine(
+            (action, pattern)
+            for action, data in ACTION_KEYWORDS.items()
+            for pattern in data["patterns"]
+        )
+        self._element_pattern, self._element_groups = _combine(
+            (
+                (element_type, pattern)
+                for element_type, data in ELEMENT_TYPE_KEYWORDS.items()
+                for pattern in data["patterns"]
+            ),
+            search=True,
+        )
+        self._spatial_pattern, self._spatial_groups = _combine(
+            ((index, pattern) for index, pattern in enumerate(AnchorLocator.SPATIAL_PATTERNS)),
+            search=True,
+        )
+
+        self.scan = lru_cache(maxsize=SCAN_CACHE_SIZE)(self._scan)
+
+    def _scan(self, text: str) -> KeywordScan:
+        """
+        扫描文本（通过带缓存的 scan 调用）
+
+        Args:
+            text: 文本
+
+        Returns:
+            扫描结果
+        """
+        actions: dict[ActionType, set[str]] = {}
+        hints: dict[int, ActionType] = {}
+        element_types: set[ElementType] = set()
+        names: dict[int, ElementType] = {}
+        contexts: dict[int, ElementType] = {}
+        directions: set[Any] = set()
+        distances: dict[int, tuple[float, Any]] = {}
+        prefixes: list[str] = []
+
+        for start, keyword, (kind, value, rank) in self.automaton.iter(text.lower()):
+            if start == 0:
+                prefixes.append(keyword)
+            if kind == "action":
+                actions.setdefault(value, set()).add(keyword)
+            elif kind == "hint":
+                hints[rank] = value
+            elif kind == "element":
+                element_types.add(value)
+            elif kind == "name":
+                names[rank] = value
+            elif kind == "context":
+                contexts[rank] = value
+            elif kind == "direction":
+                directions.add(value)
+            elif kind == "distance":
+                distances[rank] = value
+
+        return KeywordScan(
+            actions=[action for action in self._actions if action in actions],
+            action_keyword_counts={action: len(words) for action, words in actions.items()},
+            context_hints=[hints[rank] for rank in sorted(hints)],
+            element_types=[et for et in self._element_types if et in element_types],
+            element_name=names[min(names)] if names else None,
+            element_names=set(names.values()),
+            context_type=contexts[min(contexts)] if contexts else None,
+            directions=[d for d in self._directions if d in directions],
+            distance=distances[min(distances)] if distances else None,
+            prefixes=tuple(dict.fromkeys(prefixes)),
+        )
+
+    def match_action_pattern(self, text: str) -> Optional[ActionType]:
+        """
+        按动作模式匹配（等价于依次 re.match 每个模式）
+
+        Args:
+            text: 小写文本
+
+        Returns:
+            第一个匹配的模式对应的动作
+        """
+        match = self._action_pattern.match(text)
+        return self._action_groups[match.lastgroup] if match else None
+
+    def search_element_pattern(self, text: str) -> Optional[ElementType]:
+        """
+        按元素类型模式搜索（等价于依次 re.search 每个模式）
+
+        Args:
+            text: 小写文本
+
+        Returns:
+            第一个匹配的模式对应的元素类型
+        """
+        match = self._element_pattern.match(text)
+        return self._element_groups[match.lastgroup] if match else None
+
+    def search_spatial(self, text: str) -> Optional[tuple[str, str, str]]:
+        """
+        匹配空间关系（等价于依次 re.search 每个空间关系模式）
+
+        空间关系模式都要求包含方位词，没有方位词的指令直接跳过正则。
+
+        Args:
+            text: 指令（保持原始大小写）
+
+        Returns:
+            (锚点描述, 方位词, 目标描述)
+        """
+        if not self.scan(text).directions:
+            return None
+
+        match = self._spatial_pattern.match(text)
+        if not match:
+            return None
+        name = match.lastgroup
+        base = self._spatial_pattern.groupindex[name]
+        return match.group(base + 1), match.group(base + 2), match.group(base + 3)
+
+
+def _combine(patterns: Iterable[tuple[Any, str]], search: bool = False) -> tuple[re.Pattern, dict[str, Any]]:
+    """
+    把多个正则合并为一个带命名分组的正则
+
+    分支按顺序尝试，因此第一个匹配的分支就是原先逐个尝试时第一个匹配的模式。
+    search=True 时每个分支前加惰性前缀，用 match 实现“每个模式各自 search”的语义
+    （先尝试完一个模式的所有起始位置，再尝试下一个模式）。
+
+    Args:
+        patterns: (值, 正则) 列表
+        search: 是否按 search 语义合并
+
+    Returns:
+        (合并后的正则, 分组名 -> 值)
+    """
+    prefix = r"[\s\S]*?" if search else ""
+    branches = []
+    groups: dict[str, Any] = {}
+    for index, (value, pattern) in enumerate(patterns):
+        name = f"p{index}"
+        groups[name] = value
+        branches.append(f"(?P<{name}>{prefix}(?:{pattern}))")
+    return re.compile("|".join(branches)), groups
+
+
+@lru_cache(maxsize=None)
+def get_keyword_matcher() -> KeywordMatcher:
+    """获取进程共享的关键词匹配器（首次调用时编译）"""
+    return KeywordMatcher()
@@ -19,5 +19,6 @@
 from aerotest.core.funnel.l1.action_patterns import ACTION_KEYWORDS
 from aerotest.core.funnel.l1.element_types import ELEMENT_TYPE_KEYWORDS
 from aerotest.core.funnel.l1.l1_engine import L1Engine
+from aerotest.core.funnel.l1.slot_cache import SlotCache
 
-__all__ = ["L1Engine", "ACTION_KEYWORDS", "ELEMENT_TYPE_KEYWORDS"]
+__all__ = ["L1Engine", "SlotCache", "ACTION_KEYWORDS", "ELEMENT_TYPE_KEYWORDS"]
@@ -3,17 +3,11 @@
 从自然语言指令中提取目标元素的特征信息
 """
 
-import re
 from typing import Optional
 
-import jieba
-
-from aerotest.core.funnel.l1.element_types import (
-    COMMON_ELEMENT_NAMES,
-    CONTEXT_PATTERNS,
-    ELEMENT_ATTRIBUTE_HINTS,
-    ELEMENT_TYPE_KEYWORDS,
-)
+from aerotest.core.funnel.l1.element_types import ELEMENT_ATTRIBUTE_HINTS
+from aerotest.core.funnel.keyword_matcher import COMMON_ACTION_WORDS, get_keyword_matcher
+from aerotest.core.funnel.segmenter import cut
 from aerotest.core.funnel.types import ElementType
 from aerotest.utils import get_logger
 
@@ -51,20 +45,9 @@ class EntityExtractor:
     
     def __init__(self):
         """初始化实体提取器"""
-        self._load_keywords()
+        self.matcher = get_keyword_matcher()
         logger.debug("实体提取器初始化完成")
     
-    def _load_keywords(self):
-        """加载关键词到 jieba 词典"""
-        # 添加元素类型关键词
-        for element_type, data in ELEMENT_TYPE_KEYWORDS.items():
-            for keyword in data["keywords"]:
-                jieba.add_word(keyword, freq=500)
-        
-        # 添加常见元素名
-        for name in COMMON_ELEMENT_NAMES.keys():
-            jieba.add_word(name, freq=800)
-    
     def extract(self, text: str, action_keywords: Optional[list[str]] = None) -> dict:
         """
         提取目标元素信息
@@ -112,6 +95,8 @@ class EntityExtractor:
         """
         移除动作词
         
+        移除开头最长的动作词（只移除一次，避免 "点击按钮" 被继续截成 "钮"）
+        
         Args:
             text: 原始文本
             action_keywords: 要移除的动作关键词
@@ -119,25 +104,18 @@ class EntityExtractor:
         Returns:
             移除动作词后的文本
         """
-        result = text
-        
-        # 移除常见的动作词
-        common_actions = [
-            "点击", "按", "选择", "单击", "双击",
-            "输入", "填写", "录入", "键入",
-            "打开", "访问", "跳转",
-            "等待", "暂停",
-            "click", "input", "select", "open", "wait",
+        # 开头出现的常见动作词（扫描结果为小写，需确认原文确实以该词开头）
+        prefixes = [
+            word for word in self.matcher.scan(text).prefixes
+            if word in COMMON_ACTION_WORDS and text.startswith(word)
         ]
+        prefixes.extend(word for word in action_keywords if word and text.startswith(word))
         
-        all_actions = list(set(common_actions + action_keywords))
+        if not prefixes:
+            return text
         
-        for action in all_actions:
-            # 从开头移除
-            if result.startswith(action):
-                result = result[len(action):].strip()
-        
-        return result
+        action = max(prefixes, key=len)
+        return text[len(action):].strip()
     
     def _recognize_element_type(self, text: str) -> Optional[ElementType]:
         """
@@ -149,36 +127,26 @@ class EntityExtractor:
         Returns:
             元素类型
         """
-        text_lower = text.lower()
+        scan = self.matcher.scan(text)
         
         # 1. 精确匹配常见名称
-        for name, element_type in COMMON_ELEMENT_NAMES.items():
-            if name in text:
-                return element_type
+        if scan.element_name:
+            return scan.element_name
         
         # 2. 关键词匹配
-        matched_types = []
-        for element_type, data in ELEMENT_TYPE_KEYWORDS.items():
-            keywords = data["keywords"]
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    matched_types.append(element_type)
-                    break
+        matched_types = scan.element_types
         
         if len(matched_types) == 1:
             return matched_types[0]
         
         # 3. 模式匹配
-        for element_type, data in ELEMENT_TYPE_KEYWORDS.items():
-            patterns = data["patterns"]
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    return element_type
+        element_type = self.matcher.search_element_pattern(text.lower())
+        if element_type:
+            return element_type
         
         # 4. 上下文推断
-        for pattern, element_type in CONTEXT_PATTERNS.items():
-            if pattern in text:
-                return element_type
+        if scan.context_type:
+            return scan.context_type
         
         # 5. 如果有多个匹配，选择最具体的
         if matched_types:
@@ -208,7 +176,7 @@ class EntityExtractor:
         keywords = []
         
         # 分词
-        words = list(jieba.cut(text))
+        words = cut(text)
         
         # 过滤无意义的词
         stop_words = ["的", "了", "在", "是", "上", "个", "中", "和", "与"]
@@ -313,19 +281,15 @@ class EntityExtractor:
         if not element_type:
             return 0.3
         
-        text_lower = text.lower()
+        scan = self.matcher.scan(text)
         
         # 检查是否有明确的类型关键词
-        keywords = ELEMENT_TYPE_KEYWORDS.get(element_type, {}).get("keywords", [])
-        
-        for keyword in keywords:
-            if keyword.lower() in text_lower:
-                return 0.9  # 高置信度
+        if element_type in scan.element_types:
+            return 0.9  # 高置信度
         
         # 检查常见名称
-        for name, et in COMMON_ELEMENT_NAMES.items():
-            if et == element_type and name in text:
-                return 0.8
+        if element_type in scan.element_names:
+            return 0.8
         
         # 默认置信度
         return 0.5
@@ -3,16 +3,10 @@
 从自然语言指令中识别用户的操作意图
 """
 
-import re
 from typing import Optional
 
-import jieba
-
-from aerotest.core.funnel.l1.action_patterns import (
-    ACTION_KEYWORDS,
-    ACTION_PRIORITY,
-    CONTEXT_HINTS,
-)
+from aerotest.core.funnel.l1.action_patterns import ACTION_PRIORITY
+from aerotest.core.funnel.keyword_matcher import get_keyword_matcher
 from aerotest.core.funnel.types import ActionType
 from aerotest.utils import get_logger
 
@@ -25,8 +19,8 @@ class IntentRecognizer:
     识别用户想要执行的动作类型
     
     策略：
-    1. 关键词匹配：检查指令中是否包含动作关键词
-    2. 模式匹配：使用正则表达式匹配动作模式
+    1. 关键词匹配：检查指令中是否包含动作关键词（Aho–Corasick 一次扫描）
+    2. 模式匹配：使用合并后的正则表达式匹配动作模式
     3. 上下文推断：根据目标元素类型推断动作
     4. 优先级排序：当匹配到多个动作时，选择优先级最高的
     
@@ -44,15 +38,9 @@ class IntentRecognizer:
     
     def __init__(self):
         """初始化意图识别器"""
-        self._load_keywords()
+        self.matcher = get_keyword_matcher()
         logger.debug("意图识别器初始化完成")
     
-    def _load_keywords(self):
-        """加载关键词到 jieba 词典"""
-        for action, data in ACTION_KEYWORDS.items():
-            for keyword in data["keywords"]:
-                jieba.add_word(keyword, freq=1000)
-    
     def recognize(self, text: str) -> ActionType:
         """
         识别操作意图
@@ -109,22 +97,8 @@ class IntentRecognizer:
         Returns:
             匹配到的动作列表
         """
-        # 分词
-        words = list(jieba.cut(text))
-        words_lower = [w.lower() for w in words]
-        
-        matched = []
-        
-        for action, data in ACTION_KEYWORDS.items():
-            keywords = data["keywords"]
-            
-            # 检查是否有关键词在分词结果中
-            for keyword in keywords:
-                if keyword.lower() in words_lower or keyword.lower() in text:
-                    matched.append(action)
-                    break
-        
-        return matched
+        # 分词结果都是文本的子串，只需检查关键词是否出现在文本中
+        return list(self.matcher.scan(text).actions)
     
     def _match_by_patterns(self, text: str) -> Optional[ActionType]:
         """
@@ -136,14 +110,7 @@ class IntentRecognizer:
         Returns:
             匹配到的动作
         """
-        for action, data in ACTION_KEYWORDS.items():
-            patterns = data["patterns"]
-            
-            for pattern in patterns:
-                if re.match(pattern, text):
-                    return action
-        
-        return None
+        return self.matcher.match_action_pattern(text)
     
     def _infer_from_context(
         self,
@@ -161,8 +128,8 @@ class IntentRecognizer:
             推断的动作
         """
         # 检查是否包含上下文关键词
-        for hint, action in CONTEXT_HINTS.items():
-            if hint in text and action in candidates:
+        for action in self.matcher.scan(text).context_hints:
+            if action in candidates:
                 return action
         
         return None
@@ -200,14 +167,8 @@ class IntentRecognizer:
         Returns:
             置信度（0.0-1.0）
         """
-        text_lower = text.lower()
-        
         # 检查关键词匹配数量
-        keywords = ACTION_KEYWORDS.get(action, {}).get("keywords", [])
-        match_count = sum(
-            1 for keyword in keywords
-            if keyword.lower() in text_lower
-        )
+        match_count = self.matcher.scan(text).action_keyword_counts.get(action, 0)
         
         if match_count == 0:
             return 0.3  # 默认置信度
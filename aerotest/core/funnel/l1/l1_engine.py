@@ -9,8 +9,14 @@ from aerotest.browser.dom.views import SerializedDOMState
 from aerotest.core.funnel.base import BaseFunnelLayer
 from aerotest.core.funnel.l1.intent_recognizer import IntentRecognizer
 from aerotest.core.funnel.l1.entity_extractor import EntityExtractor
+from aerotest.core.funnel.l1.slot_cache import (
+    SlotCache,
+    get_shared_slot_cache,
+    make_slot_key,
+    normalize_instruction,
+)
 from aerotest.core.funnel.l1.slot_filler import SlotFiller
-from aerotest.core.funnel.l1.synonym_mapper import SynonymMapper
+from aerotest.core.funnel.l1.synonym_mapper import SynonymMapper, synonym_fingerprint
 from aerotest.core.funnel.types import ActionSlot, FunnelContext
 
 
@@ -20,9 +26,10 @@ class L1Engine(BaseFunnelLayer):
     从自然语言指令中提取结构化的操作信息
     
     完整的处理流程：
-    1. 使用 SlotFiller 填充基础槽位（内部调用 IntentRecognizer 和 EntityExtractor）
-    2. 使用 SynonymMapper 扩展关键词
-    3. 返回完整的 ActionSlot
+    1. 查询槽位缓存（规范化指令 → ActionSlot），命中时直接返回副本
+    2. 使用 SlotFiller 填充基础槽位（内部调用 IntentRecognizer 和 EntityExtractor）
+    3. 使用 SynonymMapper 扩展关键词
+    4. 写入缓存并返回完整的 ActionSlot
     
     Example:
         ```python
@@ -42,6 +49,8 @@ class L1Engine(BaseFunnelLayer):
         self,
         enable_synonym_expansion: bool = True,
         max_synonyms: int = 10,
+        slot_cache: Optional[SlotCache] = None,
+        use_slot_cache: bool = True,
     ):
         """
         初始化 L1 引擎
@@ -49,6 +58,8 @@ class L1Engine(BaseFunnelLayer):
         Args:
             enable_synonym_expansion: 是否启用同义词扩展
             max_synonyms: 每个关键词最多扩展的同义词数量
+            slot_cache: 槽位缓存（默认使用进程共享的缓存）
+            use_slot_cache: 是否启用槽位缓存
         """
         super().__init__("L1")
         
@@ -59,6 +70,11 @@ class L1Engine(BaseFunnelLayer):
         self.synonym_mapper = SynonymMapper(max_synonyms=max_synonyms)
         
         self.enable_synonym_expansion = enable_synonym_expansion
+        self.max_synonyms = max_synonyms
+        
+        self.slot_cache = slot_cache
+        if self.slot_cache is None and use_slot_cache:
+            self.slot_cache = get_shared_slot_cache()
         
         self.logger.info(
             f"L1 引擎初始化完成 (同义词扩展: {enable_synonym_expansion})"
@@ -81,19 +97,8 @@ class L1Engine(BaseFunnelLayer):
         """
         self.log_start()
         
-        instruction = context.instruction
-        
-        # 1. 使用 SlotFiller 填充槽位（内部整合了 IntentRecognizer 和 EntityExtractor）
-        slot = self.slot_filler.fill(instruction)
-        
-        # 2. 同义词扩展（如果启用）
-        if self.enable_synonym_expansion and slot.keywords:
-            expanded_keywords = self.synonym_mapper.get_all_synonyms(slot.keywords)
-            slot.keywords = expanded_keywords
-            
-            self.logger.debug(
-                f"关键词扩展: {len(slot.keywords)} 个关键词"
-            )
+        # 1-2. 填充槽位并扩展同义词（优先使用缓存）
+        slot = self.extract_slot(context.instruction)
         
         # 3. 更新上下文
         context.action_slot = slot
@@ -113,6 +118,36 @@ class L1Engine(BaseFunnelLayer):
         """
         提取槽位信息（同步版本，用于外部调用）
         
+        去掉首尾空白后相同的指令直接返回缓存结果的副本。
+        
+        Args:
+            instruction: 自然语言指令
+            
+        Returns:
+            动作槽位
+        """
+        if self.slot_cache is None:
+            return self._fill_slot(instruction)
+        
+        key = make_slot_key(
+            normalize_instruction(instruction),
+            expand=self.enable_synonym_expansion,
+            max_synonyms=self.max_synonyms,
+        )
+        version = synonym_fingerprint()
+        
+        slot = self.slot_cache.get(key, version=version)
+        if slot is not None:
+            return slot
+        
+        slot = self._fill_slot(instruction)
+        self.slot_cache.set(key, slot, version=version)
+        return slot
+    
+    def _fill_slot(self, instruction: str) -> ActionSlot:
+        """
+        填充槽位并扩展同义词（不经过缓存）
+        
         Args:
             instruction: 自然语言指令
             
@@ -126,6 +161,10 @@ class L1Engine(BaseFunnelLayer):
         if self.enable_synonym_expansion and slot.keywords:
             expanded_keywords = self.synonym_mapper.get_all_synonyms(slot.keywords)
             slot.keywords = expanded_keywords
+            
+            self.logger.debug(
+                f"关键词扩展: {len(slot.keywords)} 个关键词"
+            )
         
         return slot
     
@@ -133,6 +172,8 @@ class L1Engine(BaseFunnelLayer):
         """
         批量提取槽位
         
+        与 extract_slot 共用槽位缓存，启用缓存时批内重复的指令只填充一次。
+        
         Args:
             instructions: 指令列表
             
@@ -0,0 +1,298 @@
+"""L1 槽位缓存
+
+同一步骤描述会在大量用例和重试中反复出现，每次都重新分词、填充槽位和扩展
+同义词。这里按"规范化指令 → ActionSlot"缓存 L1 的结果：
+- 内存 LRU（有容量上限），进程内所有 L1Engine 默认共享
+- 可选 SQLite 持久化（跨进程、跨运行），词表变化时自动丢弃旧条目
+- 同义词词典变化（SynonymMapper.add_synonym）时内存条目失效
+- 读写都返回副本，调用方修改槽位不会污染缓存
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from aerotest.core.funnel.types import ActionSlot, ActionType, ElementType
+from aerotest.utils import get_logger
+from aerotest.utils.sqlite_store import connect_sqlite, evict_lru, with_hit_rate
+
+logger = get_logger("aerotest.funnel.l1.slot_cache")
+
+# 默认容量
+DEFAULT_MAX_ENTRIES = 4096
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS slots (
+    key TEXT PRIMARY KEY,
+    slot TEXT NOT NULL,
+    rules TEXT NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_slots_accessed_at ON slots (accessed_at);
+"""
+
+
+def normalize_instruction(instruction: str) -> str:
+    """
+    规范化指令（只去掉首尾空白）
+
+    指令中间的空白可能属于输入值（如 `输入"hello   world"`），保持原样，
+    避免只有值内空白不同的两条指令共用一个槽位。
+
+    Args:
+        instruction: 自然语言指令
+
+    Returns:
+        规范化后的指令
+    """
+    return instruction.strip()
+
+
+def make_slot_key(instruction: str, **options: Any) -> str:
+    """
+    计算缓存键
+
+    Args:
+        instruction: 规范化后的指令
+        **options: 影响结果的 L1 配置（是否扩展同义词、扩展数量等）
+
+    Returns:
+        十六进制摘要
+    """
+    payload = json.dumps([instruction, options], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def copy_slot(slot: ActionSlot) -> ActionSlot:
+    """复制槽位（列表和字典字段各自复制）"""
+    return replace(slot, keywords=list(slot.keywords), attributes=dict(slot.attributes))
+
+
+def _dump_slot(slot: ActionSlot) -> str:
+    """序列化槽位"""
+    return json.dumps({
+        "action": slot.action.value,
+        "target": slot.target,
+        "target_type": slot.target_type.value if slot.target_type else None,
+        "keywords": slot.keywords,
+        "attributes": slot.attributes,
+        "value": slot.value,
+        "confidence": slot.confidence,
+    }, ensure_ascii=False)
+
+
+def _load_slot(data: str) -> ActionSlot:
+    """反序列化槽位"""
+    fields = json.loads(data)
+    fields["action"] = ActionType(fields["action"])
+    if fields["target_type"] is not None:
+        fields["target_type"] = ElementType(fields["target_type"])
+    return ActionSlot(**fields)
+
+
+class SlotCache:
+    """L1 槽位缓存
+
+    Example:
+        ```python
+        cache = SlotCache(max_entries=4096, path=user_cache_dir("l1_slots.sqlite3"))
+
+        key = make_slot_key(normalize_instruction(instruction), expand=True)
+        slot = cache.get(key, version=synonym_fingerprint())
+        if slot is None:
+            slot = slot_filler.fill(instruction)
+            cache.set(key, slot, version=synonym_fingerprint())
+
+        print(cache.stats)
+        ```
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        path: Union[str, Path, None] = None,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最大条目数（内存和 SQLite 各自按最近访问淘汰）
+            path: SQLite 文件路径（None 表示仅内存）
+        """
+        self.max_entries = max_entries
+        self.path = str(path) if path else None
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, ActionSlot] = OrderedDict()
+        self._version: Optional[str] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._rules = ""
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "disk_hits": 0,
+            "writes": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+        if self.path:
+            self._open()
+
+        logger.info(f"L1 槽位缓存已创建 (max_entries={max_entries}, path={self.path})")
+
+    def _open(self):
+        """打开 SQLite 文件，丢弃词表版本不同的条目"""
+        # 延迟导入，仅持久化时需要计算词表版本
+        from aerotest.core.funnel.segmenter import dictionary_version
+
+        self._rules = dictionary_version()
+        self._conn = connect_sqlite(self.path, _SCHEMA)
+        cursor = self._conn.execute("DELETE FROM slots WHERE rules != ?", (self._rules,))
+        if cursor.rowcount > 0:
+            logger.info(f"词表已变化，丢弃 {cursor.rowcount} 条持久化槽位")
+
+    def get(self, key: str, version: str = "") -> Optional[ActionSlot]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+            version: 同义词词典版本（与上次不同时内存条目全部失效）
+
+        Returns:
+            槽位副本，未命中返回 None
+        """
+        with self._lock:
+            self._sync_version(version)
+
+            slot = self._memory.get(key)
+            if slot is not None:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                return copy_slot(slot)
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT slot FROM slots WHERE key = ?", (self._disk_key(key, version),)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE slots SET accessed_at = ? WHERE key = ?",
+                        (time.time(), self._disk_key(key, version)),
+                    )
+                    slot = _load_slot(row[0])
+                    self._remember(key, slot)
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return copy_slot(slot)
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, slot: ActionSlot, version: str = ""):
+        """
+        写入缓存（保存副本）
+
+        Args:
+            key: 缓存键
+            slot: 槽位
+            version: 同义词词典版本
+        """
+        slot = copy_slot(slot)
+        with self._lock:
+            self._sync_version(version)
+            self._remember(key, slot)
+            self._stats["writes"] += 1
+
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO slots (key, slot, rules, accessed_at) VALUES (?, ?, ?, ?)",
+                    (self._disk_key(key, version), _dump_slot(slot), self._rules, time.time()),
+                )
+                evict_lru(self._conn, "slots", self.max_entries, "accessed_at")
+
+    def invalidate(self):
+        """使内存条目全部失效（持久化条目按版本区分，不受影响）"""
+        with self._lock:
+            self._memory.clear()
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        """清空缓存（包括持久化条目）"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM slots")
+        logger.info("L1 槽位缓存已清空")
+
+    def _sync_version(self, version: str):
+        """同义词词典版本变化时清空内存条目"""
+        if version == self._version:
+            return
+        if self._version is not None and self._memory:
+            self._memory.clear()
+            self._stats["invalidations"] += 1
+            logger.debug(f"同义词词典已变化，L1 槽位缓存失效: {self._version} -> {version}")
+        self._version = version
+
+    def _remember(self, key: str, slot: ActionSlot):
+        """写入内存 LRU 并淘汰超出容量的条目"""
+        self._memory[key] = slot
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    @staticmethod
+    def _disk_key(key: str, version: str) -> str:
+        """持久化键（包含同义词词典版本）"""
+        return f"{version}:{key}"
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._memory)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """缓存指标（含命中率）"""
+        stats = with_hit_rate(self._stats)
+        stats["entries"] = len(self)
+        return stats
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_shared_cache: Optional[SlotCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_slot_cache() -> SlotCache:
+    """
+    获取进程共享的槽位缓存（按配置创建）
+
+    Returns:
+        槽位缓存
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            from aerotest.config.settings import get_settings
+
+            config = get_settings()
+            _shared_cache = SlotCache(
+                max_entries=config.l1_slot_cache_max_entries,
+                path=config.l1_slot_cache_path,
+            )
+        return _shared_cache
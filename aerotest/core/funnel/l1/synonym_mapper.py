@@ -3,6 +3,8 @@
 扩展关键词的同义词，提高匹配的召回率
 """
 
+import hashlib
+import json
 from typing import Optional
 
 from aerotest.utils import get_logger
@@ -101,6 +103,28 @@ ENGLISH_TO_CHINESE = {
     "click": "点击",
 }
 
+# 词典指纹（add_synonym 后重新计算）
+_fingerprint: Optional[str] = None
+
+# add_synonym 修改过的词条（按顺序记录，各映射器据此增量更新扩展表）
+_changed_roots: list[str] = []
+
+
+def synonym_fingerprint() -> str:
+    """
+    同义词词典指纹
+
+    L1 槽位缓存以此区分不同的词典内容，运行时添加同义词后旧的槽位不再命中。
+
+    Returns:
+        十六进制摘要
+    """
+    global _fingerprint
+    if _fingerprint is None:
+        payload = json.dumps([SYNONYM_DICT, ENGLISH_TO_CHINESE], ensure_ascii=False, sort_keys=True)
+        _fingerprint = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    return _fingerprint
+
 
 class SynonymMapper:
     """同义词映射器
@@ -113,6 +137,10 @@ class SynonymMapper:
     3. 中英文互译：支持中英文同义词
     4. 权重计算：原词权重高于同义词
     
+    构造时把词典编译为只读的扩展表（词条 → 扩展结果）和反向索引
+    （词 → {词条: 权重}），expand / get_weight / find_best_match 都是查表。
+    add_synonym 只重新编译被修改的词条。
+    
     Example:
         ```python
         mapper = SynonymMapper()
@@ -140,8 +168,89 @@ class SynonymMapper:
         self.max_synonyms = max_synonyms
         self.synonym_dict = SYNONYM_DICT
         self.en_to_zh = ENGLISH_TO_CHINESE
+        
+        # 扩展表：词条 -> 扩展结果（原词在最前面）
+        self._expansions: dict[str, tuple[str, ...]] = {}
+        # 反向索引：词 -> {词条: 权重}
+        self._reverse: dict[str, dict[str, float]] = {}
+        self._applied_changes = len(_changed_roots)
+        
+        for root in set(self.synonym_dict) | set(self.en_to_zh):
+            self._compile(root)
+        
         logger.debug(f"同义词映射器初始化完成，词典大小: {len(self.synonym_dict)}")
     
+    def _compile(self, root: str):
+        """
+        编译单个词条的扩展结果和权重
+        
+        Args:
+            root: 词条（原词）
+        """
+        for word in self._expansions.get(root, ()):
+            weights = self._reverse.get(word)
+            if weights is not None:
+                weights.pop(root, None)
+                if not weights:
+                    del self._reverse[word]
+        
+        # 原词在第一位，其后是同义词（去重、限量）和中文翻译
+        result = [root]
+        for syn in self.synonym_dict.get(root, []):
+            syn_lower = syn.lower()
+            if syn_lower not in result and len(result) < self.max_synonyms + 1:
+                result.append(syn_lower)
+        
+        if root in self.en_to_zh:
+            zh_word = self.en_to_zh[root].lower()
+            if zh_word not in result:
+                result.append(zh_word)
+        
+        if len(result) == 1:
+            # 没有同义词的词条与普通词一样，无需入表
+            self._expansions.pop(root, None)
+            return
+        
+        self._expansions[root] = tuple(result)
+        
+        # 第一个同义词 0.9，第二个 0.8，以此类推，最低 0.5
+        for index, word in enumerate(result):
+            self._reverse.setdefault(word, {})[root] = max(0.5, 1.0 - index * 0.1)
+    
+    def _sync(self):
+        """应用其他映射器通过 add_synonym 做的修改（词典在进程内共享）"""
+        if self._applied_changes == len(_changed_roots):
+            return
+        for root in set(_changed_roots[self._applied_changes:]):
+            self._compile(root)
+        self._applied_changes = len(_changed_roots)
+    
+    def _lookup(self, keyword: str) -> tuple[str, ...]:
+        """
+        查表获取扩展结果
+        
+        Args:
+            keyword: 规范化后的关键词
+            
+        Returns:
+            扩展结果（不在词典中的词只包含自身）
+        """
+        self._sync()
+        return self._expansions.get(keyword) or (keyword,)
+    
+    def lookup_roots(self, word: str) -> dict[str, float]:
+        """
+        反向查询：哪些词条的扩展结果包含该词
+        
+        Args:
+            word: 词
+            
+        Returns:
+            词条到权重的映射
+        """
+        self._sync()
+        return dict(self._reverse.get(word.strip().lower(), {}))
+    
     def expand(self, keyword: str) -> list[str]:
         """
         扩展单个关键词的同义词
@@ -157,23 +266,7 @@ class SynonymMapper:
         if not keyword:
             return []
         
-        # 结果列表，原词放在第一位
-        result = [keyword]
-        
-        # 查找同义词
-        synonyms = self.synonym_dict.get(keyword, [])
-        
-        # 添加同义词（去重）
-        for syn in synonyms:
-            syn_lower = syn.lower()
-            if syn_lower not in result and len(result) < self.max_synonyms + 1:
-                result.append(syn_lower)
-        
-        # 如果是英文词，尝试添加中文翻译
-        if keyword in self.en_to_zh:
-            zh_word = self.en_to_zh[keyword]
-            if zh_word.lower() not in result:
-                result.append(zh_word.lower())
+        result = list(self._lookup(keyword))
         
         logger.debug(f"同义词扩展: '{keyword}' -> {result}")
         return result
@@ -222,10 +315,14 @@ class SynonymMapper:
         """
         动态添加同义词
         
+        词典在进程内共享，添加后 L1 槽位缓存中的旧结果失效。
+        
         Args:
             word: 单词
             synonyms: 同义词列表
         """
+        global _fingerprint
+        
         word_lower = word.lower()
         
         if word_lower not in self.synonym_dict:
@@ -236,6 +333,10 @@ class SynonymMapper:
             if syn_lower not in self.synonym_dict[word_lower]:
                 self.synonym_dict[word_lower].append(syn_lower)
         
+        _fingerprint = None
+        _changed_roots.append(word_lower)
+        self._sync()
+        
         logger.debug(f"添加同义词: '{word}' -> {synonyms}")
     
     def get_weight(self, keyword: str, matched_word: str) -> float:
@@ -251,27 +352,36 @@ class SynonymMapper:
         Returns:
             权重（0.0-1.0）
         """
-        keyword_lower = keyword.lower()
         matched_lower = matched_word.lower()
         
         # 如果是原词，权重为 1.0
-        if keyword_lower == matched_lower:
+        if keyword.lower() == matched_lower:
             return 1.0
         
-        # 查找同义词
-        synonyms = self.expand(keyword)
+        self._sync()
+        return self._weight(keyword.strip().lower(), matched_lower)
+    
+    def _weight(self, root: str, word: str) -> float:
+        """
+        查反向索引获取词在词条扩展结果中的权重
         
-        if matched_lower not in synonyms:
-            return 0.0
+        同义词权重递减：第一个同义词 0.9，第二个 0.8，以此类推
         
-        # 同义词的权重递减
-        # 第一个同义词 0.9，第二个 0.8，以此类推
-        try:
-            index = synonyms.index(matched_lower)
-            weight = max(0.5, 1.0 - index * 0.1)
+        Args:
+            root: 规范化后的关键词
+            word: 小写的词
+            
+        Returns:
+            权重，不在扩展结果中时为 0.0
+        """
+        weight = self._reverse.get(word, {}).get(root)
+        if weight is not None:
             return weight
-        except ValueError:
-            return 0.5
+        
+        # 不在词典中的词只匹配自身
+        if root and word == root and root not in self._expansions:
+            return 1.0
+        return 0.0
     
     def find_best_match(
         self,
@@ -288,21 +398,18 @@ class SynonymMapper:
         Returns:
             (最佳匹配词, 权重) 或 None
         """
-        expanded = self.expand(keyword)
+        root = keyword.strip().lower()
+        self._sync()
         
         best_match = None
         best_weight = 0.0
         
         for candidate in candidates:
-            candidate_lower = candidate.lower()
+            weight = self._weight(root, candidate.lower())
             
-            # 检查是否在扩展列表中
-            if candidate_lower in expanded:
-                weight = self.get_weight(keyword, candidate_lower)
-                
-                if weight > best_weight:
-                    best_weight = weight
-                    best_match = candidate
+            if weight > best_weight:
+                best_weight = weight
+                best_match = candidate
         
         if best_match:
             return (best_match, best_weight)
@@ -122,9 +122,12 @@ class L2Engine(BaseFunnelLayer):
         
         self.logger.debug(f"初始候选: {len(candidates)} 个元素")
         
-        # 2. 类型筛选（如果有类型信息）
+        # 2. 类型筛选（如果有类型信息），只检查索引中标签可能匹配的分桶
         if slot.target_type:
-            candidates = self.type_matcher.match_by_type(candidates, slot.target_type)
+            possible_tags = self.type_matcher.TYPE_TO_TAGS.get(slot.target_type, [])
+            candidates = self.type_matcher.match_by_type(
+                dom_state.index.by_tags(possible_tags), slot.target_type
+            )
             self.logger.debug(f"类型筛选后: {len(candidates)} 个元素")
         
         if not candidates:
@@ -143,20 +146,13 @@ class L2Engine(BaseFunnelLayer):
         """
         获取所有可交互元素
         
+        序列化时 selector_map 已筛选出可交互元素，直接取状态索引中的元素，
+        不再逐个遍历页面节点。
+        
         Args:
             dom_state: DOM 状态
             
         Returns:
             可交互元素列表
         """
-        interactive_elements = []
-        
-        # 遍历所有元素
-        for node in dom_state.simplified_nodes:
-            # 只保留标记为可点击的元素，或者是表单元素
-            if node.is_clickable:
-                interactive_elements.append(node)
-            elif node.tag_name and node.tag_name.lower() in ["input", "textarea", "select"]:
-                interactive_elements.append(node)
-        
-        return interactive_elements
+        return list(dom_state.index.nodes)
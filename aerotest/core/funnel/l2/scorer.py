@@ -3,6 +3,7 @@
 计算元素匹配的综合得分
 """
 
+import heapq
 from typing import Optional
 
 from aerotest.browser.dom.views import EnhancedDOMTreeNode
@@ -37,6 +38,15 @@ class Scorer:
         ```
     """
     
+    # 参与评分的属性
+    SCORED_ATTRIBUTES = ["id", "name", "placeholder", "aria-label", "title", "innerText"]
+    
+    # 属性文本得分超过该值才计入
+    TEXT_SCORE_THRESHOLD = 0.5
+    
+    # 综合得分超过该值才作为候选
+    MIN_SCORE = 0.3
+    
     def __init__(self):
         """初始化评分器"""
         self.attribute_matcher = AttributeMatcher()
@@ -48,6 +58,8 @@ class Scorer:
         self,
         element: EnhancedDOMTreeNode,
         slot: ActionSlot,
+        text_scores: Optional[dict[str, float]] = None,
+        type_matched: Optional[bool] = None,
     ) -> MatchResult:
         """
         计算综合得分
@@ -55,6 +67,8 @@ class Scorer:
         Args:
             element: DOM 元素
             slot: 动作槽位
+            text_scores: 预先批量计算的属性文本得分（None 表示逐个计算）
+            type_matched: 预先批量计算的类型匹配结果（None 表示逐个计算）
             
         Returns:
             匹配结果
@@ -66,23 +80,27 @@ class Scorer:
         # 1. 类型匹配
         type_bonus = 0.0
         if slot.target_type:
-            is_type_match = self.type_matcher.is_type_match(element, slot.target_type)
-            if is_type_match:
+            if type_matched is None:
+                type_matched = self.type_matcher.is_type_match(element, slot.target_type)
+            if type_matched:
                 type_bonus = 0.2
                 match_reasons.append(f"类型匹配: {slot.target_type.value}")
         
         # 2. 属性匹配
         if slot.keywords:
             # 遍历常用属性
-            for attr in ["id", "name", "placeholder", "aria-label", "title", "innerText"]:
+            for attr in self.SCORED_ATTRIBUTES:
                 attr_value = element.attributes.get(attr)
                 if not attr_value:
                     continue
                 
                 # 计算文本匹配得分
-                text_score = self.text_matcher.match_any(attr_value, slot.keywords)
+                if text_scores is None:
+                    text_score = self.text_matcher.match_any(attr_value, slot.keywords)
+                else:
+                    text_score = text_scores.get(attr, 0.0)
                 
-                if text_score > 0.5:
+                if text_score > self.TEXT_SCORE_THRESHOLD:
                     # 应用属性权重
                     attr_weight = self.attribute_matcher.get_attribute_weight(attr)
                     weighted_score = text_score * attr_weight
@@ -118,6 +136,7 @@ class Scorer:
         elements: list[EnhancedDOMTreeNode],
         slot: ActionSlot,
         top_n: int = 10,
+        batch: bool = True,
     ) -> list[MatchResult]:
         """
         为元素列表打分并排序
@@ -126,19 +145,64 @@ class Scorer:
             elements: 元素列表
             slot: 动作槽位
             top_n: 返回前 N 个结果
+            batch: 是否批量计算属性文本得分（结果与逐个计算相同）
             
         Returns:
             排序后的匹配结果列表
         """
+        all_text_scores: list[Optional[dict[str, float]]] = [None] * len(elements)
+        all_type_matched: list[Optional[bool]] = [None] * len(elements)
+        if batch:
+            if slot.keywords:
+                all_text_scores = self._batch_text_scores(elements, slot.keywords)
+            if slot.target_type:
+                matched_ids = {id(e) for e in self.type_matcher.match_by_type(elements, slot.target_type)}
+                all_type_matched = [id(e) in matched_ids for e in elements]
+        
         results = []
         
-        for element in elements:
-            result = self.calculate_score(element, slot)
-            if result.score > 0.3:  # 过滤低分元素
+        for element, text_scores, type_matched in zip(elements, all_text_scores, all_type_matched):
+            result = self.calculate_score(element, slot, text_scores, type_matched)
+            if result.score > self.MIN_SCORE:  # 过滤低分元素
                 results.append(result)
         
-        # 排序
-        results.sort(key=lambda x: x.score, reverse=True)
+        # 取前 N 个（与稳定降序排序后截断的结果相同）
+        top_results = heapq.nlargest(top_n, results, key=lambda x: x.score)
         
         logger.info(f"评分完成: {len(results)} 个候选，返回前 {top_n} 个")
-        return results[:top_n]
+        return top_results
+    
+    def _batch_text_scores(
+        self,
+        elements: list[EnhancedDOMTreeNode],
+        keywords: list[str],
+    ) -> list[dict[str, float]]:
+        """
+        批量计算所有元素各属性的文本得分
+        
+        所有元素的属性值去重后组成一个文本列表，对全部关键词一次性计算。
+        
+        Args:
+            elements: 元素列表
+            keywords: 关键词列表
+            
+        Returns:
+            每个元素的 属性 -> 文本得分
+        """
+        value_ids: dict[str, int] = {}
+        element_refs: list[dict[str, int]] = []
+        
+        for element in elements:
+            refs = {}
+            for attr in self.SCORED_ATTRIBUTES:
+                attr_value = element.attributes.get(attr)
+                if attr_value:
+                    refs[attr] = value_ids.setdefault(attr_value, len(value_ids))
+            element_refs.append(refs)
+        
+        # 低于阈值的得分不会被计入，可以跳过
+        scores = self.text_matcher.match_any_batch(
+            list(value_ids), keywords, score_cutoff=self.TEXT_SCORE_THRESHOLD
+        )
+        
+        return [{attr: scores[i] for attr, i in refs.items()} for refs in element_refs]
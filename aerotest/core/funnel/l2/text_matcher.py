@@ -3,7 +3,9 @@
 提供多种文本匹配策略：精确匹配、模糊匹配、包含匹配
 """
 
-from rapidfuzz import fuzz
+from bisect import bisect_right
+
+from rapidfuzz import fuzz, process
 from aerotest.utils import get_logger
 
 logger = get_logger("aerotest.funnel.l2.text")
@@ -247,6 +249,95 @@ class TextMatcher:
         
         return max_score
     
+    def match_any_batch(
+        self,
+        texts: list[str],
+        keywords: list[str],
+        score_cutoff: float = 0.0,
+    ) -> list[float]:
+        """
+        批量匹配任意关键词（与逐个调用 match_any 的结果相同）
+        
+        模糊得分用 rapidfuzz.process.extract_iter 按关键词批量计算，
+        包含匹配在拼接后的文本上用 str.find 一次扫描完成。
+        
+        Args:
+            texts: 文本列表
+            keywords: 关键词列表
+            score_cutoff: 低于该值的得分返回 0.0（可跳过无关的模糊计算）
+            
+        Returns:
+            每个文本的最高匹配得分
+        """
+        best = [0.0] * len(texts)
+        keywords = [keyword for keyword in keywords if keyword]
+        if not texts or not keywords:
+            return best
+        
+        texts_lower = [text.lower().strip() if text else "" for text in texts]
+        
+        # 空文本 / 空白关键词等边界情况按原逻辑逐个计算
+        regular = [i for i, text in enumerate(texts_lower) if text]
+        for i, text in enumerate(texts):
+            if text and not texts_lower[i]:
+                best[i] = self.match_any(text, keywords)
+        
+        exact_index: dict[str, list[int]] = {}
+        for i in regular:
+            exact_index.setdefault(texts_lower[i], []).append(i)
+        
+        separator = "\x00"
+        joined = separator.join(texts_lower[i] for i in regular)
+        starts = []
+        offset = 0
+        for i in regular:
+            starts.append(offset)
+            offset += len(texts_lower[i]) + 1
+        regular_texts = [texts_lower[i] for i in regular]
+        
+        # 模糊得分只有达到 score_cutoff（或触发包含奖励）时才会影响结果
+        fuzzy_cutoff = min(score_cutoff, self.fuzzy_threshold) * 100
+        
+        for keyword in keywords:
+            keyword_lower = keyword.lower().strip()
+            if not keyword_lower or separator in keyword_lower:
+                for i in regular:
+                    best[i] = max(best[i], self.match(texts[i], keyword))
+                continue
+            
+            scores: dict[int, float] = {}
+            
+            # 包含匹配
+            position = joined.find(keyword_lower)
+            while position != -1:
+                slot = bisect_right(starts, position) - 1
+                i = regular[slot]
+                text_lower = texts_lower[i]
+                scores[i] = 0.6 + len(keyword_lower) / len(text_lower) * 0.4
+                position = joined.find(keyword_lower, starts[slot] + len(text_lower) + 1)
+            
+            # 模糊匹配
+            for _, ratio, slot in process.extract_iter(
+                keyword_lower, regular_texts, scorer=fuzz.token_sort_ratio, score_cutoff=fuzzy_cutoff
+            ):
+                i = regular[slot]
+                fuzzy_score = ratio / 100.0
+                contains_score = scores.get(i, 0.0)
+                score = max(contains_score, fuzzy_score)
+                if contains_score > 0.5 and fuzzy_score > self.fuzzy_threshold:
+                    score = min(1.0, score + self.contains_bonus)
+                scores[i] = score
+            
+            # 精确匹配
+            for i in exact_index.get(keyword_lower, []):
+                scores[i] = 1.0
+            
+            for i, score in scores.items():
+                if score > best[i]:
+                    best[i] = score
+        
+        return [score if score >= score_cutoff else 0.0 for score in best]
+    
     def match_all(
         self,
         text: str,
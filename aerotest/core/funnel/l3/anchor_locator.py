@@ -6,13 +6,13 @@
 import re
 from typing import Optional
 
-import jieba
-
 from aerotest.browser.dom.views import EnhancedDOMTreeNode
 from aerotest.browser.dom.views import SerializedDOMState
 from aerotest.core.funnel.l3.types import AnchorInfo, Direction, DistanceUnit
 from aerotest.core.funnel.l2.attribute_matcher import AttributeMatcher
 from aerotest.core.funnel.l2.text_matcher import TextMatcher
+from aerotest.core.funnel.keyword_matcher import get_keyword_matcher
+from aerotest.core.funnel.segmenter import cut
 from aerotest.utils import get_logger
 
 logger = get_logger("aerotest.funnel.l3.anchor")
@@ -76,15 +76,9 @@ class AnchorLocator:
         """初始化锚点定位器"""
         self.attribute_matcher = AttributeMatcher()
         self.text_matcher = TextMatcher()
-        self._load_keywords()
+        self.matcher = get_keyword_matcher()
         logger.debug("锚点定位器初始化完成")
     
-    def _load_keywords(self):
-        """加载关键词到 jieba 词典"""
-        for keywords in self.DIRECTION_KEYWORDS.values():
-            for keyword in keywords:
-                jieba.add_word(keyword, freq=1000)
-    
     def extract_anchor(self, instruction: str) -> Optional[AnchorInfo]:
         """
         从指令中提取锚点信息
@@ -97,37 +91,34 @@ class AnchorLocator:
         """
         instruction = instruction.strip()
         
-        # 尝试匹配空间关系模式
-        for pattern in self.SPATIAL_PATTERNS:
-            match = re.search(pattern, instruction)
-            if match:
-                anchor_desc = match.group(1).strip()
-                direction_word = match.group(2).strip()
-                target_desc = match.group(3).strip()
-                
-                # 识别方向
-                direction = self._recognize_direction(direction_word)
-                
-                # 识别距离
-                distance, distance_unit = self._recognize_distance(instruction)
-                
-                anchor_info = AnchorInfo(
-                    description=anchor_desc,
-                    direction=direction,
-                    distance=distance,
-                    distance_unit=distance_unit,
-                    target_description=target_desc,
-                    confidence=0.9,
-                )
-                
-                logger.info(
-                    f"提取锚点: '{anchor_desc}' {direction.value if direction else ''} -> '{target_desc}'"
-                )
-                
-                return anchor_info
+        # 尝试匹配空间关系模式（合并后的正则，不含方位词时直接跳过）
+        match = self.matcher.search_spatial(instruction)
+        if not match:
+            logger.debug(f"未检测到空间关系: '{instruction}'")
+            return None
         
-        logger.debug(f"未检测到空间关系: '{instruction}'")
-        return None
+        anchor_desc, direction_word, target_desc = (group.strip() for group in match)
+        
+        # 识别方向
+        direction = self._recognize_direction(direction_word)
+        
+        # 识别距离
+        distance, distance_unit = self._recognize_distance(instruction)
+        
+        anchor_info = AnchorInfo(
+            description=anchor_desc,
+            direction=direction,
+            distance=distance,
+            distance_unit=distance_unit,
+            target_description=target_desc,
+            confidence=0.9,
+        )
+        
+        logger.info(
+            f"提取锚点: '{anchor_desc}' {direction.value if direction else ''} -> '{target_desc}'"
+        )
+        
+        return anchor_info
     
     def _recognize_direction(self, direction_word: str) -> Optional[Direction]:
         """
@@ -139,11 +130,9 @@ class AnchorLocator:
         Returns:
             方向枚举
         """
-        direction_word_lower = direction_word.lower()
-        
-        for direction, keywords in self.DIRECTION_KEYWORDS.items():
-            if any(keyword in direction_word_lower for keyword in keywords):
-                return direction
+        directions = self.matcher.scan(direction_word).directions
+        if directions:
+            return directions[0]
         
         return Direction.NEAR  # 默认为附近
     
@@ -157,9 +146,9 @@ class AnchorLocator:
         Returns:
             (距离, 单位)
         """
-        for keyword, (distance, unit) in self.DISTANCE_KEYWORDS.items():
-            if keyword in text:
-                return distance, unit
+        distance = self.matcher.scan(text).distance
+        if distance:
+            return distance
         
         # 尝试提取数字距离（如 "10像素"）
         pixel_match = re.search(r"(\d+)\s*(像素|px|pixel)", text)
@@ -189,8 +178,10 @@ class AnchorLocator:
         
         logger.debug(f"搜索锚点元素: {anchor_keywords}")
         
-        # 获取所有可交互元素
-        candidates = self._get_interactive_elements(dom_state)
+        # 只取倒排索引中可能命中关键词的元素（其余元素得分必为 0）
+        candidates = dom_state.index.keyword_candidates(
+            anchor_keywords, self._get_interactive_elements(dom_state)
+        )
         
         # 使用属性匹配器查找最佳匹配
         results = self.attribute_matcher.get_best_matches(
@@ -221,7 +212,7 @@ class AnchorLocator:
             关键词列表
         """
         # 分词
-        words = list(jieba.cut(description))
+        words = cut(description)
         
         # 过滤停用词
         stop_words = ["的", "了", "在", "是", "上", "个", "中"]
@@ -238,7 +229,7 @@ class AnchorLocator:
         dom_state: SerializedDOMState,
     ) -> list[EnhancedDOMTreeNode]:
         """
-        获取所有可交互元素
+        获取所有可交互元素（序列化时 selector_map 已筛选）
         
         Args:
             dom_state: DOM 状态
@@ -246,16 +237,7 @@ class AnchorLocator:
         Returns:
             可交互元素列表
         """
-        interactive_elements = []
-        
-        for node in dom_state.simplified_nodes:
-            # 保留可点击的元素或表单元素
-            if node.is_clickable:
-                interactive_elements.append(node)
-            elif node.tag_name and node.tag_name.lower() in ["input", "textarea", "select", "button"]:
-                interactive_elements.append(node)
-        
-        return interactive_elements
+        return list(dom_state.index.nodes)
     
     def has_spatial_relation(self, instruction: str) -> bool:
         """
@@ -267,15 +249,5 @@ class AnchorLocator:
         Returns:
             是否包含空间关系
         """
-        # 检查是否匹配任何空间关系模式
-        for pattern in self.SPATIAL_PATTERNS:
-            if re.search(pattern, instruction):
-                return True
-        
-        # 检查是否包含方向关键词
-        instruction_lower = instruction.lower()
-        for keywords in self.DIRECTION_KEYWORDS.values():
-            if any(keyword in instruction_lower for keyword in keywords):
-                return True
-        
-        return False
+        # 空间关系模式都包含方位词，检查方向关键词即可
+        return bool(self.matcher.scan(instruction).directions)
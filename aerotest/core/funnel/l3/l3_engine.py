@@ -10,6 +10,7 @@ from aerotest.browser.dom.views import SerializedDOMState
 from aerotest.core.funnel.base import BaseFunnelLayer
 from aerotest.core.funnel.l3.anchor_locator import AnchorLocator
 from aerotest.core.funnel.l3.proximity_detector import ProximityDetector
+from aerotest.core.funnel.l3.spatial_index import SpatialIndex
 from aerotest.core.funnel.types import FunnelContext, MatchResult
 from aerotest.utils import get_logger
 
@@ -67,6 +68,10 @@ class L3Engine(BaseFunnelLayer):
         self.top_n = top_n
         self.use_event_listeners = use_event_listeners
         
+        # 按 DOM 状态缓存的空间索引
+        self._spatial_index: Optional[SpatialIndex] = None
+        self._spatial_index_state: Optional[SerializedDOMState] = None
+        
         self.logger.info(
             f"L3 引擎初始化完成 "
             f"(max_distance={max_distance}px, top_n={top_n}, "
@@ -128,6 +133,7 @@ class L3Engine(BaseFunnelLayer):
             candidates=candidates,
             direction=anchor_info.direction,
             max_distance=anchor_info.distance or self.max_distance,
+            index=self._get_spatial_index(dom_state, candidates),
         )
         
         # 5.5. 增强：检查事件监听器（非标控件检测）
@@ -207,5 +213,26 @@ class L3Engine(BaseFunnelLayer):
         Returns:
             所有元素列表
         """
-        # 返回所有简化节点
-        return list(dom_state.simplified_nodes)
+        # 返回状态索引中的所有元素
+        return list(dom_state.index.nodes)
+    
+    def _get_spatial_index(
+        self,
+        dom_state: SerializedDOMState,
+        candidates: list,
+    ) -> SpatialIndex:
+        """
+        获取 DOM 状态的空间索引（同一状态只构建一次）
+        
+        Args:
+            dom_state: DOM 状态
+            candidates: 状态中的所有元素
+            
+        Returns:
+            空间索引
+        """
+        if self._spatial_index is None or self._spatial_index_state is not dom_state:
+            self._spatial_index = SpatialIndex(candidates)
+            self._spatial_index_state = dom_state
+            self.logger.debug(f"构建空间索引: {len(self._spatial_index)} 个元素")
+        return self._spatial_index
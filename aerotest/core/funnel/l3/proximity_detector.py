@@ -6,6 +6,7 @@
 from typing import Optional
 
 from aerotest.browser.dom.views import EnhancedDOMTreeNode
+from aerotest.core.funnel.l3.spatial_index import SpatialIndex
 from aerotest.core.funnel.l3.types import Direction, ProximityResult, SpatialRelation
 from aerotest.core.funnel.l3.utils import (
     calculate_angle,
@@ -13,7 +14,6 @@ from aerotest.core.funnel.l3.utils import (
     calculate_overlap,
     get_element_position,
     is_horizontally_aligned,
-    is_in_direction,
     is_vertically_aligned,
 )
 from aerotest.utils import get_logger
@@ -74,15 +74,20 @@ class ProximityDetector:
         candidates: list[EnhancedDOMTreeNode],
         direction: Optional[Direction] = None,
         max_distance: Optional[float] = None,
+        index: Optional[SpatialIndex] = None,
     ) -> list[ProximityResult]:
         """
         查找邻近元素
         
+        通过空间索引只取 max_distance 内（且在指定方向锥内）的元素评分，
+        结果与逐个计算所有候选相同。
+        
         Args:
             anchor: 锚点元素
             candidates: 候选元素列表
             direction: 方向限制（None 表示不限制）
             max_distance: 最大距离（None 使用默认值）
+            index: 由 candidates 构建的空间索引（None 时临时构建）
             
         Returns:
             邻近检测结果列表（按得分降序）
@@ -95,45 +100,30 @@ class ProximityDetector:
             logger.warning("锚点元素没有位置信息")
             return []
         
+        if index is None:
+            index = SpatialIndex(candidates)
+        
+        if direction:
+            hits = index.cone_query(anchor_pos, direction, max_distance, self.direction_tolerance)
+        else:
+            hits = index.radius_query(anchor_pos, max_distance)
+        
         results = []
         
-        for candidate in candidates:
+        for slot, distance in hits:
+            candidate = index.elements[slot]
+            
             # 排除锚点本身
             if candidate.backend_node_id == anchor.backend_node_id:
                 continue
             
-            candidate_pos = get_element_position(candidate)
-            if not candidate_pos:
-                continue
-            
-            # 计算距离
-            distance = calculate_distance(anchor_pos, candidate_pos)
-            
-            # 距离过滤
-            if distance > max_distance:
-                continue
-            
-            # 计算角度
-            angle = calculate_angle(anchor_pos, candidate_pos)
-            
-            # 方向匹配
+            # 方向已由索引过滤
             direction_match = True
-            if direction:
-                direction_match = is_in_direction(
-                    anchor_pos,
-                    candidate_pos,
-                    direction,
-                    self.direction_tolerance,
-                )
-            
-            # 如果指定了方向但不匹配，跳过
-            if direction and not direction_match:
-                continue
             
             # 计算得分
             score = self._calculate_proximity_score(
                 anchor_pos=anchor_pos,
-                candidate_pos=candidate_pos,
+                candidate_pos=index.positions[slot],
                 distance=distance,
                 direction_match=direction_match,
                 direction=direction,
@@ -143,7 +133,7 @@ class ProximityDetector:
                 element=candidate,
                 distance=distance,
                 direction_match=direction_match,
-                angle=angle,
+                angle=index.angle_of(anchor_pos, slot),
                 score=score,
             )
             
@@ -152,7 +142,7 @@ class ProximityDetector:
         # 排序（按得分降序）
         results.sort(reverse=True)
         
-        logger.info(f"邻近搜索: 找到 {len(results)} 个候选")
+        logger.info(f"邻近搜索: 找到 {len(results)} 个候选（索引 {len(index)} 个元素）")
         
         return results
     
@@ -0,0 +1,185 @@
+"""L3 空间索引
+
+为一次 DOM 状态中的候选元素构建一次均匀网格索引（按元素中心点分桶），
+供邻近检测回答半径查询和方向锥查询，只对可能命中的元素计算距离和角度。
+"""
+
+import math
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from aerotest.browser.dom.views import EnhancedDOMTreeNode
+from aerotest.core.funnel.l3.types import Direction, Position
+from aerotest.core.funnel.l3.utils import (
+    calculate_angle,
+    calculate_distance,
+    get_element_position,
+    is_in_direction,
+)
+
+# 基于角度判断的方向
+ANGULAR_DIRECTIONS = (Direction.LEFT, Direction.RIGHT, Direction.ABOVE, Direction.BELOW)
+
+# 搜索范围外扩的像素，吸收坐标加减的浮点误差（只影响候选，不影响结果）
+BOX_MARGIN = 1.0
+
+
+class SpatialIndex:
+    """元素中心点网格索引
+
+    构建时对每个元素读取一次位置，按中心点落入 cell_size × cell_size
+    的网格单元。查询只遍历与搜索范围相交的单元，再用与线性扫描相同
+    的距离和角度函数精确验证，结果与逐个计算相同且保持元素原有顺序。
+
+    Example:
+        ```python
+        index = SpatialIndex(state.index.nodes)
+
+        # 锚点 200px 内的元素
+        index.radius_query(anchor_pos, 200.0)
+
+        # 锚点右侧 ±45° 锥形范围内的元素
+        index.cone_query(anchor_pos, Direction.RIGHT, 200.0, tolerance=45.0)
+        ```
+    """
+
+    def __init__(self, elements: Iterable[EnhancedDOMTreeNode], cell_size: float = 100.0):
+        """
+        构建索引
+
+        Args:
+            elements: 要索引的元素（顺序即查询结果的顺序）
+            cell_size: 网格单元边长（像素）
+        """
+        if cell_size <= 0:
+            raise ValueError(f"cell_size 必须大于 0: {cell_size}")
+
+        self.cell_size = cell_size
+        self.elements: list[EnhancedDOMTreeNode] = []
+        self.positions: list[Position] = []
+        self._grid: defaultdict[tuple[int, int], list[int]] = defaultdict(list)
+
+        for element in elements:
+            position = get_element_position(element)
+            if not position:
+                continue
+            slot = len(self.elements)
+            self.elements.append(element)
+            self.positions.append(position)
+            self._grid[self._cell(position.center_x, position.center_y)].append(slot)
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        """坐标所在的网格单元"""
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _slots_in_box(self, left: float, top: float, right: float, bottom: float) -> list[int]:
+        """中心点可能落在闭区间矩形内的元素槽位（升序）"""
+        min_col, min_row = self._cell(left, top)
+        max_col, max_row = self._cell(right, bottom)
+
+        # 范围覆盖的单元比已有单元多时直接遍历已有单元
+        if (max_col - min_col + 1) * (max_row - min_row + 1) > len(self._grid):
+            slots = [
+                slot
+                for (col, row), cell in self._grid.items()
+                if min_col <= col <= max_col and min_row <= row <= max_row
+                for slot in cell
+            ]
+        else:
+            slots = []
+            for col in range(min_col, max_col + 1):
+                for row in range(min_row, max_row + 1):
+                    cell = self._grid.get((col, row))
+                    if cell:
+                        slots.extend(cell)
+        slots.sort()
+        return slots
+
+    def radius_query(
+        self,
+        anchor_pos: Position,
+        max_distance: float,
+    ) -> list[tuple[int, float]]:
+        """
+        半径查询
+
+        Args:
+            anchor_pos: 锚点位置
+            max_distance: 最大中心点距离（含边界）
+
+        Returns:
+            (元素槽位, 距离) 列表，按槽位升序
+        """
+        return self._query(anchor_pos, max_distance, None, 0.0)
+
+    def cone_query(
+        self,
+        anchor_pos: Position,
+        direction: Direction,
+        max_distance: float,
+        tolerance: float = 45.0,
+    ) -> list[tuple[int, float]]:
+        """
+        方向锥查询：半径内且与方向夹角不超过 tolerance 的元素
+
+        Args:
+            anchor_pos: 锚点位置
+            direction: 方向（非上下左右时等同半径查询）
+            max_distance: 最大中心点距离（含边界）
+            tolerance: 角度容差（度）
+
+        Returns:
+            (元素槽位, 距离) 列表，按槽位升序
+        """
+        return self._query(anchor_pos, max_distance, direction, tolerance)
+
+    def _query(
+        self,
+        anchor_pos: Position,
+        max_distance: float,
+        direction: Optional[Direction],
+        tolerance: float,
+    ) -> list[tuple[int, float]]:
+        """按半径和方向筛选元素"""
+        if not self.elements or max_distance < 0 or math.isnan(max_distance):
+            return []
+
+        cx, cy = anchor_pos.center_x, anchor_pos.center_y
+        reach = max_distance + BOX_MARGIN
+        left, top = cx - reach, cy - reach
+        right, bottom = cx + reach, cy + reach
+
+        angular = direction in ANGULAR_DIRECTIONS
+        # 容差不超过 90° 时锥形落在对应半平面内，只需搜索半个正方形
+        if angular and tolerance <= 90:
+            if direction == Direction.RIGHT:
+                left = cx - BOX_MARGIN
+            elif direction == Direction.LEFT:
+                right = cx + BOX_MARGIN
+            elif direction == Direction.BELOW:
+                top = cy - BOX_MARGIN
+            else:
+                bottom = cy + BOX_MARGIN
+
+        if math.isinf(max_distance):
+            slots = list(range(len(self.elements)))
+        else:
+            slots = self._slots_in_box(left, top, right, bottom)
+
+        results = []
+        for slot in slots:
+            position = self.positions[slot]
+            distance = calculate_distance(anchor_pos, position)
+            if distance > max_distance:
+                continue
+            if angular and not is_in_direction(anchor_pos, position, direction, tolerance):
+                continue
+            results.append((slot, distance))
+        return results
+
+    def angle_of(self, anchor_pos: Position, slot: int) -> float:
+        """锚点指向元素的角度"""
+        return calculate_angle(anchor_pos, self.positions[slot])
@@ -20,11 +20,11 @@ def get_element_position(element: EnhancedDOMTreeNode) -> Optional[Position]:
     Returns:
         位置信息，如果元素没有位置信息则返回 None
     """
-    # 从元素的 bounding_box 获取位置
-    if not element.bounding_box:
+    # 优先使用 bounding_box，否则使用快照计算出的 absolute_position
+    bbox = getattr(element, "bounding_box", None) or getattr(element, "absolute_position", None)
+    if not bbox:
         return None
     
-    bbox = element.bounding_box
     return Position(
         x=bbox.x,
         y=bbox.y,
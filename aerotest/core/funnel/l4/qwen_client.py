@@ -4,11 +4,12 @@
 """
 
 import json
+import time
 from typing import Any, Optional
 
 import httpx
 
-from aerotest.config.settings import settings
+from aerotest.core.funnel.l4.response_cache import DEFAULT_CACHE_PATH, ResponseCache, make_cache_key
 from aerotest.utils import get_logger
 
 logger = get_logger("aerotest.funnel.l4.qwen")
@@ -44,6 +45,8 @@ class QwenClient:
         base_url: Optional[str] = None,
         model: Optional[str] = None,
         timeout: int = 60,
+        cache: Optional[ResponseCache] = None,
+        use_cache: Optional[bool] = None,
     ):
         """
         初始化 Qwen 客户端
@@ -53,6 +56,8 @@ class QwenClient:
             base_url: API Base URL（默认从配置读取）
             model: 模型名称（默认从配置读取）
             timeout: 超时时间（秒）
+            cache: 响应缓存（默认按配置创建 SQLite 缓存；传入的缓存可能被共享，close() 不会关闭它）
+            use_cache: 是否启用响应缓存（默认从配置读取）
         """
         # 使用 get_settings() 获取配置
         from aerotest.config.settings import get_settings
@@ -64,6 +69,18 @@ class QwenClient:
         self.timeout = timeout
         self.config = config
         
+        # 响应缓存
+        self.use_cache = config.llm_cache_enabled if use_cache is None else use_cache
+        self.cache = cache
+        self._owns_cache = False
+        if self.cache is None and self.use_cache:
+            self.cache = ResponseCache(
+                path=config.llm_cache_path or DEFAULT_CACHE_PATH,
+                ttl=config.llm_cache_ttl,
+                max_entries=config.llm_cache_max_entries,
+            )
+            self._owns_cache = True
+        
         # 创建 HTTP 客户端
         self.http_client = httpx.AsyncClient(
             timeout=httpx.Timeout(timeout),
@@ -82,16 +99,20 @@ class QwenClient:
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         stream: bool = False,
+        bypass_cache: bool = False,
     ) -> str:
         """
         调用 Chat API
         
+        相同模型、规范化消息和采样参数的非流式请求优先从响应缓存返回。
+        
         Args:
             messages: 消息列表，格式：[{"role": "user", "content": "..."}]
             model: 模型名称（覆盖默认值）
             max_tokens: 最大生成 tokens
             temperature: 温度参数（0-1）
             stream: 是否流式返回
+            bypass_cache: 跳过缓存读取（结果仍会写入缓存）
             
         Returns:
             AI 返回的文本内容
@@ -108,9 +129,26 @@ class QwenClient:
             "stream": stream,
         }
         
+        # 查询响应缓存
+        cache_key = None
+        if self.use_cache and self.cache is not None and not stream:
+            cache_key = make_cache_key(
+                request_data["model"],
+                messages,
+                max_tokens=request_data["max_tokens"],
+                temperature=request_data["temperature"],
+            )
+            if not bypass_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Qwen 响应缓存命中: {request_data['model']}")
+                    return cached
+        
         logger.debug(f"调用 Qwen API: {request_data['model']}")
         
         try:
+            start_time = time.perf_counter()
+            
             # 发送请求
             response = await self.http_client.post(
                 f"{self.base_url}/chat/completions",
@@ -135,6 +173,11 @@ class QwenClient:
                         f"cost={usage.get('total_tokens', 0) * 0.0001:.4f}元"
                     )
                 
+                # 写入响应缓存
+                if cache_key is not None:
+                    latency_ms = (time.perf_counter() - start_time) * 1000
+                    self.cache.set(cache_key, request_data["model"], content, latency_ms=latency_ms)
+                
                 return content
             else:
                 raise ValueError(f"API 返回格式错误: {result}")
@@ -197,8 +240,10 @@ class QwenClient:
             raise ValueError(f"Qwen 返回的不是有效的 JSON: {str(e)}") from e
     
     async def close(self):
-        """关闭 HTTP 客户端"""
+        """关闭 HTTP 客户端和客户端自己创建的响应缓存"""
         await self.http_client.aclose()
+        if self._owns_cache:
+            self.cache.close()
     
     async def __aenter__(self):
         """异步上下文管理器入口"""
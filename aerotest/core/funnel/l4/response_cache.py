@@ -0,0 +1,209 @@
+"""LLM 响应缓存
+
+按内容寻址的 Qwen 响应缓存，放在 QwenClient.chat 之前：
+- 键：模型 + 规范化消息 + 采样参数的 SHA-256
+- 存储：SQLite 文件（跨进程、跨运行持久化）
+- 淘汰：TTL 过期 + 超出容量时按最近访问时间 LRU 淘汰
+- 指标：命中 / 未命中 / 写入 / 淘汰次数和节省的调用耗时
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from aerotest.utils import get_logger, user_cache_dir
+from aerotest.utils.sqlite_store import SQLiteStore, with_hit_rate
+
+logger = get_logger("aerotest.funnel.l4.cache")
+
+# 默认缓存文件
+DEFAULT_CACHE_PATH = user_cache_dir("llm_responses.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    latency_ms REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def normalize_messages(messages: list[dict[str, str]]) -> list[dict[str, str]]:
+    """
+    规范化消息列表
+
+    去掉每行首尾空白并丢弃空行，使仅有缩进或换行差异的 prompt 得到相同的键。
+
+    Args:
+        messages: 消息列表
+
+    Returns:
+        规范化后的消息列表
+    """
+    normalized = []
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, str):
+            content = "\n".join(line.strip() for line in content.splitlines() if line.strip())
+        normalized.append({**message, "content": content})
+    return normalized
+
+
+def make_cache_key(model: str, messages: list[dict[str, str]], **params: Any) -> str:
+    """
+    计算缓存键
+
+    Args:
+        model: 模型名称
+        messages: 消息列表
+        **params: 影响输出的采样参数（max_tokens、temperature 等）
+
+    Returns:
+        十六进制 SHA-256 摘要
+    """
+    payload = {
+        "model": model,
+        "messages": normalize_messages(messages),
+        "params": params,
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(SQLiteStore):
+    """LLM 响应缓存（SQLite 后端）
+
+    Example:
+        ```python
+        cache = ResponseCache(ttl=7 * 24 * 3600, max_entries=10_000)
+
+        key = make_cache_key("qwen-max", messages, max_tokens=2000, temperature=0.1)
+        response = cache.get(key)
+        if response is None:
+            response = await call_api(...)
+            cache.set(key, "qwen-max", response, latency_ms=2300)
+
+        print(cache.stats)
+        ```
+    """
+
+    TABLE = "responses"
+    SCHEMA = _SCHEMA
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_CACHE_PATH,
+        ttl: Optional[float] = 7 * 24 * 3600,
+        max_entries: int = 10_000,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite 文件路径（":memory:" 表示仅内存）
+            ttl: 条目有效期（秒，None 表示不过期）
+            max_entries: 最大条目数，超出时按最近访问时间淘汰
+        """
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "expired": 0,
+            "evictions": 0,
+            "saved_ms": 0.0,
+        }
+
+        logger.info(f"LLM 响应缓存已打开: {self.path} (ttl={ttl}, max_entries={max_entries})")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的响应，未命中或已过期返回 None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, latency_ms, created_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            response, latency_ms, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            self._stats["hits"] += 1
+            self._stats["saved_ms"] += latency_ms
+
+        logger.debug(f"LLM 缓存命中: {key[:12]}")
+        return response
+
+    def set(self, key: str, model: str, response: str, latency_ms: float = 0.0):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            model: 模型名称
+            response: 响应文本
+            latency_ms: 原始调用耗时（命中时计入节省的耗时）
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, response, latency_ms, created_at, accessed_at, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, model, response, latency_ms, now, now),
+            )
+            self._stats["writes"] += 1
+            self._evict()
+
+    def _evict(self):
+        """删除过期条目，并按最近访问时间淘汰超出容量的条目"""
+        if self.ttl is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (time.time() - self.ttl,),
+            )
+            self._stats["expired"] += max(cursor.rowcount, 0)
+
+        self._stats["evictions"] += self._evict_lru(self.max_entries, "accessed_at")
+
+    def clear(self):
+        """清空缓存"""
+        super().clear()
+        logger.info("LLM 响应缓存已清空")
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """缓存指标（含命中率）"""
+        stats = with_hit_rate(self._stats)
+        stats["entries"] = len(self)
+        return stats
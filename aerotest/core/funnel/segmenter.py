@@ -0,0 +1,220 @@
+"""jieba 分词词典
+
+L1 意图识别、实体提取和 L3 锚点定位共用同一个 jieba 词典。原先每次构造
+引擎都会对所有关键词调用 jieba.add_word，而 jieba 首次使用时还要构建前缀
+词典，CLI 和工作进程启动因此多出数秒。
+
+这里把"默认词典 + 项目关键词"预构建为一份带版本号的磁盘缓存：
+- 懒加载：构造引擎不再触碰词典，首次分词（cut）时才初始化
+- 进程内只初始化一次（线程安全）
+- 缓存命中时直接加载前缀词典（JSON，只含词和词频，加载不会执行代码），
+  跳过 gen_pfdict 和逐词 add_word
+- 缓存放在用户缓存目录（$XDG_CACHE_HOME 或 ~/.cache），不写入工作目录
+- 版本号由 jieba 版本、词典文件和关键词表计算，任一变化都会重建
+- 可通过 warmup() 在后台线程提前加载
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import jieba
+
+from aerotest.utils import get_logger, user_cache_dir
+
+logger = get_logger("aerotest.funnel.segmenter")
+
+# 默认缓存目录
+DEFAULT_CACHE_DIR = user_cache_dir("jieba")
+
+# 缓存格式版本（格式变化时递增）
+CACHE_FORMAT = 2
+
+_lock = threading.Lock()
+_initialized = False
+_stats: dict[str, object] = {}
+
+
+def custom_words() -> list[tuple[str, int]]:
+    """
+    项目关键词及词频
+
+    顺序与原先各组件构造时的 add_word 顺序一致（同一个词后出现的词频生效）：
+    意图关键词、元素类型关键词、常见元素名、方位关键词。
+
+    Returns:
+        (词, 词频) 列表
+    """
+    # 延迟导入避免循环依赖
+    from aerotest.core.funnel.l1.action_patterns import ACTION_KEYWORDS
+    from aerotest.core.funnel.l1.element_types import COMMON_ELEMENT_NAMES, ELEMENT_TYPE_KEYWORDS
+    from aerotest.core.funnel.l3.anchor_locator import AnchorLocator
+
+    words: list[tuple[str, int]] = []
+    for data in ACTION_KEYWORDS.values():
+        words.extend((keyword, 1000) for keyword in data["keywords"])
+    for data in ELEMENT_TYPE_KEYWORDS.values():
+        words.extend((keyword, 500) for keyword in data["keywords"])
+    words.extend((name, 800) for name in COMMON_ELEMENT_NAMES)
+    for keywords in AnchorLocator.DIRECTION_KEYWORDS.values():
+        words.extend((keyword, 1000) for keyword in keywords)
+    return words
+
+
+def dictionary_version(words: Optional[list[tuple[str, int]]] = None) -> str:
+    """
+    计算词典版本号
+
+    Args:
+        words: 项目关键词（None 表示 custom_words()）
+
+    Returns:
+        十六进制摘要
+    """
+    if words is None:
+        words = custom_words()
+
+    tokenizer = jieba.dt
+    parts = [f"format={CACHE_FORMAT}", f"jieba={jieba.__version__}"]
+    if tokenizer.dictionary:
+        stat = os.stat(tokenizer.dictionary)
+        parts.append(f"dict={tokenizer.dictionary}:{stat.st_size}:{stat.st_mtime_ns}")
+    parts.extend(f"{word}:{freq}" for word, freq in words)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def ensure_dictionary(cache_dir: Union[str, Path, None] = None) -> bool:
+    """
+    初始化进程共享的 jieba 词典（只执行一次）
+
+    Args:
+        cache_dir: 缓存目录（None 使用 DEFAULT_CACHE_DIR）
+
+    Returns:
+        本次调用是否执行了初始化（已初始化时返回 False）
+    """
+    global _initialized
+    if _initialized:
+        return False
+
+    with _lock:
+        if _initialized:
+            return False
+
+        start = time.perf_counter()
+        words = custom_words()
+        version = dictionary_version(words)
+        cache_file = Path(cache_dir or DEFAULT_CACHE_DIR) / f"dict-{version}.json"
+
+        from_cache = _load_cache(cache_file)
+        if not from_cache:
+            _build(words)
+            _dump_cache(cache_file)
+
+        _initialized = True
+        _stats.update({
+            "version": version,
+            "from_cache": from_cache,
+            "words": len(words),
+            "load_ms": (time.perf_counter() - start) * 1000,
+        })
+        logger.info(
+            f"jieba 词典已就绪: version={version}, "
+            f"{'缓存' if from_cache else '构建'}耗时 {_stats['load_ms']:.1f}ms"
+        )
+        return True
+
+
+def cut(text: str) -> list[str]:
+    """
+    分词（首次调用时初始化词典）
+
+    Args:
+        text: 文本
+
+    Returns:
+        分词结果
+    """
+    ensure_dictionary()
+    return list(jieba.cut(text))
+
+
+def warmup(background: bool = True, cache_dir: Union[str, Path, None] = None) -> Optional[threading.Thread]:
+    """
+    预加载词典
+
+    Args:
+        background: 是否在后台线程加载（引擎首次使用时若尚未完成会等待）
+        cache_dir: 缓存目录
+
+    Returns:
+        后台线程（同步加载或已初始化时返回 None）
+    """
+    if _initialized:
+        return None
+    if not background:
+        ensure_dictionary(cache_dir)
+        return None
+
+    thread = threading.Thread(
+        target=ensure_dictionary,
+        args=(cache_dir,),
+        name="jieba-warmup",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def dictionary_stats() -> dict[str, object]:
+    """词典初始化信息（版本、是否来自缓存、耗时）"""
+    return dict(_stats)
+
+
+def _build(words: list[tuple[str, int]]):
+    """构建前缀词典并加入项目关键词"""
+    tokenizer = jieba.dt
+    tokenizer.initialize()
+    for word, freq in words:
+        tokenizer.add_word(word, freq=freq)
+
+
+def _load_cache(cache_file: Path) -> bool:
+    """从缓存加载前缀词典"""
+    if not cache_file.is_file():
+        return False
+
+    tokenizer = jieba.dt
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        freq, total = data["freq"], data["total"]
+        if not isinstance(freq, dict) or not isinstance(total, int):
+            raise ValueError("缓存结构不正确")
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"jieba 词典缓存损坏，重新构建: {e}")
+        return False
+
+    with tokenizer.lock:
+        tokenizer.FREQ, tokenizer.total = freq, total
+        tokenizer.initialized = True
+    return True
+
+
+def _dump_cache(cache_file: Path):
+    """写入缓存（原子替换，失败只记录日志）"""
+    tokenizer = jieba.dt
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_file.parent)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"freq": tokenizer.FREQ, "total": tokenizer.total}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, cache_file)
+    except OSError as e:
+        logger.warning(f"写入 jieba 词典缓存失败: {e}")
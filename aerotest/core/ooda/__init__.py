@@ -5,6 +5,8 @@
 """
 
 from aerotest.core.ooda.case_executor import CaseExecutor
+from aerotest.core.ooda.history import HistoryPolicy, HistoryRecorder, ObservationStore
+from aerotest.core.ooda.locator_cache import LocatorCache, LocatorEntry
 from aerotest.core.ooda.ooda_engine import OODAEngine
 from aerotest.core.ooda.types import (
     Action,
@@ -14,6 +16,7 @@ from aerotest.core.ooda.types import (
     ExecutionContext,
     ExecutionResult,
     Observation,
+    ObservationSummary,
     Orientation,
     TestCase,
     TestStep,
@@ -23,6 +26,11 @@ __all__ = [
     # OODA å¼æ
     "OODAEngine",
     "CaseExecutor",
+    "LocatorCache",
+    "LocatorEntry",
+    "HistoryPolicy",
+    "HistoryRecorder",
+    "ObservationStore",
     # æ°æ®ç±»å
     "Action",
     "ActionType",
@@ -31,6 +39,7 @@ __all__ = [
     "ExecutionContext",
     "ExecutionResult",
     "Observation",
+    "ObservationSummary",
     "Orientation",
     "TestCase",
     "TestStep",
@@ -3,11 +3,17 @@
 ç¨äºæ§è¡å®æ´çæµè¯ç¨ä¾
 """
 
+import asyncio
+import copy
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
 from loguru import logger
 
+from aerotest.browser.cdp.storage_state import StorageStateStore
+from aerotest.core.ooda.history import HistoryPolicy, HistoryRecorder
+from aerotest.core.ooda.locator_cache import LocatorCache
 from aerotest.core.ooda.ooda_engine import OODAEngine
 from aerotest.core.ooda.types import (
     ActionStatus,
@@ -51,6 +57,9 @@ class CaseExecutor:
         use_l5: bool = True,
         max_retries: int = 2,
         logger=None,
+        state_store: Optional[StorageStateStore] = None,
+        locator_cache: Optional[LocatorCache] = None,
+        history: Optional[HistoryRecorder] = None,
     ):
         """
         åå§åç¨ä¾æ§è¡å¨
@@ -62,10 +71,27 @@ class CaseExecutor:
             use_l5: æ¯å¦å¯ç¨ L5 è§è§è¯å«
             max_retries: æå¤§éè¯æ¬¡æ°
             logger: æ¥å¿è®°å½å¨
+            state_store: 登录态快照目录（用于 requires_state / provides_state）
+            locator_cache: 自愈定位缓存（可选，批量执行的工作协程共享）
+            history: 执行历史记录器（可选，批量执行的工作协程共享，默认按配置创建）
         """
         self.logger = logger or get_logger(__name__)
         self.cdp_session = cdp_session
         self.max_retries = max_retries
+        self.use_l3 = use_l3
+        self.use_l4 = use_l4
+        self.use_l5 = use_l5
+
+        # 执行历史：只保留最近 N 个步骤的完整观察
+        self.history = history or HistoryRecorder(HistoryPolicy.from_settings())
+
+        # 最近一次批量执行的统计
+        self.last_batch_stats: dict[str, Any] = {}
+
+        # 登录态快照：状态名称 -> 前置用例，以及保证前置用例只执行一次的锁
+        self.state_store = state_store
+        self._state_setups: dict[str, TestCase] = {}
+        self._state_locks: dict[str, asyncio.Lock] = {}
 
         # åå§å OODA å¼æ
         self.ooda_engine = OODAEngine(
@@ -73,6 +99,7 @@ class CaseExecutor:
             use_l3=use_l3,
             use_l4=use_l4,
             use_l5=use_l5,
+            locator_cache=locator_cache,
         )
 
         self.logger.info(
@@ -119,8 +146,13 @@ class CaseExecutor:
 
         # æ­¥éª¤ç»æåè¡¨
         step_results = []
+        state_restored = False
 
         try:
+            # 注入依赖的登录态，代替重放登录步骤
+            if case.requires_state:
+                state_restored = await self._ensure_required_state(case.requires_state, context)
+
             # éä¸ªæ§è¡æ­¥éª¤
             for i, step in enumerate(case.steps):
                 self.logger.info(
@@ -149,7 +181,7 @@ class CaseExecutor:
                     stats["skipped"] += 1
 
                 # æ·»å å°åå²è®°å½
-                context.history.append(step)
+                self.history.record(context.history, step)
 
             # æ´æ°ç¨ä¾ç¶æ
             if stats["failed"] > 0:
@@ -159,6 +191,10 @@ class CaseExecutor:
             else:
                 case.status = ActionStatus.SUCCESS
 
+            # 前置用例成功后保存登录态
+            if case.provides_state and case.status == ActionStatus.SUCCESS:
+                await self._capture_provided_state(case.provides_state)
+
         except Exception as e:
             self.logger.error(f"ç¨ä¾æ§è¡å¼å¸¸: {str(e)}", exc_info=True)
             case.status = ActionStatus.FAILED
@@ -178,6 +214,8 @@ class CaseExecutor:
             step_results=step_results,
             stats=stats,
         )
+        if case.requires_state:
+            result.metadata["state_restored"] = state_restored
 
         self.logger.info(
             f"ç¨ä¾æ§è¡å®æ: {case.case_id} - "
@@ -261,32 +299,410 @@ class CaseExecutor:
         self,
         cases: list[TestCase],
         context: Optional[ExecutionContext] = None,
+        workers: int = 1,
+        session_factory: Optional[Callable[[int], Awaitable[Any]]] = None,
+        session_release: Optional[Callable[[Any], Awaitable[None]]] = None,
+        fail_fast: bool = False,
+        case_timeout: Optional[float] = None,
     ) -> list[ExecutionResult]:
         """
-        æ¹éæ§è¡æµè¯ç¨ä¾
-        
+        批量执行测试用例
+
+        参数含义见 iter_batch_execute，返回结果与 cases 顺序一致，
+        统计信息记录在 last_batch_stats。
+
         Args:
-            cases: æµè¯ç¨ä¾åè¡¨
-            context: æ§è¡ä¸ä¸æï¼å¯éï¼
-            
+            cases: 测试用例列表
+            context: 执行上下文（可选，作为每个用例隔离上下文的模板）
+            workers: 并发工作协程数
+            session_factory: 为每个工作协程创建 CDP Session 的工厂（参数为工作协程编号）
+            session_release: 工作协程结束时释放 Session 的回调
+            fail_fast: 出现失败用例后跳过尚未开始的用例
+            case_timeout: 默认用例超时（秒），TestCase.timeout 优先
+
         Returns:
-            æ§è¡ç»æåè¡¨
+            执行结果列表
         """
-        self.logger.info(f"å¼å§æ¹éæ§è¡ {len(cases)} ä¸ªç¨ä¾")
+        results: list[Optional[ExecutionResult]] = [None] * len(cases)
+        async for result in self.iter_batch_execute(
+            cases,
+            context,
+            workers=workers,
+            session_factory=session_factory,
+            session_release=session_release,
+            fail_fast=fail_fast,
+            case_timeout=case_timeout,
+        ):
+            results[result.metadata["case_index"]] = result
+        return results
 
-        results = []
-        for i, case in enumerate(cases):
-            self.logger.info(f"æ§è¡ç¨ä¾ {i + 1}/{len(cases)}: {case.name}")
-            result = await self.execute_case(case, context)
-            results.append(result)
+    async def iter_batch_execute(
+        self,
+        cases: list[TestCase],
+        context: Optional[ExecutionContext] = None,
+        workers: int = 1,
+        session_factory: Optional[Callable[[int], Awaitable[Any]]] = None,
+        session_release: Optional[Callable[[Any], Awaitable[None]]] = None,
+        fail_fast: bool = False,
+        case_timeout: Optional[float] = None,
+    ) -> AsyncIterator[ExecutionResult]:
+        """
+        并发批量执行测试用例，按完成顺序逐个返回结果
 
-        # ç»è®¡
-        total = len(results)
-        success = sum(1 for r in results if r.success)
-        failed = total - success
+        每个工作协程拥有自己的 CDP Session（由 session_factory 创建）和
+        OODA 引擎，从共享队列领取用例；每个用例使用由 context 复制出的
+        隔离上下文。结果的 metadata 中记录 case_index 和 worker。
 
-        self.logger.info(
-            f"æ¹éæ§è¡å®æ: æå {success}/{total}, å¤±è´¥ {failed}"
+        未提供 session_factory 且 workers > 1 时，从 self.cdp_session 所在连接的
+        上下文池（connection.context_pool）为每个工作协程打开独立 Session；
+        没有上下文池时抛出 ValueError，避免多个工作协程共用同一个 Session。
+
+        Args:
+            cases: 测试用例列表
+            context: 执行上下文（可选，作为每个用例隔离上下文的模板）
+            workers: 并发工作协程数
+            session_factory: 为每个工作协程创建 CDP Session 的工厂（参数为工作协程编号）
+            session_release: 工作协程结束时释放 Session 的回调
+            fail_fast: 出现失败用例后跳过尚未开始的用例
+            case_timeout: 默认用例超时（秒），TestCase.timeout 优先
+
+        Yields:
+            执行结果
+
+        Raises:
+            ValueError: workers > 1 且无法为每个工作协程提供独立 Session
+        """
+        worker_count = max(1, min(workers, len(cases)))
+        if worker_count > 1 and session_factory is None and self.cdp_session is not None:
+            pool = getattr(self.cdp_session.connection, "context_pool", None)
+            if pool is None:
+                raise ValueError(
+                    "workers > 1 时需要提供 session_factory，"
+                    "或先调用 connection.create_context_pool() 创建上下文池"
+                )
+            session_factory = lambda worker_id: pool.open_session()
+            session_release = session_release or pool.release_session
+        self.logger.info(f"开始批量执行 {len(cases)} 个用例 (workers={worker_count}, fail_fast={fail_fast})")
+
+        start = time.perf_counter()
+        stats = {
+            "total": len(cases),
+            "success": 0,
+            "failed": 0,
+            "skipped": 0,
+            "timed_out": 0,
+            "workers": worker_count,
+            "cases_per_worker": [0] * worker_count,
+            "duration_ms": 0.0,
+        }
+        self.last_batch_stats = stats
+
+        case_queue: asyncio.Queue = asyncio.Queue()
+        for index, case in enumerate(cases):
+            case_queue.put_nowait((index, case))
+        result_queue: asyncio.Queue = asyncio.Queue()
+        stop_event = asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(self._batch_worker(
+                worker_id,
+                case_queue,
+                result_queue,
+                stop_event,
+                context,
+                session_factory,
+                session_release,
+                fail_fast,
+                case_timeout,
+            ))
+            for worker_id in range(worker_count)
+        ] if cases else []
+
+        try:
+            for _ in range(len(cases)):
+                item = await result_queue.get()
+                if isinstance(item, BaseException):
+                    raise item
+
+                if item.status == ActionStatus.SUCCESS:
+                    stats["success"] += 1
+                elif item.status == ActionStatus.SKIPPED:
+                    stats["skipped"] += 1
+                else:
+                    stats["failed"] += 1
+                if item.metadata.get("timed_out"):
+                    stats["timed_out"] += 1
+                if item.metadata.get("worker") is not None:
+                    stats["cases_per_worker"][item.metadata["worker"]] += 1
+
+                yield item
+
+            await asyncio.gather(*tasks)
+
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            stats["duration_ms"] = (time.perf_counter() - start) * 1000
+            self.logger.info(
+                f"批量执行完成: 成功 {stats['success']}/{stats['total']}, "
+                f"失败 {stats['failed']}, 跳过 {stats['skipped']}, "
+                f"超时 {stats['timed_out']}, 耗时: {stats['duration_ms']:.2f}ms"
+            )
+
+            locator_cache = self.ooda_engine.locator_cache
+            if locator_cache is not None:
+                stats["locator_cache"] = locator_cache.stats
+                self.logger.info(
+                    f"定位缓存: 命中率 {stats['locator_cache']['hit_rate']:.1%}, "
+                    f"节省定位耗时 {stats['locator_cache']['saved_ms']:.2f}ms"
+                )
+
+    async def _batch_worker(
+        self,
+        worker_id: int,
+        case_queue: asyncio.Queue,
+        result_queue: asyncio.Queue,
+        stop_event: asyncio.Event,
+        context: Optional[ExecutionContext],
+        session_factory: Optional[Callable[[int], Awaitable[Any]]],
+        session_release: Optional[Callable[[Any], Awaitable[None]]],
+        fail_fast: bool,
+        case_timeout: Optional[float],
+    ):
+        """
+        批量执行的工作协程：领取用例直到队列为空
+
+        Args:
+            worker_id: 工作协程编号
+            case_queue: 用例队列（元素为 (序号, 用例)）
+            result_queue: 结果队列（工作协程初始化失败时放入异常）
+            stop_event: fail-fast 停止信号
+            context: 上下文模板
+            session_factory: Session 工厂
+            session_release: Session 释放回调
+            fail_fast: 是否在失败后停止
+            case_timeout: 默认用例超时（秒）
+        """
+        session = None
+        try:
+            if session_factory is not None:
+                session = await session_factory(worker_id)
+                executor = self._spawn_worker_executor(session)
+            elif worker_id == 0:
+                executor = self
+            else:
+                # 仅在没有 CDP Session（离线执行）时到达，见 iter_batch_execute
+                executor = self._spawn_worker_executor(None)
+        except Exception as e:
+            self.logger.error(f"工作协程 {worker_id} 初始化失败: {e}")
+            await result_queue.put(e)
+            return
+
+        try:
+            while True:
+                try:
+                    index, case = case_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+
+                if stop_event.is_set():
+                    result = self._skipped_case_result(case, "fail-fast: 已有用例失败，跳过执行")
+                else:
+                    self.logger.info(f"[worker {worker_id}] 执行用例 {index + 1}: {case.name}")
+                    case_context = self._derive_context(context, session)
+                    try:
+                        result = await executor._execute_case_with_timeout(
+                            case,
+                            case_context,
+                            case.timeout if case.timeout is not None else case_timeout,
+                        )
+                    except Exception as e:
+                        self.logger.error(f"用例执行异常: {case.case_id} - {e}")
+                        result = ExecutionResult(
+                            success=False,
+                            status=ActionStatus.FAILED,
+                            data=case,
+                            error=str(e),
+                        )
+
+                result.metadata["case_index"] = index
+                result.metadata["worker"] = worker_id
+                await result_queue.put(result)
+
+                if fail_fast and result.status == ActionStatus.FAILED:
+                    stop_event.set()
+        finally:
+            if session is not None and session_release is not None:
+                try:
+                    await session_release(session)
+                except Exception as e:
+                    self.logger.warning(f"释放工作协程 {worker_id} 的 Session 失败: {e}")
+
+    def _spawn_worker_executor(self, cdp_session) -> "CaseExecutor":
+        """为工作协程创建使用独立 OODA 引擎的执行器（共享登录态快照）"""
+        executor = CaseExecutor(
+            cdp_session=cdp_session,
+            use_l3=self.use_l3,
+            use_l4=self.use_l4,
+            use_l5=self.use_l5,
+            max_retries=self.max_retries,
+            logger=self.logger,
+            state_store=self.state_store,
+            locator_cache=self.ooda_engine.locator_cache,
+            history=self.history,
         )
+        executor.ooda_engine.speculative = self.ooda_engine.speculative
+        executor.ooda_engine.orient_timeout = self.ooda_engine.orient_timeout
+        executor._state_setups = self._state_setups
+        executor._state_locks = self._state_locks
+        return executor
 
-        return results
+    def _derive_context(
+        self,
+        template: Optional[ExecutionContext],
+        cdp_session=None,
+    ) -> ExecutionContext:
+        """
+        为单个用例复制隔离的执行上下文
+
+        Args:
+            template: 上下文模板
+            cdp_session: 工作协程的 CDP Session
+
+        Returns:
+            新的执行上下文（历史记录为空）
+        """
+        target_info = getattr(cdp_session, "target_info", None)
+        target_id = getattr(target_info, "target_id", None)
+
+        if template is None:
+            return ExecutionContext(cdp_session=cdp_session, target_id=target_id)
+
+        return ExecutionContext(
+            cdp_session=cdp_session or template.cdp_session,
+            target_id=target_id or template.target_id,
+            variables=dict(template.variables),
+            config=dict(template.config),
+            metadata=dict(template.metadata),
+        )
+
+    async def _execute_case_with_timeout(
+        self,
+        case: TestCase,
+        context: ExecutionContext,
+        timeout: Optional[float],
+    ) -> ExecutionResult:
+        """
+        执行用例，超时后取消并返回失败结果
+
+        Args:
+            case: 测试用例
+            context: 执行上下文
+            timeout: 超时时间（秒，None 表示不限制）
+
+        Returns:
+            执行结果
+        """
+        if timeout is None:
+            return await self.execute_case(case, context)
+
+        try:
+            return await asyncio.wait_for(self.execute_case(case, context), timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"用例执行超时: {case.case_id} ({timeout}s)")
+            case.status = ActionStatus.FAILED
+            case.end_time = datetime.now()
+            if case.start_time:
+                case.duration_ms = (case.end_time - case.start_time).total_seconds() * 1000
+            return ExecutionResult(
+                success=False,
+                status=ActionStatus.FAILED,
+                data=case,
+                error=f"用例执行超时 ({timeout}s)",
+                duration_ms=case.duration_ms,
+                metadata={"timed_out": True},
+            )
+
+    def _skipped_case_result(self, case: TestCase, reason: str) -> ExecutionResult:
+        """构建未执行用例的跳过结果"""
+        case.status = ActionStatus.SKIPPED
+        return ExecutionResult(
+            success=False,
+            status=ActionStatus.SKIPPED,
+            data=case,
+            error=reason,
+        )
+
+    def register_state_setup(self, case: TestCase):
+        """
+        登记产生登录态的前置用例
+
+        requires_state 对应的快照不存在或已过期时，先在当前 Session
+        上执行该用例（并发时只执行一次），成功后保存快照。
+
+        Args:
+            case: 设置了 provides_state 的前置用例
+        """
+        if not case.provides_state:
+            raise ValueError(f"前置用例未设置 provides_state: {case.case_id}")
+        self._state_setups[case.provides_state] = case
+
+    async def _ensure_required_state(self, name: str, context: ExecutionContext) -> bool:
+        """
+        确保当前 Session 处于指定的登录态
+
+        Args:
+            name: 状态名称
+            context: 执行上下文
+
+        Returns:
+            是否注入了已保存的快照（执行前置用例获得登录态时返回 False）
+
+        Raises:
+            RuntimeError: 前置用例执行失败
+        """
+        if self.state_store is None or self.cdp_session is None:
+            self.logger.warning(f"未配置 state_store 或 CDP Session，无法注入登录态: {name}")
+            return False
+
+        lock = self._state_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            state = self.state_store.get(name)
+            if state is None:
+                setup = self._state_setups.get(name)
+                if setup is None:
+                    self.logger.warning(f"登录态 {name} 不存在且没有登记前置用例")
+                    return False
+
+                self.logger.info(f"登录态 {name} 不可用，执行前置用例: {setup.case_id}")
+                result = await self.execute_case(
+                    copy.deepcopy(setup),
+                    self._derive_context(context, self.cdp_session),
+                )
+                if not result.success:
+                    raise RuntimeError(f"前置用例执行失败，无法获得登录态: {name}")
+                return False
+
+        await self.cdp_session.restore_storage_state(state)
+        self.logger.info(f"已注入登录态: {name}")
+        return True
+
+    async def _capture_provided_state(self, name: str):
+        """
+        捕获并保存当前 Session 的登录态（失败只记录日志）
+
+        Args:
+            name: 状态名称
+        """
+        if self.state_store is None or self.cdp_session is None:
+            self.logger.warning(f"未配置 state_store 或 CDP Session，无法保存登录态: {name}")
+            return
+
+        try:
+            state = await self.cdp_session.capture_storage_state()
+            self.state_store.save(name, state)
+        except Exception as e:
+            self.logger.warning(f"保存登录态失败: {name} - {e}")
@@ -0,0 +1,611 @@
+"""执行历史管理
+
+每个步骤都保留完整的 Observation（DOM 树、可见/可交互元素列表、截图），
+长用例会同时持有大量 DOM 图。这里按 HistoryPolicy 管理执行历史：
+- 只保留最近 N 个步骤的完整观察
+- 更早的步骤压缩为 ObservationSummary（稳定哈希、候选元素、耗时），
+  释放 DOM 树、元素列表和各阶段对元素的引用
+- 可选在压缩前将完整观察写入 SQLite（JSON + zlib），生成报告时按需加载
+"""
+
+import json
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from aerotest.browser.dom.cdp_types import AXPropertyName, ShadowRootType
+from aerotest.browser.dom.views import (
+    DOMRect,
+    EnhancedAXNode,
+    EnhancedAXProperty,
+    EnhancedDOMTreeNode,
+    EnhancedSnapshotNode,
+    NodeType,
+)
+from aerotest.core.ooda.locator_cache import page_fingerprint
+from aerotest.core.ooda.types import Observation, ObservationSummary, TestStep
+from aerotest.utils import get_logger
+from aerotest.utils.sqlite_store import SQLiteStore
+
+logger = get_logger("aerotest.ooda.history")
+
+# 默认保留完整观察的步骤数
+DEFAULT_KEEP_FULL = 20
+
+# 序列化格式版本
+FORMAT_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    step_id TEXT NOT NULL,
+    data BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+_RECT_FIELDS = ("bounds", "clientRects", "scrollRects")
+
+
+@dataclass
+class HistoryPolicy:
+    """执行历史策略
+
+    Attributes:
+        keep_full: 保留完整观察的最近步骤数（None 表示不压缩）
+        spill_path: 压缩前写入完整观察的 SQLite 文件（None 表示直接丢弃）
+    """
+
+    keep_full: Optional[int] = DEFAULT_KEEP_FULL
+    spill_path: Optional[str] = None
+
+    @classmethod
+    def from_settings(cls) -> "HistoryPolicy":
+        """按配置创建策略"""
+        from aerotest.config.settings import get_settings
+
+        config = get_settings()
+        return cls(
+            keep_full=config.ooda_history_keep_full,
+            spill_path=config.ooda_history_spill_path,
+        )
+
+
+def _dump_rect(rect: Optional[DOMRect]) -> Optional[list[float]]:
+    """序列化矩形"""
+    if rect is None:
+        return None
+    return [rect.x, rect.y, rect.width, rect.height]
+
+
+def _load_rect(data: Optional[list[float]]) -> Optional[DOMRect]:
+    """反序列化矩形"""
+    return DOMRect(*data) if data is not None else None
+
+
+def _dump_ax(ax_node: Optional[EnhancedAXNode]) -> Optional[dict[str, Any]]:
+    """序列化 AX 节点"""
+    if ax_node is None:
+        return None
+    return {
+        "ax_node_id": ax_node.ax_node_id,
+        "ignored": ax_node.ignored,
+        "role": ax_node.role,
+        "name": ax_node.name,
+        "description": ax_node.description,
+        "properties": (
+            [[prop.name.value, prop.value] for prop in ax_node.properties]
+            if ax_node.properties is not None
+            else None
+        ),
+        "child_ids": ax_node.child_ids,
+    }
+
+
+def _load_ax(data: Optional[dict[str, Any]]) -> Optional[EnhancedAXNode]:
+    """反序列化 AX 节点"""
+    if data is None:
+        return None
+    if data["properties"] is not None:
+        data["properties"] = [
+            EnhancedAXProperty(name=AXPropertyName(name), value=value)
+            for name, value in data["properties"]
+        ]
+    return EnhancedAXNode(**data)
+
+
+def _dump_snapshot(snapshot_node: Any) -> Optional[dict[str, Any]]:
+    """序列化快照数据（EnhancedSnapshotNode 或字段相同的列式视图）"""
+    if snapshot_node is None:
+        return None
+    return {
+        "is_clickable": snapshot_node.is_clickable,
+        "cursor_style": snapshot_node.cursor_style,
+        "bounds": _dump_rect(snapshot_node.bounds),
+        "clientRects": _dump_rect(snapshot_node.clientRects),
+        "scrollRects": _dump_rect(snapshot_node.scrollRects),
+        "computed_styles": (
+            dict(snapshot_node.computed_styles) if snapshot_node.computed_styles is not None else None
+        ),
+        "paint_order": snapshot_node.paint_order,
+        "stacking_contexts": snapshot_node.stacking_contexts,
+    }
+
+
+def _load_snapshot(data: Optional[dict[str, Any]]) -> Optional[EnhancedSnapshotNode]:
+    """反序列化快照数据"""
+    if data is None:
+        return None
+    for name in _RECT_FIELDS:
+        data[name] = _load_rect(data[name])
+    return EnhancedSnapshotNode(**data)
+
+
+def _collect_nodes(
+    roots: Iterable[Optional[EnhancedDOMTreeNode]],
+) -> tuple[list[EnhancedDOMTreeNode], dict[int, int]]:
+    """
+    先序遍历收集节点（包括 shadow root 和 iframe 文档，不递归）
+
+    Args:
+        roots: 起始节点
+
+    Returns:
+        (节点列表, id(节点) -> 序号)
+    """
+    nodes: list[EnhancedDOMTreeNode] = []
+    index: dict[int, int] = {}
+
+    for element in roots:
+        if element is None or id(element) in index:
+            continue
+        # 不在已收集的树中的元素：从它所在树的根开始遍历，
+        # 父节点的子节点列表中没有它时再单独遍历
+        top = element
+        while top.parent_node is not None:
+            top = top.parent_node
+        stack = [element, top]
+        while stack:
+            node = stack.pop()
+            if id(node) in index:
+                continue
+            index[id(node)] = len(nodes)
+            nodes.append(node)
+            related = list(node.children_nodes or [])
+            related.extend(node.shadow_roots or [])
+            if node.content_document is not None:
+                related.append(node.content_document)
+            stack.extend(reversed(related))
+
+    return nodes, index
+
+
+def _dump_node(node: EnhancedDOMTreeNode, index: dict[int, int]) -> dict[str, Any]:
+    """序列化单个节点，节点之间的引用记为序号"""
+
+    def ref(other: Optional[EnhancedDOMTreeNode]) -> Optional[int]:
+        return index.get(id(other)) if other is not None else None
+
+    def refs(others: Optional[list[EnhancedDOMTreeNode]]) -> Optional[list[int]]:
+        return [index[id(other)] for other in others] if others is not None else None
+
+    return {
+        "node_id": node.node_id,
+        "backend_node_id": node.backend_node_id,
+        "node_type": node.node_type.value,
+        "node_name": node.node_name,
+        "node_value": node.node_value,
+        "attributes": dict(node.attributes),
+        "is_scrollable": node.is_scrollable,
+        "is_visible": node.is_visible,
+        "absolute_position": _dump_rect(node.absolute_position),
+        "target_id": node.target_id,
+        "frame_id": node.frame_id,
+        "session_id": node.session_id,
+        "content_document": ref(node.content_document),
+        "shadow_root_type": node.shadow_root_type.value if node.shadow_root_type else None,
+        "shadow_roots": refs(node.shadow_roots),
+        "parent_node": ref(node.parent_node),
+        "children_nodes": refs(node.children_nodes),
+        "ax_node": _dump_ax(node.ax_node),
+        "snapshot_node": _dump_snapshot(node.snapshot_node),
+        "_compound_children": node._compound_children,
+        "uuid": node.uuid,
+    }
+
+
+def _load_nodes(records: list[dict[str, Any]]) -> list[EnhancedDOMTreeNode]:
+    """反序列化节点列表并恢复节点之间的引用"""
+    nodes = []
+    for record in records:
+        nodes.append(EnhancedDOMTreeNode(
+            node_id=record["node_id"],
+            backend_node_id=record["backend_node_id"],
+            node_type=NodeType(record["node_type"]),
+            node_name=record["node_name"],
+            node_value=record["node_value"],
+            attributes=record["attributes"],
+            is_scrollable=record["is_scrollable"],
+            is_visible=record["is_visible"],
+            absolute_position=_load_rect(record["absolute_position"]),
+            target_id=record["target_id"],
+            frame_id=record["frame_id"],
+            session_id=record["session_id"],
+            content_document=None,
+            shadow_root_type=(
+                ShadowRootType(record["shadow_root_type"]) if record["shadow_root_type"] else None
+            ),
+            shadow_roots=None,
+            parent_node=None,
+            children_nodes=None,
+            ax_node=_load_ax(record["ax_node"]),
+            snapshot_node=_load_snapshot(record["snapshot_node"]),
+            _compound_children=record["_compound_children"],
+            uuid=record["uuid"],
+        ))
+
+    for node, record in zip(nodes, records):
+        if record["parent_node"] is not None:
+            node.parent_node = nodes[record["parent_node"]]
+        if record["content_document"] is not None:
+            node.content_document = nodes[record["content_document"]]
+        if record["children_nodes"] is not None:
+            node.children_nodes = [nodes[i] for i in record["children_nodes"]]
+        if record["shadow_roots"] is not None:
+            node.shadow_roots = [nodes[i] for i in record["shadow_roots"]]
+
+    return nodes
+
+
+def dump_observation(observation: Observation) -> bytes:
+    """
+    序列化并压缩观察结果
+
+    DOM 节点按先序展开为列表（不递归，深层 DOM 也不会超出递归深度），
+    元素列表和索引记录为节点序号；序列化的 DOM 状态可由 DOM 树重新生成，不写入
+
+    Args:
+        observation: 观察结果
+
+    Returns:
+        zlib 压缩的 JSON
+    """
+    roots = [observation.dom_tree]
+    roots.extend(observation.visible_elements)
+    roots.extend(observation.interactive_elements)
+    roots.extend(observation.selector_map.values())
+    nodes, index = _collect_nodes(roots)
+
+    payload = {
+        "version": FORMAT_VERSION,
+        "url": observation.url,
+        "title": observation.title,
+        "viewport_size": list(observation.viewport_size),
+        "screenshot": observation.screenshot,
+        "timestamp": observation.timestamp.isoformat(),
+        "metadata": observation.metadata,
+        "nodes": [_dump_node(node, index) for node in nodes],
+        "dom_tree": index[id(observation.dom_tree)] if observation.dom_tree is not None else None,
+        "visible_elements": [index[id(node)] for node in observation.visible_elements],
+        "interactive_elements": [index[id(node)] for node in observation.interactive_elements],
+        "selector_map": [[key, index[id(node)]] for key, node in observation.selector_map.items()],
+    }
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+    return zlib.compress(data.encode("utf-8"))
+
+
+def load_observation(data: bytes) -> Observation:
+    """
+    解压并反序列化观察结果
+
+    Args:
+        data: dump_observation 的结果
+
+    Returns:
+        观察结果（节点为新对象，结构和字段与写入时一致）
+    """
+    payload = json.loads(zlib.decompress(data).decode("utf-8"))
+    if payload["version"] != FORMAT_VERSION:
+        raise ValueError(f"不支持的观察序列化版本: {payload['version']}")
+
+    nodes = _load_nodes(payload["nodes"])
+    return Observation(
+        dom_tree=nodes[payload["dom_tree"]] if payload["dom_tree"] is not None else None,
+        url=payload["url"],
+        title=payload["title"],
+        viewport_size=tuple(payload["viewport_size"]),
+        visible_elements=[nodes[i] for i in payload["visible_elements"]],
+        interactive_elements=[nodes[i] for i in payload["interactive_elements"]],
+        selector_map={
+            tuple(key) if isinstance(key, list) else key: nodes[i] for key, i in payload["selector_map"]
+        },
+        screenshot=payload["screenshot"],
+        timestamp=datetime.fromisoformat(payload["timestamp"]),
+        metadata=payload["metadata"],
+    )
+
+
+def _element_ref(element: EnhancedDOMTreeNode) -> dict[str, Any]:
+    """元素的轻量标识"""
+    return {
+        "stable_hash": element.compute_stable_hash(),
+        "backend_node_id": element.backend_node_id,
+    }
+
+
+def summarize_step(step: TestStep) -> ObservationSummary:
+    """
+    生成步骤的观察摘要
+
+    Args:
+        step: 测试步骤
+
+    Returns:
+        观察摘要
+    """
+    summary = ObservationSummary()
+
+    observation = step.observation
+    if observation is not None:
+        summary.url = observation.url
+        summary.title = observation.title
+        summary.timestamp = observation.timestamp
+        summary.fingerprint = page_fingerprint(observation.interactive_elements, observation.url)
+        summary.visible_count = len(observation.visible_elements)
+        summary.interactive_count = len(observation.interactive_elements)
+        summary.interactive_hashes = [
+            element.compute_stable_hash() for element in observation.interactive_elements
+        ]
+
+    if step.orientation is not None:
+        for match in step.orientation.candidate_elements:
+            candidate = _element_ref(match.element)
+            candidate["score"] = match.score
+            candidate["layer"] = match.layer
+            summary.candidates.append(candidate)
+
+    if step.decision is not None and step.decision.target_element is not None:
+        summary.target = _element_ref(step.decision.target_element)
+        summary.target["xpath"] = step.decision.target_element.xpath
+
+    summary.timings["step_ms"] = step.duration_ms
+    if "orient_ms" in step.metadata:
+        summary.timings["orient_ms"] = step.metadata["orient_ms"]
+    if step.action is not None:
+        summary.timings["action_ms"] = step.action.duration_ms
+
+    return summary
+
+
+def compact_step(step: TestStep) -> ObservationSummary:
+    """
+    压缩步骤：设置观察摘要，释放 DOM 树、元素列表、截图和各阶段的元素引用
+
+    观察对象原地清空（保留 URL、标题、时间和 metadata），
+    持有同一步骤的用例和历史记录都随之释放
+
+    Args:
+        step: 测试步骤
+
+    Returns:
+        观察摘要
+    """
+    summary = summarize_step(step)
+
+    observation = step.observation
+    if observation is not None:
+        observation.dom_tree = None
+        observation.dom_state = None
+        observation.visible_elements = []
+        observation.interactive_elements = []
+        observation.selector_map = {}
+        observation.screenshot = None
+
+    if step.orientation is not None:
+        step.orientation.candidate_elements = []
+        step.orientation.best_match = None
+
+    if step.decision is not None:
+        step.decision.target_element = None
+        for fallback in step.decision.fallback_decisions:
+            fallback.target_element = None
+
+    if step.action is not None:
+        step.action.target_element = None
+
+    step.observation_summary = summary
+    return summary
+
+
+class ObservationStore(SQLiteStore):
+    """完整观察的磁盘存储（SQLite，JSON + zlib 压缩）
+
+    Example:
+        ```python
+        store = ObservationStore(user_cache_dir("observations.sqlite3"))
+        key = store.put(step.observation, step.step_id)
+
+        observation = store.get(key)
+        ```
+    """
+
+    TABLE = "observations"
+    SCHEMA = _SCHEMA
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        """
+        初始化存储
+
+        Args:
+            path: SQLite 文件路径（":memory:" 表示仅内存）
+        """
+        super().__init__(path)
+
+        self._stats = {"writes": 0, "reads": 0, "bytes": 0}
+
+        logger.info(f"观察存储已打开: {self.path}")
+
+    def put(self, observation: Observation, step_id: str = "") -> int:
+        """
+        写入观察
+
+        Args:
+            observation: 观察结果
+            step_id: 步骤 ID（便于排查）
+
+        Returns:
+            存储键
+        """
+        data = dump_observation(observation)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO observations (step_id, data, created_at) VALUES (?, ?, ?)",
+                (step_id, data, time.time()),
+            )
+            self._stats["writes"] += 1
+            self._stats["bytes"] += len(data)
+            return cursor.lastrowid
+
+    def get(self, key: int) -> Optional[Observation]:
+        """
+        读取观察
+
+        Args:
+            key: 存储键
+
+        Returns:
+            观察结果，不存在返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM observations WHERE id = ?", (key,)
+            ).fetchone()
+            self._stats["reads"] += 1
+        if row is None:
+            return None
+        return load_observation(row[0])
+
+    def clear(self):
+        """清空存储"""
+        super().clear()
+        logger.info("观察存储已清空")
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """存储指标"""
+        return dict(self._stats)
+
+
+class HistoryRecorder:
+    """执行历史记录器
+
+    追加步骤后压缩超出窗口的旧步骤；配置了磁盘存储时先写入完整观察。
+
+    Example:
+        ```python
+        recorder = HistoryRecorder(HistoryPolicy(keep_full=10, spill_path=str(user_cache_dir("observations.sqlite3"))))
+        recorder.record(context.history, step)
+
+        # 生成报告时按需加载完整观察
+        observation = recorder.load_observation(context.history[0])
+        ```
+    """
+
+    def __init__(
+        self,
+        policy: Optional[HistoryPolicy] = None,
+        store: Optional[ObservationStore] = None,
+    ):
+        """
+        初始化记录器
+
+        Args:
+            policy: 执行历史策略（默认保留最近 20 个完整观察，不写入磁盘）
+            store: 观察存储（默认按 policy.spill_path 创建）
+        """
+        self.policy = policy or HistoryPolicy()
+        if store is None and self.policy.spill_path:
+            store = ObservationStore(self.policy.spill_path)
+        self.store = store
+
+        self._stats = {"compacted": 0, "spilled": 0, "spill_errors": 0}
+
+    def record(self, history: list[TestStep], step: TestStep):
+        """
+        追加步骤，并压缩超出窗口的旧步骤
+
+        Args:
+            history: 执行历史（ExecutionContext.history）
+            step: 测试步骤
+        """
+        history.append(step)
+
+        keep = self.policy.keep_full
+        if keep is None:
+            return
+
+        window = history[len(history) - keep:] if keep > 0 else []
+        for index in range(len(history) - len(window) - 1, -1, -1):
+            old = history[index]
+            if old.observation_summary is not None:
+                # 更早的步骤已在之前压缩
+                break
+            # 同一步骤对象再次执行且仍在窗口内时，观察属于最新一次执行
+            if any(recent is old for recent in window):
+                continue
+            self.compact(old)
+
+    def compact(self, step: TestStep) -> ObservationSummary:
+        """
+        压缩步骤（配置了磁盘存储时先写入完整观察）
+
+        Args:
+            step: 测试步骤
+
+        Returns:
+            观察摘要
+        """
+        spill_key = None
+        if self.store is not None and step.observation is not None:
+            try:
+                spill_key = self.store.put(step.observation, step.step_id)
+                self._stats["spilled"] += 1
+            except Exception as e:
+                self._stats["spill_errors"] += 1
+                logger.warning(f"写入观察存储失败: {step.step_id} - {e}")
+
+        summary = compact_step(step)
+        summary.spill_key = spill_key
+        self._stats["compacted"] += 1
+        return summary
+
+    def load_observation(self, step: TestStep) -> Optional[Observation]:
+        """
+        获取步骤的完整观察（已压缩的步骤从磁盘存储加载，不回填到步骤）
+
+        Args:
+            step: 测试步骤
+
+        Returns:
+            观察结果；已压缩且未写入磁盘时返回清空后的观察
+        """
+        summary = step.observation_summary
+        if summary is None or summary.spill_key is None or self.store is None:
+            return step.observation
+        return self.store.get(summary.spill_key) or step.observation
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """记录器指标"""
+        stats = dict(self._stats)
+        if self.store is not None:
+            stats["store"] = self.store.stats
+        return stats
+
+    def close(self):
+        """关闭观察存储"""
+        if self.store is not None:
+            self.store.close()
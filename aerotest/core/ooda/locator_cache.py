@@ -0,0 +1,321 @@
+"""自愈定位缓存
+
+记录每个步骤最终命中的元素，使重复运行时跳过 L2→L5 漏斗：
+- 键：规范化的步骤描述 + 页面结构指纹
+- 值：元素稳定哈希、XPath、关键属性、命中层级和原始定位耗时
+- 校验：按 (稳定哈希, XPath) 在当前页面的可交互元素中 O(1) 查找并比对
+  关键属性和文本（同类兄弟元素的稳定哈希相同，只靠哈希会命中错误的元素）；
+  稳定哈希失配时按 XPath 找回并更新条目（自愈），仍失败则回退到漏斗
+- 存储：SQLite 文件（跨运行持久化）
+- 指标：命中 / 未命中 / 失效 / 自愈次数和节省的定位耗时
+"""
+
+import hashlib
+import json
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from aerotest.browser.dom.views import EnhancedDOMTreeNode
+from aerotest.utils import get_logger, user_cache_dir
+from aerotest.utils.sqlite_store import SQLiteStore, with_hit_rate
+
+logger = get_logger("aerotest.ooda.locator_cache")
+
+# 默认缓存文件
+DEFAULT_LOCATOR_CACHE_PATH = user_cache_dir("locators.sqlite3")
+
+# 参与校验的关键属性
+KEY_ATTRIBUTES = ("id", "name", "type", "role", "aria-label", "placeholder", "data-testid")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS locators (
+    key TEXT PRIMARY KEY,
+    entry TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+# 参与校验的文本最大长度
+_MAX_TEXT_LENGTH = 100
+
+# 可交互元素索引的键：(稳定哈希, XPath)
+SelectorKey = tuple[int, str]
+
+
+def normalize_step_text(text: str) -> str:
+    """
+    规范化步骤描述（合并空白、转小写）
+
+    Args:
+        text: 步骤描述
+
+    Returns:
+        规范化后的描述
+    """
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def page_fingerprint(elements: Iterable[EnhancedDOMTreeNode], url: str = "") -> str:
+    """
+    计算页面结构指纹
+
+    由 URL（去掉查询参数和锚点）和可交互元素的标签/类型集合组成，
+    对文本、顺序和数量变化不敏感，只在页面结构变化时改变。
+
+    Args:
+        elements: 可交互元素
+        url: 页面 URL
+
+    Returns:
+        十六进制摘要
+    """
+    shapes = sorted({
+        f"{element.tag_name}:{element.attributes.get('type', '')}:{element.attributes.get('role', '')}"
+        for element in elements
+    })
+    base_url = url.split("#", 1)[0].split("?", 1)[0]
+    encoded = base_url + "|" + ",".join(shapes)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def element_text(element: EnhancedDOMTreeNode) -> str:
+    """提取元素的文本（合并空白并截断），用于区分属性相同的兄弟元素"""
+    return _WHITESPACE.sub(" ", element.get_all_children_text()).strip()[:_MAX_TEXT_LENGTH]
+
+
+def key_attributes(element: EnhancedDOMTreeNode) -> dict[str, str]:
+    """提取元素的关键属性（含标签名）"""
+    attributes = {"tag": element.tag_name}
+    for name in KEY_ATTRIBUTES:
+        value = element.attributes.get(name)
+        if value:
+            attributes[name] = value
+    return attributes
+
+
+@dataclass
+class LocatorEntry:
+    """定位缓存条目
+
+    Attributes:
+        stable_hash: 元素稳定哈希
+        xpath: 元素 XPath
+        attributes: 关键属性
+        text: 元素文本
+        layer: 最初定位成功的层级（L2-L5）
+        confidence: 最初定位的置信度
+        resolve_ms: 最初漏斗定位耗时（命中时计入节省的耗时）
+        hits: 命中次数
+    """
+
+    stable_hash: int
+    xpath: str
+    attributes: dict[str, str] = field(default_factory=dict)
+    text: str = ""
+    layer: str = "L2"
+    confidence: float = 1.0
+    resolve_ms: float = 0.0
+    hits: int = 0
+
+
+class LocatorCache(SQLiteStore):
+    """自愈定位缓存（SQLite 后端）
+
+    Example:
+        ```python
+        cache = LocatorCache()
+        engine = OODAEngine(cdp_session, locator_cache=cache)
+
+        await engine.execute_step(step, context)   # 漏斗定位并记录
+        await engine.execute_step(step, context)   # 直接命中缓存
+
+        print(cache.stats)
+        ```
+    """
+
+    TABLE = "locators"
+    SCHEMA = _SCHEMA
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_LOCATOR_CACHE_PATH,
+        max_entries: int = 10_000,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite 文件路径（":memory:" 表示仅内存）
+            max_entries: 最大条目数，超出时按更新时间淘汰
+        """
+        super().__init__(path)
+        self.max_entries = max_entries
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "heals": 0,
+            "writes": 0,
+            "saved_ms": 0.0,
+        }
+
+    @staticmethod
+    def make_key(description: str, fingerprint: str) -> str:
+        """
+        计算缓存键
+
+        Args:
+            description: 步骤描述
+            fingerprint: 页面结构指纹
+
+        Returns:
+            缓存键
+        """
+        return f"{fingerprint}:{normalize_step_text(description)}"
+
+    @staticmethod
+    def build_selector_map(elements: Iterable[EnhancedDOMTreeNode]) -> dict[SelectorKey, EnhancedDOMTreeNode]:
+        """
+        按 (稳定哈希, XPath) 索引可交互元素
+
+        稳定哈希只包含标签路径和静态属性，同类兄弟元素会相同，
+        加上 XPath 后每个元素各占一项
+
+        Args:
+            elements: 可交互元素
+
+        Returns:
+            (稳定哈希, XPath) -> 元素
+        """
+        return {(element.compute_stable_hash(), element.xpath): element for element in elements}
+
+    def lookup(
+        self,
+        key: str,
+        selector_map: dict[SelectorKey, EnhancedDOMTreeNode],
+    ) -> Optional[tuple[EnhancedDOMTreeNode, LocatorEntry]]:
+        """
+        查找并校验缓存的元素
+
+        Args:
+            key: 缓存键
+            selector_map: 当前页面的 (稳定哈希, XPath) -> 元素
+
+        Returns:
+            (当前页面中的元素, 缓存条目)，未命中或校验失败返回 None
+        """
+        entry = self._load(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        element = selector_map.get((entry.stable_hash, entry.xpath))
+        if element is None or not self._matches(element, entry):
+            element = self._heal(key, entry, selector_map)
+            if element is None:
+                self._stats["stale"] += 1
+                self._stats["misses"] += 1
+                logger.debug(f"定位缓存失效: {key}")
+                return None
+
+        entry.hits += 1
+        self._stats["hits"] += 1
+        self._stats["saved_ms"] += entry.resolve_ms
+        self._store(key, entry, evict=False)
+        return element, entry
+
+    def record(
+        self,
+        key: str,
+        element: EnhancedDOMTreeNode,
+        layer: str,
+        confidence: float,
+        resolve_ms: float,
+    ):
+        """
+        记录漏斗定位成功的元素
+
+        Args:
+            key: 缓存键
+            element: 命中的元素
+            layer: 定位层级
+            confidence: 置信度
+            resolve_ms: 漏斗定位耗时
+        """
+        entry = LocatorEntry(
+            stable_hash=element.compute_stable_hash(),
+            xpath=element.xpath,
+            attributes=key_attributes(element),
+            text=element_text(element),
+            layer=layer,
+            confidence=confidence,
+            resolve_ms=resolve_ms,
+        )
+        self._store(key, entry)
+        self._stats["writes"] += 1
+
+    def invalidate(self, key: str):
+        """
+        删除条目（缓存元素执行失败时调用）
+
+        Args:
+            key: 缓存键
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM locators WHERE key = ?", (key,))
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """缓存指标（含命中率）"""
+        stats = with_hit_rate(self._stats)
+        stats["entries"] = len(self)
+        return stats
+
+    def _heal(
+        self,
+        key: str,
+        entry: LocatorEntry,
+        selector_map: dict[SelectorKey, EnhancedDOMTreeNode],
+    ) -> Optional[EnhancedDOMTreeNode]:
+        """稳定哈希失配时按 XPath 找回关键属性和文本一致的元素，并更新条目"""
+        for element in selector_map.values():
+            if element.xpath == entry.xpath and self._matches(element, entry):
+                entry.stable_hash = element.compute_stable_hash()
+                self._stats["heals"] += 1
+                logger.debug(f"定位缓存自愈: {key} -> {entry.xpath}")
+                return element
+        return None
+
+    @staticmethod
+    def _matches(element: EnhancedDOMTreeNode, entry: LocatorEntry) -> bool:
+        """元素的关键属性和文本是否与条目一致"""
+        return key_attributes(element) == entry.attributes and element_text(element) == entry.text
+
+    def _load(self, key: str) -> Optional[LocatorEntry]:
+        """读取条目"""
+        with self._lock:
+            row = self._conn.execute("SELECT entry FROM locators WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return LocatorEntry(**json.loads(row[0]))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"定位缓存条目损坏: {key} - {e}")
+            return None
+
+    def _store(self, key: str, entry: LocatorEntry, evict: bool = True):
+        """写入条目，并按更新时间淘汰超出容量的条目"""
+        encoded = json.dumps(asdict(entry), ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO locators (key, entry, updated_at) VALUES (?, ?, ?)",
+                (key, encoded, time.time()),
+            )
+            if evict:
+                self._evict_lru(self.max_entries, "updated_at")
@@ -4,19 +4,21 @@
 """
 
 import asyncio
+import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from loguru import logger
 
-from aerotest.browser.dom.views import EnhancedDOMTreeNode
+from aerotest.browser.dom.views import EnhancedDOMTreeNode, SerializedDOMState
 from aerotest.browser.dom.dom_service import DomService
 from aerotest.core.funnel.l1.l1_engine import L1Engine
 from aerotest.core.funnel.l2.l2_engine import L2Engine
 from aerotest.core.funnel.l3.l3_engine import L3Engine
 from aerotest.core.funnel.l4.l4_engine import L4Engine
 from aerotest.core.funnel.l5.l5_engine import L5Engine
-from aerotest.core.funnel.types import ActionSlot, MatchResult
+from aerotest.core.funnel.types import ActionSlot, FunnelContext, MatchResult
+from aerotest.core.ooda.locator_cache import LocatorCache, page_fingerprint
 from aerotest.core.ooda.types import (
     Action,
     ActionStatus,
@@ -56,6 +58,12 @@ class OODAEngine:
         ```
     """
 
+    # 各层级直接采用结果的置信阈值
+    LAYER_THRESHOLDS = {"L2": 0.8, "L3": 0.7, "L4": 0.6, "L5": 0.0}
+
+    # L1 槽位置信度低于该值时推测执行 L4
+    SPECULATE_L4_BELOW = 0.5
+
     def __init__(
         self,
         cdp_session=None,
@@ -63,6 +71,10 @@ class OODAEngine:
         use_l4: bool = True,
         use_l5: bool = True,
         logger=None,
+        locator_cache: Optional[LocatorCache] = None,
+        speculative: bool = False,
+        orient_timeout: Optional[float] = None,
+        adaptive_capture: bool = True,
     ):
         """
         初始的OODA 引擎
@@ -73,23 +85,32 @@ class OODAEngine:
             use_l4: 是否启用 L4 AI 推理
             use_l5: 是否启用 L5 视觉识别
             logger: 日志记录的
+            locator_cache: 自愈定位缓存（可选，命中时跳过 L2-L5）
+            speculative: 是否推测执行漏斗（并发执行并提前发起昂贵层级）
+            orient_timeout: 默认的单步定位预算（秒，None 表示不限）
+            adaptive_capture: 是否按 L1 槽位选择 DOM 抓取配置（只抓取需要的 CDP 数据）
         """
         self.logger = logger or get_logger(__name__)
         self.cdp_session = cdp_session
+        self.locator_cache = locator_cache
 
         # 初始的DOM 服务
-        self.dom_service = DomService(cdp_session)
+        self.dom_service = DomService()
+        self._last_dom_state: Optional[SerializedDOMState] = None
 
         # 初始化五层漏的
         self.l1_engine = L1Engine()
         self.l2_engine = L2Engine()
         self.l3_engine = L3Engine() if use_l3 else None
         self.l4_engine = L4Engine() if use_l4 else None
-        self.l5_engine = L5Engine(cdp_session) if use_l5 else None
+        self.l5_engine = L5Engine() if use_l5 else None
 
         self.use_l3 = use_l3
         self.use_l4 = use_l4
         self.use_l5 = use_l5
+        self.speculative = speculative
+        self.orient_timeout = orient_timeout
+        self.adaptive_capture = adaptive_capture
 
         self.logger.info(
             f"OODA 引擎初始化完的"
@@ -115,16 +136,21 @@ class OODAEngine:
         start_time = datetime.now()
         step.start_time = start_time
         step.status = ActionStatus.RUNNING
+        # 再次执行的步骤：上一次执行的压缩摘要不再对应本次观察
+        step.observation_summary = None
 
         try:
             # 1. Observe: 观察页面状的
-            observation = await self._observe(context)
+            observation = await self._observe(context, step)
             step.observation = observation
             self.logger.debug(f"Observe 完成")
 
             # 2. Orient: 分析定位目标元素
+            orient_start = time.perf_counter()
             orientation = await self._orient(step, observation, context)
+            orient_ms = (time.perf_counter() - orient_start) * 1000
             step.orientation = orientation
+            step.metadata["orient_ms"] = orient_ms
             self.logger.debug(
                 f"Orient 完成 - 策略: {orientation.strategy}, "
                 f"置信的 {orientation.confidence:.2f}"
@@ -144,6 +170,9 @@ class OODAEngine:
             if step.expected_value is not None:
                 await self._verify(step, action, context)
 
+            # 记录或淘汰定位缓存
+            self._update_locator_cache(orientation, action, orient_ms)
+
             # 6. 更新步骤状的
             step.status = action.status
             step.end_time = datetime.now()
@@ -161,6 +190,7 @@ class OODAEngine:
                 metadata={
                     "strategy": orientation.strategy,
                     "confidence": orientation.confidence,
+                    "orient_ms": orient_ms,
                 },
             )
 
@@ -187,12 +217,13 @@ class OODAEngine:
                 duration_ms=step.duration_ms,
             )
 
-    async def _observe(self, context: ExecutionContext) -> Observation:
+    async def _observe(self, context: ExecutionContext, step: Optional[TestStep] = None) -> Observation:
         """
         Observe: 观察当前页面状的
         
         Args:
             context: 执行上下的
+            step: 当前步骤（用于选择抓取配置，None 表示使用会话默认配置）
             
         Returns:
             观察结果
@@ -202,33 +233,26 @@ class OODAEngine:
         observation = Observation()
 
         # 获取 DOM 的
-        if context.target_id:
+        cdp_session = context.cdp_session or self.cdp_session
+        if cdp_session is not None:
             try:
-                # 使用增强的DOM 树（包含事件监听器）
-                if hasattr(self.dom_service, "get_dom_tree_with_events"):
-                    dom_tree = await self.dom_service.get_dom_tree_with_events(
-                        context.target_id
-                    )
-                else:
-                    dom_tree = self.dom_service.get_dom_tree(context.target_id)
-
+                profile = self._select_capture_profile(step)
+                dom_tree = await cdp_session.get_dom_tree(profile=profile)
                 observation.dom_tree = dom_tree
+                observation.metadata["capture_profile"] = profile
+                observation.metadata["cdp_timing"] = dict(getattr(cdp_session, "last_cdp_timing", {}))
 
-                # 收集可见和可交互元素
-                self._collect_elements(dom_tree, observation)
+                # 序列化时一次得到可见和可交互元素
+                self._attach_dom_state(observation, dom_tree)
 
             except Exception as e:
                 self.logger.warning(f"获取 DOM 树失的 {str(e)}")
 
-        # 获取页面信息（如果有 CDP Session的
-        if self.cdp_session and context.target_id:
-            try:
-                # TODO: 的CDP Session 获取 URL, title 的
-                # observation.url = await self.cdp_session.get_url(context.target_id)
-                # observation.title = await self.cdp_session.get_title(context.target_id)
-                pass
-            except Exception as e:
-                self.logger.warning(f"获取页面信息失败: {str(e)}")
+        # 页面信息（会话在导航后更新，URL 参与定位缓存的页面指纹）
+        page_info = getattr(cdp_session, "page_info", None)
+        if page_info is not None:
+            observation.url = page_info.url or ""
+            observation.title = page_info.title or ""
 
         self.logger.debug(
             f"Observe 完成 - "
@@ -238,26 +262,53 @@ class OODAEngine:
 
         return observation
 
-    def _collect_elements(
-        self, node: EnhancedDOMTreeNode, observation: Observation
-    ):
+    def _select_capture_profile(self, step: Optional[TestStep]) -> Optional[str]:
         """
-        递归收集可见和可交互元素
-        
+        根据 L1 槽位选择本次观察的 DOM 抓取配置
+
+        - 将要用到 L4/L5（槽位较弱或包含视觉描述）：full，包含 AX 树
+        - 包含空间关系且启用 L3：layout，包含绘制顺序和 DOMRects
+        - 其他：attributes-only，只请求可见性相关样式
+
         Args:
-            node: DOM 节点
-            observation: 观察结果
+            step: 当前步骤
+
+        Returns:
+            抓取配置名称（None 表示使用会话默认配置）
         """
-        if node.is_visible:
-            observation.visible_elements.append(node)
+        if not self.adaptive_capture or step is None:
+            return None
+
+        action_slot = self.l1_engine.extract_slot(step.description)
+        if self.use_l4 and self.l4_engine and self._predict_ai_needed(action_slot):
+            return "full"
+        if self.use_l5 and self.l5_engine and self.l5_engine._needs_visual_recognition(step.description):
+            return "full"
+        if self.use_l3 and self.l3_engine and self.l3_engine.anchor_locator.has_spatial_relation(step.description):
+            return "layout"
+        return "attributes-only"
+
+    def _attach_dom_state(self, observation: Observation, dom_tree: EnhancedDOMTreeNode):
+        """
+        序列化 DOM 树并挂到观察结果上
 
-        if node.is_clickable or (
-            hasattr(node, "event_listeners") and node.event_listeners
-        ):
-            observation.interactive_elements.append(node)
+        可见/可交互元素直接使用序列化时构建的列表，不再遍历整棵树；
+        与上一次观察的状态比较得到 diff
 
-        for child in node.children:
-            self._collect_elements(child, observation)
+        Args:
+            observation: 观察结果
+            dom_tree: DOM 树根节点
+        """
+        # 结果保留为下一次的 previous_state，需要完整的内容指纹
+        state, timing = self.dom_service.serialize_dom_tree(
+            dom_tree, previous_state=self._last_dom_state, keep_fingerprints=True
+        )
+        self._last_dom_state = state
+
+        observation.dom_state = state
+        observation.visible_elements = state.visible_nodes
+        observation.interactive_elements = state.interactive_nodes
+        observation.metadata["serialize_ms"] = timing.get("serialize_accessible_elements_total", 0) * 1000
 
     async def _orient(
         self,
@@ -282,9 +333,7 @@ class OODAEngine:
 
         # L1: 槽位提取
         try:
-            action_slot = await self.l1_engine.extract_slot(
-                step.description, context.variables
-            )
+            action_slot = self.l1_engine.extract_slot(step.description)
             orientation.action_slot = action_slot
 
             if not action_slot:
@@ -297,100 +346,429 @@ class OODAEngine:
             self.logger.error(f"L1 失败: {str(e)}")
             return orientation
 
-        # L2: 启发式属性匹的
-        try:
-            if observation.dom_tree:
-                l2_matches = await self.l2_engine.match_elements(
-                    observation.dom_tree, action_slot, context.variables
-                )
-
-                if l2_matches:
-                    orientation.candidate_elements = l2_matches
-                    orientation.best_match = l2_matches[0]
-                    orientation.strategy = "L2"
-                    orientation.confidence = l2_matches[0].score
+        # 定位缓存：校验通过时直接使用缓存的元素，跳过 L2-L5
+        if self.locator_cache is not None and observation.interactive_elements:
+            if self._orient_from_cache(step, observation, orientation):
+                return orientation
 
-                    self.logger.debug(
-                        f"L2 匹配成功: {len(l2_matches)} 个候的 "
-                        f"最佳得的 {l2_matches[0].score:.2f}"
-                    )
+        # L2-L5：在步骤的定位预算内执行
+        deadline = self._orient_deadline(step)
+        if self.speculative:
+            await self._orient_speculative(step, observation, context, orientation, deadline)
+        else:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    await self._orient_sequential(step, observation, context, orientation)
+            except TimeoutError:
+                orientation.metadata["timed_out"] = True
+                self.logger.warning(f"Orient 超出定位预算: {step.step_id}")
 
-                    # 如果 L2 得分足够高，直接返回
-                    if l2_matches[0].score >= 0.8:
-                        return orientation
+        self.logger.debug(
+            f"Orient 完成 - 策略: {orientation.strategy}, "
+            f"置信的 {orientation.confidence:.2f}"
+        )
 
-        except Exception as e:
-            self.logger.error(f"L2 失败: {str(e)}")
+        return orientation
 
-        # L3: 空间布局推理
-        if self.use_l3 and self.l3_engine and not orientation.best_match:
-            try:
-                l3_matches = await self.l3_engine.process(
-                    step.description, observation.dom_tree, context.variables
-                )
+    async def _orient_sequential(
+        self,
+        step: TestStep,
+        observation: Observation,
+        context: ExecutionContext,
+        orientation: Orientation,
+    ):
+        """
+        逐层执行 L2-L5，第一个达到置信阈值的层级胜出
 
-                if l3_matches:
-                    orientation.candidate_elements = l3_matches
-                    orientation.best_match = l3_matches[0]
-                    orientation.strategy = "L3"
-                    orientation.confidence = l3_matches[0].score
+        不够置信的结果交给后续层级（L4 在 L2/L3 候选中消歧）；没有置信结果
+        或超出定位预算时，取第一个有匹配结果的层级
 
-                    self.logger.debug(
-                        f"L3 匹配成功: {len(l3_matches)} 个候的 "
-                        f"最佳得的 {l3_matches[0].score:.2f}"
+        Args:
+            step: 测试步骤
+            observation: 观察结果
+            context: 执行上下文
+            orientation: 定向结果
+        """
+        layers = self._enabled_layers()
+        results: Dict[str, List[MatchResult]] = {}
+        try:
+            for layer in layers:
+                try:
+                    matches = await self._run_layer(
+                        layer, step, observation, context, orientation.action_slot, results
                     )
+                except Exception as e:
+                    self.logger.error(f"{layer} 失败: {str(e)}")
+                    continue
+
+                results[layer] = matches
+                if self._is_confident(layer, matches):
+                    self._apply_layer_result(orientation, layer, matches)
+                    return
+        finally:
+            if orientation.best_match is None:
+                winner = next(((layer, results[layer]) for layer in layers if results.get(layer)), None)
+                if winner:
+                    self._apply_layer_result(orientation, *winner)
 
-                    # 如果 L3 得分足够高，直接返回
-                    if l3_matches[0].score >= 0.7:
-                        return orientation
+    async def _orient_speculative(
+        self,
+        step: TestStep,
+        observation: Observation,
+        context: ExecutionContext,
+        orientation: Orientation,
+        deadline: Optional[float],
+    ):
+        """
+        推测执行 L2-L5
 
-            except Exception as e:
-                self.logger.error(f"L3 失败: {str(e)}")
+        L2、L3 并发执行；L1 槽位较弱时立即发起 L4，指令包含视觉描述时立即
+        发起 L5；某层完成但不够置信时提前发起下一个昂贵层级。按层级顺序
+        出现置信结果后取消其余任务；超出定位预算时使用已完成的最佳结果。
 
-        # L4: AI 推理
-        if self.use_l4 and self.l4_engine and not orientation.best_match:
-            try:
-                l4_result = await self.l4_engine.process(
-                    step.description, observation.dom_tree, context.variables
+        Args:
+            step: 测试步骤
+            observation: 观察结果
+            context: 执行上下文
+            orientation: 定向结果
+            deadline: 定位截止时间（事件循环时间，None 表示不限）
+        """
+        layers = self._enabled_layers()
+        tasks: Dict[str, asyncio.Task] = {}
+        results: Dict[str, List[MatchResult]] = {}
+        loop = asyncio.get_running_loop()
+
+        def start(layer: str):
+            if layer in layers and layer not in tasks:
+                tasks[layer] = asyncio.create_task(
+                    self._run_layer_safely(layer, step, observation, context, orientation.action_slot, tasks)
                 )
 
-                if l4_result:
-                    orientation.best_match = l4_result
-                    orientation.strategy = "L4"
-                    orientation.confidence = l4_result.score
+        # 廉价层级并发执行，昂贵层级根据早期信号提前发起
+        start("L2")
+        start("L3")
+        if self._predict_ai_needed(orientation.action_slot):
+            start("L4")
+        if self.l5_engine and self.l5_engine._needs_visual_recognition(step.description):
+            start("L5")
 
-                    self.logger.debug(f"L4 推理成功: 得分 {l4_result.score:.2f}")
+        winner = None
+        timed_out = False
+        try:
+            while True:
+                winner = self._pick_winner(layers, tasks, results)
+                if winner:
+                    break
+
+                pending = [task for layer, task in tasks.items() if layer not in results]
+                if not pending:
+                    next_layer = self._next_layer(layers, tasks, results)
+                    if next_layer is None:
+                        break
+                    start(next_layer)
+                    continue
+
+                timeout = None if deadline is None else deadline - loop.time()
+                if timeout is not None and timeout <= 0:
+                    timed_out = True
+                    break
+
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    timed_out = True
+                    break
+
+                for layer, task in list(tasks.items()):
+                    if task in done:
+                        results[layer] = task.result()
+                        # 不够置信时提前发起下一个层级
+                        if not self._is_confident(layer, results[layer]):
+                            next_layer = self._next_layer(layers, tasks, results)
+                            if next_layer is not None:
+                                start(next_layer)
 
-                    # 如果 L4 得分足够高，直接返回
-                    if l4_result.score >= 0.6:
-                        return orientation
+        finally:
+            cancelled = [layer for layer, task in tasks.items() if not task.done()]
+            for layer in cancelled:
+                tasks[layer].cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        if winner is None:
+            # 没有置信结果：与顺序模式一致，取第一个有匹配结果的层级
+            winner = next(((layer, results[layer]) for layer in layers if results.get(layer)), None)
+        if winner:
+            self._apply_layer_result(orientation, *winner)
+
+        orientation.metadata["speculative"] = {
+            "started": list(tasks),
+            "completed": list(results),
+            "cancelled": cancelled,
+        }
+        if timed_out:
+            orientation.metadata["timed_out"] = True
+            self.logger.warning(f"Orient 超出定位预算: {step.step_id}")
+
+    def _enabled_layers(self) -> List[str]:
+        """按优先级排列的已启用层级"""
+        layers = ["L2"]
+        if self.use_l3 and self.l3_engine:
+            layers.append("L3")
+        if self.use_l4 and self.l4_engine:
+            layers.append("L4")
+        if self.use_l5 and self.l5_engine:
+            layers.append("L5")
+        return layers
+
+    def _orient_deadline(self, step: TestStep) -> Optional[float]:
+        """计算定位截止时间（事件循环时间）"""
+        timeout = step.orient_timeout if step.orient_timeout is not None else self.orient_timeout
+        if timeout is None:
+            return None
+        return asyncio.get_running_loop().time() + timeout
+
+    def _predict_ai_needed(self, action_slot: Optional[ActionSlot]) -> bool:
+        """L1 槽位较弱（无关键词或置信度低）时预测 L2/L3 难以命中"""
+        if action_slot is None:
+            return True
+        return not action_slot.keywords or action_slot.confidence < self.SPECULATE_L4_BELOW
+
+    def _is_confident(self, layer: str, matches: List[MatchResult]) -> bool:
+        """层级结果是否达到该层的置信阈值"""
+        return bool(matches) and matches[0].score >= self.LAYER_THRESHOLDS[layer]
+
+    def _pick_winner(
+        self,
+        layers: List[str],
+        tasks: Dict[str, asyncio.Task],
+        results: Dict[str, List[MatchResult]],
+    ) -> Optional[tuple]:
+        """按层级顺序选出置信结果；更高优先级的层级仍在执行时继续等待"""
+        for layer in layers:
+            if layer in results:
+                if self._is_confident(layer, results[layer]):
+                    return layer, results[layer]
+            elif layer in tasks:
+                return None
+        return None
+
+    def _next_layer(
+        self,
+        layers: List[str],
+        tasks: Dict[str, asyncio.Task],
+        results: Dict[str, List[MatchResult]],
+    ) -> Optional[str]:
+        """下一个未发起的层级（L5 要等 L4 完成后才发起）"""
+        for layer in layers:
+            if layer in tasks:
+                continue
+            if layer == "L5" and "L4" in tasks and "L4" not in results:
+                return None
+            return layer
+        return None
+
+    async def _run_layer_safely(
+        self,
+        layer: str,
+        step: TestStep,
+        observation: Observation,
+        context: ExecutionContext,
+        action_slot: ActionSlot,
+        upstream: Optional[Dict[str, Any]] = None,
+    ) -> List[MatchResult]:
+        """执行单个层级（失败时记录日志并返回空结果）"""
+        try:
+            return await self._run_layer(layer, step, observation, context, action_slot, upstream)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"{layer} 失败: {str(e)}")
+            return []
 
-            except Exception as e:
-                self.logger.error(f"L4 失败: {str(e)}")
+    async def _fetch_candidate_ax(self, context: ExecutionContext, matches: List[MatchResult]):
+        """
+        为 L2 筛选后的候选按需获取 AX 信息（会话未抓取完整 AX 树时）
 
-        # L5: 视觉识别
-        if self.use_l5 and self.l5_engine and not orientation.best_match:
-            try:
-                l5_result = await self.l5_engine.process(
-                    step.description, context.target_id, context.variables
-                )
+        Args:
+            context: 执行上下文
+            matches: L2 匹配结果
+        """
+        cdp_session = context.cdp_session or self.cdp_session
+        fetch_ax_nodes = getattr(cdp_session, "fetch_ax_nodes", None)
+        if fetch_ax_nodes is None or not matches:
+            return
 
-                if l5_result:
-                    orientation.best_match = l5_result
-                    orientation.strategy = "L5"
-                    orientation.confidence = l5_result.score
+        try:
+            await fetch_ax_nodes([match.element for match in matches])
+        except Exception as e:
+            self.logger.warning(f"按需获取 AX 信息失败: {e}")
+
+    @staticmethod
+    async def _upstream_matches(
+        upstream: Dict[str, Any],
+        layer: str,
+        wait: bool,
+    ) -> Optional[List[MatchResult]]:
+        """
+        取其他层级的结果
 
-                    self.logger.debug(f"L5 识别成功: 得分 {l5_result.score:.2f}")
+        Args:
+            upstream: 层级 -> 结果列表或任务
+            layer: 层级
+            wait: 任务未完成时是否等待
 
-            except Exception as e:
-                self.logger.error(f"L5 失败: {str(e)}")
+        Returns:
+            匹配结果，层级未执行（或未完成且不等待）时为 None
+        """
+        value = upstream.get(layer)
+        if isinstance(value, asyncio.Task):
+            if not value.done() and not wait:
+                return None
+            # shield：本层被取消时不连带取消被等待的层级
+            return await asyncio.shield(value)
+        return value
+
+    async def _run_layer(
+        self,
+        layer: str,
+        step: TestStep,
+        observation: Observation,
+        context: ExecutionContext,
+        action_slot: ActionSlot,
+        upstream: Optional[Dict[str, Any]] = None,
+    ) -> List[MatchResult]:
+        """
+        执行单个层级
+
+        Args:
+            layer: 层级（L2-L5）
+            step: 测试步骤
+            observation: 观察结果
+            context: 执行上下文
+            action_slot: L1 槽位
+            upstream: 已执行层级的结果（顺序模式）或任务（推测模式），供 L4 复用
+
+        Returns:
+            匹配结果（按得分降序）
+        """
+        dom_state = observation.dom_state
+        if dom_state is None and layer != "L5":
+            return []
+
+        funnel_context = FunnelContext(instruction=step.description, action_slot=action_slot)
+        if layer == "L2":
+            matches = self.l2_engine.match_elements(dom_state, action_slot)
+            await self._fetch_candidate_ax(context, matches)
+        elif layer == "L3":
+            await self.l3_engine.process(funnel_context, dom_state)
+            matches = funnel_context.l3_candidates
+        elif layer == "L4":
+            # L4 在 L2/L3 候选中消歧，复用已有结果（推测模式下等待 L2 任务）
+            upstream = upstream or {}
+            l2_candidates = await self._upstream_matches(upstream, "L2", wait=True)
+            if l2_candidates is None:
+                l2_candidates = self.l2_engine.match_elements(dom_state, action_slot)
+                await self._fetch_candidate_ax(context, l2_candidates)
+            funnel_context.l2_candidates = l2_candidates
+            funnel_context.l3_candidates = await self._upstream_matches(upstream, "L3", wait=False) or []
+            await self.l4_engine.process(funnel_context, dom_state)
+            matches = funnel_context.l4_candidates
+        else:
+            await self.l5_engine.process(
+                funnel_context, dom_state, context.cdp_session or self.cdp_session
+            )
+            matches = getattr(funnel_context, "l5_candidates", [])
+        return list(matches or [])
+
+    def _apply_layer_result(self, orientation: Orientation, layer: str, matches: List[MatchResult]):
+        """将层级结果写入定向结果"""
+        orientation.candidate_elements = matches
+        orientation.best_match = matches[0]
+        orientation.strategy = layer
+        orientation.confidence = matches[0].score
 
         self.logger.debug(
-            f"Orient 完成 - 策略: {orientation.strategy}, "
-            f"置信的 {orientation.confidence:.2f}"
+            f"{layer} 匹配成功: {len(matches)} 个候选, "
+            f"最佳得分 {matches[0].score:.2f}"
         )
 
-        return orientation
+    def _orient_from_cache(
+        self,
+        step: TestStep,
+        observation: Observation,
+        orientation: Orientation,
+    ) -> bool:
+        """
+        查询定位缓存
+
+        Args:
+            step: 测试步骤
+            observation: 观察结果
+            orientation: 定向结果（命中时写入最佳匹配）
+
+        Returns:
+            是否命中
+        """
+        if not observation.selector_map:
+            observation.selector_map = LocatorCache.build_selector_map(
+                observation.interactive_elements
+            )
+
+        key = LocatorCache.make_key(
+            step.description,
+            page_fingerprint(observation.interactive_elements, observation.url),
+        )
+        orientation.metadata["locator_cache_key"] = key
+
+        cached = self.locator_cache.lookup(key, observation.selector_map)
+        if cached is None:
+            return False
+
+        element, entry = cached
+        orientation.best_match = MatchResult(
+            element=element,
+            score=entry.confidence,
+            match_reasons=[f"定位缓存命中（原始层级 {entry.layer}）"],
+            layer=entry.layer,
+            metadata={"cached": True},
+        )
+        orientation.candidate_elements = [orientation.best_match]
+        orientation.strategy = "cache"
+        orientation.confidence = entry.confidence
+        self.logger.debug(f"定位缓存命中: {step.description} -> {entry.xpath}")
+        return True
+
+    def _update_locator_cache(
+        self,
+        orientation: Orientation,
+        action: Action,
+        orient_ms: float,
+    ):
+        """
+        执行成功后记录漏斗定位结果；缓存的元素执行失败时淘汰条目
+
+        Args:
+            orientation: 定向结果
+            action: 行动结果
+            orient_ms: 定位耗时
+        """
+        key = orientation.metadata.get("locator_cache_key")
+        if self.locator_cache is None or key is None or orientation.best_match is None:
+            return
+
+        if orientation.strategy == "cache":
+            if action.status != ActionStatus.SUCCESS:
+                self.locator_cache.invalidate(key)
+            return
+
+        element = orientation.best_match.element
+        if action.status == ActionStatus.SUCCESS and isinstance(element, EnhancedDOMTreeNode):
+            self.locator_cache.record(
+                key,
+                element,
+                layer=orientation.strategy,
+                confidence=orientation.confidence,
+                resolve_ms=orient_ms,
+            )
 
     async def _decide(
         self,
@@ -416,7 +794,7 @@ class OODAEngine:
         # 检查是否找到目标元的
         if not orientation.best_match:
             decision.should_execute = False
-            decision.reason = "未找到目标元的
+            decision.reason = "未找到目标元素"
             self.logger.warning("Decide: 未找到目标元素，跳过执行")
             return decision
 
@@ -428,8 +806,8 @@ class OODAEngine:
             if orientation.action_slot.value:
                 decision.parameters["value"] = orientation.action_slot.value
 
-            if orientation.action_slot.target_attributes:
-                decision.parameters.update(orientation.action_slot.target_attributes)
+            if orientation.action_slot.attributes:
+                decision.parameters.update(orientation.action_slot.attributes)
 
         # 决策原因
         decision.reason = (
@@ -596,7 +974,7 @@ class OODAEngine:
         """
         duration = decision.parameters.get("duration", 1.0)
 
-        self.logger.info(f"执行等待: {duration} 的)
+        self.logger.info(f"执行等待: {duration} 秒")
 
         await asyncio.sleep(duration)
 
@@ -8,7 +8,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from aerotest.browser.dom.views import EnhancedDOMTreeNode
+from aerotest.browser.dom.views import EnhancedDOMTreeNode, SerializedDOMState
 from aerotest.core.funnel.types import MatchResult
 
 
@@ -29,7 +29,7 @@ class ActionType(str, Enum):
 
 
 class ActionStatus(str, Enum):
-    """操作状的""
+    """操作状态"""
 
     PENDING = "pending"  # 待执的
     RUNNING = "running"  # 执行的
@@ -49,6 +49,9 @@ class Observation:
     # DOM 的
     dom_tree: Optional[EnhancedDOMTreeNode] = None
 
+    # 序列化的 DOM 状态（L2-L5 直接使用，可见/可交互元素列表与其共享）
+    dom_state: Optional[SerializedDOMState] = None
+
     # 页面信息
     url: str = ""
     title: str = ""
@@ -60,6 +63,9 @@ class Observation:
     # 可交互元的
     interactive_elements: List[EnhancedDOMTreeNode] = field(default_factory=list)
 
+    # 可交互元素索引（(稳定哈希, XPath) -> 元素，启用定位缓存时构建）
+    selector_map: Dict[Any, EnhancedDOMTreeNode] = field(default_factory=dict)
+
     # 页面截图（Base64的
     screenshot: Optional[str] = None
 
@@ -70,6 +76,44 @@ class Observation:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class ObservationSummary:
+    """观察摘要
+
+    执行历史压缩旧步骤时保留的轻量信息，完整观察（DOM 树、元素列表、截图）
+    被释放，可选写入磁盘存储
+    """
+
+    # 页面信息
+    url: str = ""
+    title: str = ""
+
+    # 观察时间
+    timestamp: Optional[datetime] = None
+
+    # 页面结构指纹（与定位缓存一致）
+    fingerprint: str = ""
+
+    # 元素数量
+    visible_count: int = 0
+    interactive_count: int = 0
+
+    # 可交互元素的稳定哈希
+    interactive_hashes: List[int] = field(default_factory=list)
+
+    # 候选元素（stable_hash, backend_node_id, score, layer）
+    candidates: List[Dict[str, Any]] = field(default_factory=list)
+
+    # 决策目标元素（stable_hash, backend_node_id, xpath）
+    target: Optional[Dict[str, Any]] = None
+
+    # 耗时（毫秒）
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    # 磁盘存储中的键（未写入时为 None）
+    spill_key: Optional[int] = None
+
+
 @dataclass
 class Orientation:
     """定向（Orient的
@@ -194,12 +238,18 @@ class TestStep:
     # 期望值（用于断言的
     expected_value: Optional[Any] = None
 
+    # 定位预算（秒，None 使用引擎默认值）
+    orient_timeout: Optional[float] = None
+
     # OODA 循环数据
     observation: Optional[Observation] = None
     orientation: Optional[Orientation] = None
     decision: Optional[Decision] = None
     action: Optional[Action] = None
 
+    # 观察摘要（完整观察被执行历史压缩后设置）
+    observation_summary: Optional["ObservationSummary"] = None
+
     # 步骤状的
     status: ActionStatus = ActionStatus.PENDING
 
@@ -247,6 +297,15 @@ class TestCase:
     # 环境配置
     environment: Dict[str, Any] = field(default_factory=dict)
 
+    # 用例超时（秒，None 表示不限制）
+    timeout: Optional[float] = None
+
+    # 依赖的登录/存储状态名称（执行前注入快照，而不是重放登录步骤）
+    requires_state: Optional[str] = None
+
+    # 成功后捕获并保存的存储状态名称（登录等前置用例）
+    provides_state: Optional[str] = None
+
     # 执行耗时（毫秒）
     duration_ms: float = 0.0
 
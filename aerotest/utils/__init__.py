@@ -1,6 +1,15 @@
 """å·¥å·æ¨¡å"""
 
 from aerotest.utils.logger import get_logger
+from aerotest.utils.paths import user_cache_dir
+from aerotest.utils.sqlite_store import SQLiteStore, connect_sqlite, evict_lru, with_hit_rate
 
-__all__ = ["get_logger"]
+__all__ = [
+    "get_logger",
+    "user_cache_dir",
+    "SQLiteStore",
+    "connect_sqlite",
+    "evict_lru",
+    "with_hit_rate",
+]
 
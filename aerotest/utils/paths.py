@@ -0,0 +1,22 @@
+"""缓存路径
+
+各缓存（LLM 响应、定位、槽位、观察、登录态、jieba 词典）默认放在用户缓存
+目录（$XDG_CACHE_HOME 或 ~/.cache）下的 aerotest 子目录，不写入工作目录。
+"""
+
+import os
+from pathlib import Path
+
+
+def user_cache_dir(*parts: str) -> Path:
+    """
+    用户缓存目录下的 aerotest 路径
+
+    Args:
+        parts: aerotest 缓存目录下的相对路径片段
+
+    Returns:
+        $XDG_CACHE_HOME/aerotest/...（未设置时为 ~/.cache/aerotest/...）
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base, "aerotest", *parts)
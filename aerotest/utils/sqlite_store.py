@@ -0,0 +1,121 @@
+"""SQLite 存储工具
+
+响应缓存、槽位缓存、定位缓存和观察存储共用的 SQLite 封装：
+- 跨线程共享的自动提交连接（WAL 模式），首次打开时建表
+- 按时间列淘汰超出容量的行（单条 DELETE）
+- 带命中率的缓存指标
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Union
+
+
+def connect_sqlite(path: Union[str, Path], schema: str) -> sqlite3.Connection:
+    """
+    打开 SQLite 数据库并建表
+
+    Args:
+        path: 文件路径（":memory:" 表示仅内存，其他路径自动创建父目录）
+        schema: 建表脚本
+
+    Returns:
+        数据库连接（可跨线程使用，调用方负责加锁）
+    """
+    path = str(path)
+    if path != ":memory:":
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(schema)
+    return conn
+
+
+def evict_lru(conn: sqlite3.Connection, table: str, max_entries: int, order_by: str) -> int:
+    """
+    按时间列淘汰超出容量的行（保留最近的 max_entries 行）
+
+    Args:
+        conn: 数据库连接
+        table: 表名
+        max_entries: 最大行数
+        order_by: 最近访问（或更新）时间列
+
+    Returns:
+        淘汰的行数
+    """
+    cursor = conn.execute(
+        f"DELETE FROM {table} WHERE rowid IN "
+        f"(SELECT rowid FROM {table} ORDER BY {order_by} DESC LIMIT -1 OFFSET ?)",
+        (max(max_entries, 0),),
+    )
+    return max(cursor.rowcount, 0)
+
+
+def with_hit_rate(stats: dict[str, Any]) -> dict[str, Any]:
+    """
+    复制缓存指标并加上命中率
+
+    Args:
+        stats: 包含 hits 和 misses 的指标
+
+    Returns:
+        指标副本
+    """
+    stats = dict(stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+
+class SQLiteStore:
+    """单表 SQLite 存储基类
+
+    子类设置 TABLE 和 SCHEMA，并在持有 _lock 时访问 _conn。
+
+    Example:
+        ```python
+        class NoteStore(SQLiteStore):
+            TABLE = "notes"
+            SCHEMA = "CREATE TABLE IF NOT EXISTS notes (key TEXT PRIMARY KEY, updated_at REAL)"
+
+        store = NoteStore(user_cache_dir("notes.sqlite3"))
+        print(len(store))
+        store.close()
+        ```
+    """
+
+    TABLE = ""
+    SCHEMA = ""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        打开存储
+
+        Args:
+            path: SQLite 文件路径（":memory:" 表示仅内存）
+        """
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.path, self.SCHEMA)
+
+    def _evict_lru(self, max_entries: int, order_by: str) -> int:
+        """按时间列淘汰超出容量的行（调用方持有锁）"""
+        return evict_lru(self._conn, self.TABLE, max_entries, order_by)
+
+    def clear(self):
+        """清空表"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.TABLE}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()
+        return count
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
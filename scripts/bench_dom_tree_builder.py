@@ -0,0 +1,252 @@
+"""增强 DOM 树构建基准测试
+
+对比旧版递归协程构建与 EnhancedDOMTreeBuilder（显式栈同步构建）
+在 10k / 50k / 100k 节点合成页面上的耗时、峰值内存和事件循环停顿
+
+用法:
+    python scripts/bench_dom_tree_builder.py [--sizes 10000 50000 100000] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aerotest.browser.dom.enhanced_snapshot import build_snapshot_lookup  # noqa: E402
+from aerotest.browser.dom.tree_builder import (  # noqa: E402
+    EnhancedDOMTreeBuilder,
+    build_ax_node,
+    is_node_visible,
+)
+from aerotest.browser.dom.views import (  # noqa: E402
+    DOMRect,
+    EnhancedDOMTreeNode,
+    NodeType,
+    TargetAllTrees,
+)
+
+
+def make_payload(node_count: int, fanout: int = 8) -> TargetAllTrees:
+    """
+    生成合成的 CDP 数据（DOM 树 + 快照 + AX 树）
+
+    Args:
+        node_count: 元素节点数量
+        fanout: 每个节点的子节点数量
+
+    Returns:
+        TargetAllTrees
+    """
+    strings = ["block", "visible", "1", "auto", "default", "auto", "static", "rgba(0, 0, 0, 0)"]
+    style_row = [0, 1, 2, 3, 3, 3, 4, 5, 6, 7]
+
+    root = {"nodeId": 1, "backendNodeId": 1, "nodeType": 9, "nodeName": "#document", "children": []}
+    backend_ids = [1]
+    layout_node_index = []
+    bounds = []
+    styles = []
+    ax_nodes = []
+
+    queue = [root]
+    next_id = 2
+    head = 0
+    while next_id <= node_count + 1:
+        parent = queue[head]
+        head += 1
+        for _ in range(fanout):
+            if next_id > node_count + 1:
+                break
+            node = {
+                "nodeId": next_id,
+                "backendNodeId": next_id,
+                "parentId": parent["nodeId"],
+                "nodeType": 1,
+                "nodeName": "DIV" if next_id % 7 else "BUTTON",
+                "attributes": ["id", f"n{next_id}", "class", "item"],
+                "children": [],
+            }
+            parent["children"].append(node)
+            queue.append(node)
+
+            layout_node_index.append(len(backend_ids))
+            backend_ids.append(next_id)
+            bounds.append([float(next_id % 1280), float(next_id), 100.0, 20.0])
+            styles.append(style_row)
+            if next_id % 7 == 0:
+                ax_nodes.append({
+                    "nodeId": str(next_id),
+                    "backendNodeId": next_id,
+                    "role": {"value": "button"},
+                    "name": {"value": f"按钮 {next_id}"},
+                })
+            next_id += 1
+
+    snapshot = {
+        "strings": strings,
+        "documents": [{
+            "nodes": {"backendNodeId": backend_ids},
+            "layout": {
+                "nodeIndex": layout_node_index,
+                "bounds": bounds,
+                "styles": styles,
+            },
+        }],
+    }
+
+    return TargetAllTrees(
+        snapshot=snapshot,
+        dom_tree={"root": root},
+        ax_tree={"nodes": ax_nodes},
+        device_pixel_ratio=1.0,
+        cdp_timing={},
+    )
+
+
+async def legacy_build(all_trees: TargetAllTrees) -> EnhancedDOMTreeNode:
+    """旧版实现：每个节点一个递归协程"""
+    snapshot_lookup = build_snapshot_lookup(all_trees.snapshot, all_trees.device_pixel_ratio)
+    ax_tree_lookup = {n["backendNodeId"]: n for n in all_trees.ax_tree["nodes"]}
+    lookup: dict[int, EnhancedDOMTreeNode] = {}
+
+    async def construct(node: dict, offset: DOMRect) -> EnhancedDOMTreeNode:
+        offset = DOMRect(x=offset.x, y=offset.y, width=offset.width, height=offset.height)
+        if node["nodeId"] in lookup:
+            return lookup[node["nodeId"]]
+
+        backend_node_id = node.get("backendNodeId", 0)
+        ax_node = ax_tree_lookup.get(backend_node_id)
+        attrs = node.get("attributes") or []
+        snapshot_data = snapshot_lookup.get(backend_node_id)
+        absolute_position = None
+        if snapshot_data and snapshot_data.bounds:
+            absolute_position = DOMRect(
+                x=snapshot_data.bounds.x + offset.x,
+                y=snapshot_data.bounds.y + offset.y,
+                width=snapshot_data.bounds.width,
+                height=snapshot_data.bounds.height,
+            )
+        dom_tree_node = EnhancedDOMTreeNode(
+            node_id=node["nodeId"],
+            backend_node_id=backend_node_id,
+            node_type=NodeType(node.get("nodeType", 1)),
+            node_name=node.get("nodeName", ""),
+            node_value=node.get("nodeValue", ""),
+            attributes={attrs[i]: attrs[i + 1] for i in range(0, len(attrs) - 1, 2)},
+            is_scrollable=False,
+            is_visible=None,
+            absolute_position=absolute_position,
+            target_id="bench",
+            frame_id=None,
+            session_id="bench",
+            content_document=None,
+            shadow_root_type=None,
+            shadow_roots=None,
+            parent_node=lookup.get(node.get("parentId")),
+            children_nodes=None,
+            ax_node=build_ax_node(ax_node) if ax_node else None,
+            snapshot_node=snapshot_data,
+        )
+        lookup[node["nodeId"]] = dom_tree_node
+        if node.get("children"):
+            dom_tree_node.children_nodes = []
+            for child in node["children"]:
+                dom_tree_node.children_nodes.append(await construct(child, offset))
+        dom_tree_node.is_visible = is_node_visible(dom_tree_node)
+        return dom_tree_node
+
+    return await construct(all_trees.dom_tree["root"], DOMRect(x=0.0, y=0.0, width=0.0, height=0.0))
+
+
+def measure(func, repeat: int) -> tuple[float, float]:
+    """返回 (最佳耗时 ms, 峰值内存 MB)"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024 / 1024
+
+
+async def max_loop_stall(build) -> float:
+    """
+    构建期间事件循环的最大停顿（ms）
+
+    Args:
+        build: 返回可等待对象的构建函数
+    """
+    max_gap = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal max_gap
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            max_gap = max(max_gap, now - last)
+            last = now
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    await build()
+    done = True
+    await ticker_task
+    return max_gap * 1000
+
+
+async def measure_stalls(all_trees: TargetAllTrees) -> dict[str, float]:
+    """测量三种构建方式的事件循环停顿"""
+
+    async def inline_build():
+        EnhancedDOMTreeBuilder(all_trees, "bench", "bench").build()
+
+    async def thread_build():
+        builder = EnhancedDOMTreeBuilder(all_trees, "bench", "bench")
+        await asyncio.to_thread(builder.build)
+
+    return {
+        "递归协程": await max_loop_stall(lambda: legacy_build(all_trees)),
+        "显式栈": await max_loop_stall(inline_build),
+        "显式栈+线程": await max_loop_stall(thread_build),
+    }
+
+
+def main():
+    """运行基准测试"""
+    parser = argparse.ArgumentParser(description="增强 DOM 树构建基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'节点数':>8} | {'实现':<10} | {'耗时(ms)':>10} | {'峰值内存(MB)':>12} | {'循环停顿(ms)':>12}")
+    print("-" * 68)
+
+    for size in args.sizes:
+        all_trees = make_payload(size)
+
+        legacy_ms, legacy_mb = measure(lambda: asyncio.run(legacy_build(all_trees)), args.repeat)
+        builder_ms, builder_mb = measure(
+            lambda: EnhancedDOMTreeBuilder(all_trees, "bench", "bench").build(), args.repeat
+        )
+
+        stalls = asyncio.run(measure_stalls(all_trees))
+
+        print(f"{size:>8} | {'递归协程':<10} | {legacy_ms:>10.1f} | {legacy_mb:>12.1f} | {stalls['递归协程']:>12.1f}")
+        print(f"{size:>8} | {'显式栈':<10} | {builder_ms:>10.1f} | {builder_mb:>12.1f} | {stalls['显式栈']:>12.1f}")
+        print(f"{size:>8} | {'显式栈+线程':<10} | {'-':>10} | {'-':>12} | {stalls['显式栈+线程']:>12.1f}")
+        print(f"{'':>8} | 加速比 {legacy_ms / builder_ms:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
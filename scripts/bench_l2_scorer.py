@@ -0,0 +1,96 @@
+"""L2 评分基准测试
+
+对比 Scorer 逐个元素评分与批量评分在大页面上的耗时，并校验排序一致
+
+用法:
+    python scripts/bench_l2_scorer.py [--sizes 1000 5000] [--keywords 12] [--repeat 3]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aerotest.core.funnel.l2.scorer import Scorer  # noqa: E402
+from aerotest.core.funnel.types import ActionSlot, ActionType, ElementType  # noqa: E402
+
+VOCABULARY = [
+    "提交", "登录", "注册", "用户名", "密码", "搜索", "取消", "确定", "下一步", "购物车",
+    "submit", "login", "signup", "user", "username", "password", "search", "cancel",
+    "confirm", "next", "cart", "btn", "input", "field", "form", "item", "list", "nav",
+]
+
+
+def make_elements(count: int, seed: int = 0) -> list:
+    """
+    生成合成候选元素
+
+    Args:
+        count: 元素数量
+        seed: 随机种子
+    """
+    rng = random.Random(seed)
+    elements = []
+    for i in range(count):
+        attributes = {"id": f"{rng.choice(VOCABULARY)}-{i}"}
+        for attr in ("name", "placeholder", "aria-label", "title", "innerText"):
+            if rng.random() < 0.5:
+                attributes[attr] = " ".join(rng.sample(VOCABULARY, rng.randint(1, 3)))
+        elements.append(SimpleNamespace(
+            backend_node_id=i,
+            tag_name=rng.choice(["button", "input", "a", "div", "span"]),
+            attributes=attributes,
+        ))
+    return elements
+
+
+def measure(fn, repeat: int) -> tuple[float, list]:
+    """返回最短耗时（毫秒）和最后一次结果"""
+    best = float("inf")
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best, result
+
+
+def main():
+    """运行基准测试"""
+    parser = argparse.ArgumentParser(description="L2 评分基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000])
+    parser.add_argument("--keywords", type=int, default=12, help="同义词扩展后的关键词数量")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    scorer = Scorer()
+    slot = ActionSlot(
+        action=ActionType.CLICK,
+        target_type=ElementType.BUTTON,
+        keywords=random.Random(1).sample(VOCABULARY, args.keywords),
+    )
+
+    print(f"{'候选数':>8} | {'实现':<6} | {'耗时(ms)':>10}")
+    print("-" * 32)
+
+    for size in args.sizes:
+        elements = make_elements(size)
+        scalar_ms, scalar = measure(lambda: scorer.score_elements(elements, slot, batch=False), args.repeat)
+        batch_ms, batch = measure(lambda: scorer.score_elements(elements, slot), args.repeat)
+
+        if [(r.element.backend_node_id, r.score) for r in scalar] != [
+            (r.element.backend_node_id, r.score) for r in batch
+        ]:
+            raise SystemExit(f"{size} 个候选时批量评分结果不一致")
+
+        print(f"{size:>8} | {'逐个':<6} | {scalar_ms:>10.1f}")
+        print(f"{size:>8} | {'批量':<6} | {batch_ms:>10.1f}")
+        print(f"{'':>8} | 加速比 {scalar_ms / batch_ms:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
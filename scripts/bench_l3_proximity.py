@@ -0,0 +1,100 @@
+"""L3 邻近检测基准测试
+
+对比逐个计算所有元素与通过空间索引查询的耗时，并校验结果一致
+
+用法:
+    python scripts/bench_l3_proximity.py [--sizes 1000 5000] [--queries 50] [--repeat 3]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aerotest.browser.dom.views import DOMRect  # noqa: E402
+from aerotest.core.funnel.l3.proximity_detector import ProximityDetector  # noqa: E402
+from aerotest.core.funnel.l3.spatial_index import SpatialIndex  # noqa: E402
+from aerotest.core.funnel.l3.types import Direction  # noqa: E402
+
+DIRECTIONS = [None, Direction.RIGHT, Direction.LEFT, Direction.BELOW, Direction.ABOVE]
+
+
+def make_elements(count: int, seed: int = 0) -> list:
+    """
+    生成分布在长页面上的合成元素
+
+    Args:
+        count: 元素数量
+        seed: 随机种子
+    """
+    rng = random.Random(seed)
+    height = max(2000, count * 4)
+    return [
+        SimpleNamespace(
+            backend_node_id=i,
+            absolute_position=DOMRect(
+                x=rng.uniform(0, 1400),
+                y=rng.uniform(0, height),
+                width=rng.uniform(20, 300),
+                height=rng.uniform(16, 60),
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def measure(fn, repeat: int) -> tuple[float, list]:
+    """返回最短耗时（毫秒）和最后一次结果"""
+    best = float("inf")
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best, result
+
+
+def main():
+    """运行基准测试"""
+    parser = argparse.ArgumentParser(description="L3 邻近检测基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000])
+    parser.add_argument("--queries", type=int, default=50, help="每个页面的锚点查询次数")
+    parser.add_argument("--max-distance", type=float, default=300.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    detector = ProximityDetector(max_distance=args.max_distance)
+
+    print(f"{'元素数':>8} | {'实现':<8} | {'耗时(ms)':>10}")
+    print("-" * 34)
+
+    for size in args.sizes:
+        elements = make_elements(size)
+        rng = random.Random(1)
+        queries = [(rng.choice(elements), rng.choice(DIRECTIONS)) for _ in range(args.queries)]
+
+        def run(shared: bool) -> list:
+            index = SpatialIndex(elements) if shared else None
+            return [
+                [(r.element.backend_node_id, r.score) for r in
+                 detector.find_nearby_elements(anchor, elements, direction, index=index)]
+                for anchor, direction in queries
+            ]
+
+        per_query_ms, per_query = measure(lambda: run(False), args.repeat)
+        shared_ms, shared = measure(lambda: run(True), args.repeat)
+
+        if per_query != shared:
+            raise SystemExit(f"{size} 个元素时索引查询结果不一致")
+
+        print(f"{size:>8} | {'每次构建':<8} | {per_query_ms:>10.1f}")
+        print(f"{size:>8} | {'共享索引':<8} | {shared_ms:>10.1f}")
+        print(f"{'':>8} | 加速比 {per_query_ms / shared_ms:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
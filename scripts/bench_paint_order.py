@@ -0,0 +1,109 @@
+"""绘制顺序遮挡计算基准测试
+
+对比 PaintOrderRemover 的 pure / grid 后端在合成页面上的耗时，
+并校验两者标记的 ignored_by_paint_order 完全一致
+
+用法:
+    python scripts/bench_paint_order.py [--sizes 1000 5000] [--repeat 3]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aerotest.browser.dom.paint_order import OCCLUSION_BACKENDS, PaintOrderRemover  # noqa: E402
+from aerotest.browser.dom.views import DOMRect, SimplifiedNode  # noqa: E402
+
+OPAQUE = {"background-color": "rgb(255, 255, 255)", "opacity": "1"}
+TRANSPARENT = {"background-color": "rgba(0, 0, 0, 0)"}
+
+
+def make_tree(node_count: int, seed: int = 0) -> SimplifiedNode:
+    """
+    生成合成页面：纵向排列的卡片列表，每张卡片内有若干小元素，
+    另有少量覆盖大片区域的浮层
+
+    Args:
+        node_count: 带绘制顺序的节点数量
+        seed: 随机种子
+
+    Returns:
+        简化树根节点
+    """
+    rng = random.Random(seed)
+
+    def node(x, y, width, height, paint_order, styles):
+        snapshot = SimpleNamespace(
+            paint_order=paint_order,
+            bounds=DOMRect(x=x, y=y, width=width, height=height),
+            computed_styles=styles,
+        )
+        return SimplifiedNode(original_node=SimpleNamespace(snapshot_node=snapshot), children=[])
+
+    root = node(0, 0, 1920, node_count * 4, 0, OPAQUE)
+    for i in range(node_count):
+        if rng.random() < 0.01:
+            # 浮层 / 弹窗
+            y = rng.uniform(0, node_count * 4)
+            child = node(rng.uniform(0, 800), y, rng.uniform(400, 1100), rng.uniform(300, 900), i, OPAQUE)
+        else:
+            row, col = divmod(i, 12)
+            child = node(col * 160 + rng.uniform(0, 20), row * 48 + rng.uniform(0, 8),
+                         rng.uniform(40, 150), rng.uniform(16, 40), i,
+                         rng.choice([OPAQUE, TRANSPARENT, None]))
+        root.children.append(child)
+    return root
+
+
+def flags(root: SimplifiedNode) -> list[bool]:
+    """收集所有节点的 ignored_by_paint_order"""
+    return [root.ignored_by_paint_order] + [c.ignored_by_paint_order for c in root.children]
+
+
+def measure(node_count: int, backend: str, repeat: int) -> tuple[float, list[bool]]:
+    """
+    测量一次遮挡计算的最短耗时
+
+    Returns:
+        (毫秒, ignored 标记)
+    """
+    best = float("inf")
+    result: list[bool] = []
+    for _ in range(repeat):
+        root = make_tree(node_count)
+        start = time.perf_counter()
+        PaintOrderRemover(root, occlusion_backend=backend).calculate_paint_order()
+        best = min(best, (time.perf_counter() - start) * 1000)
+        result = flags(root)
+    return best, result
+
+
+def main():
+    """运行基准测试"""
+    parser = argparse.ArgumentParser(description="绘制顺序遮挡计算基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'节点数':>8} | {'后端':<6} | {'耗时(ms)':>10} | {'被遮挡':>6}")
+    print("-" * 42)
+
+    for size in args.sizes:
+        timings = {}
+        results = {}
+        for backend in OCCLUSION_BACKENDS:
+            timings[backend], results[backend] = measure(size, backend, args.repeat)
+            print(f"{size:>8} | {backend:<6} | {timings[backend]:>10.1f} | {sum(results[backend]):>6}")
+
+        if results["grid"] != results["pure"]:
+            raise SystemExit(f"{size} 个节点时 grid 与 pure 结果不一致")
+        print(f"{'':>8} | 加速比 {timings['pure'] / timings['grid']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""启动耗时基准测试
+
+在独立子进程中测量从启动到 L1/L3 首次分词完成的耗时，对比：
+- 旧方式：每构造一个组件就对所有关键词调用 jieba.add_word
+- 冷缓存：首次运行，构建并写入预构建词典
+- 热缓存：直接加载预构建词典
+- 热缓存 + 后台预热：启动时 warmup()，与其他启动工作（模拟 300ms 浏览器连接）并行
+
+另外测量 `aerotest run` / `aerotest serve` 命令行的启动耗时（需要安装 click）。
+
+用法:
+    python scripts/bench_startup.py [--repeat 3]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+LEGACY = """
+import jieba
+from aerotest.core.funnel.segmenter import custom_words
+words = custom_words()
+# SlotFiller(IntentRecognizer + EntityExtractor) + AnchorLocator，各构造一次
+for _ in range(3):
+    for word, freq in words:
+        jieba.add_word(word, freq=freq)
+list(jieba.cut("点击登录按钮右边的输入框"))
+"""
+
+CURRENT = """
+from aerotest.core.funnel.l1.l1_engine import L1Engine
+from aerotest.core.funnel.l3.anchor_locator import AnchorLocator
+L1Engine().extract_slot("点击登录按钮右边的输入框")
+AnchorLocator().extract_anchor("点击登录按钮右边的输入框")
+"""
+
+WARMUP = """
+import time
+from aerotest.core.funnel.segmenter import warmup
+warmup()
+time.sleep(0.3)  # 模拟连接浏览器等启动工作
+""" + CURRENT
+
+
+def run_python(code: str, cwd: str) -> float:
+    """在子进程中执行代码，返回耗时（毫秒）"""
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, check=True, capture_output=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_cli(args: list[str]) -> float | None:
+    """执行 aerotest 命令行，返回耗时（毫秒），click 未安装时返回 None"""
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "aerotest.cli", *args],
+        cwd=ROOT, env=env, capture_output=True,
+    )
+    if result.returncode != 0:
+        return None
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    """运行基准测试"""
+    parser = argparse.ArgumentParser(description="启动耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'场景':<20} | {'耗时(ms)':>10}")
+    print("-" * 35)
+
+    with tempfile.TemporaryDirectory() as legacy_dir:
+        legacy = min(run_python(LEGACY, legacy_dir) for _ in range(args.repeat))
+    print(f"{'旧方式 add_word':<20} | {legacy:>10.1f}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = run_python(CURRENT, cache_dir)
+        warm = min(run_python(CURRENT, cache_dir) for _ in range(args.repeat))
+        background = min(run_python(WARMUP, cache_dir) for _ in range(args.repeat))
+    print(f"{'冷缓存':<20} | {cold:>10.1f}")
+    print(f"{'热缓存':<20} | {warm:>10.1f}")
+    print(f"{'热缓存+后台预热':<20} | {background:>10.1f}  (含 300ms 模拟启动工作)")
+    print(f"{'':<20} | 加速比 {legacy / warm:.2f}x")
+
+    for command in (["run", "--help"], ["serve", "--help"]):
+        elapsed = run_cli(command)
+        label = "aerotest " + " ".join(command)
+        if elapsed is None:
+            print(f"{label:<20} | {'跳过':>10}  (命令行不可用)")
+        else:
+            print(f"{label:<20} | {elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
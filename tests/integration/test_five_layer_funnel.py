@@ -137,8 +137,8 @@ class TestFiveLayerFunnelIntegration:
         ]
         
         return SerializedDOMState(
-            simplified_nodes=nodes,
-            selector_map={},
+            _root=None,
+            selector_map={node.backend_node_id: node for node in nodes},
         )
     
     # ====================================================================
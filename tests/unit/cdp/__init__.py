@@ -0,0 +1 @@
+"""CDP 单元测试"""
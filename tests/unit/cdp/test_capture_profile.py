@@ -0,0 +1,200 @@
+"""按需 DOM 抓取配置单元测试"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from aerotest.browser.cdp import CAPTURE_PROFILES, CDPSession
+from aerotest.browser.dom.enhanced_snapshot import (
+    REQUIRED_COMPUTED_STYLES,
+    VISIBILITY_COMPUTED_STYLES,
+)
+from tests.unit.dom_helpers import document, element
+
+
+class FakeDomain:
+    """记录调用并返回预设结果的 CDP 域"""
+
+    def __init__(self, calls: list, **handlers):
+        self._calls = calls
+        self._handlers = handlers
+
+    def __getattr__(self, name):
+        async def method(params=None, session_id=None):
+            self._calls.append((name, params))
+            handler = self._handlers.get(name)
+            if handler is None:
+                return {}
+            return handler(params or {})
+        return method
+
+
+def make_session(calls: list, **kwargs) -> CDPSession:
+    """构造带假 CDP 客户端的会话，页面 body 下有一个按钮"""
+    button = element(4, "BUTTON", [], attributes={"id": "login"})
+    root = document(element(2, "HTML", [element(3, "BODY", [button])]))
+
+    def capture_snapshot(params):
+        # 按请求的样式列表返回样式值的字符串索引
+        strings = list(params["computedStyles"])
+        values = {"display": "block", "visibility": "visible", "opacity": "1", "cursor": "pointer"}
+        style = []
+        for name in params["computedStyles"]:
+            strings.append(values.get(name, "auto"))
+            style.append(len(strings) - 1)
+        return {"strings": strings, "documents": [{
+            "nodes": {"backendNodeId": [3, 4]},
+            "layout": {"nodeIndex": [0, 1], "bounds": [[0, 0, 800, 600], [10, 10, 80, 30]],
+                       "styles": [style, style]},
+        }]}
+
+    def partial_ax(params):
+        return {"nodes": [{"nodeId": "ax4", "backendDOMNodeId": params["backendNodeId"],
+                           "role": {"value": "button"}, "name": {"value": "登录"}}]}
+
+    send = SimpleNamespace(
+        DOM=FakeDomain(calls, getDocument=lambda p: {"root": root}),
+        DOMSnapshot=FakeDomain(calls, captureSnapshot=capture_snapshot),
+        Page=FakeDomain(calls, getFrameTree=lambda p: {"frameTree": {"frame": {"id": "f1"}}}),
+        Accessibility=FakeDomain(calls, getFullAXTree=lambda p: {"nodes": []}, getPartialAXTree=partial_ax),
+    )
+    connection = SimpleNamespace(client=SimpleNamespace(send=send))
+    return CDPSession(connection, SimpleNamespace(target_id="t1"), **kwargs)
+
+
+def call_names(calls: list) -> list[str]:
+    """调用记录中的方法名"""
+    return [name for name, _ in calls]
+
+
+class TestCaptureProfile:
+    """测试 CDPSession 按抓取配置获取 DOM"""
+
+    @pytest.mark.asyncio
+    async def test_attributes_only(self):
+        """测试只请求可见性样式，不请求绘制顺序、DOMRects 和 AX 树"""
+        calls = []
+        session = make_session(calls)
+
+        root = await session.get_dom_tree(profile="attributes-only")
+
+        params = dict(calls)["captureSnapshot"]
+        assert params["computedStyles"] == VISIBILITY_COMPUTED_STYLES
+        assert params["includePaintOrder"] is False
+        assert params["includeDOMRects"] is False
+        assert "getFrameTree" not in call_names(calls)
+        assert "getFullAXTree" not in call_names(calls)
+
+        button = root.children[0].children[0].children[0]
+        assert button.snapshot_node.cursor_style == "pointer"
+        assert button.is_visible is True
+
+        assert "capture.attributes-only" in session.last_cdp_timing
+        assert session.capture_stats["attributes-only"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_full_is_default(self):
+        """测试默认完整抓取（保持原有行为）"""
+        calls = []
+        session = make_session(calls)
+
+        await session.get_dom_tree()
+
+        params = dict(calls)["captureSnapshot"]
+        assert params["computedStyles"] == REQUIRED_COMPUTED_STYLES
+        assert params["includePaintOrder"] is True
+        assert params["includeDOMRects"] is True
+        assert "getFullAXTree" in call_names(calls)
+        assert "capture.full" in session.last_cdp_timing
+
+        layout_session = make_session([], capture_profile="layout")
+        assert layout_session.capture_profile is CAPTURE_PROFILES["layout"]
+
+    @pytest.mark.asyncio
+    async def test_mirror_reused_when_covered(self):
+        """测试镜像的抓取配置覆盖本次需要时复用，不足时按新配置完整抓取"""
+        calls = []
+        session = make_session(calls, enable_dom_mirror=True)
+
+        await session.get_dom_tree(profile="layout")
+        await session.get_dom_tree(profile="attributes-only")
+        assert call_names(calls).count("captureSnapshot") == 1
+        assert "dom_mirror_refresh" in session.last_cdp_timing
+
+        await session.get_dom_tree(profile="full")
+        assert call_names(calls).count("captureSnapshot") == 2
+        assert "getFullAXTree" in call_names(calls)
+        assert session.dom_mirror.profile is CAPTURE_PROFILES["full"]
+        assert set(session.capture_stats) == {"layout", "full"}
+
+    @pytest.mark.asyncio
+    async def test_stable_hash_independent_of_profile(self):
+        """测试同一页面在完整抓取和只抓属性时元素的稳定哈希一致"""
+        full_session = make_session([])
+        full_session.connection.client.send.Accessibility = FakeDomain([], getFullAXTree=lambda p: {"nodes": [
+            {"nodeId": "ax4", "backendNodeId": 4, "role": {"value": "button"}, "name": {"value": "登录"}},
+        ]})
+        attributes_session = make_session([])
+
+        full_root = await full_session.get_dom_tree(profile="full")
+        attributes_root = await attributes_session.get_dom_tree(profile="attributes-only")
+
+        full_button = full_root.children[0].children[0].children[0]
+        attributes_button = attributes_root.children[0].children[0].children[0]
+        assert full_button.ax_node.name == "登录"
+        assert attributes_button.ax_node is None
+        assert full_button.compute_stable_hash() == attributes_button.compute_stable_hash()
+
+
+class TestLazyAX:
+    """测试延迟 AX 模式"""
+
+    @pytest.mark.asyncio
+    async def test_partial_fetch_cached(self):
+        """测试抓取时跳过完整 AX 树，按需获取的结果按 DOM 版本缓存，且不改变稳定哈希"""
+        calls = []
+        session = make_session(calls, lazy_ax=True)
+
+        root = await session.get_dom_tree()
+        button = root.children[0].children[0].children[0]
+        assert "getFullAXTree" not in call_names(calls)
+        assert button.ax_node is None
+        hash_without_ax = button.compute_stable_hash()
+
+        assert await session.fetch_ax_nodes([button, button]) == 1
+        assert button.ax_node.role == "button"
+        assert button.ax_node.name == "登录"
+        assert button.compute_stable_hash() == hash_without_ax
+        assert "partial_ax" in session.last_cdp_timing
+
+        assert await session.fetch_ax_nodes([button]) == 0
+        assert call_names(calls).count("getPartialAXTree") == 1
+        assert session.ax_stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidated_by_dom_version(self):
+        """测试 DOM 变更或重新抓取后重新获取"""
+        calls = []
+        session = make_session(calls, lazy_ax=True, enable_dom_mirror=True)
+
+        root = await session.get_dom_tree()
+        button = root.children[0].children[0].children[0]
+        await session.fetch_ax_nodes([button])
+
+        session.dom_mirror.on_attribute_modified({"nodeId": 4, "name": "class", "value": "active"})
+        assert await session.fetch_ax_nodes([button]) == 1
+
+        root = await session.get_dom_tree(force_full=True)
+        assert await session.fetch_ax_nodes([root.children[0].children[0].children[0]]) == 1
+        assert call_names(calls).count("getPartialAXTree") == 3
+
+    @pytest.mark.asyncio
+    async def test_skipped_when_full_tree_captured(self):
+        """测试已抓取完整 AX 树时不再按需获取"""
+        calls = []
+        session = make_session(calls)
+
+        root = await session.get_dom_tree()
+
+        assert await session.fetch_ax_nodes([root.children[0].children[0].children[0]]) == 0
+        assert "getPartialAXTree" not in call_names(calls)
@@ -0,0 +1,212 @@
+"""隔离浏览器上下文池单元测试"""
+
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from aerotest.browser.cdp.connection import CDPConnection
+from aerotest.browser.cdp.types import BrowserContextPoolConfig, CDPConnectionConfig
+
+
+class FakeTarget:
+    """模拟 Target 域：记录上下文和页面的创建与销毁"""
+
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.contexts: set[str] = set()
+        self.calls: list[str] = []
+        self.fail_create = False
+
+    async def createBrowserContext(self, params=None, session_id=None):
+        self.calls.append("createBrowserContext")
+        if self.fail_create:
+            raise RuntimeError("浏览器拒绝创建上下文")
+        context_id = f"ctx-{next(self.ids)}"
+        self.contexts.add(context_id)
+        return {"browserContextId": context_id}
+
+    async def createTarget(self, params=None, session_id=None):
+        self.calls.append("createTarget")
+        assert params["browserContextId"] in self.contexts
+        return {"targetId": f"target-{params['browserContextId']}"}
+
+    async def disposeBrowserContext(self, params=None, session_id=None):
+        self.calls.append("disposeBrowserContext")
+        self.contexts.discard(params["browserContextId"])
+        return {}
+
+    async def attachToTarget(self, params=None, session_id=None):
+        return {"sessionId": f"session-{params['targetId']}"}
+
+    async def detachFromTarget(self, params=None, session_id=None):
+        self.calls.append("detachFromTarget")
+        return {}
+
+
+class FakeSend:
+    """模拟 client.send：支持属性调用和按方法名调用"""
+
+    def __init__(self, target: FakeTarget):
+        self.Target = target
+        self.Page = SimpleNamespace(setLifecycleEventsEnabled=self._noop)
+
+    async def _noop(self, params=None, session_id=None):
+        return {}
+
+    async def __call__(self, method, params=None, session_id=None):
+        return {}
+
+
+class FakeRegister:
+    """模拟 client.register：接受任意事件处理器"""
+
+    def __getattr__(self, domain):
+        return _EventRegistry()
+
+
+class _EventRegistry:
+    """某个域的事件注册入口"""
+
+    def __getattr__(self, event):
+        return lambda handler: None
+
+
+@pytest.fixture
+def target():
+    """模拟的 Target 域"""
+    return FakeTarget()
+
+
+@pytest.fixture
+def connection(target):
+    """使用假 CDP 客户端的连接"""
+    connection = CDPConnection(CDPConnectionConfig())
+    connection.client = SimpleNamespace(send=FakeSend(target), register=FakeRegister())
+    connection._connected = True
+    return connection
+
+
+class TestBrowserContextPool:
+    """测试 BrowserContextPool"""
+
+    @pytest.mark.asyncio
+    async def test_prewarm(self, connection, target):
+        """测试启动时预热上下文"""
+        pool = await connection.create_context_pool(BrowserContextPoolConfig(max_size=4, prewarm=3))
+
+        assert pool.stats["idle"] == 3
+        assert pool.stats["created"] == 3
+        assert len(target.contexts) == 3
+
+    @pytest.mark.asyncio
+    async def test_acquire_creates_on_demand(self, connection, target):
+        """测试池未满时按需创建"""
+        pool = await connection.create_context_pool(BrowserContextPoolConfig(max_size=2))
+
+        first = await pool.acquire()
+        second = await pool.acquire()
+
+        assert first.browser_context_id != second.browser_context_id
+        assert first.target_info.target_id == f"target-{first.browser_context_id}"
+        assert pool.stats["in_use"] == 2
+
+    @pytest.mark.asyncio
+    async def test_release_resets_context(self, connection, target):
+        """测试归还时销毁并重建上下文"""
+        pool = await connection.create_context_pool(BrowserContextPoolConfig(max_size=1, prewarm=1))
+
+        context = await pool.acquire()
+        await pool.release(context)
+
+        assert context.browser_context_id not in target.contexts
+        assert pool.stats["resets"] == 1
+        assert pool.stats["idle"] == 1
+        assert (await pool.acquire()).browser_context_id != context.browser_context_id
+
+    @pytest.mark.asyncio
+    async def test_release_without_reset(self, connection, target):
+        """测试不重置时复用同一上下文"""
+        pool = await connection.create_context_pool(
+            BrowserContextPoolConfig(max_size=1, reset_on_release=False)
+        )
+
+        context = await pool.acquire()
+        await pool.release(context)
+
+        reused = await pool.acquire()
+        assert reused is context
+        assert reused.uses == 2
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_when_full(self, connection, target):
+        """测试池满时等待归还"""
+        pool = await connection.create_context_pool(BrowserContextPoolConfig(max_size=1))
+        context = await pool.acquire()
+
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await pool.release(context)
+        assert (await asyncio.wait_for(waiter, 1.0)) is not None
+        assert pool.stats["waits"] == 1
+
+        with pytest.raises(TimeoutError):
+            await pool.acquire(timeout=0.01)
+
+    @pytest.mark.asyncio
+    async def test_failed_reset_frees_slot(self, connection, target):
+        """测试重建失败后释放容量，等待者可以重新创建"""
+        pool = await connection.create_context_pool(BrowserContextPoolConfig(max_size=1))
+        context = await pool.acquire()
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.01)
+
+        target.fail_create = True
+        await pool.release(context)
+        target.fail_create = False
+
+        assert (await asyncio.wait_for(waiter, 1.0)).browser_context_id in target.contexts
+
+    @pytest.mark.asyncio
+    async def test_sessions(self, connection, target):
+        """测试会话借还：分离目标并移除会话监听器，不断开连接"""
+        pool = await connection.create_context_pool(BrowserContextPoolConfig(max_size=2))
+
+        session = await pool.open_session()
+        assert session.session_id == f"session-{session.target_info.target_id}"
+        assert any(
+            sid == session.session_id
+            for listeners in connection._event_listeners.values()
+            for sid, _ in listeners
+        )
+
+        session_id = session.session_id
+        await pool.release_session(session)
+
+        assert "detachFromTarget" in target.calls
+        assert not any(
+            sid == session_id
+            for listeners in connection._event_listeners.values()
+            for sid, _ in listeners
+        )
+        assert connection.is_connected
+        assert pool.stats["in_use"] == 0
+
+    @pytest.mark.asyncio
+    async def test_disconnect_closes_pool(self, connection, target):
+        """测试断开连接时销毁所有上下文"""
+        connection.client.disconnect = lambda: asyncio.sleep(0)
+        pool = await connection.create_context_pool(BrowserContextPoolConfig(max_size=3, prewarm=2))
+        await pool.acquire()
+        await pool.acquire()
+        await pool.acquire()
+
+        await connection.disconnect()
+
+        assert target.contexts == set()
+        assert connection.context_pool is None
+        with pytest.raises(RuntimeError):
+            await pool.acquire()
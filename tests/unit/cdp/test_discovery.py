@@ -0,0 +1,175 @@
+"""CDP 发现接口连接池与缓存单元测试"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from aerotest.browser.cdp.connection import CDPConnection
+from aerotest.browser.cdp.types import CDPConnectionConfig
+
+VERSION = {"Browser": "Chrome/120", "Protocol-Version": "1.3", "webSocketDebuggerUrl": "ws://localhost/browser"}
+
+
+def make_connection(delay: float = 0.0, **config) -> tuple[CDPConnection, list[str]]:
+    """构造使用假发现接口的连接，返回连接和请求路径记录"""
+    requests: list[str] = []
+    targets = [{"id": "t1", "type": "page", "url": "https://example.com", "webSocketDebuggerUrl": "ws://t1"}]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        requests.append(path)
+        if delay:
+            await asyncio.sleep(delay)
+        if path == "/json/version":
+            return httpx.Response(200, json=VERSION)
+        if path == "/json/list":
+            return httpx.Response(200, json=list(targets))
+        if path == "/json/new":
+            targets.append({"id": "t2", "type": "page", "url": "about:blank"})
+            return httpx.Response(200, json=targets[-1])
+        return httpx.Response(200, text="Target is closing")
+
+    connection = CDPConnection(CDPConnectionConfig(**config))
+    connection.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return connection, requests
+
+
+class TestDiscoveryCache:
+    """测试发现接口缓存"""
+
+    @pytest.mark.asyncio
+    async def test_version_fetched_once(self):
+        """测试连接时检查可用性和获取 WebSocket URL 只请求一次 /json/version"""
+        connection, requests = make_connection()
+
+        await connection._check_cdp_availability()
+        ws_url = await connection._get_browser_ws_url()
+
+        assert ws_url == VERSION["webSocketDebuggerUrl"]
+        assert requests == ["/json/version"]
+
+    @pytest.mark.asyncio
+    async def test_target_events_invalidate(self):
+        """测试目标列表缓存命中，收到 Target 事件后重新获取"""
+        connection, requests = make_connection()
+
+        await connection.get_targets()
+        await connection.get_targets()
+        assert requests == ["/json/list"]
+
+        await connection.dispatch_event("Target.targetDestroyed", {"targetId": "t1"})
+        await connection.get_targets()
+
+        assert requests == ["/json/list", "/json/list"]
+        assert connection.http_stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_new_and_close_invalidate(self):
+        """测试通过 HTTP 创建或关闭页面后目标列表立即失效"""
+        connection, requests = make_connection()
+
+        assert len(await connection.get_targets()) == 1
+        await connection.create_new_page()
+        assert len(await connection.get_targets()) == 2
+        await connection.close_target("t2")
+        await connection.get_targets()
+
+        assert requests.count("/json/list") == 3
+
+    @pytest.mark.asyncio
+    async def test_ttl(self):
+        """测试 TTL 为 0 时不缓存"""
+        connection, requests = make_connection(discovery_cache_ttl=0)
+
+        await connection.get_targets()
+        await connection.get_targets()
+
+        assert requests == ["/json/list", "/json/list"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_coalesced(self):
+        """测试并发的相同请求合并为一次"""
+        connection, requests = make_connection(delay=0.05)
+
+        results = await asyncio.gather(*(connection.get_targets() for _ in range(5)))
+
+        assert requests == ["/json/list"]
+        assert all(len(targets) == 1 for targets in results)
+        assert connection.http_stats["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_invalidated_during_request(self):
+        """测试请求期间失效时结果不写入缓存"""
+        connection, requests = make_connection(delay=0.05)
+
+        task = asyncio.create_task(connection.get_targets())
+        await asyncio.sleep(0.01)
+        await connection.dispatch_event("Target.targetCreated", {"targetInfo": {}})
+        await task
+        await connection.get_targets()
+
+        assert requests == ["/json/list", "/json/list"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_retried_by_waiters(self):
+        """测试发起请求的任务被取消时，等待同一请求的任务重新请求"""
+        connection, requests = make_connection(delay=0.05)
+
+        first = asyncio.create_task(connection.get_targets())
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(connection.get_targets())
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert len(await second) == 1
+        assert requests == ["/json/list", "/json/list"]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """支持 keep-alive 的最小发现接口"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps(VERSION if self.path == "/json/version" else []).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHTTPPool:
+    """测试发现接口共用的 keep-alive 连接池"""
+
+    @pytest.mark.asyncio
+    async def test_connection_reused(self):
+        """测试多次请求复用同一个 TCP 连接，断开后关闭连接池"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            connection = CDPConnection(
+                CDPConnectionConfig(host="127.0.0.1", port=server.server_address[1], discovery_cache_ttl=0)
+            )
+            for _ in range(5):
+                await connection.get_targets()
+                await connection._get_browser_ws_url()
+
+            stats = connection.http_stats
+            assert stats["requests"] == 10
+            assert stats["connections_opened"] == 1
+            assert stats["errors"] == 0
+
+            await connection._close_http_client()
+            assert connection.http_client is None
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,212 @@
+"""增量 DOM 镜像单元测试"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from aerotest.browser.cdp.dom_mirror import DOMMirror
+from aerotest.browser.cdp.types import DOMMirrorConfig
+from tests.unit.dom_helpers import build_tree, document, element, text_node
+
+
+class FakeDomain:
+    """记录调用并返回预设结果的 CDP 域"""
+
+    def __init__(self, calls: list, **handlers):
+        self._calls = calls
+        self._handlers = handlers
+
+    def __getattr__(self, name):
+        async def method(params=None, session_id=None):
+            self._calls.append((name, params))
+            handler = self._handlers.get(name)
+            if handler is None:
+                return {}
+            return handler(params or {})
+        return method
+
+
+def make_session(calls: list):
+    """构造带假 CDP 客户端的会话"""
+    def box_model(params):
+        x = params["backendNodeId"] * 10
+        return {"model": {"border": [x, 5, x + 50, 5, x + 50, 25, x, 25], "width": 50, "height": 20}}
+
+    def computed_style(params):
+        return {"computedStyle": [
+            {"name": "display", "value": "block"},
+            {"name": "opacity", "value": "1"},
+            {"name": "color", "value": "red"},
+        ]}
+
+    def partial_ax(params):
+        return {"nodes": [{"nodeId": "ax", "role": {"value": "button"}, "name": {"value": "新按钮"}}]}
+
+    send = SimpleNamespace(
+        DOM=FakeDomain(calls, getBoxModel=box_model),
+        CSS=FakeDomain(calls, getComputedStyleForNode=computed_style),
+        Accessibility=FakeDomain(calls, getPartialAXTree=partial_ax),
+        Page=FakeDomain(calls, getLayoutMetrics=lambda p: {"cssVisualViewport": {"pageX": 0, "pageY": 100}}),
+        DOMSnapshot=FakeDomain(calls),
+    )
+
+    async def get_viewport_ratio():
+        return 1.0
+
+    return SimpleNamespace(
+        connection=SimpleNamespace(client=SimpleNamespace(send=send)),
+        session_id="s1",
+        _get_viewport_ratio=get_viewport_ratio,
+    )
+
+
+@pytest.fixture
+def mirror():
+    """body 下有一个按钮和一段文本的页面镜像"""
+    span = element(4, "SPAN", [text_node(5, "你好")])
+    button = element(6, "BUTTON", attributes={"class": "btn"})
+    body = element(3, "BODY", [span, button])
+
+    tree, node_lookup = build_tree(document(element(2, "HTML", [body])))
+    calls = []
+    mirror = DOMMirror(make_session(calls), tree, node_lookup)
+    mirror.calls = calls
+    return mirror
+
+
+class TestDOMMirror:
+    """测试 DOMMirror"""
+
+    def test_attribute_modified(self, mirror):
+        """测试属性修改"""
+        mirror.on_attribute_modified({"nodeId": 6, "name": "class", "value": "btn active"})
+        mirror.on_attribute_removed({"nodeId": 6, "name": "missing"})
+
+        assert mirror.node_lookup[6].attributes == {"class": "btn active"}
+        assert mirror.version == 2
+        assert mirror.is_dirty
+
+    def test_character_data_modified(self, mirror):
+        """测试文本修改"""
+        mirror.on_character_data_modified({"nodeId": 5, "characterData": "再见"})
+
+        assert mirror.node_lookup[5].node_value == "再见"
+        assert mirror.node_lookup[4].get_all_children_text() == "再见"
+
+    def test_child_node_inserted(self, mirror):
+        """测试插入节点（按 previousNodeId 定位）"""
+        new_node = element(7, "A", parent_id=3, attributes={"href": "/x"}, childNodeCount=0)
+        mirror.on_child_node_inserted({"parentNodeId": 3, "previousNodeId": 4, "node": new_node})
+
+        body = mirror.node_lookup[3]
+        assert [c.node_id for c in body.children_nodes] == [4, 7, 6]
+        assert mirror.node_lookup[7].parent_node is body
+        assert mirror.node_lookup[7].target_id == "t1"
+
+    def test_child_node_inserted_first(self, mirror):
+        """测试插入到首位"""
+        mirror.on_child_node_inserted({"parentNodeId": 3, "previousNodeId": 0, "node": element(8, "P", parent_id=3)})
+
+        assert mirror.node_lookup[3].children_nodes[0].node_id == 8
+
+    def test_child_node_removed(self, mirror):
+        """测试删除子树"""
+        mirror.on_child_node_removed({"parentNodeId": 3, "nodeId": 4})
+
+        assert [c.node_id for c in mirror.node_lookup[3].children_nodes] == [6]
+        assert 4 not in mirror.node_lookup
+        assert 5 not in mirror.node_lookup
+
+    def test_set_child_nodes(self, mirror):
+        """测试 setChildNodes 替换子节点"""
+        mirror.on_set_child_nodes({"parentId": 4, "nodes": [element(9, "B", parent_id=4)]})
+
+        assert [c.node_id for c in mirror.node_lookup[4].children_nodes] == [9]
+        assert 5 not in mirror.node_lookup
+
+    def test_unknown_node_ignored(self, mirror):
+        """测试未跟踪节点的变更被忽略"""
+        mirror.on_attribute_modified({"nodeId": 999, "name": "id", "value": "x"})
+
+        assert mirror.version == 0
+        assert mirror.stats["mutations_ignored"] == 1
+
+    def test_document_updated(self, mirror):
+        """测试文档替换使镜像失效"""
+        mirror.on_document_updated({})
+
+        assert mirror.valid is False
+
+    @pytest.mark.asyncio
+    async def test_missing_children_requests_tracked(self, mirror):
+        """测试子节点请求被跟踪，完成后移除，stop() 时取消"""
+        node = element(7, "UL", parent_id=3, childNodeCount=2)
+        mirror.on_child_node_inserted({"parentNodeId": 3, "previousNodeId": 6, "node": node})
+        assert len(mirror._pending) == 1
+
+        await asyncio.gather(*mirror._pending)
+        assert mirror._pending == set()
+        assert [p["nodeId"] for name, p in mirror.calls if name == "requestChildNodes"] == [7]
+
+        mirror.on_child_node_inserted({"parentNodeId": 3, "previousNodeId": 7,
+                                       "node": element(8, "OL", parent_id=3, childNodeCount=1)})
+        (task,) = mirror._pending
+        mirror.stop()
+        await asyncio.sleep(0)
+
+        assert task.cancelled()
+        assert mirror._pending == set()
+        assert mirror.valid is False
+
+    @pytest.mark.asyncio
+    async def test_refresh_noop(self, mirror):
+        """测试无变更时刷新不发送 CDP 命令"""
+        root = await mirror.refresh()
+
+        assert root is mirror.root
+        assert mirror.calls == []
+
+    @pytest.mark.asyncio
+    async def test_refresh_dirty_subtree(self, mirror):
+        """测试只刷新脏子树"""
+        mirror.on_attribute_modified({"nodeId": 6, "name": "class", "value": "btn active"})
+        await mirror.refresh()
+
+        box_calls = [p["backendNodeId"] for name, p in mirror.calls if name == "getBoxModel"]
+        assert box_calls == [6]
+
+        button = mirror.node_lookup[6]
+        assert button.snapshot_node.computed_styles == {"display": "block", "opacity": "1"}
+        assert button.absolute_position.x == 60
+        assert button.absolute_position.y == 105  # 视口坐标 + 滚动量
+        assert button.snapshot_node.clientRects.y == 5
+        assert button.is_visible is True
+        assert button.ax_node.name == "新按钮"
+        assert not mirror.is_dirty
+        assert mirror.stats["partial_refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_falls_back_to_full_layout(self, mirror):
+        """测试脏节点过多时整页刷新布局"""
+        mirror.config = DOMMirrorConfig(max_dirty_nodes=1)
+        mirror.on_attribute_modified({"nodeId": 3, "name": "class", "value": "dark"})
+        await mirror.refresh()
+
+        names = [name for name, _ in mirror.calls]
+        assert "captureSnapshot" in names
+        assert "getBoxModel" not in names
+        assert mirror.stats["full_layout_refreshes"] == 1
+
+    def test_identity_cache_invalidated(self, mirror):
+        """测试变更后缓存的 XPath 和哈希失效"""
+        button = mirror.node_lookup[6]
+        assert button.xpath == "html/body/button"
+        old_hash = hash(button)
+
+        mirror.on_attribute_modified({"nodeId": 6, "name": "id", "value": "submit"})
+        assert hash(button) != old_hash
+
+        mirror.on_child_node_inserted({"parentNodeId": 3, "previousNodeId": 0, "node": element(8, "BUTTON", parent_id=3)})
+        assert button.xpath == "html/body/button[2]"
+        assert mirror.node_lookup[8].xpath == "html/body/button[1]"
@@ -0,0 +1,148 @@
+"""页面就绪检测单元测试"""
+
+import asyncio
+
+import pytest
+
+from aerotest.browser.cdp.connection import CDPConnection
+from aerotest.browser.cdp.readiness import PageReadinessTracker
+from aerotest.browser.cdp.types import CDPConnectionConfig, ReadinessConfig
+
+
+def lifecycle(name: str, frame_id: str = "main", loader_id: str = "L1") -> dict:
+    """构造 Page.lifecycleEvent"""
+    return {"frameId": frame_id, "loaderId": loader_id, "name": name, "timestamp": 0}
+
+
+@pytest.fixture
+def tracker():
+    """已提交导航的跟踪器"""
+    tracker = PageReadinessTracker(ReadinessConfig(timeout=1.0, idle_time=0.05))
+    tracker.start_navigation()
+    tracker.commit_navigation("main", "L1")
+    return tracker
+
+
+class TestPageReadinessTracker:
+    """测试 PageReadinessTracker"""
+
+    def test_lifecycle_conditions(self, tracker):
+        """测试生命周期事件推进条件"""
+        assert not tracker.is_satisfied("domcontentloaded")
+
+        tracker.on_lifecycle_event(lifecycle("init"))
+        tracker.on_lifecycle_event(lifecycle("DOMContentLoaded"))
+        assert tracker.is_satisfied("domcontentloaded")
+        assert not tracker.is_satisfied("load")
+
+        tracker.on_lifecycle_event(lifecycle("load"))
+        assert tracker.is_satisfied("load")
+
+    def test_ignore_other_frames_and_loaders(self, tracker):
+        """测试忽略子帧和旧加载器的事件"""
+        tracker.on_lifecycle_event(lifecycle("load", frame_id="child"))
+        tracker.on_lifecycle_event(lifecycle("load", loader_id="OLD"))
+
+        assert not tracker.loaded
+
+    def test_load_event_fired(self, tracker):
+        """测试 Page.loadEventFired 作为回退"""
+        tracker.on_load_event_fired({"timestamp": 0})
+
+        assert tracker.dom_content_loaded
+        assert tracker.loaded
+
+    def test_same_document_navigation(self):
+        """测试文档内导航立即就绪"""
+        tracker = PageReadinessTracker()
+        tracker.start_navigation()
+        tracker.commit_navigation("main", None)
+
+        assert tracker.is_satisfied("load")
+
+    def test_inflight_requests(self, tracker):
+        """测试在途请求计数"""
+        tracker.on_request_will_be_sent({"requestId": "1"})
+        tracker.on_request_will_be_sent({"requestId": "2"})
+        tracker.on_request_will_be_sent({"requestId": "2"})  # 重定向
+        assert tracker.inflight_requests == 2
+
+        tracker.on_loading_finished({"requestId": "1"})
+        tracker.on_loading_failed({"requestId": "2"})
+        tracker.on_loading_finished({"requestId": "unknown"})
+        assert tracker.inflight_requests == 0
+
+    def test_inflight_threshold(self):
+        """测试在途请求阈值"""
+        tracker = PageReadinessTracker(ReadinessConfig(idle_time=0.0, max_inflight_requests=1))
+        tracker.start_navigation()
+
+        tracker.on_request_will_be_sent({"requestId": "long-poll"})
+        assert tracker.is_network_idle()
+
+        tracker.on_request_will_be_sent({"requestId": "xhr"})
+        assert not tracker.is_network_idle()
+
+    def test_unknown_condition(self, tracker):
+        """测试不支持的等待条件"""
+        with pytest.raises(ValueError):
+            tracker.is_satisfied("commit")
+
+    @pytest.mark.asyncio
+    async def test_wait_returns_on_event(self, tracker):
+        """测试事件到达后立即返回"""
+        async def fire():
+            await asyncio.sleep(0.02)
+            tracker.on_lifecycle_event(lifecycle("load"))
+
+        asyncio.create_task(fire())
+        metrics = await tracker.wait_until("load")
+
+        assert metrics.satisfied
+        assert not metrics.timed_out
+        assert metrics.elapsed_ms < 500
+
+    @pytest.mark.asyncio
+    async def test_wait_network_idle(self, tracker):
+        """测试网络空闲窗口"""
+        tracker.on_lifecycle_event(lifecycle("load"))
+        tracker.on_request_will_be_sent({"requestId": "1"})
+
+        async def finish():
+            await asyncio.sleep(0.05)
+            tracker.on_loading_finished({"requestId": "1"})
+
+        asyncio.create_task(finish())
+        metrics = await tracker.wait_until("networkidle")
+
+        assert metrics.satisfied
+        # 请求结束 (~50ms) + 空闲窗口 (50ms)
+        assert 90 <= metrics.elapsed_ms < 800
+        assert metrics.total_requests == 1
+
+    @pytest.mark.asyncio
+    async def test_wait_timeout(self, tracker):
+        """测试等待超时"""
+        metrics = await tracker.wait_until("load", timeout=0.05)
+
+        assert not metrics.satisfied
+        assert metrics.timed_out
+        assert tracker.get_metrics()["load"]["timeouts"] == 1
+
+
+class TestEventDispatch:
+    """测试 CDPConnection 事件分发"""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_by_session(self):
+        """测试按会话分发到多个监听器"""
+        connection = CDPConnection(CDPConnectionConfig())
+        received = []
+
+        connection.add_event_listener("Page.loadEventFired", lambda e, s: received.append(("a", s)), "s1")
+        connection.add_event_listener("Page.loadEventFired", lambda e, s: received.append(("b", s)))
+
+        await connection.dispatch_event("Page.loadEventFired", {}, "s1")
+        await connection.dispatch_event("Page.loadEventFired", {}, "s2")
+
+        assert received == [("a", "s1"), ("b", "s1"), ("b", "s2")]
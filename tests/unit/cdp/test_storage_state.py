@@ -0,0 +1,226 @@
+"""登录态快照单元测试"""
+
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from aerotest.browser.cdp.connection import CDPConnection
+from aerotest.browser.cdp.session import CDPSession
+from aerotest.browser.cdp.storage_state import OriginStorage, StorageState, StorageStateStore
+from aerotest.browser.cdp.types import CDPConnectionConfig, TargetInfo
+
+ORIGIN = "https://shop.example.com"
+
+
+def make_state(**kwargs) -> StorageState:
+    """构造包含会话 Cookie、持久 Cookie 和 Web Storage 的快照"""
+    return StorageState(
+        cookies=[
+            {"name": "sid", "value": "abc", "domain": "shop.example.com", "path": "/",
+             "expires": -1, "session": True, "size": 6, "httpOnly": True},
+            {"name": "remember", "value": "1", "domain": "shop.example.com", "path": "/",
+             "expires": time.time() + 3600, "session": False},
+        ],
+        origins=[OriginStorage(ORIGIN, local_storage={"token": "t-1"}, session_storage={"tab": "2"})],
+        **kwargs,
+    )
+
+
+class FakeStorageBrowser:
+    """模拟 Network / DOMStorage / Runtime / Page 域，保存 Cookie 和 Web Storage
+
+    与 Chrome 一致：没有加载某个源的帧时不能通过 DOMStorage 写入该源
+    """
+
+    def __init__(self):
+        self.cookies: list[dict] = []
+        self.storage: dict[tuple[str, bool], dict[str, str]] = {}
+        self.loaded_origins: set[str] = set()
+        self.scripts: dict[str, str] = {}
+        self.script_count = 0
+        self.Network = SimpleNamespace(getAllCookies=self.getAllCookies, setCookies=self.setCookies)
+        self.Page = SimpleNamespace(
+            addScriptToEvaluateOnNewDocument=self.addScriptToEvaluateOnNewDocument,
+            removeScriptToEvaluateOnNewDocument=self.removeScriptToEvaluateOnNewDocument,
+        )
+        self.DOMStorage = SimpleNamespace(
+            enable=self._noop,
+            getDOMStorageItems=self.getDOMStorageItems,
+            setDOMStorageItem=self.setDOMStorageItem,
+        )
+        self.Runtime = SimpleNamespace(evaluate=self.evaluate)
+
+    async def _noop(self, params=None, session_id=None):
+        return {}
+
+    async def getAllCookies(self, params=None, session_id=None):
+        return {"cookies": [dict(cookie, session="expires" not in cookie) for cookie in self.cookies]}
+
+    async def setCookies(self, params=None, session_id=None):
+        self.cookies.extend(params["cookies"])
+        return {}
+
+    async def getDOMStorageItems(self, params=None, session_id=None):
+        storage_id = params["storageId"]
+        items = self.storage.get((storage_id["securityOrigin"], storage_id["isLocalStorage"]), {})
+        return {"entries": [[key, value] for key, value in items.items()]}
+
+    async def setDOMStorageItem(self, params=None, session_id=None):
+        storage_id = params["storageId"]
+        if storage_id["securityOrigin"] not in self.loaded_origins:
+            raise RuntimeError("Frame not found for the given storage id")
+        key = (storage_id["securityOrigin"], storage_id["isLocalStorage"])
+        self.storage.setdefault(key, {})[params["key"]] = params["value"]
+        return {}
+
+    async def evaluate(self, params=None, session_id=None):
+        return {"result": {"value": ORIGIN}}
+
+    async def addScriptToEvaluateOnNewDocument(self, params=None, session_id=None):
+        self.script_count += 1
+        identifier = str(self.script_count)
+        self.scripts[identifier] = params["source"]
+        return {"identifier": identifier}
+
+    async def removeScriptToEvaluateOnNewDocument(self, params=None, session_id=None):
+        self.scripts.pop(params["identifier"])
+        return {}
+
+    def load(self, origin: str):
+        """加载该源的新文档：按注入脚本的逻辑写入 Web Storage"""
+        self.loaded_origins.add(origin)
+        for source in self.scripts.values():
+            seed = json.loads(source.split("const seed = ", 1)[1].split(";\n", 1)[0])
+            storage = seed["origins"].get(origin)
+            session_storage = self.storage.setdefault((origin, False), {})
+            if storage is None or session_storage.get(seed["marker"]) == seed["token"]:
+                continue
+            self.storage.setdefault((origin, True), {}).update(storage["local"])
+            session_storage.update(storage["session"])
+            session_storage[seed["marker"]] = seed["token"]
+
+
+def make_session(browser: FakeStorageBrowser) -> CDPSession:
+    """构造使用假浏览器的会话"""
+    connection = CDPConnection(CDPConnectionConfig())
+    connection.client = SimpleNamespace(send=browser)
+    session = CDPSession(connection, TargetInfo(target_id="t1", target_type="page", url=ORIGIN, title=""))
+    session.session_id = "s1"
+    return session
+
+
+class TestStorageState:
+    """测试 StorageState"""
+
+    def test_cookie_params(self):
+        """测试转换为 setCookies 参数：去掉只读字段和会话 Cookie 的过期时间"""
+        state = make_state()
+        state.cookies.append({"name": "old", "value": "x", "domain": "a", "expires": time.time() - 10})
+
+        params = state.cookie_params()
+
+        assert [p["name"] for p in params] == ["sid", "remember"]
+        assert "expires" not in params[0]
+        assert "size" not in params[0] and "session" not in params[0]
+        assert params[1]["expires"] > time.time()
+
+    def test_save_load(self, tmp_path):
+        """测试 JSON 往返"""
+        state = make_state()
+        path = tmp_path / "state" / "login.json"
+
+        state.save(path)
+        loaded = StorageState.load(path)
+
+        assert loaded == state
+        assert not path.with_suffix(".json.tmp").exists()
+
+
+class TestStorageStateStore:
+    """测试 StorageStateStore"""
+
+    def test_save_get(self, tmp_path):
+        """测试保存后跨实例读取"""
+        StorageStateStore(tmp_path).save("admin", make_state())
+
+        state = StorageStateStore(tmp_path).get("admin")
+
+        assert state is not None
+        assert state.origins[0].local_storage == {"token": "t-1"}
+        assert StorageStateStore(tmp_path).get("guest") is None
+
+    def test_expiry(self, tmp_path):
+        """测试过期状态被删除"""
+        store = StorageStateStore(tmp_path, max_age=60)
+        store.save("admin", make_state(created_at=time.time() - 120))
+
+        assert store.get("admin") is None
+        assert not store.path_for("admin").exists()
+
+    def test_corrupt_file(self, tmp_path):
+        """测试损坏的文件视为不存在"""
+        store = StorageStateStore(tmp_path)
+        store.path_for("admin").write_text("{not json", encoding="utf-8")
+
+        assert store.get("admin") is None
+
+
+class TestSessionStorageState:
+    """测试 CDPSession 捕获和恢复存储状态"""
+
+    @pytest.mark.asyncio
+    async def test_capture_restore_round_trip(self):
+        """测试从一个页面捕获的状态可以注入到另一个页面"""
+        source = FakeStorageBrowser()
+        source.cookies = [{"name": "sid", "value": "abc", "domain": "shop.example.com", "path": "/"}]
+        source.storage[(ORIGIN, True)] = {"token": "t-1"}
+        source.storage[(ORIGIN, False)] = {"tab": "2"}
+
+        state = await make_session(source).capture_storage_state()
+
+        target = FakeStorageBrowser()
+        session = make_session(target)
+        await session.restore_storage_state(state)
+        target.load(ORIGIN)
+
+        assert [(c["name"], c["value"]) for c in target.cookies] == [("sid", "abc")]
+        assert "session" not in target.cookies[0]
+        assert (await session.capture_storage_state()).origins == state.origins
+
+    @pytest.mark.asyncio
+    async def test_restore_before_navigation(self):
+        """测试在没有加载任何页面（about:blank）时恢复，导航到该源后写入且只写入一次"""
+        browser = FakeStorageBrowser()
+        session = make_session(browser)
+
+        await session.restore_storage_state(make_state())
+        assert len(browser.scripts) == 1
+
+        browser.load("https://other.example.com")
+        assert browser.storage.get(("https://other.example.com", True)) is None
+
+        browser.load(ORIGIN)
+        assert browser.storage[(ORIGIN, True)] == {"token": "t-1"}
+        assert browser.storage[(ORIGIN, False)]["tab"] == "2"
+
+        # 页面之后的修改不会被再次导航覆盖
+        browser.storage[(ORIGIN, True)]["token"] = "t-2"
+        browser.load(ORIGIN)
+        assert browser.storage[(ORIGIN, True)]["token"] == "t-2"
+
+        # 再次恢复替换之前的脚本
+        await session.restore_storage_state(make_state())
+        assert list(browser.scripts) == ["2"]
+
+    @pytest.mark.asyncio
+    async def test_capture_explicit_origins(self):
+        """测试指定源时不读取当前页面的源"""
+        browser = FakeStorageBrowser()
+        browser.storage[("https://sso.example.com", True)] = {"ticket": "x"}
+
+        state = await make_session(browser).capture_storage_state(origins=["https://sso.example.com"])
+
+        assert [o.origin for o in state.origins] == ["https://sso.example.com"]
+        assert state.origins[0].local_storage == {"ticket": "x"}
@@ -0,0 +1,95 @@
+"""DOM 倒排索引单元测试"""
+
+import random
+
+import pytest
+
+from aerotest.browser.dom.dom_index import DOMIndex
+from aerotest.browser.dom.views import NodeType, SerializedDOMState
+from aerotest.core.funnel.l2.attribute_matcher import AttributeMatcher
+from tests.unit.dom_helpers import build_tree, document, element, text_node
+
+WORDS = ["登录", "用户名", "密码", "提交", "搜索", "Submit", "user name", "login-btn", "a", "取消 按钮"]
+ATTRIBUTES = ["id", "name", "placeholder", "aria-label", "title", "class", "role", "data-x"]
+TAGS = ["BUTTON", "INPUT", "A", "DIV", "SPAN"]
+
+
+def make_elements(count: int, seed: int = 0) -> list:
+    """随机生成带属性和文本的元素"""
+    rng = random.Random(seed)
+    children = []
+    for i in range(count):
+        node_id = 10 + i * 2
+        attributes = {}
+        for attribute in rng.sample(ATTRIBUTES, rng.randint(0, 3)):
+            attributes[attribute] = " ".join(rng.sample(WORDS, rng.randint(1, 2)))
+        text = text_node(node_id + 1, rng.choice(WORDS))
+        children.append(element(node_id, rng.choice(TAGS), [text], attributes=attributes))
+    _, nodes = build_tree(document(element(2, "HTML", [element(3, "BODY", children)])))
+    return [
+        node for node in nodes.values()
+        if node.node_type == NodeType.ELEMENT_NODE and node.tag_name not in ("html", "body")
+    ]
+
+
+@pytest.fixture
+def elements():
+    """200 个随机元素"""
+    return make_elements(200)
+
+
+class TestDOMIndex:
+    """测试 DOMIndex"""
+
+    @pytest.mark.parametrize("query", ["登录", "user", "USER NAME", "a", "", "不存在"])
+    def test_find_by_text_matches_scan(self, elements, query):
+        """测试子串文本查询与线性扫描一致"""
+        index = DOMIndex(elements)
+        expected = [e for e in elements if query.lower() in e.get_all_children_text().lower()]
+
+        assert index.find_by_text(query) == expected
+
+    def test_find_by_text_exact(self, elements):
+        """测试精确文本查询"""
+        index = DOMIndex(elements)
+
+        assert index.find_by_text("Submit", exact_match=True) == [
+            e for e in elements if e.get_all_children_text() == "Submit"
+        ]
+
+    def test_find_by_xpath(self, elements):
+        """测试 XPath 映射"""
+        index = DOMIndex(elements)
+        target = elements[7]
+
+        assert index.find_by_xpath(target.xpath) == [target]
+        assert index.find_by_xpath("html/nothing") == []
+
+    def test_tag_and_role_buckets(self, elements):
+        """测试标签和 role 分桶"""
+        index = DOMIndex(elements)
+
+        assert index.by_tags(["input", "a"]) == [e for e in elements if e.tag_name in ("input", "a")]
+        assert index.by_role("Submit") == [
+            e for e in elements if e.attributes.get("role", "").lower() == "submit"
+        ]
+
+    @pytest.mark.parametrize("keywords", [["用户名"], ["submit", "登录"], ["name"], ["login-btn 按钮"], ["x"]])
+    def test_keyword_candidates_preserve_matching(self, elements, keywords):
+        """测试候选剪枝后 AttributeMatcher 结果不变"""
+        index = DOMIndex(elements)
+        matcher = AttributeMatcher()
+        candidates = index.keyword_candidates(keywords)
+
+        full = matcher.get_best_matches(elements, keywords, top_n=50)
+        pruned = matcher.get_best_matches(candidates, keywords, top_n=50)
+
+        assert [(r.element, r.score) for r in pruned] == [(r.element, r.score) for r in full]
+        assert len(candidates) <= len(elements)
+
+    def test_state_index_cached(self, elements):
+        """测试每个状态只构建一次索引"""
+        state = SerializedDOMState(_root=None, selector_map={e.backend_node_id: e for e in elements})
+
+        assert state.index is state.index
+        assert len(state.index) == len(elements)
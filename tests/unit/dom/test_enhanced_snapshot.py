@@ -0,0 +1,137 @@
+"""列式快照存储单元测试"""
+
+import pytest
+
+from aerotest.browser.dom.enhanced_snapshot import (
+    SnapshotNodeView,
+    SnapshotStore,
+    build_snapshot_lookup,
+    snapshot_bounds,
+)
+from aerotest.browser.dom.views import DOMRect
+
+STRINGS = ["block", "visible", "1", "auto", "pointer", "none", "0"]
+
+
+@pytest.fixture
+def snapshot():
+    """两个文档的快照：节点 10 有完整布局，11 不可见，12 无布局"""
+    return {
+        "strings": STRINGS,
+        "documents": [
+            {
+                "nodes": {"backendNodeId": [10, 11, 12], "isClickable": {"index": [0]}},
+                "layout": {
+                    "nodeIndex": [0, 1],
+                    "bounds": [[20, 40, 200, 60], [0, 0, 10, 10]],
+                    "styles": [[0, 1, 2, 3, 3, 3, 4], [5, 1, 2]],
+                    "paintOrders": [3, 4],
+                    "clientRects": [[1, 2, 3, 4], []],
+                    "scrollRects": [[0, 7, 100, 30], []],
+                    "stackingContexts": {"index": [1]},
+                },
+            },
+            {
+                "nodes": {"backendNodeId": [20]},
+                "layout": {"nodeIndex": [0], "bounds": [[0, 0, 8, 8]], "styles": [[0, 1, 6]]},
+            },
+        ],
+    }
+
+
+class TestSnapshotStore:
+    """测试 SnapshotStore"""
+
+    def test_mapping_interface(self, snapshot):
+        """测试字典接口"""
+        store = build_snapshot_lookup(snapshot)
+
+        assert isinstance(store, SnapshotStore)
+        assert len(store) == 4
+        assert set(store) == {10, 11, 12, 20}
+        assert 10 in store
+        assert 99 not in store
+        assert store.get(99) is None
+        assert isinstance(store[10], SnapshotNodeView)
+
+    def test_view_fields(self, snapshot):
+        """测试视图字段与 EnhancedSnapshotNode 一致"""
+        view = build_snapshot_lookup(snapshot, device_pixel_ratio=2.0)[10]
+
+        assert view.bounds == DOMRect(x=10.0, y=20.0, width=100.0, height=30.0)
+        assert view.clientRects == DOMRect(x=1.0, y=2.0, width=3.0, height=4.0)
+        assert view.scrollRects == DOMRect(x=0.0, y=7.0, width=100.0, height=30.0)
+        assert view.computed_styles == {
+            "display": "block",
+            "visibility": "visible",
+            "opacity": "1",
+            "overflow": "auto",
+            "overflow-x": "auto",
+            "overflow-y": "auto",
+            "cursor": "pointer",
+        }
+        assert view.cursor_style == "pointer"
+        assert view.paint_order == 3
+        assert view.stacking_contexts == 1
+        assert view.is_clickable is True
+
+    def test_missing_layout(self, snapshot):
+        """测试无布局节点"""
+        view = build_snapshot_lookup(snapshot)[12]
+
+        assert view.bounds is None
+        assert view.computed_styles is None
+        assert view.paint_order is None
+        assert view.is_clickable is False
+        assert build_snapshot_lookup(snapshot)[20].is_clickable is None
+
+    def test_lazy_materialization(self, snapshot):
+        """测试字段首次访问后缓存"""
+        view = build_snapshot_lookup(snapshot)[10]
+
+        assert view.bounds is view.bounds
+        assert view.computed_styles is view.computed_styles
+
+    def test_visibility_without_materializing(self, snapshot):
+        """测试按列检查可见性"""
+        store = build_snapshot_lookup(snapshot)
+
+        assert store.is_visible_at(store.row_of(10)) is True
+        assert store.is_visible_at(store.row_of(11)) is False  # display: none
+        assert store.is_visible_at(store.row_of(20)) is False  # opacity: 0
+        assert store.style_at(store.row_of(10), "cursor") == "pointer"
+
+    def test_snapshot_bounds(self, snapshot):
+        """测试读取边界框元组"""
+        view = build_snapshot_lookup(snapshot)[10]
+
+        assert snapshot_bounds(view) == (20, 40, 200, 60)
+        assert snapshot_bounds(view.to_snapshot_node()) == (20, 40, 200, 60)
+        assert snapshot_bounds(build_snapshot_lookup(snapshot)[12]) is None
+
+    def test_empty_snapshot(self):
+        """测试空快照"""
+        assert len(build_snapshot_lookup({})) == 0
+
+    def test_style_subset(self):
+        """测试只请求部分样式时按名称对齐到样式槽位"""
+        subset = ["display", "visibility", "opacity", "cursor", "pointer-events"]
+        snapshot = {
+            "strings": ["block", "visible", "1", "pointer", "auto"],
+            "documents": [{
+                "nodes": {"backendNodeId": [10]},
+                "layout": {"nodeIndex": [0], "bounds": [[0, 0, 10, 10]], "styles": [[0, 1, 2, 3, 4]]},
+            }],
+        }
+        store = build_snapshot_lookup(snapshot, computed_styles=subset)
+
+        assert store.style_at(store.row_of(10), "cursor") == "pointer"
+        assert store.style_at(store.row_of(10), "overflow") is None
+        assert store[10].computed_styles == {
+            "display": "block",
+            "visibility": "visible",
+            "opacity": "1",
+            "cursor": "pointer",
+            "pointer-events": "auto",
+        }
+        assert store.is_visible_at(store.row_of(10)) is True
@@ -0,0 +1,127 @@
+"""绘制顺序遮挡计算单元测试"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from aerotest.browser.dom.paint_order import (
+    OCCLUSION_BACKENDS,
+    PaintOrderRemover,
+    Rect,
+    RectUnionGrid,
+    RectUnionPure,
+)
+from aerotest.browser.dom.views import DOMRect, SimplifiedNode
+
+
+def painted(x, y, width, height, paint_order, styles=None, children=None) -> SimplifiedNode:
+    """构造带绘制顺序和边界框的简化节点"""
+    snapshot = SimpleNamespace(
+        paint_order=paint_order,
+        bounds=DOMRect(x=x, y=y, width=width, height=height),
+        computed_styles=styles,
+    )
+    return SimplifiedNode(
+        original_node=SimpleNamespace(snapshot_node=snapshot),
+        children=children or [],
+    )
+
+
+def random_tree(rng: random.Random, count: int) -> SimplifiedNode:
+    """随机页面：大量小元素 + 少量遮罩层，部分为半透明或透明背景"""
+    children = []
+    for _ in range(count):
+        if rng.random() < 0.05:
+            width, height = rng.uniform(200, 1200), rng.uniform(100, 800)
+        else:
+            width, height = rng.choice([0, rng.uniform(5, 200)]), rng.uniform(0, 60)
+        styles = rng.choice([
+            None,
+            {"background-color": "rgb(255, 255, 255)", "opacity": "1"},
+            {"background-color": "rgba(0, 0, 0, 0)"},
+            {"background-color": "rgb(0, 0, 0)", "opacity": "0.5"},
+        ])
+        # 对齐到 10px 网格，制造大量共享边
+        x, y = round(rng.uniform(-50, 1900), -1), round(rng.uniform(0, 4000), -1)
+        children.append(painted(x, y, round(width, -1), round(height, -1), rng.randint(0, count // 4), styles))
+    return painted(0, 0, 1920, 4000, 0, None, children)
+
+
+def ignored_flags(root: SimplifiedNode) -> list[bool]:
+    """按先序收集 ignored_by_paint_order"""
+    flags, stack = [], [root]
+    while stack:
+        node = stack.pop()
+        flags.append(node.ignored_by_paint_order)
+        stack.extend(reversed(node.children))
+    return flags
+
+
+class TestRectUnionGrid:
+    """测试网格索引矩形并集"""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_pure(self, seed):
+        """测试 contains/add 结果与纯版本逐次一致"""
+        rng = random.Random(seed)
+        pure, grid = RectUnionPure(), RectUnionGrid(cell_size=64)
+
+        for _ in range(400):
+            x, y = rng.randint(-100, 800), rng.randint(-100, 800)
+            r = Rect(x, y, x + rng.choice([0, rng.randint(1, 300)]), y + rng.randint(0, 300))
+            assert grid.contains(r) == pure.contains(r)
+            assert grid.add(r) == pure.add(r)
+
+        assert grid._rects == pure._rects
+
+    def test_adjacent_rects_cover(self):
+        """测试相邻矩形共同覆盖"""
+        union = RectUnionGrid(cell_size=16)
+        union.add(Rect(0, 0, 50, 100))
+        union.add(Rect(50, 0, 100, 100))
+
+        assert union.contains(Rect(20, 20, 80, 80))
+        assert not union.contains(Rect(20, 20, 120, 80))
+
+
+class TestPaintOrderRemover:
+    """测试 PaintOrderRemover"""
+
+    def test_occluded_node_ignored(self):
+        """测试被上层不透明元素覆盖的节点被标记"""
+        button = painted(10, 10, 50, 20, 1)
+        overlay = painted(0, 0, 200, 200, 5, {"background-color": "rgb(0, 0, 0)", "opacity": "1"})
+        root = SimplifiedNode(original_node=SimpleNamespace(snapshot_node=None), children=[button, overlay])
+
+        PaintOrderRemover(root).calculate_paint_order()
+
+        assert button.ignored_by_paint_order is True
+        assert overlay.ignored_by_paint_order is False
+
+    def test_translucent_overlay_not_occluding(self):
+        """测试半透明遮罩不遮挡下层元素"""
+        button = painted(10, 10, 50, 20, 1)
+        overlay = painted(0, 0, 200, 200, 5, {"background-color": "rgb(0, 0, 0)", "opacity": "0.5"})
+        root = SimplifiedNode(original_node=SimpleNamespace(snapshot_node=None), children=[button, overlay])
+
+        PaintOrderRemover(root, occlusion_backend="pure").calculate_paint_order()
+
+        assert button.ignored_by_paint_order is False
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_backends_identical(self, seed):
+        """测试所有后端得到相同的 ignored_by_paint_order"""
+        results = {}
+        for backend in OCCLUSION_BACKENDS:
+            root = random_tree(random.Random(seed), 600)
+            PaintOrderRemover(root, occlusion_backend=backend).calculate_paint_order()
+            results[backend] = ignored_flags(root)
+
+        assert results["grid"] == results["pure"]
+        assert any(results["pure"])
+
+    def test_unknown_backend(self):
+        """测试不支持的后端"""
+        with pytest.raises(ValueError):
+            PaintOrderRemover(painted(0, 0, 1, 1, 0), occlusion_backend="numpy")
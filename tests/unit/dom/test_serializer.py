@@ -0,0 +1,118 @@
+"""DOM 树序列化器单元测试"""
+
+from aerotest.browser.dom.dom_service import create_dom_service
+from aerotest.browser.dom.serializer import DOMTreeSerializer
+from aerotest.browser.dom.views import SerializedDOMState
+from tests.unit.dom_helpers import build_tree, document, element, text_node
+
+
+def build_page(buttons: dict[int, str]):
+    """
+    构造 body 下排成一列的按钮页面
+
+    Args:
+        buttons: backendNodeId -> 按钮文字
+    """
+    children = []
+    layout = {3: [0, 0, 800, 600]}
+    for row, (node_id, label) in enumerate(buttons.items()):
+        children.append(element(node_id, "BUTTON", [text_node(node_id * 100, label)], attributes={"class": "btn"}))
+        layout[node_id] = [10, row * 40, 100, 30]
+    root = document(element(2, "HTML", [element(3, "BODY", children)]))
+    return build_tree(root, layout)[0]
+
+
+def serialize(root, previous: SerializedDOMState | None = None, keep_fingerprints: bool = True) -> SerializedDOMState:
+    """序列化页面（默认保留指纹，结果可作为下一次的上一次状态）"""
+    serializer = DOMTreeSerializer(root, previous_cached_state=previous, keep_fingerprints=keep_fingerprints)
+    state, _ = serializer.serialize_accessible_elements()
+    return state
+
+
+class TestAssignInteractiveIndices:
+    """测试交互索引分配"""
+
+    def test_document_order(self):
+        """测试按文档顺序分配"""
+        state = serialize(build_page({10: "登录", 11: "注册", 12: "取消"}))
+
+        assert list(state.selector_map) == [10, 11, 12]
+        assert state.diff is None
+
+    def test_new_elements_marked(self):
+        """测试相对上一次状态新增的元素被标记"""
+        previous = serialize(build_page({10: "登录", 11: "注册"}))
+        state = serialize(build_page({10: "登录", 11: "注册", 12: "取消"}), previous)
+
+        new_flags = {}
+        stack = [state._root]
+        while stack:
+            node = stack.pop()
+            if node.is_interactive:
+                new_flags[node.original_node.backend_node_id] = node.is_new
+            stack.extend(node.children)
+        assert new_flags == {10: False, 11: False, 12: True}
+
+    def test_element_arrays(self):
+        """测试序列化时同时得到可交互和可见元素列表"""
+        state = serialize(build_page({10: "登录", 11: "注册"}))
+
+        assert state.interactive_nodes == list(state.selector_map.values())
+        assert [node.backend_node_id for node in state.visible_nodes] == [3, 10, 11]
+
+
+class TestDOMDiff:
+    """测试结构化 DOM 差异"""
+
+    def test_added_removed_changed(self):
+        """测试新增、删除和内容变化"""
+        previous = serialize(build_page({10: "登录", 11: "注册", 12: "取消"}))
+        state = serialize(build_page({10: "登录", 12: "确定", 13: "帮助"}), previous)
+
+        assert state.diff.added == [13]
+        assert state.diff.removed == [11]
+        assert state.diff.changed == [12]
+        assert state.diff.has_changes
+        assert state.diff.to_dict() == {"added": [13], "removed": [11], "changed": [12]}
+
+    def test_no_changes(self):
+        """测试页面未变化"""
+        previous = serialize(build_page({10: "登录"}))
+        state = serialize(build_page({10: "登录"}), previous)
+
+        assert not state.diff.has_changes
+
+    def test_fingerprints_on_demand(self, monkeypatch):
+        """测试不保留指纹时不计算，计算 diff 时只为前后都存在的元素计算"""
+        calls = []
+        fingerprint = DOMTreeSerializer._element_fingerprint
+        monkeypatch.setattr(DOMTreeSerializer, "_element_fingerprint",
+                            staticmethod(lambda node: calls.append(node.backend_node_id) or fingerprint(node)))
+
+        assert serialize(build_page({10: "登录", 11: "注册"}), keep_fingerprints=False).element_fingerprints == {}
+        assert calls == []
+
+        previous = serialize(build_page({10: "登录", 11: "注册"}))
+        calls.clear()
+        state = serialize(build_page({10: "退出", 12: "确定"}), previous, keep_fingerprints=False)
+
+        assert calls == [10]
+        assert state.diff.to_dict() == {"added": [12], "removed": [11], "changed": [10]}
+
+    def test_in_place_mutation_detected(self):
+        """测试同一棵树原地修改（DOM 镜像）后仍能检测到变化"""
+        root = build_page({10: "登录"})
+        previous = serialize(root)
+        previous.selector_map[10].attributes["class"] = "btn disabled"
+        state = serialize(root, previous)
+
+        assert state.diff.changed == [10]
+
+    def test_dom_service_detects_changes(self):
+        """测试 DomService 默认保留指纹，连续序列化能检测内容变化"""
+        service = create_dom_service()
+        previous, _ = service.serialize_dom_tree(build_page({10: "登录", 11: "注册"}))
+        state, _ = service.serialize_dom_tree(build_page({10: "退出", 11: "注册"}), previous)
+
+        assert previous.element_fingerprints
+        assert state.diff.to_dict() == {"added": [], "removed": [], "changed": [10]}
@@ -0,0 +1,200 @@
+"""增强 DOM 树构建器单元测试"""
+
+import asyncio
+import sys
+
+import pytest
+
+from aerotest.browser.dom.tree_builder import EnhancedDOMTreeBuilder, is_node_visible
+from aerotest.browser.dom.views import DOMRect, NodeType, TargetAllTrees
+from tests.unit.dom_helpers import element
+
+# computed styles 对应 REQUIRED_COMPUTED_STYLES 的顺序
+STRINGS = ["block", "visible", "1", "auto", "default", "static", "rgba(0, 0, 0, 0)", "none"]
+VISIBLE_STYLE = [0, 1, 2, 3, 3, 3, 4, 3, 5, 6]
+HIDDEN_STYLE = [7, 1, 2, 3, 3, 3, 4, 3, 5, 6]
+
+
+def make_trees(root: dict, layout: dict[int, tuple], ax_nodes=None) -> TargetAllTrees:
+    """
+    根据 DOM 树和布局信息构造 TargetAllTrees
+
+    Args:
+        root: DOM 根节点
+        layout: backendNodeId -> (bounds, styles, scrollRects)
+        ax_nodes: AX 节点列表
+    """
+    backend_ids = list(layout.keys())
+    return TargetAllTrees(
+        snapshot={
+            "strings": STRINGS,
+            "documents": [{
+                "nodes": {"backendNodeId": backend_ids},
+                "layout": {
+                    "nodeIndex": list(range(len(backend_ids))),
+                    "bounds": [layout[b][0] for b in backend_ids],
+                    "styles": [layout[b][1] for b in backend_ids],
+                    "scrollRects": [layout[b][2] for b in backend_ids],
+                },
+            }],
+        },
+        dom_tree={"root": root},
+        ax_tree={"nodes": ax_nodes or []},
+        device_pixel_ratio=1.0,
+        cdp_timing={},
+    )
+
+
+@pytest.fixture
+def page_trees():
+    """包含 iframe 和 shadow root 的页面"""
+    shadow_button = element(21, "BUTTON", parent_id=20)
+    shadow_root = {
+        "nodeId": 20, "backendNodeId": 20, "nodeType": 11, "nodeName": "#document-fragment",
+        "shadowRootType": "open", "children": [shadow_button],
+    }
+    host = element(5, "MY-WIDGET", parent_id=3, shadowRoots=[shadow_root], children=[shadow_root])
+
+    frame_input = element(32, "INPUT", parent_id=31, attributes={"id": "inner", "type": "text"})
+    frame_body = element(31, "BODY", parent_id=30, children=[frame_input])
+    frame_html = element(30, "HTML", parent_id=29, frameId="child", children=[frame_body])
+    frame_doc = {
+        "nodeId": 29, "backendNodeId": 29, "nodeType": 9, "nodeName": "#document",
+        "children": [frame_html],
+    }
+    iframe = element(6, "IFRAME", parent_id=3, contentDocument=frame_doc)
+
+    button = element(4, "BUTTON", parent_id=3, attributes={"id": "login", "class": "btn"})
+    body = element(3, "BODY", parent_id=2, children=[button, host, iframe])
+    html = element(2, "HTML", parent_id=1, frameId="main", children=[body])
+    root = {"nodeId": 1, "backendNodeId": 1, "nodeType": 9, "nodeName": "#document", "children": [html]}
+
+    layout = {
+        2: ([0, 0, 1000, 800], VISIBLE_STYLE, [0, 0, 1000, 800]),
+        4: ([10, 20, 80, 30], VISIBLE_STYLE, [0, 0, 80, 30]),
+        5: ([0, 100, 200, 50], VISIBLE_STYLE, [0, 0, 200, 50]),
+        21: ([5, 110, 60, 20], HIDDEN_STYLE, [0, 0, 60, 20]),
+        6: ([100, 200, 400, 300], VISIBLE_STYLE, [0, 0, 400, 300]),
+        30: ([0, 0, 400, 600], VISIBLE_STYLE, [0, 50, 400, 300]),
+        32: ([10, 60, 120, 24], VISIBLE_STYLE, [0, 0, 120, 24]),
+    }
+    ax_nodes = [{
+        "nodeId": "ax-4", "backendNodeId": 4,
+        "role": {"value": "button"}, "name": {"value": "登录"},
+        "properties": [{"name": "focusable", "value": {"value": True}}],
+    }]
+    return make_trees(root, layout, ax_nodes)
+
+
+class TestEnhancedDOMTreeBuilder:
+    """测试 EnhancedDOMTreeBuilder"""
+
+    def test_build_structure(self, page_trees):
+        """测试节点结构和父子关系"""
+        builder = EnhancedDOMTreeBuilder(page_trees, "target-1", "session-1")
+        root = builder.build()
+
+        assert builder.node_count == 12
+        html = root.children_nodes[0]
+        body = html.children_nodes[0]
+        assert [c.node_name for c in body.children_nodes] == ["BUTTON", "MY-WIDGET", "IFRAME"]
+        assert all(c.parent_node is body for c in body.children_nodes)
+        assert body.children_nodes[0].attributes == {"id": "login", "class": "btn"}
+        assert body.children_nodes[0].target_id == "target-1"
+        assert body.children_nodes[0].session_id == "session-1"
+
+    def test_shadow_roots(self, page_trees):
+        """测试 shadow root 不重复出现在 children 中"""
+        root = EnhancedDOMTreeBuilder(page_trees, "t").build()
+        host = root.children_nodes[0].children_nodes[0].children_nodes[1]
+
+        assert host.children_nodes == []
+        assert len(host.shadow_roots) == 1
+        shadow_root = host.shadow_roots[0]
+        assert shadow_root.parent_node is host
+        assert shadow_root.node_type == NodeType.DOCUMENT_FRAGMENT_NODE
+        assert shadow_root.shadow_root_type == "open"
+        assert shadow_root.children_nodes[0].is_visible is False
+
+    def test_iframe_offset(self, page_trees):
+        """测试 iframe 偏移和滚动量累加到绝对位置"""
+        root = EnhancedDOMTreeBuilder(page_trees, "t").build()
+        iframe = root.children_nodes[0].children_nodes[0].children_nodes[2]
+        frame_doc = iframe.content_document
+
+        assert frame_doc.parent_node is iframe
+        frame_input = frame_doc.children_nodes[0].children_nodes[0].children_nodes[0]
+        # iframe (100, 200) + 帧内 HTML 滚动 (0, 50) -> (10+100, 60+200-50)
+        assert frame_input.absolute_position.x == 110
+        assert frame_input.absolute_position.y == 210
+        # 兄弟节点不受 iframe 偏移影响
+        button = root.children_nodes[0].children_nodes[0].children_nodes[0]
+        assert button.absolute_position.x == 10
+        assert button.absolute_position.y == 20
+
+    def test_total_frame_offset(self, page_trees):
+        """测试初始帧偏移"""
+        offset = DOMRect(x=5.0, y=7.0, width=0.0, height=0.0)
+        root = EnhancedDOMTreeBuilder(page_trees, "t").build(offset)
+        button = root.children_nodes[0].children_nodes[0].children_nodes[0]
+
+        assert button.absolute_position.x == 15
+        assert button.absolute_position.y == 27
+        assert offset.x == 5.0  # 不修改调用方的对象
+
+    def test_ax_node(self, page_trees):
+        """测试 AX 数据合并"""
+        root = EnhancedDOMTreeBuilder(page_trees, "t").build()
+        button = root.children_nodes[0].children_nodes[0].children_nodes[0]
+
+        assert button.ax_node.role == "button"
+        assert button.ax_node.name == "登录"
+        assert button.ax_node.properties[0].value is True
+
+    def test_deep_tree(self):
+        """测试超过递归限制的深层嵌套"""
+        depth = sys.getrecursionlimit() + 500
+        root = {"nodeId": 1, "backendNodeId": 1, "nodeType": 9, "nodeName": "#document"}
+        current = root
+        for node_id in range(2, depth + 2):
+            child = element(node_id, "DIV", parent_id=current["nodeId"])
+            current["children"] = [child]
+            current = child
+
+        builder = EnhancedDOMTreeBuilder(make_trees(root, {}), "t")
+        built = builder.build()
+
+        assert builder.node_count == depth + 1
+        node = built
+        while node.children_nodes:
+            node = node.children_nodes[0]
+        assert node.node_id == depth + 1
+        assert node.parent_node.node_id == depth
+
+    def test_build_in_thread(self, page_trees):
+        """测试在工作线程中构建"""
+        builder = EnhancedDOMTreeBuilder(page_trees, "t")
+        root = asyncio.run(asyncio.to_thread(builder.build))
+
+        assert root.node_name == "#document"
+        assert "build_enhanced_dom_tree" in builder.timing
+
+    def test_empty_root(self):
+        """测试根节点为空"""
+        trees = TargetAllTrees(
+            snapshot={}, dom_tree={}, ax_tree={}, device_pixel_ratio=1.0, cdp_timing={}
+        )
+
+        with pytest.raises(RuntimeError):
+            EnhancedDOMTreeBuilder(trees, "t").build()
+
+
+class TestIsNodeVisible:
+    """测试 is_node_visible"""
+
+    def test_no_snapshot(self, page_trees):
+        """测试无快照数据时默认可见"""
+        root = EnhancedDOMTreeBuilder(page_trees, "t").build()
+
+        assert root.snapshot_node is None
+        assert is_node_visible(root) is True
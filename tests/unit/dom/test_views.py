@@ -0,0 +1,77 @@
+"""DOM 视图数据结构单元测试"""
+
+import pytest
+
+from tests.unit.dom_helpers import build_tree, document, element
+
+
+@pytest.fixture
+def tree():
+    """带列表、shadow root 和 iframe 的页面"""
+    items = [element(10 + i, "LI", attributes={"class": f"item-{i}"}) for i in range(3)]
+    shadow_root = element(30, "#document-fragment", [element(31, "SPAN")],
+                          nodeType=11, shadowRootType="open")
+    host = element(5, "MY-WIDGET", shadowRoots=[shadow_root])
+    frame_doc = document(element(41, "HTML", [element(42, "BODY", [element(43, "INPUT")])]), node_id=40)
+    iframe = element(6, "IFRAME", contentDocument=frame_doc)
+    body = element(3, "BODY", [element(4, "UL", items), host, iframe])
+    return build_tree(document(element(2, "HTML", [body])))[1]
+
+
+def reference_xpath(node) -> str:
+    """未缓存的 XPath 参考实现（逐层向上遍历）"""
+    segments = []
+    current = node
+    while current and current.node_type.value in (1, 11):
+        if current.node_type.value == 11:
+            current = current.parent_node
+            continue
+        if current.parent_node and current.parent_node.node_name.lower() == "iframe":
+            break
+        siblings = [c for c in (current.parent_node.children_nodes or []) if c.node_type.value == 1
+                    and c.node_name.lower() == current.node_name.lower()] if current.parent_node else []
+        index = f"[{siblings.index(current) + 1}]" if len(siblings) > 1 and current in siblings else ""
+        segments.insert(0, f"{current.node_name.lower()}{index}")
+        current = current.parent_node
+    return "/".join(segments)
+
+
+class TestIdentityCache:
+    """测试 EnhancedDOMTreeNode 的身份缓存"""
+
+    def test_xpath_matches_reference(self, tree):
+        """测试缓存 XPath 与逐层遍历结果一致"""
+        for node in tree.values():
+            assert node.xpath == reference_xpath(node), node
+
+        assert tree[11].xpath == "html/body/ul/li[2]"
+        assert tree[31].xpath == "html/body/my-widget/span"
+
+    def test_branch_path(self, tree):
+        """测试父分支路径"""
+        assert tree[11]._get_parent_branch_path() == ["html", "body", "ul", "li"]
+        assert tree[1]._get_parent_branch_path() == []
+
+    def test_precompute(self, tree):
+        """测试预计算后哈希被缓存且值不变"""
+        expected = {node_id: hash(node) for node_id, node in tree.items() if node.node_type.value == 1}
+        for node in tree.values():
+            node.invalidate_identity_cache()
+
+        count = tree[1].precompute_identity_cache()
+
+        assert count == len(tree)
+        assert all(tree[node_id]._hash is not None for node_id in expected)
+        assert {node_id: hash(tree[node_id]) for node_id in expected} == expected
+
+    def test_invalidate(self, tree):
+        """测试属性变化后失效重新计算"""
+        item = tree[10]
+        old_hash, old_stable = hash(item), item.compute_stable_hash()
+
+        item.attributes["id"] = "first"
+        assert hash(item) == old_hash  # 未失效前仍是缓存值
+
+        item.invalidate_identity_cache()
+        assert hash(item) != old_hash
+        assert item.compute_stable_hash() != old_stable
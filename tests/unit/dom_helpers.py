@@ -0,0 +1,110 @@
+"""单元测试共用的 DOM 构造工具"""
+
+from typing import Optional
+
+from aerotest.browser.dom.tree_builder import EnhancedDOMTreeBuilder
+from aerotest.browser.dom.views import EnhancedDOMTreeNode, TargetAllTrees
+
+# computed styles 对应 REQUIRED_COMPUTED_STYLES 的顺序（可见、cursor: pointer）
+STRINGS = ["block", "visible", "1", "auto", "pointer", "static", "rgba(0, 0, 0, 0)"]
+VISIBLE_STYLE = [0, 1, 2, 3, 3, 3, 4, 3, 5, 6]
+
+
+def element(
+    node_id: int,
+    name: str,
+    children: Optional[list] = None,
+    parent_id: Optional[int] = None,
+    attributes: Optional[dict[str, str]] = None,
+    **extra,
+) -> dict:
+    """
+    构造 DOM.Node 字典（子节点的 parentId 自动填充）
+
+    Args:
+        node_id: nodeId，同时作为 backendNodeId
+        name: 节点名（大写标签名）
+        children: 子节点列表
+        parent_id: 父节点 nodeId
+        attributes: 属性字典
+        **extra: 其他 DOM.Node 字段（shadowRoots、contentDocument 等）
+
+    Returns:
+        DOM.Node 字典
+    """
+    node = {"nodeId": node_id, "backendNodeId": node_id, "nodeType": 1, "nodeName": name}
+    if children is not None:
+        for child in children:
+            child["parentId"] = node_id
+        node["children"] = children
+    if parent_id is not None:
+        node["parentId"] = parent_id
+    if attributes:
+        node["attributes"] = [item for pair in attributes.items() for item in pair]
+    node.update(extra)
+    return node
+
+
+def text_node(node_id: int, value: str, parent_id: Optional[int] = None) -> dict:
+    """构造文本节点字典"""
+    node = {"nodeId": node_id, "backendNodeId": node_id, "nodeType": 3,
+            "nodeName": "#text", "nodeValue": value}
+    if parent_id is not None:
+        node["parentId"] = parent_id
+    return node
+
+
+def document(*children: dict, node_id: int = 1) -> dict:
+    """构造 #document 节点字典（子节点的 parentId 自动填充）"""
+    return element(node_id, "#document", list(children), nodeType=9)
+
+
+def login_page(button_id: str = "login", button_class: str = "btn") -> dict:
+    """登录页：表单（4）下有用户名（10）、密码（11）输入框和登录按钮（12）"""
+    form = element(4, "FORM", [
+        element(10, "INPUT", attributes={"id": "username", "type": "text"}),
+        element(11, "INPUT", attributes={"id": "password", "type": "password"}),
+        element(12, "BUTTON", attributes={"id": button_id, "type": "submit", "class": button_class}),
+    ])
+    return document(element(2, "HTML", [element(3, "BODY", [form])]))
+
+
+def make_trees(root: dict, layout: Optional[dict[int, list]] = None) -> TargetAllTrees:
+    """
+    根据 DOM 树构造 TargetAllTrees
+
+    Args:
+        root: DOM 根节点
+        layout: backendNodeId -> bounds（均为可见样式）；不传时快照为空
+
+    Returns:
+        TargetAllTrees
+    """
+    snapshot = {}
+    if layout is not None:
+        ids = list(layout)
+        snapshot = {"strings": STRINGS, "documents": [{
+            "nodes": {"backendNodeId": ids},
+            "layout": {"nodeIndex": list(range(len(ids))),
+                       "bounds": [layout[i] for i in ids], "styles": [VISIBLE_STYLE] * len(ids)},
+        }]}
+    return TargetAllTrees(snapshot=snapshot, dom_tree={"root": root}, ax_tree={"nodes": []},
+                          device_pixel_ratio=1.0, cdp_timing={})
+
+
+def build_tree(
+    root: dict,
+    layout: Optional[dict[int, list]] = None,
+) -> tuple[EnhancedDOMTreeNode, dict[int, EnhancedDOMTreeNode]]:
+    """
+    构建增强 DOM 树
+
+    Args:
+        root: DOM 根节点
+        layout: backendNodeId -> bounds（见 make_trees）
+
+    Returns:
+        (根节点, nodeId -> 节点)
+    """
+    builder = EnhancedDOMTreeBuilder(make_trees(root, layout), "t1", "s1")
+    return builder.build(), builder.node_lookup
@@ -64,8 +64,8 @@ class TestAnchorLocator:
         ]
         
         return SerializedDOMState(
-            simplified_nodes=nodes,
-            selector_map={},
+            _root=None,
+            selector_map={node.backend_node_id: node for node in nodes},
         )
     
     def test_extract_anchor_right(self, locator):
@@ -0,0 +1,137 @@
+"""关键词多模式匹配测试"""
+
+import re
+
+import pytest
+
+from aerotest.core.funnel.keyword_matcher import AhoCorasick, get_keyword_matcher
+from aerotest.core.funnel.l1.action_patterns import ACTION_KEYWORDS
+from aerotest.core.funnel.l1.element_types import ELEMENT_TYPE_KEYWORDS
+from aerotest.core.funnel.l1.entity_extractor import EntityExtractor
+from aerotest.core.funnel.l3.anchor_locator import AnchorLocator
+from aerotest.core.funnel.l3.types import Direction
+from aerotest.core.funnel.types import ActionType, ElementType
+
+INSTRUCTIONS = [
+    "点击提交按钮",
+    "在用户名输入框中输入admin",
+    "点击用户名输入框右边的清除按钮",
+    "在密码框下方的链接",
+    "勾选同意复选框",
+    "Click the Submit button",
+    "拖动滑块到最右边",
+    "第一行\n点击下拉框",
+    "",
+]
+
+
+class TestAhoCorasick:
+    """测试 Aho–Corasick 自动机"""
+
+    def test_overlapping_matches(self):
+        """测试重叠和嵌套的关键词都能找到"""
+        automaton = AhoCorasick([("he", 1), ("she", 2), ("his", 3), ("hers", 4)])
+
+        matches = sorted(automaton.iter("ushers"))
+
+        assert matches == [(1, "she", 2), (2, "he", 1), (2, "hers", 4)]
+
+    def test_same_keyword_multiple_tags(self):
+        """测试同一个关键词携带多个标签"""
+        automaton = AhoCorasick([("文本框", "input"), ("文本框", "textarea"), ("框", "input")])
+
+        tags = [tag for _, keyword, tag in automaton.iter("文本框") if keyword == "文本框"]
+
+        assert tags == ["input", "textarea"]
+
+    def test_matches_substring_search(self):
+        """测试与逐个子串检查结果一致"""
+        keywords = [kw.lower() for data in ACTION_KEYWORDS.values() for kw in data["keywords"]]
+        automaton = AhoCorasick((kw, kw) for kw in keywords)
+
+        for text in INSTRUCTIONS:
+            found = {keyword for _, keyword, _ in automaton.iter(text.lower())}
+            assert found == {kw for kw in keywords if kw in text.lower()}, text
+
+
+class TestKeywordMatcher:
+    """测试 L1/L3 词表匹配器"""
+
+    @pytest.fixture
+    def matcher(self):
+        """进程共享的匹配器"""
+        return get_keyword_matcher()
+
+    def test_single_pass(self, matcher):
+        """测试一次扫描得到意图、元素类型和方位"""
+        scan = matcher.scan("点击用户名输入框右边的清除按钮")
+
+        assert scan.actions == [ActionType.CLICK, ActionType.INPUT]
+        assert scan.context_hints == [ActionType.CLICK, ActionType.INPUT]
+        assert scan.element_types == [ElementType.BUTTON, ElementType.INPUT]
+        assert scan.element_name == ElementType.INPUT
+        assert scan.directions == [Direction.RIGHT]
+        assert "点击" in scan.prefixes
+
+    def test_scan_cached(self, matcher):
+        """测试同一文本只扫描一次"""
+        assert matcher.scan("点击登录按钮") is matcher.scan("点击登录按钮")
+
+    def test_action_pattern_order(self, matcher):
+        """测试合并正则与逐个 re.match 的结果一致"""
+        for text in INSTRUCTIONS:
+            expected = next(
+                (
+                    action
+                    for action, data in ACTION_KEYWORDS.items()
+                    for pattern in data["patterns"]
+                    if re.match(pattern, text.lower())
+                ),
+                None,
+            )
+            assert matcher.match_action_pattern(text.lower()) == expected, text
+
+    def test_element_pattern_order(self, matcher):
+        """测试合并正则与逐个 re.search 的结果一致（包括多行文本）"""
+        for text in INSTRUCTIONS:
+            expected = next(
+                (
+                    element_type
+                    for element_type, data in ELEMENT_TYPE_KEYWORDS.items()
+                    for pattern in data["patterns"]
+                    if re.search(pattern, text.lower())
+                ),
+                None,
+            )
+            assert matcher.search_element_pattern(text.lower()) == expected, text
+
+    def test_spatial_groups(self, matcher):
+        """测试合并正则与逐个空间关系模式的分组一致"""
+        for text in INSTRUCTIONS:
+            expected = None
+            for pattern in AnchorLocator.SPATIAL_PATTERNS:
+                match = re.search(pattern, text)
+                if match:
+                    expected = match.groups()
+                    break
+            assert matcher.search_spatial(text) == expected, text
+
+
+class TestRemoveActionWords:
+    """测试移除动作词"""
+
+    def test_longest_prefix_once(self):
+        """测试只移除开头最长的动作词，结果与集合遍历顺序无关"""
+        extractor = EntityExtractor()
+        click_keywords = ACTION_KEYWORDS[ActionType.CLICK]["keywords"]
+
+        assert extractor._remove_action_words("点击按钮", click_keywords) == "按钮"
+        assert extractor._remove_action_words("双击 图标", click_keywords) == "图标"
+        assert extractor._remove_action_words("提交按钮", click_keywords) == "提交按钮"
+
+    def test_custom_keywords(self):
+        """测试词表之外的动作词"""
+        extractor = EntityExtractor()
+
+        assert extractor._remove_action_words("Press 回车", ["Press"]) == "回车"
+        assert extractor._remove_action_words("Click 按钮", []) == "Click 按钮"
@@ -0,0 +1,174 @@
+"""LLM 响应缓存测试"""
+
+import sqlite3
+
+import httpx
+import pytest
+
+from aerotest.core.funnel.l4.qwen_client import QwenClient
+from aerotest.core.funnel.l4.response_cache import ResponseCache, make_cache_key
+
+MESSAGES = [
+    {"role": "system", "content": "你是测试助手"},
+    {"role": "user", "content": "选择最便宜的商品\n  候选: [1] [2]  "},
+]
+
+
+def make_client(cache: ResponseCache) -> tuple[QwenClient, list]:
+    """构造使用假 API 的客户端，返回客户端和请求记录"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": f'{{"index": {len(requests)}}}'}}],
+            "usage": {"total_tokens": 10},
+        })
+
+    client = QwenClient(api_key="test", base_url="https://api.test", cache=cache, use_cache=True)
+    client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client, requests
+
+
+class TestResponseCache:
+    """测试 ResponseCache"""
+
+    def test_key_normalization(self):
+        """测试仅空白不同的消息得到相同的键"""
+        reformatted = [
+            {"role": "system", "content": "  你是测试助手"},
+            {"role": "user", "content": "选择最便宜的商品\n\n候选: [1] [2]"},
+        ]
+
+        assert make_cache_key("qwen-max", MESSAGES) == make_cache_key("qwen-max", reformatted)
+        assert make_cache_key("qwen-max", MESSAGES) != make_cache_key("qwen-plus", MESSAGES)
+        assert make_cache_key("qwen-max", MESSAGES, temperature=0.1) != make_cache_key(
+            "qwen-max", MESSAGES, temperature=0.7
+        )
+
+    def test_get_set(self):
+        """测试读写和命中率"""
+        cache = ResponseCache(":memory:")
+
+        assert cache.get("k") is None
+        cache.set("k", "qwen-max", "响应", latency_ms=1500)
+        assert cache.get("k") == "响应"
+
+        stats = cache.stats
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["saved_ms"] == 1500
+        assert stats["entries"] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        """测试过期条目视为未命中并被删除"""
+        cache = ResponseCache(":memory:", ttl=60)
+        cache.set("k", "qwen-max", "响应")
+
+        import aerotest.core.funnel.l4.response_cache as module
+        real_time = module.time.time
+        monkeypatch.setattr(module.time, "time", lambda: real_time() + 120)
+
+        assert cache.get("k") is None
+        assert cache.stats["expired"] == 1
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """测试超出容量时淘汰最久未访问的条目"""
+        cache = ResponseCache(":memory:", max_entries=2)
+        cache.set("a", "m", "A")
+        cache.set("b", "m", "B")
+        cache._conn.execute("UPDATE responses SET accessed_at = accessed_at + 10 WHERE key = 'a'")
+
+        cache.set("c", "m", "C")
+
+        assert cache.get("a") == "A"
+        assert cache.get("b") is None
+        assert cache.get("c") == "C"
+        assert cache.stats["evictions"] == 1
+
+    def test_persistence(self, tmp_path):
+        """测试缓存跨实例持久化"""
+        path = tmp_path / "cache" / "llm.sqlite3"
+        cache = ResponseCache(path)
+        cache.set("k", "m", "持久化")
+        cache.close()
+
+        assert ResponseCache(path).get("k") == "持久化"
+
+
+class TestQwenClientCache:
+    """测试 QwenClient 使用响应缓存"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_chat_hits_cache(self):
+        """测试重复请求直接返回缓存"""
+        client, requests = make_client(ResponseCache(":memory:"))
+
+        first = await client.chat(MESSAGES)
+        second = await client.chat(MESSAGES)
+
+        assert first == second
+        assert len(requests) == 1
+        assert client.cache.stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_chat_with_json_hits_cache(self):
+        """测试 chat_with_json 的重复请求命中缓存"""
+        client, requests = make_client(ResponseCache(":memory:"))
+
+        first = await client.chat_with_json([dict(m) for m in MESSAGES])
+        second = await client.chat_with_json([dict(m) for m in MESSAGES])
+
+        assert first == second == {"index": 1}
+        assert len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_close_keeps_shared_cache(self, tmp_path, monkeypatch):
+        """测试关闭客户端时只关闭客户端自己创建的缓存"""
+        shared = ResponseCache(":memory:")
+        client, _ = make_client(shared)
+        await client.close()
+        shared.set("k", "m", "仍可用")
+        assert shared.get("k") == "仍可用"
+
+        from aerotest.config.settings import get_settings
+
+        monkeypatch.setattr(get_settings(), "llm_cache_path", str(tmp_path / "llm.sqlite3"))
+        owned = QwenClient(api_key="test", use_cache=True)
+        await owned.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            len(owned.cache)
+
+    @pytest.mark.asyncio
+    async def test_bypass_cache(self):
+        """测试跳过缓存时重新请求并刷新缓存"""
+        client, requests = make_client(ResponseCache(":memory:"))
+
+        await client.chat(MESSAGES)
+        refreshed = await client.chat(MESSAGES, bypass_cache=True)
+
+        assert len(requests) == 2
+        assert await client.chat(MESSAGES) == refreshed
+
+    @pytest.mark.asyncio
+    async def test_sampling_params_in_key(self):
+        """测试不同采样参数不共享缓存"""
+        client, requests = make_client(ResponseCache(":memory:"))
+
+        await client.chat(MESSAGES, temperature=0.2)
+        await client.chat(MESSAGES, temperature=0.9)
+
+        assert len(requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled(self):
+        """测试关闭缓存"""
+        client, requests = make_client(ResponseCache(":memory:"))
+        client.use_cache = False
+
+        await client.chat(MESSAGES)
+        await client.chat(MESSAGES)
+
+        assert len(requests) == 2
@@ -0,0 +1,62 @@
+"""评分器测试"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from aerotest.core.funnel.l2.scorer import Scorer
+from aerotest.core.funnel.types import ActionSlot, ActionType, ElementType
+
+WORDS = ["提交", "登录", "用户名", "密码", "submit", "login", "user", "username", "btn", "search", "取消"]
+
+
+def make_elements(count: int, seed: int = 0) -> list:
+    """随机生成带常用属性的元素"""
+    rng = random.Random(seed)
+    elements = []
+    for i in range(count):
+        attributes = {}
+        for attr in ("id", "name", "placeholder", "aria-label", "title", "innerText", "type"):
+            if rng.random() < 0.4:
+                attributes[attr] = "-".join(rng.sample(WORDS, rng.randint(1, 2)))
+        elements.append(SimpleNamespace(
+            backend_node_id=i,
+            tag_name=rng.choice(["button", "input", "a", "div"]),
+            attributes=attributes,
+        ))
+    return elements
+
+
+class TestScorer:
+    """测试评分器"""
+
+    @pytest.fixture
+    def scorer(self):
+        """创建评分器实例"""
+        return Scorer()
+
+    @pytest.mark.parametrize("keywords, target_type", [
+        (["提交", "submit", "btn"], ElementType.BUTTON),
+        (["用户名", "user", "username", "name"], ElementType.INPUT),
+        (["login"], None),
+    ])
+    def test_batch_matches_scalar(self, scorer, keywords, target_type):
+        """测试批量评分与逐个评分的排序和细节相同"""
+        elements = make_elements(300)
+        slot = ActionSlot(action=ActionType.CLICK, target_type=target_type, keywords=keywords)
+
+        scalar = scorer.score_elements(elements, slot, top_n=50, batch=False)
+        batch = scorer.score_elements(elements, slot, top_n=50)
+
+        assert [(r.element.backend_node_id, r.score, r.matched_attributes, r.match_reasons) for r in batch] == [
+            (r.element.backend_node_id, r.score, r.matched_attributes, r.match_reasons) for r in scalar
+        ]
+        assert batch
+
+    def test_no_keywords(self, scorer):
+        """测试没有关键词时只有类型奖励"""
+        slot = ActionSlot(action=ActionType.CLICK, target_type=ElementType.LINK)
+        results = scorer.score_elements(make_elements(20), slot)
+
+        assert results == []  # 0.2 的类型奖励低于候选下限
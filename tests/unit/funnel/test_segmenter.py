@@ -0,0 +1,96 @@
+"""jieba 分词词典缓存测试"""
+
+import jieba
+import pytest
+
+from aerotest.core.funnel import segmenter
+
+INSTRUCTIONS = [
+    "点击登录按钮",
+    "在用户名输入框中输入admin",
+    "点击用户名右边的下拉框",
+    "勾选记住密码复选框",
+]
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    """重置进程内的词典状态，测试结束后恢复"""
+    tokenizer = jieba.dt
+    saved = (tokenizer.FREQ, tokenizer.total, tokenizer.initialized)
+    monkeypatch.setattr(segmenter, "_initialized", False)
+    monkeypatch.setattr(segmenter, "_stats", {})
+    tokenizer.initialized = False
+    yield
+    tokenizer.FREQ, tokenizer.total, tokenizer.initialized = saved
+
+
+def reset():
+    """模拟新进程"""
+    segmenter._initialized = False
+    jieba.dt.initialized = False
+
+
+class TestSegmenter:
+    """测试进程共享的 jieba 词典"""
+
+    def test_cache_round_trip(self, fresh, tmp_path):
+        """测试从缓存加载的词典与构建的词典分词结果一致"""
+        assert segmenter.ensure_dictionary(tmp_path) is True
+        assert segmenter.dictionary_stats()["from_cache"] is False
+        built = [segmenter.cut(text) for text in INSTRUCTIONS]
+        built_total = jieba.dt.total
+
+        reset()
+        assert segmenter.ensure_dictionary(tmp_path) is True
+        assert segmenter.dictionary_stats()["from_cache"] is True
+
+        assert [segmenter.cut(text) for text in INSTRUCTIONS] == built
+        assert jieba.dt.total == built_total
+        assert jieba.dt.FREQ["下拉框"] == 500
+
+    def test_initialized_once(self, fresh, tmp_path):
+        """测试重复调用和构造组件不会再次修改词典"""
+        from aerotest.core.funnel.l1.slot_filler import SlotFiller
+
+        segmenter.ensure_dictionary(tmp_path)
+        total = jieba.dt.total
+
+        assert segmenter.ensure_dictionary(tmp_path) is False
+        SlotFiller().fill("点击登录按钮")
+        SlotFiller().fill("点击登录按钮")
+
+        assert jieba.dt.total == total
+
+    def test_version_tracks_keywords(self):
+        """测试关键词或词频变化时版本号改变"""
+        words = segmenter.custom_words()
+
+        assert segmenter.dictionary_version(words) == segmenter.dictionary_version(list(words))
+        assert segmenter.dictionary_version(words) != segmenter.dictionary_version(words + [("新词", 1000)])
+        assert segmenter.dictionary_version(words) != segmenter.dictionary_version(
+            [(word, freq + 1) for word, freq in words]
+        )
+
+    def test_corrupt_cache_rebuilt(self, fresh, tmp_path):
+        """测试损坏的缓存被重建"""
+        version = segmenter.dictionary_version()
+        (tmp_path / f"dict-{version}.json").write_text('{"freq": [], "total": 1}', encoding="utf-8")
+
+        segmenter.ensure_dictionary(tmp_path)
+
+        assert segmenter.dictionary_stats()["from_cache"] is False
+        assert segmenter.cut("点击登录按钮")
+
+        reset()
+        segmenter.ensure_dictionary(tmp_path)
+        assert segmenter.dictionary_stats()["from_cache"] is True
+
+    def test_background_warmup(self, fresh, tmp_path):
+        """测试后台预热"""
+        thread = segmenter.warmup(cache_dir=tmp_path)
+
+        assert thread is not None
+        thread.join(timeout=30)
+        assert segmenter._initialized
+        assert segmenter.warmup(cache_dir=tmp_path) is None
@@ -0,0 +1,121 @@
+"""L1 槽位缓存测试"""
+
+import pytest
+
+from aerotest.core.funnel.l1 import synonym_mapper
+from aerotest.core.funnel.l1.l1_engine import L1Engine
+from aerotest.core.funnel.l1.slot_cache import SlotCache
+from aerotest.core.funnel.types import ActionSlot, ActionType, ElementType, FunnelContext
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """使用独立缓存的引擎，记录 SlotFiller.fill 的调用"""
+    engine = L1Engine(slot_cache=SlotCache())
+    engine.fills = []
+    fill = engine.slot_filler.fill
+
+    def counting_fill(text):
+        engine.fills.append(text)
+        return fill(text)
+
+    monkeypatch.setattr(engine.slot_filler, "fill", counting_fill)
+    return engine
+
+
+class TestSlotCache:
+    """测试 SlotCache"""
+
+    @pytest.mark.asyncio
+    async def test_shared_by_all_entry_points(self, engine):
+        """测试 extract_slot、process 和 extract_batch 共用缓存，空白差异视为同一指令"""
+        first = engine.extract_slot("点击提交按钮")
+        context = await engine.process(FunnelContext(instruction="  点击提交按钮 "))
+        batch = engine.extract_batch(["点击提交按钮", "输入用户名", "输入用户名"])
+
+        assert engine.fills == ["点击提交按钮", "输入用户名"]
+        assert context.action_slot == first == batch[0]
+        assert batch[1].action == ActionType.INPUT
+        assert engine.slot_cache.stats["hits"] == 3
+
+    def test_returns_copies(self, engine):
+        """测试修改返回的槽位不会污染缓存"""
+        slot = engine.extract_slot("点击提交按钮")
+        keywords = list(slot.keywords)
+
+        slot.keywords.append("污染")
+        slot.attributes["type"] = "reset"
+
+        cached = engine.extract_slot("点击提交按钮")
+        assert cached.keywords == keywords
+        assert cached.attributes["type"] == "submit"
+
+    def test_add_synonym_invalidates(self, engine, monkeypatch):
+        """测试运行时添加同义词后重新计算槽位"""
+        monkeypatch.setitem(synonym_mapper.SYNONYM_DICT, "提交", list(synonym_mapper.SYNONYM_DICT["提交"]))
+        monkeypatch.setattr(synonym_mapper, "_fingerprint", None)
+
+        before = engine.extract_slot("点击提交按钮")
+        engine.synonym_mapper.add_synonym("提交", ["commit"])
+        after = engine.extract_slot("点击提交按钮")
+
+        assert "commit" not in before.keywords
+        assert "commit" in after.keywords
+        assert len(engine.fills) == 2
+        assert engine.slot_cache.stats["invalidations"] == 1
+
+    def test_values_kept_verbatim(self, engine):
+        """测试输入值内的空白保持原样，只有值内空白不同的指令不共用槽位"""
+        spaced = engine.extract_slot('在搜索框输入"hello   world"')
+        single = engine.extract_slot('在搜索框输入"hello world"')
+
+        assert spaced.value == L1Engine(use_slot_cache=False).extract_slot('在搜索框输入"hello   world"').value
+        assert spaced.value == "hello   world"
+        assert single.value == "hello world"
+        assert len(engine.fills) == 2
+
+    def test_config_in_key(self):
+        """测试不同的同义词扩展配置不共用结果"""
+        cache = SlotCache()
+        expanded = L1Engine(slot_cache=cache).extract_slot("点击提交按钮")
+        plain = L1Engine(slot_cache=cache, enable_synonym_expansion=False).extract_slot("点击提交按钮")
+
+        assert len(plain.keywords) < len(expanded.keywords)
+        assert L1Engine(use_slot_cache=False).slot_cache is None
+
+    def test_lru_eviction(self):
+        """测试超出容量时淘汰最久未访问的条目"""
+        cache = SlotCache(max_entries=2)
+        for key in ("a", "b"):
+            cache.set(key, ActionSlot(action=ActionType.CLICK))
+        cache.get("a")
+        cache.set("c", ActionSlot(action=ActionType.CLICK))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats["evictions"] == 1
+
+    def test_persistence(self, tmp_path, monkeypatch):
+        """测试持久化条目跨实例命中，词表变化时被丢弃"""
+        path = tmp_path / "slots.sqlite3"
+        slot = ActionSlot(
+            action=ActionType.CLICK,
+            target="提交按钮",
+            target_type=ElementType.BUTTON,
+            keywords=["提交", "按钮"],
+            attributes={"type": "submit"},
+            confidence=0.9,
+        )
+        cache = SlotCache(path=path)
+        cache.set("k", slot, version="v1")
+        cache.close()
+
+        cache = SlotCache(path=path)
+        assert cache.get("k", version="v2") is None
+        assert cache.get("k", version="v1") == slot
+        assert cache.stats["disk_hits"] == 1
+        cache.close()
+
+        from aerotest.core.funnel import segmenter
+        monkeypatch.setattr(segmenter, "dictionary_version", lambda: "changed")
+        assert SlotCache(path=path).get("k", version="v1") is None
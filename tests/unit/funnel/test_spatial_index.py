@@ -0,0 +1,159 @@
+"""L3 空间索引测试"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from aerotest.browser.dom.views import DOMRect
+from aerotest.core.funnel.l3.proximity_detector import ProximityDetector
+from aerotest.core.funnel.l3.spatial_index import SpatialIndex
+from aerotest.core.funnel.l3.types import Direction, ProximityResult
+from aerotest.core.funnel.l3.utils import (
+    calculate_angle,
+    calculate_distance,
+    get_element_position,
+    is_in_direction,
+)
+
+
+def make_element(node_id: int, x: float, y: float, width: float = 40, height: float = 20):
+    """构造带快照位置的元素"""
+    return SimpleNamespace(
+        backend_node_id=node_id,
+        absolute_position=DOMRect(x=x, y=y, width=width, height=height),
+    )
+
+
+def make_page(count: int, seed: int = 0) -> list:
+    """随机布局的页面元素（部分没有位置）"""
+    rng = random.Random(seed)
+    elements = []
+    for i in range(count):
+        if rng.random() < 0.05:
+            elements.append(SimpleNamespace(backend_node_id=i, absolute_position=None))
+            continue
+        elements.append(make_element(
+            i,
+            rng.uniform(-50, 1400),
+            rng.uniform(-50, 3000),
+            rng.uniform(0, 300),
+            rng.uniform(0, 80),
+        ))
+    return elements
+
+
+def linear_scan(detector, anchor, candidates, direction, max_distance):
+    """逐个计算所有候选的参考实现"""
+    anchor_pos = get_element_position(anchor)
+    results = []
+    for candidate in candidates:
+        if candidate.backend_node_id == anchor.backend_node_id:
+            continue
+        candidate_pos = get_element_position(candidate)
+        if not candidate_pos:
+            continue
+        distance = calculate_distance(anchor_pos, candidate_pos)
+        if distance > max_distance:
+            continue
+        if direction and not is_in_direction(anchor_pos, candidate_pos, direction, detector.direction_tolerance):
+            continue
+        score = detector._calculate_proximity_score(anchor_pos, candidate_pos, distance, True, direction)
+        results.append(ProximityResult(
+            element=candidate,
+            distance=distance,
+            direction_match=True,
+            angle=calculate_angle(anchor_pos, candidate_pos),
+            score=score,
+        ))
+    results.sort(reverse=True)
+    return [(r.element.backend_node_id, r.distance, r.angle, r.score) for r in results]
+
+
+class TestSpatialIndex:
+    """测试 SpatialIndex"""
+
+    def test_skips_elements_without_position(self):
+        """测试没有位置的元素不入索引"""
+        index = SpatialIndex([make_element(1, 0, 0), SimpleNamespace(backend_node_id=2, absolute_position=None)])
+
+        assert len(index) == 1
+        assert index.elements[0].backend_node_id == 1
+
+    def test_invalid_cell_size(self):
+        """测试非法网格大小"""
+        with pytest.raises(ValueError):
+            SpatialIndex([], cell_size=0)
+
+    def test_radius_boundary_inclusive(self):
+        """测试半径边界包含在内"""
+        anchor = make_element(0, 0, 0)
+        index = SpatialIndex([make_element(1, 100, 0), make_element(2, 101, 0)])
+
+        hits = index.radius_query(get_element_position(anchor), 100.0)
+
+        assert hits == [(0, 100.0)]
+
+    def test_cone_query(self):
+        """测试方向锥查询"""
+        anchor = make_element(0, 200, 200)
+        elements = [
+            make_element(1, 300, 200),   # 右
+            make_element(2, 100, 200),   # 左
+            make_element(3, 200, 300),   # 下
+            make_element(4, 200, 100),   # 上
+            make_element(5, 290, 290),   # 右下 45°
+        ]
+        index = SpatialIndex(elements)
+        anchor_pos = get_element_position(anchor)
+
+        def ids(direction):
+            return [index.elements[slot].backend_node_id for slot, _ in index.cone_query(anchor_pos, direction, 200.0)]
+
+        assert ids(Direction.RIGHT) == [1, 5]
+        assert ids(Direction.LEFT) == [2]
+        assert ids(Direction.BELOW) == [3, 5]
+        assert ids(Direction.ABOVE) == [4]
+        assert ids(Direction.NEAR) == [1, 2, 3, 4, 5]
+
+    @pytest.mark.parametrize("direction", [None, *Direction])
+    @pytest.mark.parametrize("max_distance", [0.0, 75.0, 300.0, 5000.0, float("inf")])
+    def test_matches_linear_scan(self, direction, max_distance):
+        """测试结果与逐个计算完全相同"""
+        elements = make_page(800)
+        detector = ProximityDetector()
+        index = SpatialIndex(elements, cell_size=64)
+        rng = random.Random(7)
+
+        for anchor in rng.sample([e for e in elements if e.absolute_position], 10):
+            expected = linear_scan(detector, anchor, elements, direction, max_distance)
+            results = detector.find_nearby_elements(anchor, elements, direction, max_distance, index=index)
+
+            assert [
+                (r.element.backend_node_id, r.distance, r.angle, r.score) for r in results
+            ] == expected
+
+    def test_wide_tolerance(self):
+        """测试容差超过 90° 时不按半平面裁剪"""
+        elements = make_page(300, seed=3)
+        detector = ProximityDetector(direction_tolerance=120.0)
+        anchor = elements[1]
+
+        for direction in (Direction.LEFT, Direction.RIGHT, Direction.ABOVE, Direction.BELOW):
+            expected = linear_scan(detector, anchor, elements, direction, 400.0)
+            results = detector.find_nearby_elements(anchor, elements, direction, 400.0)
+
+            assert [r.element.backend_node_id for r in results] == [e[0] for e in expected]
+
+    def test_engine_caches_index_per_state(self):
+        """测试 L3 引擎按 DOM 状态复用索引"""
+        from aerotest.core.funnel.l3.l3_engine import L3Engine
+
+        engine = L3Engine(use_event_listeners=False)
+        elements = make_page(50)
+        state_a, state_b = object(), object()
+
+        index = engine._get_spatial_index(state_a, elements)
+
+        assert engine._get_spatial_index(state_a, elements) is index
+        assert engine._get_spatial_index(state_b, elements) is not index
@@ -134,6 +134,31 @@ class TestSynonymMapper:
         # 结果应该一致（都是小写）
         assert synonyms1 == synonyms2
 
+    
+    def test_reverse_index(self, mapper):
+        """测试反向索引与扩展顺序一致"""
+        roots = mapper.lookup_roots("确认")
+        
+        assert roots["确认"] == 1.0
+        assert roots["提交"] == mapper.get_weight("提交", "确认")
+        assert mapper.lookup_roots("随便") == {}
+    
+    def test_add_synonym_updates_all_mappers(self, mapper):
+        """测试添加同义词后增量更新所有映射器的扩展表"""
+        other = SynonymMapper(max_synonyms=1)
+        
+        mapper.add_synonym("词根", ["甲", "乙"])
+        
+        assert mapper.expand("词根") == ["词根", "甲", "乙"]
+        assert other.expand("词根") == ["词根", "甲"]
+        assert mapper.get_weight("词根", "乙") == 0.8
+        assert other.get_weight("词根", "乙") == 0.0
+        
+        mapper.add_synonym("词根", ["丙"])
+        
+        assert other.find_best_match("词根", ["丙", "甲"]) == ("甲", 0.9)
+        assert mapper.lookup_roots("丙") == {"词根": 0.7}
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
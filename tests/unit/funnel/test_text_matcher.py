@@ -104,6 +104,26 @@ class TestTextMatcher:
         score2 = matcher.match("SUBMIT", "submit")
         assert score1 == score2 == 1.0
 
+    def test_match_any_batch(self, matcher):
+        """测试批量匹配与逐个 match_any 结果相同"""
+        texts = [
+            "submit", "Submit Button", "sumit", "提交订单", "  ", "", "用户名 输入框",
+            "cancel", "button submit", "submit-submit", "a",
+        ]
+        keywords = ["submit", "提交", "button", " ", "", "a", "输入"]
+
+        expected = [matcher.match_any(text, keywords) for text in texts]
+
+        assert matcher.match_any_batch(texts, keywords) == expected
+
+    def test_match_any_batch_cutoff(self, matcher):
+        """测试批量匹配的得分下限"""
+        texts = ["submit", "sub", "cancel"]
+        expected = [matcher.match_any(text, ["submit"]) for text in texts]
+        scores = matcher.match_any_batch(texts, ["submit"], score_cutoff=0.5)
+
+        assert scores == [s if s >= 0.5 else 0.0 for s in expected]
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
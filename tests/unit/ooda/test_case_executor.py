@@ -1,11 +1,18 @@
 """用例执行器单元测试"""
 
+import asyncio
+import time
+from types import SimpleNamespace
+
 import pytest
 
+from aerotest.browser.cdp.storage_state import StorageState, StorageStateStore
 from aerotest.core.ooda import (
+    ActionStatus,
     ActionType,
     CaseExecutor,
     ExecutionContext,
+    ExecutionResult,
     TestCase,
     TestStep,
 )
@@ -179,6 +186,273 @@ class TestCaseExecutor:
         assert len(result.step_results) == 2
 
 
+def make_cases(*delays, fail: tuple = ()) -> list:
+    """构造按 metadata 控制耗时和结果的用例"""
+    return [
+        TestCase(case_id=f"TC{i:03d}", name=f"用例 {i}", metadata={"delay": delay, "fail": i in fail})
+        for i, delay in enumerate(delays)
+    ]
+
+
+@pytest.fixture
+def fake_execute(monkeypatch):
+    """替换 execute_case：按用例 metadata 等待后返回结果，并记录上下文"""
+    calls = []
+
+    async def execute_case(self, case, context=None):
+        calls.append((case.case_id, context, self))
+        await asyncio.sleep(case.metadata["delay"])
+        status = ActionStatus.FAILED if case.metadata["fail"] else ActionStatus.SUCCESS
+        case.status = status
+        return ExecutionResult(success=status == ActionStatus.SUCCESS, status=status, data=case)
+
+    monkeypatch.setattr(CaseExecutor, "execute_case", execute_case)
+    return calls
+
+
+class TestParallelBatchExecute:
+    """测试并发批量执行"""
+
+    @pytest.fixture
+    def executor(self):
+        """创建执行器实例"""
+        return CaseExecutor(use_l3=False, use_l4=False, use_l5=False, max_retries=0)
+
+    @pytest.mark.asyncio
+    async def test_workers_run_concurrently(self, executor, fake_execute):
+        """测试多个工作协程并发执行，结果保持输入顺序"""
+        created, released = [], []
+
+        async def session_factory(worker_id):
+            session = SimpleNamespace(target_info=SimpleNamespace(target_id=f"target-{worker_id}"))
+            created.append(session)
+            return session
+
+        async def session_release(session):
+            released.append(session)
+
+        start = time.perf_counter()
+        results = await executor.batch_execute(
+            make_cases(0.1, 0.1, 0.1, 0.1),
+            workers=4,
+            session_factory=session_factory,
+            session_release=session_release,
+        )
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.3
+        assert [r.data.case_id for r in results] == ["TC000", "TC001", "TC002", "TC003"]
+        assert len(created) == 4
+        assert released == created
+        assert {ctx.target_id for _, ctx, _ in fake_execute} == {f"target-{i}" for i in range(4)}
+        assert len({id(worker) for _, _, worker in fake_execute}) == 4
+        assert executor.last_batch_stats["success"] == 4
+        assert sum(executor.last_batch_stats["cases_per_worker"]) == 4
+
+    @pytest.mark.asyncio
+    async def test_results_stream_in_completion_order(self, executor, fake_execute):
+        """测试结果按完成顺序返回"""
+        finished = [
+            result.data.case_id
+            async for result in executor.iter_batch_execute(make_cases(0.2, 0.01, 0.1), workers=3)
+        ]
+
+        assert finished == ["TC001", "TC002", "TC000"]
+
+    @pytest.mark.asyncio
+    async def test_isolated_contexts(self, executor, fake_execute):
+        """测试每个用例使用独立上下文"""
+        template = ExecutionContext(target_id="t1", variables={"user": "admin"})
+
+        await executor.batch_execute(make_cases(0, 0), template, workers=2)
+
+        contexts = [ctx for _, ctx, _ in fake_execute]
+        assert contexts[0] is not contexts[1]
+        assert all(ctx is not template and ctx.variables == {"user": "admin"} for ctx in contexts)
+        assert all(ctx.variables is not template.variables for ctx in contexts)
+
+    @pytest.mark.asyncio
+    async def test_fail_fast(self, executor, fake_execute):
+        """测试失败后跳过未开始的用例"""
+        results = await executor.batch_execute(make_cases(0, 0, 0, 0, fail=(1,)), fail_fast=True)
+
+        assert [r.status for r in results] == [
+            ActionStatus.SUCCESS,
+            ActionStatus.FAILED,
+            ActionStatus.SKIPPED,
+            ActionStatus.SKIPPED,
+        ]
+        assert len(fake_execute) == 2
+        assert executor.last_batch_stats["skipped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_case_timeout(self, executor, fake_execute):
+        """测试用例超时（TestCase.timeout 优先于默认值）"""
+        cases = make_cases(1.0, 0.3)
+        cases[0].timeout = 0.05
+
+        results = await executor.batch_execute(cases, workers=2, case_timeout=0.1)
+
+        assert all(r.status == ActionStatus.FAILED for r in results)
+        assert all(r.metadata["timed_out"] for r in results)
+        assert executor.last_batch_stats["timed_out"] == 2
+
+    @pytest.mark.asyncio
+    async def test_session_factory_failure(self, executor, fake_execute):
+        """测试工作协程初始化失败时抛出异常"""
+        async def session_factory(worker_id):
+            raise RuntimeError("无法创建页面")
+
+        with pytest.raises(RuntimeError):
+            await executor.batch_execute(make_cases(0), session_factory=session_factory)
+
+
+
+class FakeStateSession:
+    """模拟支持存储状态快照的 CDP Session"""
+
+    def __init__(self):
+        self.target_info = SimpleNamespace(target_id="target-state")
+        self.cookies: list[dict] = []
+        self.restored: list[StorageState] = []
+
+    async def capture_storage_state(self, origins=None):
+        return StorageState(cookies=list(self.cookies))
+
+    async def restore_storage_state(self, state):
+        self.restored.append(state)
+        self.cookies = list(state.cookies)
+
+
+class TestStorageStateReuse:
+    """测试用例间复用登录态"""
+
+    @pytest.fixture
+    def steps(self, monkeypatch):
+        """替换步骤执行：记录执行的步骤，登录步骤写入 Cookie"""
+        executed = []
+
+        async def execute_step(self, step, context):
+            executed.append(step.step_id)
+            if step.step_id == "login":
+                self.cdp_session.cookies = [{"name": "sid", "value": "abc"}]
+            return ExecutionResult(success=True, status=ActionStatus.SUCCESS)
+
+        monkeypatch.setattr(CaseExecutor, "_execute_step_with_retry", execute_step)
+        return executed
+
+    @pytest.fixture
+    def executor(self, tmp_path):
+        """创建带状态目录和前置登录用例的执行器"""
+        executor = CaseExecutor(
+            cdp_session=FakeStateSession(),
+            use_l3=False,
+            use_l4=False,
+            use_l5=False,
+            state_store=StorageStateStore(tmp_path),
+        )
+        executor.register_state_setup(TestCase(
+            case_id="LOGIN",
+            name="登录",
+            steps=[TestStep(step_id="login", description="登录", action_type=ActionType.CLICK)],
+            provides_state="admin",
+        ))
+        return executor
+
+    def make_case(self, case_id: str) -> TestCase:
+        """构造依赖登录态的用例"""
+        return TestCase(
+            case_id=case_id,
+            name="查看订单",
+            steps=[TestStep(step_id=case_id, description="打开订单页", action_type=ActionType.CLICK)],
+            requires_state="admin",
+        )
+
+    @pytest.mark.asyncio
+    async def test_login_runs_once(self, executor, steps):
+        """测试首次执行前置用例并保存状态，之后直接注入"""
+        first = await executor.execute_case(self.make_case("C1"), ExecutionContext())
+        second = await executor.execute_case(self.make_case("C2"), ExecutionContext())
+
+        assert first.success and second.success
+        assert steps == ["login", "C1", "C2"]
+        assert first.metadata["state_restored"] is False
+        assert second.metadata["state_restored"] is True
+        assert executor.cdp_session.restored[0].cookies == [{"name": "sid", "value": "abc"}]
+
+    @pytest.mark.asyncio
+    async def test_saved_state_skips_login(self, executor, steps):
+        """测试已有快照时不执行前置用例"""
+        executor.state_store.save("admin", StorageState(cookies=[{"name": "sid", "value": "saved"}]))
+
+        result = await executor.execute_case(self.make_case("C1"), ExecutionContext())
+
+        assert result.success
+        assert steps == ["C1"]
+        assert executor.cdp_session.cookies == [{"name": "sid", "value": "saved"}]
+
+    @pytest.mark.asyncio
+    async def test_setup_failure_fails_case(self, executor, monkeypatch):
+        """测试前置用例失败时依赖用例失败且不保存状态"""
+        async def execute_step(self, step, context):
+            return ExecutionResult(success=False, status=ActionStatus.FAILED)
+
+        monkeypatch.setattr(CaseExecutor, "_execute_step_with_retry", execute_step)
+
+        result = await executor.execute_case(self.make_case("C1"), ExecutionContext())
+
+        assert result.status == ActionStatus.FAILED
+        assert executor.state_store.get("admin") is None
+
+    def test_register_requires_provides_state(self, executor):
+        """测试登记的前置用例必须声明 provides_state"""
+        with pytest.raises(ValueError):
+            executor.register_state_setup(TestCase(case_id="X", name="无状态"))
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
 
+
+    @pytest.mark.asyncio
+    async def test_workers_never_share_session(self, fake_execute):
+        """测试未提供 session_factory 时每个工作协程从上下文池获得独立 Session"""
+        opened, released = [], []
+
+        async def open_session():
+            session = SimpleNamespace(target_info=SimpleNamespace(target_id=f"target-{len(opened)}"))
+            opened.append(session)
+            return session
+
+        async def release_session(session):
+            released.append(session)
+
+        pool = SimpleNamespace(open_session=open_session, release_session=release_session)
+        main_session = SimpleNamespace(connection=SimpleNamespace(context_pool=pool))
+        executor = CaseExecutor(
+            cdp_session=main_session, use_l3=False, use_l4=False, use_l5=False, max_retries=0
+        )
+
+        await executor.batch_execute(make_cases(0.05, 0.05), workers=2)
+
+        workers = {id(worker): worker for _, _, worker in fake_execute}
+        sessions = [worker.cdp_session for worker in workers.values()]
+        assert len(opened) == 2
+        assert len(sessions) == 2
+        assert sessions[0] is not sessions[1]
+        assert main_session not in sessions
+        assert released == opened
+
+    @pytest.mark.asyncio
+    async def test_workers_without_session_source(self, fake_execute):
+        """测试 workers > 1 且既无 session_factory 也无上下文池时拒绝执行"""
+        main_session = SimpleNamespace(connection=SimpleNamespace(context_pool=None))
+        executor = CaseExecutor(
+            cdp_session=main_session, use_l3=False, use_l4=False, use_l5=False, max_retries=0
+        )
+
+        with pytest.raises(ValueError):
+            await executor.batch_execute(make_cases(0, 0), workers=2)
+        assert fake_execute == []
+
+        results = await executor.batch_execute(make_cases(0, 0), workers=1)
+        assert all(r.status == ActionStatus.SUCCESS for r in results)
@@ -0,0 +1,219 @@
+"""执行历史压缩与观察存储单元测试"""
+
+import pytest
+
+from aerotest.browser.dom.views import EnhancedDOMTreeNode, NodeType
+from aerotest.core.funnel.types import MatchResult
+from aerotest.core.ooda import (
+    Action,
+    ActionStatus,
+    ActionType,
+    CaseExecutor,
+    Decision,
+    ExecutionContext,
+    ExecutionResult,
+    HistoryPolicy,
+    HistoryRecorder,
+    Observation,
+    ObservationStore,
+    OODAEngine,
+    Orientation,
+    TestCase,
+    TestStep,
+)
+from aerotest.core.ooda.history import dump_observation, load_observation
+from tests.unit.dom_helpers import build_tree, login_page
+
+
+def build_page() -> EnhancedDOMTreeNode:
+    """登录页，返回根节点"""
+    return build_tree(login_page())[0]
+
+
+def interactive(root: EnhancedDOMTreeNode) -> list[EnhancedDOMTreeNode]:
+    """表单中的可交互元素"""
+    form = root.children[0].children[0].children[0]
+    return list(form.children)
+
+
+def executed_step(step_id: str) -> TestStep:
+    """构造已执行（包含完整 OODA 数据）的步骤"""
+    root = build_page()
+    elements = interactive(root)
+    button = elements[2]
+    step = TestStep(step_id=step_id, description="点击登录按钮", action_type=ActionType.CLICK,
+                    duration_ms=12.0, metadata={"orient_ms": 5.0})
+    step.observation = Observation(
+        dom_tree=root,
+        url="https://example.com/login",
+        title="登录",
+        visible_elements=elements,
+        interactive_elements=elements,
+        selector_map={el.compute_stable_hash(): el for el in elements},
+        screenshot="iVBORw0KGgo=",
+    )
+    match = MatchResult(element=button, score=0.9, layer="L2")
+    step.orientation = Orientation(candidate_elements=[match], best_match=match, strategy="L2")
+    step.decision = Decision(action_type=ActionType.CLICK, target_element=button)
+    step.action = Action(action_type=ActionType.CLICK, target_element=button,
+                         status=ActionStatus.SUCCESS, duration_ms=3.0)
+    return step
+
+
+class TestHistoryRecorder:
+    """测试 HistoryRecorder"""
+
+    def test_keeps_last_full(self):
+        """测试只保留最近 N 个完整观察，旧步骤压缩为摘要并释放元素引用"""
+        recorder = HistoryRecorder(HistoryPolicy(keep_full=2))
+        history: list[TestStep] = []
+
+        for i in range(5):
+            recorder.record(history, executed_step(str(i)))
+
+        assert [step.observation_summary is None for step in history] == [False, False, False, True, True]
+        assert recorder.stats["compacted"] == 3
+
+        old = history[0]
+        assert old.observation.dom_tree is None
+        assert old.observation.interactive_elements == []
+        assert old.observation.selector_map == {}
+        assert old.observation.screenshot is None
+        assert old.observation.url == "https://example.com/login"
+        assert old.orientation.candidate_elements == [] and old.orientation.best_match is None
+        assert old.decision.target_element is None
+        assert old.action.target_element is None
+
+    def test_summary(self):
+        """测试摘要包含稳定哈希、候选元素、目标和耗时"""
+        step = executed_step("1")
+        elements = step.observation.interactive_elements
+        hashes = [el.compute_stable_hash() for el in elements]
+        xpath = elements[2].xpath
+
+        summary = HistoryRecorder().compact(step)
+
+        assert summary.interactive_hashes == hashes
+        assert summary.interactive_count == 3
+        assert summary.candidates == [
+            {"stable_hash": hashes[2], "backend_node_id": 12, "score": 0.9, "layer": "L2"}
+        ]
+        assert summary.target == {"stable_hash": hashes[2], "backend_node_id": 12, "xpath": xpath}
+        assert summary.timings == {"step_ms": 12.0, "orient_ms": 5.0, "action_ms": 3.0}
+        assert summary.fingerprint
+        assert summary.spill_key is None
+
+    def test_unbounded_and_repeated_steps(self):
+        """测试 keep_full=None 不压缩；同一步骤对象仍在窗口内时不压缩"""
+        history: list[TestStep] = []
+        unbounded = HistoryRecorder(HistoryPolicy(keep_full=None))
+        for i in range(3):
+            unbounded.record(history, executed_step(str(i)))
+        assert all(step.observation_summary is None for step in history)
+
+        history = []
+        recorder = HistoryRecorder(HistoryPolicy(keep_full=1))
+        step = executed_step("1")
+        recorder.record(history, step)
+        recorder.record(history, step)
+
+        assert step.observation_summary is None
+        assert step.observation.dom_tree is not None
+
+    @pytest.mark.asyncio
+    async def test_rerun_clears_summary(self):
+        """测试已压缩的步骤再次执行时清除上一次执行的摘要"""
+        recorder = HistoryRecorder(HistoryPolicy(keep_full=1))
+        history: list[TestStep] = []
+        step = executed_step("1")
+        recorder.record(history, step)
+        recorder.record(history, executed_step("2"))
+        assert step.observation_summary is not None
+
+        engine = OODAEngine(use_l3=False, use_l4=False, use_l5=False)
+        await engine.execute_step(step, ExecutionContext())
+        recorder.record(history, step)
+
+        assert step.observation_summary is None
+        assert history[1].observation_summary is not None
+
+    def test_spill_and_reload(self):
+        """测试压缩前写入磁盘存储，按需加载得到结构一致的观察"""
+        recorder = HistoryRecorder(HistoryPolicy(keep_full=0), store=ObservationStore(":memory:"))
+        step = executed_step("1")
+        original = step.observation
+        expected_xpaths = [el.xpath for el in original.interactive_elements]
+        expected_hashes = [el.compute_stable_hash() for el in original.interactive_elements]
+        history: list[TestStep] = []
+
+        recorder.record(history, step)
+        assert step.observation_summary.spill_key is not None
+        assert step.observation.dom_tree is None
+
+        loaded = recorder.load_observation(step)
+
+        assert loaded.url == "https://example.com/login"
+        assert loaded.screenshot == "iVBORw0KGgo="
+        assert loaded.dom_tree.node_type == NodeType.DOCUMENT_NODE
+        assert [el.xpath for el in loaded.interactive_elements] == expected_xpaths
+        assert [el.compute_stable_hash() for el in loaded.interactive_elements] == expected_hashes
+        assert loaded.interactive_elements[2].parent.parent.parent.parent is loaded.dom_tree
+        assert loaded.selector_map[expected_hashes[2]] is loaded.interactive_elements[2]
+        assert recorder.stats["store"]["writes"] == 1
+
+        # 不回填到步骤
+        assert step.observation.dom_tree is None
+
+    def test_deep_dom_round_trip(self):
+        """测试深层 DOM 序列化不受递归深度限制"""
+        root = build_page()
+        node = root
+        for i in range(3000):
+            child = EnhancedDOMTreeNode(
+                node_id=100 + i, backend_node_id=100 + i, node_type=NodeType.ELEMENT_NODE,
+                node_name="DIV", node_value="", attributes={}, is_scrollable=None, is_visible=True,
+                absolute_position=None, target_id="t1", frame_id=None, session_id="s1",
+                content_document=None, shadow_root_type=None, shadow_roots=None,
+                parent_node=node, children_nodes=[], ax_node=None, snapshot_node=None,
+            )
+            node.children_nodes = (node.children_nodes or []) + [child]
+            node = child
+
+        loaded = load_observation(dump_observation(Observation(dom_tree=root, visible_elements=[node])))
+
+        deepest = loaded.visible_elements[0]
+        assert deepest.backend_node_id == 3099
+        assert deepest.parent.backend_node_id == 3098
+
+
+class TestCaseExecutorHistory:
+    """测试 CaseExecutor 使用执行历史策略"""
+
+    @pytest.mark.asyncio
+    async def test_execute_case_bounded(self, monkeypatch):
+        """测试执行长用例时只保留最近 N 个完整观察，工作协程共享记录器"""
+        executor = CaseExecutor(use_l3=False, use_l4=False, use_l5=False,
+                                history=HistoryRecorder(HistoryPolicy(keep_full=3)))
+
+        async def execute_step(step, context):
+            filled = executed_step(step.step_id)
+            step.observation = filled.observation
+            step.orientation = filled.orientation
+            step.decision = filled.decision
+            step.action = filled.action
+            return ExecutionResult(success=True, status=ActionStatus.SUCCESS)
+
+        monkeypatch.setattr(executor.ooda_engine, "execute_step", execute_step)
+
+        case = TestCase(case_id="TC", name="长用例", steps=[
+            TestStep(step_id=str(i), description="点击登录按钮", action_type=ActionType.CLICK)
+            for i in range(10)
+        ])
+        context = ExecutionContext()
+        result = await executor.execute_case(case, context)
+
+        assert result.success
+        assert len(context.history) == 10
+        assert sum(step.observation_summary is None for step in case.steps) == 3
+        assert executor.history.stats["compacted"] == 7
+        assert executor._spawn_worker_executor(None).history is executor.history
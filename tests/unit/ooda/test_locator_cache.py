@@ -0,0 +1,194 @@
+"""自愈定位缓存单元测试"""
+
+import pytest
+
+from aerotest.browser.dom.views import SerializedDOMState
+from aerotest.core.funnel.types import MatchResult
+from aerotest.core.ooda import (
+    Action,
+    ActionStatus,
+    ActionType,
+    ExecutionContext,
+    LocatorCache,
+    Observation,
+    OODAEngine,
+    TestStep,
+)
+from aerotest.core.ooda.locator_cache import page_fingerprint
+from tests.unit.dom_helpers import build_tree, document, element, login_page, text_node
+
+
+def build_page(button_class: str = "btn", button_id: str = "login") -> list:
+    """登录页，返回可交互元素"""
+    _, nodes = build_tree(login_page(button_id=button_id, button_class=button_class))
+    return [nodes[node_id] for node_id in (10, 11, 12)]
+
+
+def record_button(cache: LocatorCache, elements: list) -> str:
+    """记录登录按钮并返回缓存键"""
+    key = LocatorCache.make_key("点击登录按钮", page_fingerprint(elements))
+    cache.record(key, elements[2], layer="L2", confidence=0.9, resolve_ms=40.0)
+    return key
+
+
+class TestLocatorCache:
+    """测试 LocatorCache"""
+
+    def test_hit(self):
+        """测试记录后在新的 DOM 中按稳定哈希命中"""
+        cache = LocatorCache(":memory:")
+        key = record_button(cache, build_page())
+
+        page = build_page()
+        cached = cache.lookup(key, LocatorCache.build_selector_map(page))
+
+        assert cached is not None
+        assert cached[0] is page[2]
+        assert cached[1].layer == "L2"
+        assert cache.stats["hits"] == 1
+        assert cache.stats["saved_ms"] == 40.0
+
+    def test_key_normalization(self):
+        """测试描述仅空白和大小写不同时键相同，页面结构不同时键不同"""
+        page = build_page()
+        fingerprint = page_fingerprint(page)
+
+        assert LocatorCache.make_key(" 点击  Login ", fingerprint) == LocatorCache.make_key("点击 login", fingerprint)
+        assert page_fingerprint(page[:2]) != fingerprint
+
+    def test_stale_entry(self):
+        """测试关键属性变化时校验失败"""
+        cache = LocatorCache(":memory:")
+        key = record_button(cache, build_page())
+
+        page = build_page(button_id="sign-in")
+
+        assert cache.lookup(key, LocatorCache.build_selector_map(page)) is None
+        assert cache.stats["stale"] == 1
+        assert cache.stats["hit_rate"] == 0.0
+
+    def test_heal_by_xpath(self):
+        """测试稳定哈希变化但 XPath 和关键属性一致时自愈"""
+        cache = LocatorCache(":memory:")
+        key = record_button(cache, build_page())
+
+        page = build_page(button_class="btn btn-primary")
+        cached = cache.lookup(key, LocatorCache.build_selector_map(page))
+
+        assert cached is not None and cached[0] is page[2]
+        assert cache.stats["heals"] == 1
+
+        # 条目已更新为新的稳定哈希
+        cache.lookup(key, LocatorCache.build_selector_map(build_page(button_class="btn btn-primary")))
+        assert cache.stats["heals"] == 1
+        assert cache.stats["hits"] == 2
+
+    def test_identical_siblings(self):
+        """测试属性相同的兄弟按钮稳定哈希相同时，按 XPath 和文本区分"""
+        def siblings(first: str, second: str) -> list:
+            form = element(4, "FORM", [
+                element(10, "BUTTON", [text_node(20, first)], attributes={"class": "btn"}),
+                element(11, "BUTTON", [text_node(21, second)], attributes={"class": "btn"}),
+            ])
+            _, nodes = build_tree(document(element(2, "HTML", [element(3, "BODY", [form])])))
+            return [nodes[10], nodes[11]]
+
+        cache = LocatorCache(":memory:")
+        page = siblings("保存", "取消")
+        assert page[0].compute_stable_hash() == page[1].compute_stable_hash()
+        key = LocatorCache.make_key("点击保存按钮", page_fingerprint(page))
+        cache.record(key, page[0], layer="L2", confidence=0.9, resolve_ms=10.0)
+
+        page = siblings("保存", "取消")
+        cached = cache.lookup(key, LocatorCache.build_selector_map(page))
+        assert cached is not None and cached[0] is page[0]
+
+        # 按钮交换位置后同一 XPath 上是另一个按钮，不能命中
+        assert cache.lookup(key, LocatorCache.build_selector_map(siblings("取消", "保存"))) is None
+
+    def test_persistence(self, tmp_path):
+        """测试缓存跨实例持久化"""
+        path = tmp_path / "locators.sqlite3"
+        cache = LocatorCache(path)
+        key = record_button(cache, build_page())
+        cache.close()
+
+        page = build_page()
+        assert LocatorCache(path).lookup(key, LocatorCache.build_selector_map(page)) is not None
+
+
+class TestOODAEngineLocatorCache:
+    """测试 OODAEngine 使用定位缓存"""
+
+    @pytest.fixture
+    def engine(self, monkeypatch):
+        """替换 Observe / L2 / Act 的引擎，记录 L2 调用次数"""
+        engine = OODAEngine(use_l3=False, use_l4=False, use_l5=False, locator_cache=LocatorCache(":memory:"))
+        engine.l2_calls = 0
+        engine.act_status = ActionStatus.SUCCESS
+
+        async def observe(context):
+            page = build_page()
+            state = SerializedDOMState(
+                _root=None,
+                selector_map={el.backend_node_id: el for el in page},
+                interactive_nodes=page,
+            )
+            return Observation(dom_tree=page[0], dom_state=state, interactive_elements=page)
+
+        def match_elements(dom_state, action_slot):
+            engine.l2_calls += 1
+            return [MatchResult(element=engine.current_page[2], score=0.9)]
+
+        async def act(decision, context):
+            return Action(action_type=decision.action_type, target_element=decision.target_element,
+                          status=engine.act_status)
+
+        async def tracking_observe(context, step=None):
+            observation = await observe(context)
+            engine.current_page = observation.interactive_elements
+            return observation
+
+        monkeypatch.setattr(engine, "_observe", tracking_observe)
+        monkeypatch.setattr(engine.l2_engine, "match_elements", match_elements)
+        monkeypatch.setattr(engine, "_act", act)
+        return engine
+
+    def make_step(self) -> TestStep:
+        return TestStep(step_id="1", description="点击登录按钮", action_type=ActionType.CLICK)
+
+    @pytest.mark.asyncio
+    async def test_second_run_skips_funnel(self, engine):
+        """测试第二次执行直接命中缓存，定位到当前 DOM 中的元素"""
+        first = await engine.execute_step(self.make_step(), ExecutionContext())
+        step = self.make_step()
+        second = await engine.execute_step(step, ExecutionContext())
+
+        assert first.metadata["strategy"] == "L2"
+        assert second.metadata["strategy"] == "cache"
+        assert engine.l2_calls == 1
+        assert step.decision.target_element is engine.current_page[2]
+        assert engine.locator_cache.stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_action_invalidates(self, engine):
+        """测试缓存的元素执行失败时淘汰条目，下次回退到漏斗"""
+        await engine.execute_step(self.make_step(), ExecutionContext())
+
+        engine.act_status = ActionStatus.FAILED
+        await engine.execute_step(self.make_step(), ExecutionContext())
+        assert len(engine.locator_cache) == 0
+
+        engine.act_status = ActionStatus.SUCCESS
+        result = await engine.execute_step(self.make_step(), ExecutionContext())
+        assert result.metadata["strategy"] == "L2"
+        assert engine.l2_calls == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_funnel_result_not_recorded(self, engine):
+        """测试漏斗结果执行失败时不写入缓存"""
+        engine.act_status = ActionStatus.FAILED
+
+        await engine.execute_step(self.make_step(), ExecutionContext())
+
+        assert len(engine.locator_cache) == 0
@@ -2,6 +2,7 @@
 
 import pytest
 
+from aerotest.config.settings import get_settings
 from aerotest.core.ooda import (
     ActionType,
     ExecutionContext,
@@ -10,6 +11,12 @@ from aerotest.core.ooda import (
 )
 
 
+@pytest.fixture(autouse=True)
+def no_llm_cache(monkeypatch):
+    """启用 L4 的引擎不在工作目录创建 LLM 响应缓存"""
+    monkeypatch.setattr(get_settings(), "llm_cache_enabled", False)
+
+
 class TestOODAEngine:
     """测试 OODA 引擎"""
 
@@ -233,3 +240,172 @@ class TestOODAEngine:
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
 
+
+
+class TestObserveDOMState:
+    """测试 Observe 使用序列化的 DOM 状态"""
+
+    @pytest.fixture
+    def page(self):
+        """body 下三个可见按钮的页面"""
+        from tests.unit.dom_helpers import build_tree, document, element
+
+        buttons = [element(i, "BUTTON", [], attributes={"class": "btn"}) for i in (10, 11, 12)]
+        root = document(element(2, "HTML", [element(3, "BODY", buttons)]))
+        layout = {3: [0, 0, 800, 600], 10: [10, 0, 100, 30], 11: [10, 40, 100, 30], 12: [10, 80, 100, 30]}
+        return build_tree(root, layout)[0]
+
+    @pytest.fixture
+    def context(self, page):
+        """使用假 CDP Session 的上下文"""
+        from types import SimpleNamespace
+
+        async def get_dom_tree(profile=None):
+            return page
+
+        return ExecutionContext(cdp_session=SimpleNamespace(get_dom_tree=get_dom_tree))
+
+    @pytest.mark.asyncio
+    async def test_observe_uses_serialized_state(self, context):
+        """测试可见/可交互元素直接来自序列化状态，连续观察得到 diff"""
+        engine = OODAEngine(use_l3=False, use_l4=False, use_l5=False)
+
+        first = await engine._observe(context)
+        second = await engine._observe(context)
+
+        assert first.interactive_elements is first.dom_state.interactive_nodes
+        assert [el.backend_node_id for el in first.interactive_elements] == [10, 11, 12]
+        assert first.visible_elements is first.dom_state.visible_nodes
+        assert first.dom_state.diff is None
+        assert second.dom_state.diff is not None and not second.dom_state.diff.has_changes
+
+    @pytest.mark.asyncio
+    async def test_layers_consume_state(self, context, monkeypatch):
+        """测试 L2、L3 直接在观察携带的序列化状态上匹配"""
+        engine = OODAEngine(use_l3=True, use_l4=False, use_l5=False)
+        step = TestStep(step_id="1", description="点击登录按钮右边的按钮", action_type=ActionType.CLICK)
+        states = []
+
+        def match_elements(dom_state, slot):
+            states.append(dom_state)
+            return []
+
+        async def process(funnel_context, dom_state=None):
+            states.append(dom_state)
+            return funnel_context
+
+        monkeypatch.setattr(engine.l2_engine, "match_elements", match_elements)
+        monkeypatch.setattr(engine.l3_engine, "process", process)
+
+        observation = await engine._observe(context)
+        await engine._orient(step, observation, context)
+
+        assert len(states) == 2
+        assert all(state is observation.dom_state for state in states)
+
+
+class TestCaptureProfileSelection:
+    """测试 Observe 按 L1 槽位选择抓取配置"""
+
+    @pytest.fixture
+    def context(self):
+        """记录请求的抓取配置的假 CDP Session"""
+        from types import SimpleNamespace
+
+        from aerotest.browser.dom.views import EnhancedDOMTreeNode, NodeType
+
+        profiles = []
+
+        async def get_dom_tree(profile=None):
+            profiles.append(profile)
+            return EnhancedDOMTreeNode(
+                node_id=1, backend_node_id=1, node_type=NodeType.DOCUMENT_NODE,
+                node_name="#document", node_value="", attributes={}, is_scrollable=None,
+                is_visible=None, absolute_position=None, target_id="t1", frame_id=None,
+                session_id="s1", content_document=None, shadow_root_type=None,
+                shadow_roots=None, parent_node=None, children_nodes=[], ax_node=None,
+                snapshot_node=None,
+            )
+
+        session = SimpleNamespace(
+            get_dom_tree=get_dom_tree, last_cdp_timing={"capture.layout": 0.01}, profiles=profiles,
+            page_info=SimpleNamespace(url="https://example.com/login?next=/", title="登录"),
+        )
+        return ExecutionContext(cdp_session=session)
+
+    @pytest.mark.parametrize(
+        "description, expected",
+        [
+            ("点击登录按钮", "attributes-only"),
+            ("点击用户名输入框右边的按钮", "layout"),
+            ("点击红色图标", "full"),
+        ],
+    )
+    def test_select(self, description, expected):
+        """测试普通指令只抓取属性，空间关系抓取布局，视觉描述完整抓取"""
+        engine = OODAEngine(use_l3=True, use_l4=False, use_l5=True)
+        step = TestStep(step_id="1", description=description, action_type=ActionType.CLICK)
+
+        assert engine._select_capture_profile(step) == expected
+
+    def test_weak_slot_needs_full(self):
+        """测试 L1 槽位较弱且启用 L4 时完整抓取；关闭时使用会话默认配置"""
+        step = TestStep(step_id="1", description="嗯", action_type=ActionType.CLICK)
+
+        assert OODAEngine(use_l3=False, use_l4=True, use_l5=False)._select_capture_profile(step) == "full"
+        assert OODAEngine(use_l3=False, use_l4=False, use_l5=False)._select_capture_profile(step) == "attributes-only"
+        engine = OODAEngine(use_l3=False, use_l4=True, use_l5=False, adaptive_capture=False)
+        assert engine._select_capture_profile(step) is None
+        assert engine._select_capture_profile(None) is None
+
+    @pytest.mark.asyncio
+    async def test_observe_passes_profile(self, context):
+        """测试 Observe 把选择的配置传给会话并记录 CDP 耗时"""
+        engine = OODAEngine(use_l3=True, use_l4=False, use_l5=False)
+        step = TestStep(step_id="1", description="点击用户名输入框右边的按钮", action_type=ActionType.CLICK)
+
+        observation = await engine._observe(context, step)
+
+        assert context.cdp_session.profiles == ["layout"]
+        assert observation.metadata["capture_profile"] == "layout"
+        assert observation.metadata["cdp_timing"] == {"capture.layout": 0.01}
+        assert observation.url == "https://example.com/login?next=/"
+        assert observation.title == "登录"
+
+
+class TestCandidateAX:
+    """测试 L2 候选按需获取 AX 信息"""
+
+    @pytest.mark.asyncio
+    async def test_l2_survivors_fetched(self, monkeypatch):
+        """测试只为 L2 筛选后的候选请求 AX，会话不支持时跳过"""
+        from types import SimpleNamespace
+
+        from aerotest.browser.dom.views import SerializedDOMState
+        from aerotest.core.funnel.types import MatchResult
+        from aerotest.core.ooda import Observation
+
+        fetched = []
+
+        async def fetch_ax_nodes(nodes):
+            fetched.append(nodes)
+            return len(nodes)
+
+        engine = OODAEngine(use_l3=False, use_l4=False, use_l5=False)
+        candidate = SimpleNamespace(backend_node_id=10)
+        monkeypatch.setattr(
+            engine.l2_engine, "match_elements",
+            lambda dom_state, slot: [MatchResult(element=candidate, score=0.9)],
+        )
+        step = TestStep(step_id="1", description="点击登录按钮", action_type=ActionType.CLICK)
+        observation = Observation(dom_state=SerializedDOMState(_root=None, selector_map={}))
+        slot = engine.l1_engine.extract_slot(step.description)
+
+        context = ExecutionContext(cdp_session=SimpleNamespace(fetch_ax_nodes=fetch_ax_nodes))
+        matches = await engine._run_layer("L2", step, observation, context, slot)
+
+        assert fetched == [[candidate]]
+        assert matches[0].element is candidate
+
+        plain = ExecutionContext(cdp_session=SimpleNamespace())
+        assert len(await engine._run_layer("L2", step, observation, plain, slot)) == 1
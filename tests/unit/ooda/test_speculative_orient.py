@@ -0,0 +1,220 @@
+"""推测执行漏斗单元测试"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from aerotest.config.settings import get_settings
+from aerotest.core.funnel.types import ActionSlot, ActionType as SlotActionType, MatchResult
+from aerotest.core.ooda import ActionType, ExecutionContext, Observation, OODAEngine, TestStep
+
+
+@pytest.fixture(autouse=True)
+def no_llm_cache(monkeypatch):
+    """启用 L4 的引擎不在工作目录创建 LLM 响应缓存"""
+    monkeypatch.setattr(get_settings(), "llm_cache_enabled", False)
+
+
+class FakeLayers:
+    """按层级配置耗时和得分的假漏斗，记录启动、完成和取消时间"""
+
+    def __init__(self, **plan):
+        self.plan = plan  # layer -> (delay, score or None)
+        self.started: dict[str, float] = {}
+        self.finished: dict[str, float] = {}
+        self.cancelled: list[str] = []
+        self.origin = time.perf_counter()
+
+    async def run(self, layer, step, observation, context, action_slot, upstream=None):
+        self.started[layer] = time.perf_counter() - self.origin
+        delay, score = self.plan[layer]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(layer)
+            raise
+        self.finished[layer] = time.perf_counter() - self.origin
+        if score is None:
+            return []
+        return [MatchResult(element=SimpleNamespace(layer=layer), score=score, layer=layer)]
+
+
+def make_engine(monkeypatch, layers: FakeLayers, speculative=True, slot_confidence=0.9, **kwargs):
+    """构造启用全部层级、漏斗被替换的引擎"""
+    engine = OODAEngine(speculative=speculative, **kwargs)
+    slot = ActionSlot(action=SlotActionType.CLICK, keywords=["登录"], confidence=slot_confidence)
+    monkeypatch.setattr(engine.l1_engine, "extract_slot", lambda instruction: slot)
+    monkeypatch.setattr(engine, "_run_layer", layers.run)
+    return engine
+
+
+async def orient(engine, description="点击登录按钮", **step_kwargs):
+    """对空页面执行 Orient"""
+    step = TestStep(step_id="1", description=description, action_type=ActionType.CLICK, **step_kwargs)
+    return await engine._orient(step, Observation(), ExecutionContext())
+
+
+class TestSpeculativeOrient:
+    """测试推测执行 Orient"""
+
+    @pytest.mark.asyncio
+    async def test_confident_l2_cancels_others(self, monkeypatch):
+        """测试 L2 置信时取消 L3，且不发起 L4/L5"""
+        layers = FakeLayers(L2=(0.01, 0.9), L3=(0.5, 0.9), L4=(1.0, 0.9), L5=(1.0, 0.9))
+        engine = make_engine(monkeypatch, layers)
+
+        orientation = await orient(engine)
+
+        assert orientation.strategy == "L2"
+        assert set(layers.started) == {"L2", "L3"}
+        assert layers.cancelled == ["L3"]
+        assert orientation.metadata["speculative"]["cancelled"] == ["L3"]
+
+    @pytest.mark.asyncio
+    async def test_weak_l2_starts_l4_early(self, monkeypatch):
+        """测试 L2 不够置信时立即发起 L4，无需等待 L3"""
+        layers = FakeLayers(L2=(0.01, 0.5), L3=(0.3, None), L4=(0.1, 0.9), L5=(1.0, 0.9))
+        engine = make_engine(monkeypatch, layers)
+
+        start = time.perf_counter()
+        orientation = await orient(engine)
+        elapsed = time.perf_counter() - start
+
+        assert orientation.strategy == "L4"
+        assert layers.started["L4"] < layers.finished["L3"]
+        assert elapsed < 0.38
+        assert "L5" not in layers.started
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_layer_wins(self, monkeypatch):
+        """测试 L4 先完成时仍等待仍在执行的 L3，L3 置信则 L3 胜出"""
+        layers = FakeLayers(L2=(0.01, None), L3=(0.1, 0.8), L4=(0.02, 0.9), L5=(1.0, 0.9))
+        engine = make_engine(monkeypatch, layers)
+
+        orientation = await orient(engine)
+
+        assert orientation.strategy == "L3"
+
+    @pytest.mark.asyncio
+    async def test_weak_slot_starts_l4_immediately(self, monkeypatch):
+        """测试 L1 槽位置信度低时与 L2/L3 同时发起 L4"""
+        layers = FakeLayers(L2=(0.05, None), L3=(0.05, None), L4=(0.05, 0.9), L5=(1.0, 0.9))
+        engine = make_engine(monkeypatch, layers, slot_confidence=0.3)
+
+        orientation = await orient(engine)
+
+        assert orientation.strategy == "L4"
+        assert layers.started["L4"] - layers.started["L2"] < 0.02
+
+    @pytest.mark.asyncio
+    async def test_visual_instruction_starts_l5(self, monkeypatch):
+        """测试指令包含视觉描述时提前发起 L5"""
+        layers = FakeLayers(L2=(0.01, 0.9), L3=(0.01, None), L4=(1.0, None), L5=(1.0, None))
+        engine = make_engine(monkeypatch, layers)
+        monkeypatch.setattr(engine.l5_engine, "_needs_visual_recognition", lambda instruction: True)
+
+        await orient(engine, description="点击红色的图标")
+
+        assert "L5" in layers.started
+        assert "L5" in layers.cancelled
+
+    @pytest.mark.asyncio
+    async def test_fallback_to_first_match(self, monkeypatch):
+        """测试没有置信结果时与顺序模式一致：取第一个有匹配的层级"""
+        plan = dict(L2=(0.01, None), L3=(0.02, 0.4), L4=(0.01, 0.5), L5=(0.01, None))
+        speculative = await orient(make_engine(monkeypatch, FakeLayers(**plan)))
+        sequential = await orient(make_engine(monkeypatch, FakeLayers(**plan), speculative=False))
+
+        assert speculative.strategy == sequential.strategy == "L3"
+        assert speculative.confidence == 0.4
+
+    @pytest.mark.asyncio
+    async def test_deadline(self, monkeypatch):
+        """测试超出定位预算时取消所有任务并返回已完成的最佳结果"""
+        layers = FakeLayers(L2=(0.01, 0.5), L3=(1.0, 0.9), L4=(1.0, 0.9), L5=(1.0, 0.9))
+        engine = make_engine(monkeypatch, layers, orient_timeout=0.1)
+
+        start = time.perf_counter()
+        orientation = await orient(engine)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.3
+        assert orientation.metadata["timed_out"] is True
+        assert orientation.strategy == "L2"
+        assert set(layers.cancelled) == {"L3", "L4"}
+
+    @pytest.mark.asyncio
+    async def test_sequential_deadline(self, monkeypatch):
+        """测试顺序模式同样遵守步骤的定位预算（步骤配置优先）"""
+        layers = FakeLayers(L2=(0.01, None), L3=(1.0, 0.9), L4=(1.0, 0.9), L5=(1.0, 0.9))
+        engine = make_engine(monkeypatch, layers, speculative=False, orient_timeout=5.0)
+
+        start = time.perf_counter()
+        orientation = await orient(engine, orient_timeout=0.05)
+
+        assert time.perf_counter() - start < 0.3
+        assert orientation.metadata["timed_out"] is True
+        assert orientation.best_match is None
+
+
+class TestUpstreamCandidates:
+    """测试 L4 复用 L2 的结果"""
+
+    def make_engine(self, monkeypatch, speculative: bool, slot_confidence: float):
+        """L2 返回低置信结果、L4 记录收到的候选的引擎"""
+        from aerotest.browser.dom.views import SerializedDOMState
+
+        engine = OODAEngine(use_l3=False, use_l4=True, use_l5=False, speculative=speculative)
+        slot = ActionSlot(action=SlotActionType.CLICK, keywords=["登录"], confidence=slot_confidence)
+        monkeypatch.setattr(engine.l1_engine, "extract_slot", lambda instruction: slot)
+        engine.l2_calls = 0
+        engine.l4_received = []
+        weak = MatchResult(element=SimpleNamespace(layer="L2"), score=0.5, layer="L2")
+
+        def match_elements(dom_state, action_slot):
+            engine.l2_calls += 1
+            return [weak]
+
+        async def process(funnel_context, dom_state=None):
+            await asyncio.sleep(0)
+            engine.l4_received.append(funnel_context.l2_candidates)
+            funnel_context.l4_candidates = [
+                MatchResult(element=SimpleNamespace(layer="L4"), score=0.9, layer="L4")
+            ]
+            return funnel_context
+
+        monkeypatch.setattr(engine.l2_engine, "match_elements", match_elements)
+        monkeypatch.setattr(engine.l4_engine, "process", process)
+        engine.observation = Observation(dom_state=SerializedDOMState(_root=None, selector_map={}))
+        engine.weak = weak
+        return engine
+
+    async def orient(self, engine):
+        """对引擎预置的观察执行 Orient"""
+        step = TestStep(step_id="1", description="点击登录按钮", action_type=ActionType.CLICK)
+        return await engine._orient(step, engine.observation, ExecutionContext())
+
+    @pytest.mark.asyncio
+    async def test_sequential_low_confidence_reaches_l4(self, monkeypatch):
+        """测试顺序模式下 L2 不够置信时由 L4 在 L2 候选中消歧，L2 只匹配一次"""
+        engine = self.make_engine(monkeypatch, speculative=False, slot_confidence=0.9)
+
+        orientation = await self.orient(engine)
+
+        assert orientation.strategy == "L4"
+        assert engine.l4_received == [[engine.weak]]
+        assert engine.l2_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_speculative_l4_waits_for_l2(self, monkeypatch):
+        """测试推测模式下提前发起的 L4 等待 L2 任务的结果，不重复匹配"""
+        engine = self.make_engine(monkeypatch, speculative=True, slot_confidence=0.1)
+
+        orientation = await self.orient(engine)
+
+        assert orientation.metadata["speculative"]["started"][:2] == ["L2", "L4"]
+        assert orientation.strategy == "L4"
+        assert engine.l4_received == [[engine.weak]]
+        assert engine.l2_calls == 1
@@ -0,0 +1,23 @@
+"""缓存路径单元测试"""
+
+from pathlib import Path
+
+from aerotest.utils import user_cache_dir
+
+
+class TestUserCacheDir:
+    """测试 user_cache_dir"""
+
+    def test_xdg_cache_home(self, monkeypatch, tmp_path):
+        """测试优先使用 $XDG_CACHE_HOME"""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        assert user_cache_dir() == tmp_path / "aerotest"
+        assert user_cache_dir("jieba") == tmp_path / "aerotest" / "jieba"
+
+    def test_home_fallback(self, monkeypatch, tmp_path):
+        """测试未设置 $XDG_CACHE_HOME 时回退到 ~/.cache"""
+        monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+        monkeypatch.setattr(Path, "home", lambda: tmp_path)
+
+        assert user_cache_dir("locators.sqlite3") == tmp_path / ".cache" / "aerotest" / "locators.sqlite3"
@@ -0,0 +1,39 @@
+"""SQLite 存储工具单元测试"""
+
+from aerotest.utils.sqlite_store import SQLiteStore, with_hit_rate
+
+
+class NoteStore(SQLiteStore):
+    """测试用单表存储"""
+
+    TABLE = "notes"
+    SCHEMA = "CREATE TABLE IF NOT EXISTS notes (key TEXT PRIMARY KEY, accessed_at REAL NOT NULL);"
+
+
+class TestSQLiteStore:
+    """测试 SQLiteStore"""
+
+    def test_evict_lru(self, tmp_path):
+        """测试只保留最近访问的行，并自动创建父目录"""
+        store = NoteStore(tmp_path / "nested" / "notes.sqlite3")
+        for i in range(5):
+            store._conn.execute("INSERT INTO notes VALUES (?, ?)", (f"k{i}", float(i)))
+
+        with store._lock:
+            assert store._evict_lru(3, "accessed_at") == 2
+            assert store._evict_lru(3, "accessed_at") == 0
+        keys = {key for (key,) in store._conn.execute("SELECT key FROM notes")}
+
+        assert keys == {"k2", "k3", "k4"}
+        assert len(store) == 3
+        store.clear()
+        assert len(store) == 0
+        store.close()
+
+    def test_hit_rate(self):
+        """测试命中率不修改原指标"""
+        stats = {"hits": 3, "misses": 1}
+
+        assert with_hit_rate(stats)["hit_rate"] == 0.75
+        assert "hit_rate" not in stats
+        assert with_hit_rate({"hits": 0, "misses": 0})["hit_rate"] == 0.0